@@ -16,9 +16,11 @@ from api_routes import (
     invoice_routes,
     activity_routes,
     dashboard_routes,
+    events_routes,
     tariff_routes,
     qc_routes,
     data_import_routes,
+    admin_routes,
 )
 
 _MODULES = [
@@ -37,9 +39,11 @@ _MODULES = [
     invoice_routes,
     activity_routes,
     dashboard_routes,
+    events_routes,
     tariff_routes,
     qc_routes,
     data_import_routes,
+    admin_routes,
 ]
 
 
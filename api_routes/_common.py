@@ -1,13 +1,39 @@
-"""Common helpers shared across API route modules."""
+"""Common helpers shared across API route modules.
 
+JSON bodies are rendered with orjson when it is installed (``JSON_BACKEND``
+``auto``), otherwise with the stdlib encoder.  :func:`cors_handler`
+compresses responses of at least ``RESPONSE_COMPRESSION_MIN_BYTES`` with
+brotli (if installed) or gzip, as negotiated by ``Accept-Encoding``.
+"""
+
+import gzip
+import json
 import logging
+import time
+import zlib
 from functools import wraps
-from typing import Any, Optional, List
+from typing import Any, Dict, Iterator, Optional, List
+
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+import config
+import metrics
+from db import query_origin
 
-from starlette.responses import JSONResponse, Response
+try:
+    import orjson
+except ImportError:  # optional fast serializer
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
 
 logger = logging.getLogger("duck-demo")
 
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
 
 DEMO_CORS_HEADERS = {
     "Access-Control-Allow-Origin": "*",
@@ -16,9 +42,102 @@ DEMO_CORS_HEADERS = {
 }
 
 
+def dumps(data: Any) -> bytes:
+    """Serialize *data* to compact UTF-8 JSON with the configured backend."""
+    if orjson is not None and config.JSON_BACKEND != "stdlib":
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class _JSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
 def _json(data: Any, status_code: int = 200) -> JSONResponse:
     """Return JSON response with CORS headers."""
-    return JSONResponse(data, status_code=status_code, headers=DEMO_CORS_HEADERS)
+    return _JSONResponse(data, status_code=status_code, headers=DEMO_CORS_HEADERS)
+
+
+def _json_stream(data: Dict[str, Any], list_key: str, chunk_items: int = 500) -> Response:
+    """JSON response for *data* whose ``data[list_key]`` may be long.
+
+    Below ``RESPONSE_STREAM_MIN_ITEMS`` items this is just :func:`_json`.
+    Above it the body is serialized and sent *chunk_items* list entries at a
+    time, so the whole document is never held in memory as one string (the
+    list is emitted as the last key).
+    """
+    items = data.get(list_key) or []
+    if len(items) < config.RESPONSE_STREAM_MIN_ITEMS:
+        return _json(data)
+    head = {k: v for k, v in data.items() if k != list_key}
+
+    def body() -> Iterator[bytes]:
+        prefix = dumps(head)[:-1]
+        yield prefix + (b"," if head else b"") + dumps(list_key) + b":["
+        for start in range(0, len(items), chunk_items):
+            chunk = dumps(items[start:start + chunk_items])[1:-1]
+            yield (b"," if start else b"") + chunk
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json", headers=DEMO_CORS_HEADERS)
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+async def _compress_stream(chunks, encoding: str):
+    if encoding == "br":
+        compressor = brotli.Compressor()
+        flush = compressor.finish
+        process = compressor.process
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        flush = compressor.flush
+        process = compressor.compress
+    async for chunk in chunks:
+        data = process(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield flush()
+
+
+def compress_response(request, response: Response) -> Response:
+    """Compress *response* in place for the client's ``Accept-Encoding`` when worthwhile.
+
+    Skips bodies below ``RESPONSE_COMPRESSION_MIN_BYTES``, already encoded
+    responses and non-text media types; streaming responses are compressed
+    chunk by chunk.
+    """
+    if not config.RESPONSE_COMPRESSION_ENABLED or "content-encoding" in response.headers:
+        return response
+    content_type = response.headers.get("content-type", "")
+    # Event streams must reach the client event by event, never buffered by a compressor
+    if not content_type.startswith(_COMPRESSIBLE_TYPES) or content_type.startswith("text/event-stream"):
+        return response
+    encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None:
+        return response
+
+    if isinstance(response, StreamingResponse):
+        response.body_iterator = _compress_stream(response.body_iterator, encoding)
+        if "content-length" in response.headers:
+            del response.headers["content-length"]
+    else:
+        body = getattr(response, "body", b"")
+        if len(body) < config.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        response.body = brotli.compress(body) if encoding == "br" else gzip.compress(body, compresslevel=6, mtime=0)
+        response.headers["content-length"] = str(len(response.body))
+    response.headers["content-encoding"] = encoding
+    response.headers["vary"] = "Accept-Encoding"
+    return response
 
 
 def _cors_preflight(methods: list) -> Response:
@@ -51,6 +170,15 @@ def cors_handler(methods: List[str]):
         async def wrapper(request):
             if request.method == "OPTIONS":
                 return _cors_preflight(methods)
-            return await func(request)
+            t0 = time.perf_counter()
+            status = 500
+            try:
+                with query_origin(f"rest:{func.__name__}"):
+                    response = await func(request)
+                status = response.status_code
+                return compress_response(request, response)
+            finally:
+                metrics.HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - t0, func.__name__, request.method, str(status))
         return wrapper
     return decorator
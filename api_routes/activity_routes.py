@@ -1,6 +1,6 @@
 """API routes – activity log feed and daily summary."""
 
-from api_routes._common import _json, cors_handler
+from api_routes._common import _json, _json_stream, cors_handler
 from services import activity_service
 
 
@@ -11,17 +11,23 @@ def register(mcp):
     @cors_handler(["GET"])
     async def api_activity_log(request):
         qp = request.query_params
-        result = activity_service.get_log(
-            limit=int(qp.get("limit", 50)),
-            offset=int(qp.get("offset", 0)),
-            category=qp.get("category"),
-            action=qp.get("action"),
-            entity_type=qp.get("entity_type"),
-            entity_ids=[qp["entity_id"]] if "entity_id" in qp else None,
-            since=qp.get("since"),
-            until=qp.get("until"),
-        )
-        return _json(result)
+        try:
+            result = activity_service.get_log(
+                limit=int(qp.get("limit", 50)),
+                offset=int(qp.get("offset", 0)),
+                category=qp.get("category"),
+                action=qp.get("action"),
+                entity_type=qp.get("entity_type"),
+                entity_ids=[qp["entity_id"]] if "entity_id" in qp else None,
+                since=qp.get("since"),
+                until=qp.get("until"),
+                cursor=qp.get("cursor"),
+                total_mode=qp.get("total", "exact"),
+                trace_id=qp.get("trace_id"),
+            )
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
+        return _json_stream(result, "entries")
 
     @mcp.custom_route("/api/activity-log/summary", methods=["GET", "OPTIONS"])
     @cors_handler(["GET"])
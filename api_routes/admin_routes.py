@@ -0,0 +1,32 @@
+"""API routes – admin diagnostics (SQL query statistics)."""
+
+from api_routes._common import _json, _parse_bool, cors_handler
+from services import admin_service
+
+
+def register(mcp):
+    """Register admin routes."""
+
+    @mcp.custom_route("/api/admin/query-stats", methods=["GET", "OPTIONS"])
+    @cors_handler(["GET"])
+    async def api_admin_query_stats(request):
+        qp = request.query_params
+        try:
+            result = admin_service.get_query_stats(
+                limit=int(qp.get("limit", 20)),
+                sort=qp.get("sort", "total_ms"),
+            )
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
+        return _json(result)
+
+    @mcp.custom_route("/api/admin/query-stats/reset", methods=["POST", "OPTIONS"])
+    @cors_handler(["POST"])
+    async def api_admin_query_stats_reset(request):
+        qp = request.query_params
+        tracing = _parse_bool(qp["tracing"]) if "tracing" in qp else None
+        try:
+            result = admin_service.get_query_stats(limit=0, reset=True, tracing=tracing, confirm=qp.get("confirm"))
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
+        return _json(result)
@@ -2,7 +2,7 @@
 
 import json
 
-from api_routes._common import _json, cors_handler
+from api_routes._common import _json, _json_stream, cors_handler
 from db import dict_rows
 from services._base import db_conn
 
@@ -52,4 +52,4 @@ def register(mcp):
             row["issues"] = json.loads(row["issues"]) if row["issues"] else []
 
         job["rows"] = rows
-        return _json(job)
+        return _json_stream(job, "rows")
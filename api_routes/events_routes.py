@@ -0,0 +1,45 @@
+"""API routes – server-sent event stream of activity rows and dashboard deltas."""
+
+from starlette.responses import StreamingResponse
+
+import config
+import events
+from api_routes._common import DEMO_CORS_HEADERS, cors_handler, dumps
+
+
+def _format(event) -> bytes:
+    head = f"id: {event['id']}\n" if event["id"] else ""
+    return f"{head}event: {event['type']}\ndata: ".encode("utf-8") + dumps(event["data"]) + b"\n\n"
+
+
+def register(mcp):
+    """Register the event stream route."""
+
+    @mcp.custom_route("/api/events", methods=["GET", "OPTIONS"])
+    @cors_handler(["GET"])
+    async def api_events(request):
+        """Stream ``activity``, ``dashboard`` and ``reset`` events (text/event-stream).
+
+        Resumes after the ``Last-Event-ID`` header (or ``?last_event_id=``).
+        Subscribe before fetching ``/api/dashboard`` so no delta is missed.
+        """
+        last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+
+        async def stream():
+            sub = events.subscribe(last_event_id)
+            try:
+                yield b"retry: 3000\n\n"
+                while True:
+                    batch = await sub.get(config.EVENTS_HEARTBEAT_SECONDS)
+                    if not batch:
+                        yield b": keepalive\n\n"
+                        continue
+                    yield b"".join(_format(event) for event in batch)
+            finally:
+                events.unsubscribe(sub)
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={**DEMO_CORS_HEADERS, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
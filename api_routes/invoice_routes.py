@@ -14,12 +14,16 @@ def register(mcp):
     async def api_invoices(request):
         qp = request.query_params
         limit = int(qp.get("limit", 50))
-        result = invoice_service.list_invoices(
-            customer_ids=[qp["customer_id"]] if "customer_id" in qp else None,
-            sales_order_id=qp.get("sales_order_id"),
-            status=qp.get("status"),
-            limit=limit
-        )
+        try:
+            result = invoice_service.list_invoices(
+                customer_ids=[qp["customer_id"]] if "customer_id" in qp else None,
+                sales_order_id=qp.get("sales_order_id"),
+                status=qp.get("status"),
+                limit=limit,
+                cursor=qp.get("cursor"),
+            )
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
         return _json(result)
 
     @mcp.custom_route("/api/invoices/{invoice_id}", methods=["GET", "OPTIONS"])
@@ -19,7 +19,8 @@ def register(mcp):
             customer_ids=[qp["customer_id"]] if "customer_id" in qp else None,
             status=qp.get("status"),
             limit=limit,
-            show_superseded=show_superseded
+            show_superseded=show_superseded,
+            quote_chain_id=qp.get("quote_chain_id"),
         )
         return _json(result)
 
@@ -12,11 +12,28 @@ def register(mcp):
     async def api_sales_orders(request):
         qp = request.query_params
         limit = int(qp.get("limit", 20))
-        result = sales_service.search_orders(
-            customer_ids=[qp["customer_id"]] if "customer_id" in qp else None,
-            limit=limit,
-            sort=qp.get("sort", "most_recent"),
-        )
+        try:
+            result = sales_service.search_orders(
+                customer_ids=[qp["customer_id"]] if "customer_id" in qp else None,
+                limit=limit,
+                sort=qp.get("sort", "most_recent"),
+                cursor=qp.get("cursor"),
+            )
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
+        return _json(result)
+
+    @mcp.custom_route("/api/sales-orders/bulk", methods=["POST", "OPTIONS"])
+    @cors_handler(["POST"])
+    async def api_sales_orders_bulk(request):
+        body = await request.json()
+        orders = body.get("orders")
+        if not isinstance(orders, list) or not orders:
+            return _json({"error": "orders is required"}, status_code=400)
+        try:
+            result = sales_service.bulk_create_orders(orders, confirm=body.get("confirm", True), actor="api")
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status_code=400)
         return _json(result)
 
     @mcp.custom_route("/api/sales-orders/{order_id}", methods=["GET", "OPTIONS"])
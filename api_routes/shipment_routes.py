@@ -3,6 +3,7 @@
 from api_routes._common import _json, cors_handler
 from db import dict_rows
 from services import db_conn, logistics_service
+from services._base import keyset_condition, page_cursor
 from utils import ui_href
 
 
@@ -31,8 +32,22 @@ def register(mcp):
     @mcp.custom_route("/api/shipments", methods=["GET", "OPTIONS"])
     @cors_handler(["GET"])
     async def api_shipments(request):
+        qp = request.query_params
+        where, params = "", []
+        if "cursor" in qp:
+            try:
+                seek_sql, params = keyset_condition(("planned_departure", "id"), qp["cursor"], descending=True)
+            except ValueError as exc:
+                return _json({"error": str(exc)}, status_code=400)
+            where = f" WHERE {seek_sql}"
         with db_conn() as conn:
-            rows = dict_rows(conn.execute("SELECT * FROM shipments ORDER BY planned_departure DESC").fetchall())
+            if "limit" in qp:
+                limit = int(qp["limit"])
+                cur = conn.execute(f"SELECT * FROM shipments{where} ORDER BY planned_departure DESC, id DESC LIMIT ?", (*params, limit + 1))
+                rows, next_cursor = page_cursor(dict_rows(cur.fetchall()), ("planned_departure", "id"), limit)
+            else:
+                cur = conn.execute(f"SELECT * FROM shipments{where} ORDER BY planned_departure DESC, id DESC", params)
+                rows, next_cursor = dict_rows(cur.fetchall()), None
             for row in rows:
                 row["ui_url"] = ui_href("shipments", row["id"])
-        return _json({"shipments": rows})
+        return _json({"shipments": rows, "next_cursor": next_cursor})
@@ -3,6 +3,7 @@
 from api_routes._common import _json, cors_handler
 from db import dict_rows
 from services import db_conn
+from services._base import keyset_condition, page_cursor
 from utils import ui_href
 
 
@@ -14,12 +15,19 @@ def register(mcp):
     async def api_stock(request):
         qp = request.query_params
         limit = int(qp.get("limit", 200))
+        where, params = "", []
+        if "cursor" in qp:
+            try:
+                seek_sql, params = keyset_condition(("s.warehouse", "s.location", "s.id"), qp["cursor"], descending=False)
+            except ValueError as exc:
+                return _json({"error": str(exc)}, status_code=400)
+            where = f" WHERE {seek_sql}"
         with db_conn() as conn:
-            query = "SELECT s.id, s.item_id, i.sku as item_sku, i.name as item_name, i.type as item_type, s.warehouse, s.location, s.on_hand FROM stock s JOIN items i ON s.item_id = i.id ORDER BY s.warehouse, s.location LIMIT ?"
-            rows = dict_rows(conn.execute(query, (limit,)).fetchall())
+            query = f"SELECT s.id, s.item_id, i.sku as item_sku, i.name as item_name, i.type as item_type, s.warehouse, s.location, s.on_hand FROM stock s JOIN items i ON s.item_id = i.id{where} ORDER BY s.warehouse, s.location, s.id LIMIT ?"
+            rows, next_cursor = page_cursor(dict_rows(conn.execute(query, (*params, limit + 1)).fetchall()), ("warehouse", "location", "id"), limit)
             for row in rows:
                 row["ui_url"] = ui_href("stock", row["id"])
-            return _json({"stock": rows})
+            return _json({"stock": rows, "next_cursor": next_cursor})
 
     @mcp.custom_route("/api/stock/{stock_id}", methods=["GET", "OPTIONS"])
     @cors_handler(["GET"])
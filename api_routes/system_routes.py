@@ -3,8 +3,10 @@
 import os
 from datetime import datetime, timedelta
 
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, HTMLResponse, PlainTextResponse, Response
 
+import mcp_apps
+import metrics
 from api_routes._common import _json, cors_handler, DEMO_CORS_HEADERS
 from db import dict_rows
 from services import db_conn, simulation_service
@@ -18,17 +20,29 @@ def register(mcp):
     async def api_health(request):
         return _json({"status": "ok"})
 
-    @mcp.custom_route("/api/mcp-app-ui/customer-confirm", methods=["GET", "OPTIONS"])
+    @mcp.custom_route("/api/metrics", methods=["GET", "OPTIONS"])
     @cors_handler(["GET"])
-    async def api_mcp_app_test(request):
-        """Test endpoint to manually access the MCP App UI for debugging."""
-        ui_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mcp_apps_ui", "customer-confirm.html")
-        if os.path.exists(ui_path):
-            with open(ui_path, "r", encoding="utf-8") as f:
-                from starlette.responses import HTMLResponse
-                return HTMLResponse(f.read(), headers=DEMO_CORS_HEADERS)
-        else:
+    async def api_metrics(request):
+        """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+        return PlainTextResponse(
+            metrics.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+            headers=DEMO_CORS_HEADERS,
+        )
+
+    @mcp.custom_route("/api/mcp-app-ui/{name}", methods=["GET", "OPTIONS"])
+    @cors_handler(["GET"])
+    async def api_mcp_app_ui(request):
+        """Serve a built MCP App UI bundle for debugging (gzip + ETag from the in-memory cache)."""
+        bundle = mcp_apps.get_bundle(f"{request.path_params['name']}.html")
+        if bundle is None:
             return _json({"error": "MCP App UI not found"}, status_code=404)
+        headers = {**DEMO_CORS_HEADERS, "ETag": f'"{bundle.etag}"', "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(bundle.gzip, media_type="text/html", headers={**headers, "Content-Encoding": "gzip"})
+        return HTMLResponse(bundle.text, headers=headers)
 
     @mcp.custom_route("/api/simulation/time", methods=["GET", "OPTIONS"])
     @cors_handler(["GET"])
@@ -0,0 +1,12 @@
+"""Scale benchmarks for the duck-demo backend.
+
+``benchmarks.datagen`` builds synthetic databases at a multiple of the
+scenario volumes with bulk inserts; ``benchmarks.run`` times the hot paths
+against them and writes JSON results that can be compared across runs.
+
+Usage:
+    python -m benchmarks                          # scales 10,100 → benchmarks/results/
+    python -m benchmarks --scales 10,100,1000 --repeat 10
+    python -m benchmarks --baseline benchmarks/results/<earlier>.json
+    python -m benchmarks.datagen --scale 100 --out /tmp/scale-100.db
+"""
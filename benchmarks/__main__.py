@@ -0,0 +1,5 @@
+"""Allow running the benchmarks as a module: python -m benchmarks"""
+
+from benchmarks.run import main
+
+main()
@@ -0,0 +1,509 @@
+"""Parametric synthetic data generator for scale benchmarks.
+
+Builds a database with the scenario catalog (``scenarios.base_setup``) and
+``scale`` times the transactional volume of a full scenario run: customers,
+quotes, sales orders, production orders with operations, purchase orders,
+shipments, invoices, payments, emails, stock batches with a consistent
+movement trail (so supply-chain traces resolve) and the activity log.
+
+Everything after the catalog is written with ``executemany`` in a single
+transaction, with secondary indexes dropped during the load and rebuilt at
+the end, so a 100× database takes seconds rather than the minutes the
+service-layer scenarios need.  Output is deterministic for a given
+``(scale, seed)``.
+
+Usage:
+    python -m benchmarks.datagen --scale 100 --out /tmp/scale-100.db
+"""
+
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+import db
+
+logger = logging.getLogger("benchmarks.datagen")
+
+# Bump when the generated data changes shape, so cached databases are rebuilt
+GENERATOR_VERSION = 1
+
+# Rows per 1× unit, roughly what s01–s06 produce over the scenario window
+UNIT_VOLUMES = {
+    "customers": 120,
+    "quotes": 400,
+    "purchase_orders": 60,
+}
+SCENARIO_START = datetime(2025, 8, 1, 8, 0, 0)
+SCENARIO_DAYS = 150
+
+# ID counters start well above anything base_setup or generate_id's seed defaults produce
+_ID_START = 10000
+
+_FIRST_NAMES = [
+    "Alexandre", "Amélie", "Antoine", "Camille", "Charlotte", "Clara", "Emma", "Gabriel",
+    "Hugo", "Jade", "Jules", "Léa", "Louis", "Lucas", "Manon", "Marie", "Nathan", "Sophie",
+    "Klaus", "Anna", "Lukas", "Greta", "Jonas", "Mia",
+]
+_LAST_NAMES = [
+    "Bernard", "Bonnet", "Dubois", "Durand", "Fontaine", "Fournier", "Garnier", "Girard",
+    "Lambert", "Laurent", "Martin", "Mercier", "Moreau", "Petit", "Richard", "Rousseau",
+    "Müller", "Schmidt", "Weber", "Fischer",
+]
+_CITIES = [
+    ("Paris", "75001", "FR"), ("Lyon", "69001", "FR"), ("Marseille", "13001", "FR"),
+    ("Toulouse", "31000", "FR"), ("Bordeaux", "33000", "FR"), ("Nantes", "44000", "FR"),
+    ("Lille", "59000", "FR"), ("Nice", "06000", "FR"), ("Berlin", "10115", "DE"),
+    ("München", "80331", "DE"), ("Hamburg", "20095", "DE"), ("Bruxelles", "1000", "BE"),
+    ("Zürich", "8001", "CH"), ("London", "EC1A", "GB"),
+]
+_COMPANY_TEMPLATES = ["Jouets {last}", "Canard & {last}", "{last} Distribution", "Boutique {last}", None, None]
+
+
+class _Ids:
+    """Sequential ``PREFIX-n`` identifiers per prefix."""
+
+    def __init__(self):
+        self._next: Dict[str, int] = defaultdict(lambda: _ID_START)
+
+    def __call__(self, prefix: str) -> str:
+        n = self._next[prefix]
+        self._next[prefix] = n + 1
+        return f"{prefix}-{n}"
+
+
+def _ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _fresh_database(path: Path) -> None:
+    """Create an empty database at *path* with schema and simulation clock."""
+    if path.exists():
+        path.unlink()
+    for suffix in ("-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    db.init_db()
+    conn = db.get_connection()
+    try:
+        conn.execute("INSERT OR REPLACE INTO simulation_state (id, sim_time) VALUES (1, ?)", (_ts(SCENARIO_START),))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _load_catalog(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Read the catalog written by base_setup into plain lookup structures."""
+    finished = [dict(r) for r in conn.execute(
+        "SELECT i.id, i.unit_price, r.id AS recipe_id, r.output_qty "
+        "FROM items i JOIN recipes r ON r.output_item_id = i.id "
+        "WHERE i.type = 'finished_good' ORDER BY i.id"
+    )]
+    operations: Dict[str, list] = defaultdict(list)
+    for r in conn.execute(
+        "SELECT recipe_id, id, sequence_order, operation_name, duration_hours, work_center "
+        "FROM recipe_operations ORDER BY recipe_id, sequence_order"
+    ):
+        operations[r["recipe_id"]].append(tuple(r))
+    ingredients: Dict[str, list] = defaultdict(list)
+    for r in conn.execute("SELECT recipe_id, input_item_id, input_qty FROM recipe_ingredients"):
+        ingredients[r["recipe_id"]].append((r["input_item_id"], r["input_qty"]))
+    materials = [dict(r) for r in conn.execute(
+        "SELECT id, cost_price, reorder_qty, default_supplier_id FROM items "
+        "WHERE type = 'raw_material' ORDER BY id"
+    )]
+    initial_stock = {r["item_id"]: r["id"] for r in conn.execute("SELECT id, item_id FROM stock")}
+    return {
+        "finished": finished,
+        "operations": operations,
+        "ingredients": ingredients,
+        "materials": materials,
+        "initial_stock": initial_stock,
+    }
+
+
+def _build_unit(catalog: Dict[str, Any], rng: random.Random, ids: _Ids,
+                batches: Dict[str, Dict[str, list]]) -> Dict[str, List[tuple]]:
+    """Generate the rows for one 1× unit of volume, keyed by table.
+
+    ``batches`` carries raw-material and finished-goods stock IDs across
+    units so later production and shipments can consume earlier batches.
+    """
+    rows: Dict[str, List[tuple]] = defaultdict(list)
+    end = SCENARIO_START + timedelta(days=SCENARIO_DAYS)
+
+    def when(lo_days: float = 0, hi_days: float = SCENARIO_DAYS) -> datetime:
+        return SCENARIO_START + timedelta(days=rng.uniform(lo_days, hi_days))
+
+    def log(ts: datetime, actor: str, category: str, action: str, entity_type: str, entity_id: str) -> None:
+        rows["activity_log"].append((ids("ACT"), _ts(ts), actor, category, action, entity_type, entity_id, None))
+
+    # --- Customers -------------------------------------------------------
+    customers = []
+    for _ in range(UNIT_VOLUMES["customers"]):
+        cid = ids("CUST")
+        first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+        city, postal, country = rng.choice(_CITIES)
+        template = rng.choice(_COMPANY_TEMPLATES)
+        company = template.format(last=last) if template else None
+        created = when(-30, SCENARIO_DAYS - 10)
+        customers.append((cid, f"{rng.randint(1, 200)} Rue {last}", city, postal, country, created))
+        rows["customers"].append((
+            cid, rng.choice("MF"), f"{first} {last}", company,
+            f"{first.lower()}.{last.lower()}{cid[5:]}@example.com", None,
+            customers[-1][1], None, city, postal, country, None, rng.choice((15, 30, 45, 60)),
+            config.PRICING_CURRENCY, None, _ts(created),
+        ))
+
+    # --- Purchase orders → raw-material batches ------------------------------
+    rm_batches = batches["rm"]  # material id → [stock id]
+    for _ in range(UNIT_VOLUMES["purchase_orders"]):
+        mat = rng.choice(catalog["materials"])
+        po_id = ids("PO")
+        qty = max(1, int(mat["reorder_qty"] or 100))
+        ordered = when(0, SCENARIO_DAYS - 5)
+        expected = ordered + timedelta(days=rng.randint(3, 14))
+        received = expected if expected < end - timedelta(days=3) else None
+        unit_price = mat["cost_price"] or 0.1
+        rows["purchase_orders"].append((
+            po_id, mat["id"], qty, mat["default_supplier_id"] or "SUP-001", unit_price, round(qty * unit_price, 2),
+            config.PRICING_CURRENCY, "received" if received else "ordered", _ts(ordered), _ts(expected),
+            _ts(received) if received else None,
+        ))
+        log(ordered, "mcp:purchase", "purchasing", "purchase_order.created", "purchase_order", po_id)
+        if received:
+            stk_id = ids("STK")
+            rows["stock"].append((stk_id, mat["id"], config.WAREHOUSE_DEFAULT, config.LOC_RAW_MATERIAL_RECV, qty))
+            rows["stock_movements"].append((
+                ids("MOV"), _ts(received), mat["id"], "purchase_in", qty, stk_id, "purchase_order", po_id, None, None,
+            ))
+            rm_batches[mat["id"]].append(stk_id)
+            log(received, "system", "purchasing", "purchase_order.received", "purchase_order", po_id)
+
+    # --- Quotes → sales orders → production / shipments / invoices -----------
+    fg_batches = batches["fg"]  # item id → [stock id]
+    for _ in range(UNIT_VOLUMES["quotes"]):
+        cust_id, line1, city, postal, country, cust_created = rng.choice(customers)
+        created = max(cust_created, SCENARIO_START) + timedelta(days=rng.uniform(0, 20))
+        if created >= end:
+            created = end - timedelta(hours=rng.uniform(1, 48))
+        age = (end - created).days
+        quote_id = ids("QUOTE")
+        lines = []
+        for idx in range(1, rng.randint(1, 3) + 1):
+            fg = rng.choice(catalog["finished"])
+            qty = rng.choice((6, 12, 24, 36, 48, 60, 96, 120))
+            lines.append((idx, fg, qty, fg["unit_price"], round(qty * fg["unit_price"], 2)))
+        subtotal = round(sum(ln[4] for ln in lines), 2)
+        discount = round(subtotal * config.PRICING_VOLUME_DISCOUNT_PCT, 2) if sum(ln[2] for ln in lines) >= config.PRICING_VOLUME_QTY_THRESHOLD else 0.0
+        shipping = 0.0 if subtotal >= config.PRICING_FREE_SHIPPING_THRESHOLD else config.PRICING_FLAT_SHIPPING
+        total = round(subtotal - discount + shipping, 2)
+        requested = created + timedelta(days=rng.randint(14, 45))
+        valid_until = created + timedelta(days=config.QUOTE_VALIDITY_DAYS)
+
+        roll = rng.random()
+        if age < 3:
+            status = rng.choice(("draft", "sent"))
+        elif roll < 0.75:
+            status = "accepted"
+        elif roll < 0.85:
+            status = "rejected"
+        else:
+            status = "expired" if valid_until < end else "sent"
+        sent_at = created + timedelta(hours=2) if status != "draft" else None
+        accepted_at = created + timedelta(days=rng.uniform(0.5, 3)) if status == "accepted" else None
+        rows["quotes"].append((
+            quote_id, cust_id, 1, None, quote_id, requested.strftime("%Y-%m-%d"), line1, None, postal, city, country, None,
+            subtotal, discount, shipping, 0.0, total, config.PRICING_CURRENCY, valid_until.strftime("%Y-%m-%d"),
+            status, _ts(created), _ts(sent_at) if sent_at else None, _ts(accepted_at) if accepted_at else None,
+            _ts(created + timedelta(days=2)) if status == "rejected" else None,
+        ))
+        for idx, fg, qty, price, line_total in lines:
+            rows["quote_lines"].append((f"{quote_id}-{idx:02d}", quote_id, fg["id"], qty, price, line_total))
+        log(created, "mcp:quote", "sales", "quote.created", "quote", quote_id)
+        if sent_at:
+            log(sent_at, "mcp:quote", "sales", "quote.sent", "quote", quote_id)
+        if status != "accepted":
+            continue
+
+        # Sales order
+        so_id = ids("SO")
+        so_created = accepted_at
+        log(accepted_at, "mcp:quote", "sales", "quote.accepted", "quote", quote_id)
+        log(so_created, "mcp:sales", "sales", "sales_order.created", "sales_order", so_id)
+        for idx, fg, qty, price, line_total in lines:
+            rows["sales_order_lines"].append((f"{so_id}-{idx:02d}", so_id, fg["id"], qty, price, line_total))
+        so_age = (end - so_created).days
+
+        # Production: one order per line, completed ones leave a finished-goods batch
+        for idx, fg, qty, _price, _total in lines:
+            if rng.random() < 0.5:
+                continue
+            mo_id = ids("MO")
+            started = so_created + timedelta(days=rng.uniform(0.5, 3))
+            duration = sum(op[4] for op in catalog["operations"][fg["recipe_id"]])
+            completed = started + timedelta(hours=duration)
+            if completed < end:
+                mo_status = "completed"
+            elif started < end:
+                mo_status = "in_progress"
+            else:
+                mo_status, started = "planned", None
+            batch_qty = max(qty, fg["output_qty"])
+            rows["production_orders"].append((
+                mo_id, so_id, fg["recipe_id"], fg["id"], mo_status, None, None,
+                batch_qty if mo_status == "completed" else None,
+                _ts(started) if started else None, _ts(completed) if mo_status == "completed" else None,
+                _ts(completed), _ts(completed + timedelta(days=1)), 0, "none",
+            ))
+            log(so_created, "mcp:production", "production", "production_order.created", "production_order", mo_id)
+            op_start = started
+            for rcp_id, op_id, seq, name, hours, wc in catalog["operations"][fg["recipe_id"]]:
+                op_end = op_start + timedelta(hours=hours) if op_start else None
+                if mo_status == "completed" or (op_end and op_end < end):
+                    op_status = "completed"
+                elif op_start and op_start < end:
+                    op_status = "in_progress"
+                else:
+                    op_status = "pending"
+                rows["production_operations"].append((
+                    ids("POP"), mo_id, op_id, seq, name, hours, wc, op_status,
+                    _ts(op_start) if op_status != "pending" else None,
+                    _ts(op_end) if op_status == "completed" else None, None, None,
+                ))
+                op_start = op_end
+            if mo_status != "completed":
+                continue
+            for mat_id, per_batch in catalog["ingredients"][fg["recipe_id"]]:
+                source = rng.choice(rm_batches[mat_id]) if rm_batches[mat_id] else catalog["initial_stock"].get(mat_id)
+                rows["stock_movements"].append((
+                    ids("MOV"), _ts(started), mat_id, "production_consume", -int(per_batch), source,
+                    "production_order", mo_id, None, None,
+                ))
+            stk_id = ids("STK")
+            rows["stock"].append((stk_id, fg["id"], config.WAREHOUSE_DEFAULT, config.LOC_FINISHED_GOODS, batch_qty))
+            rows["stock_movements"].append((
+                ids("MOV"), _ts(completed), fg["id"], "production_in", batch_qty, stk_id, "production_order", mo_id, None, None,
+            ))
+            fg_batches[fg["id"]].append(stk_id)
+            log(completed, "system", "production", "production_order.completed", "production_order", mo_id)
+
+        # Shipment, invoice, payment for orders old enough to have shipped
+        so_status = "confirmed"
+        if so_age >= 7:
+            ship_id = ids("SHIP")
+            departure = so_created + timedelta(days=rng.uniform(3, 6))
+            arrival = departure + timedelta(days=config.TRANSIT_DAYS_DEFAULT)
+            if arrival < end:
+                ship_status, so_status = "delivered", "completed"
+            elif departure < end:
+                ship_status = "in_transit"
+            else:
+                ship_status = "planned"
+            rows["shipments"].append((
+                ship_id, config.WAREHOUSE_DEFAULT, line1, None, postal, city, country, _ts(departure), _ts(arrival),
+                ship_status, f"TRK-{ship_id[5:]}", _ts(departure) if ship_status != "planned" else None,
+                _ts(arrival) if ship_status == "delivered" else None,
+            ))
+            rows["sales_order_shipments"].append((so_id, ship_id))
+            for idx, fg, qty, _price, _total in lines:
+                rows["shipment_lines"].append((f"{ship_id}-{idx:02d}", ship_id, fg["id"], qty, None, None))
+                if ship_status != "planned" and fg_batches[fg["id"]]:
+                    rows["stock_movements"].append((
+                        ids("MOV"), _ts(departure), fg["id"], "shipment_out", -qty, rng.choice(fg_batches[fg["id"]]),
+                        "shipment", ship_id, None, None,
+                    ))
+            if ship_status != "planned":
+                log(departure, "system", "logistics", "shipment.dispatched", "shipment", ship_id)
+            if ship_status == "delivered":
+                log(arrival, "system", "logistics", "shipment.delivered", "shipment", ship_id)
+
+                inv_id = ids("INV")
+                issued = arrival + timedelta(hours=4)
+                due = issued + timedelta(days=config.INVOICE_PAYMENT_TERMS_DAYS)
+                paid = issued + timedelta(days=rng.uniform(5, 40))
+                if paid < end:
+                    inv_status = "paid"
+                else:
+                    inv_status = "overdue" if due < end else "issued"
+                rows["invoices"].append((
+                    inv_id, so_id, cust_id, issued.strftime("%Y-%m-%d"), due.strftime("%Y-%m-%d"),
+                    subtotal, discount, shipping, 0.0, total, config.PRICING_CURRENCY, inv_status,
+                    _ts(issued), _ts(paid) if inv_status == "paid" else None, _ts(issued),
+                ))
+                log(issued, "mcp:invoice", "billing", "invoice.issued", "invoice", inv_id)
+                if inv_status == "paid":
+                    pay_id = ids("PAY")
+                    rows["payments"].append((
+                        pay_id, inv_id, total, "bank_transfer", paid.strftime("%Y-%m-%d"), f"REF-{pay_id[4:]}", None, _ts(paid),
+                    ))
+                    log(paid, "mcp:invoice", "billing", "payment.recorded", "payment", pay_id)
+
+        rows["sales_orders"].append((
+            so_id, quote_id, cust_id, requested.strftime("%Y-%m-%d"), line1, None, postal, city, country, None,
+            subtotal, discount, shipping, 0.0, total, config.PRICING_CURRENCY, so_status, _ts(so_created),
+        ))
+        if rng.random() < 0.3:
+            rows["emails"].append((
+                ids("EMAIL"), cust_id, so_id, f"{cust_id.lower()}@example.com", None,
+                f"Order confirmation {so_id}", f"Thank you for your order {so_id}.", "sent",
+                _ts(so_created), _ts(so_created), _ts(so_created),
+            ))
+
+    return rows
+
+
+# Column lists for the bulk inserts, in the tuple order _build_unit produces
+_COLUMNS = {
+    "customers": ("id", "gender", "name", "company", "email", "phone", "address_line1", "address_line2",
+                  "city", "postal_code", "country", "tax_id", "payment_terms", "currency", "notes", "created_at"),
+    "purchase_orders": ("id", "item_id", "qty", "supplier_id", "unit_price", "total", "currency", "status",
+                        "ordered_at", "expected_delivery", "received_at"),
+    "stock": ("id", "item_id", "warehouse", "location", "on_hand"),
+    "stock_movements": ("id", "timestamp", "item_id", "movement_type", "qty", "stock_id", "reference_type",
+                        "reference_id", "notes", "qc_inspection_id"),
+    "quotes": ("id", "customer_id", "revision_number", "supersedes_quote_id", "quote_chain_id", "requested_delivery_date",
+               "ship_to_line1", "ship_to_line2", "ship_to_postal_code", "ship_to_city", "ship_to_country", "note",
+               "subtotal", "discount", "shipping", "tax", "total", "currency", "valid_until", "status",
+               "created_at", "sent_at", "accepted_at", "rejected_at"),
+    "quote_lines": ("id", "quote_id", "item_id", "qty", "unit_price", "line_total"),
+    "sales_orders": ("id", "quote_id", "customer_id", "requested_delivery_date", "ship_to_line1", "ship_to_line2",
+                     "ship_to_postal_code", "ship_to_city", "ship_to_country", "note", "subtotal", "discount",
+                     "shipping", "tax", "total", "currency", "status", "created_at"),
+    "sales_order_lines": ("id", "sales_order_id", "item_id", "qty", "unit_price", "line_total"),
+    "production_orders": ("id", "sales_order_id", "recipe_id", "item_id", "status", "parent_production_order_id",
+                          "current_operation", "qty_produced", "started_at", "completed_at", "eta_finish",
+                          "eta_ship", "inspection_required", "inspection_status"),
+    "production_operations": ("id", "production_order_id", "recipe_operation_id", "sequence_order",
+                              "operation_name", "duration_hours", "work_center", "status", "started_at",
+                              "completed_at", "blocked_reason", "blocked_at"),
+    "shipments": ("id", "ship_from_warehouse", "ship_to_line1", "ship_to_line2", "ship_to_postal_code",
+                  "ship_to_city", "ship_to_country", "planned_departure", "planned_arrival", "status",
+                  "tracking_ref", "dispatched_at", "delivered_at"),
+    "shipment_lines": ("id", "shipment_id", "item_id", "qty", "tariff_code", "tariff_description"),
+    "sales_order_shipments": ("sales_order_id", "shipment_id"),
+    "invoices": ("id", "sales_order_id", "customer_id", "invoice_date", "due_date", "subtotal", "discount",
+                 "shipping", "tax", "total", "currency", "status", "issued_at", "paid_at", "created_at"),
+    "payments": ("id", "invoice_id", "amount", "payment_method", "payment_date", "reference", "notes", "created_at"),
+    "emails": ("id", "customer_id", "sales_order_id", "recipient_email", "recipient_name", "subject", "body",
+               "status", "created_at", "modified_at", "sent_at"),
+    "activity_log": ("id", "timestamp", "actor", "category", "action", "entity_type", "entity_id", "details"),
+}
+
+
+def generate(path: Path, scale: int = 1, seed: int = 42) -> Dict[str, Any]:
+    """Build a synthetic database at *path* with ``scale``× scenario volume.
+
+    Returns a metadata dict (scale, seed, per-table row counts, build time)
+    which is also stored in the database's ``benchmark_meta`` table so
+    ``ensure_database`` can reuse it.
+    """
+    if scale < 1:
+        raise ValueError("scale must be >= 1")
+    path = Path(path)
+    t0 = time.perf_counter()
+    rng = random.Random(seed)
+
+    original = db.DB_PATH
+    db.DB_PATH = path
+    try:
+        _fresh_database(path)
+        # Catalog, suppliers, recipes, work centers and starting stock
+        from scenarios import base_setup
+        base_setup.populate()
+
+        conn = db.get_connection()
+        try:
+            conn.execute("PRAGMA synchronous=OFF")
+            catalog = _load_catalog(conn)
+            ids = _Ids()
+            batches = {"rm": defaultdict(list), "fg": defaultdict(list)}
+            inserts = {
+                table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+                for table, columns in _COLUMNS.items()
+            }
+
+            # Drop secondary indexes for the load; rebuilding once is far cheaper
+            indexes = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            ).fetchall()
+            conn.execute("BEGIN")
+            for name, _sql in indexes:
+                conn.execute(f"DROP INDEX {name}")
+            # One unit at a time keeps memory flat even at 1000×
+            for _ in range(scale):
+                rows = _build_unit(catalog, rng, ids, batches)
+                for table, sql in inserts.items():
+                    if rows[table]:
+                        conn.executemany(sql, rows[table])
+            for _name, sql in indexes:
+                conn.execute(sql)
+            sim_end = SCENARIO_START + timedelta(days=SCENARIO_DAYS)
+            conn.execute("UPDATE simulation_state SET sim_time = ? WHERE id = 1", (_ts(sim_end),))
+
+            counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in _COLUMNS}
+            meta = {
+                "generator_version": GENERATOR_VERSION,
+                "scale": scale,
+                "seed": seed,
+                "rows": counts,
+                "build_seconds": round(time.perf_counter() - t0, 2),
+            }
+            conn.execute("CREATE TABLE benchmark_meta (meta TEXT NOT NULL)")
+            conn.execute("INSERT INTO benchmark_meta (meta) VALUES (?)", (json.dumps(meta),))
+            conn.commit()
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        db.DB_PATH = original
+
+    logger.info("Generated %s (scale=%d) in %.1fs: %d rows", path, scale, meta["build_seconds"], sum(counts.values()))
+    return meta
+
+
+def read_meta(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the generator metadata stored in *path*, or None if absent/unreadable."""
+    if not Path(path).exists():
+        return None
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("SELECT meta FROM benchmark_meta").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def ensure_database(path: Path, scale: int, seed: int = 42) -> Dict[str, Any]:
+    """Reuse the database at *path* if it matches (scale, seed, version), else regenerate it."""
+    meta = read_meta(path)
+    if meta and meta.get("generator_version") == GENERATOR_VERSION and meta.get("scale") == scale and meta.get("seed") == seed:
+        return meta
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return generate(path, scale=scale, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic duck-demo database for benchmarks.")
+    parser.add_argument("--scale", type=int, default=10, help="Multiple of scenario volume (default 10)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default 42)")
+    parser.add_argument("--out", type=Path, required=True, help="Output database path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%H:%M:%S")
+    meta = generate(args.out, scale=args.scale, seed=args.seed)
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Replay recorded agent tool-call sessions against the MCP server under load.
+
+Sessions are read from ``chatlogs/*.json`` (OpenAI-style completion logs):
+each log's ``mcp_<n>_<tool>`` calls are replayed in order, client-side tools
+such as ``system_get_current_date_time_iso`` are skipped.  ``--concurrency``
+workers each replay whole sessions; ``--rate`` caps the combined calls per
+second.  LLM calls made by the tools are answered by the local fake provider
+(``INFERENCE_FAKE=true``), so nothing leaves the machine.
+
+Transports:
+    inprocess  tools called on a FastMCP app in this process, one thread per worker
+    http       streamable-http against a running server (``--url``); start it
+               with ``INFERENCE_FAKE=true python server.py``
+    stdio      ``server.py --stdio`` spawned through ``mcp_proxy.py`` (server
+               stderr goes to ``<proxy log>.stderr``)
+
+The report gives per-tool p50/p95/p99 latency, throughput and error rates,
+and flags SQLite lock contention ("database is locked" errors).
+
+Usage:
+    python -m benchmarks.replay --concurrency 8 --iterations 20
+    python -m benchmarks.replay --transport http --url http://127.0.0.1:8000/mcp --rate 50
+    python -m benchmarks.replay --transport stdio --duration 60 --out /tmp/replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import db
+from benchmarks.run import _percentile
+
+logger = logging.getLogger("benchmarks.replay")
+
+CHATLOG_DIR = db.ROOT / "chatlogs"
+TRANSPORTS = ("inprocess", "http", "stdio")
+
+# Tools exposed by the MCP server carry a per-connection prefix in the logs
+_MCP_PREFIX = re.compile(r"^mcp_\d+_")
+
+# Error text that means a call lost a SQLite lock race
+LOCK_MARKERS = ("database is locked", "database table is locked", "sqlite_busy")
+
+# A tool call as replayed: (tool name, arguments)
+Call = Tuple[str, Dict[str, Any]]
+# Returns None on success, the error text on failure
+Caller = Callable[[str, Dict[str, Any]], Awaitable[Optional[str]]]
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+def load_session(path: Path) -> List[Call]:
+    """Extract the MCP tool calls of one chatlog, in the order they were made."""
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    entries.sort(key=lambda e: e.get("createdAt") or "")
+    calls = []
+    for entry in entries:
+        for choice in (entry.get("response") or {}).get("choices") or []:
+            for tool_call in (choice.get("message") or {}).get("tool_calls") or []:
+                fn = tool_call.get("function") or {}
+                name = fn.get("name") or ""
+                if not _MCP_PREFIX.match(name):
+                    continue
+                try:
+                    args = json.loads(fn.get("arguments") or "{}")
+                except json.JSONDecodeError:
+                    logger.warning("%s: unparseable arguments for %s — skipped", Path(path).name, name)
+                    continue
+                calls.append((_MCP_PREFIX.sub("", name), args))
+    return calls
+
+
+def load_sessions(paths: List[Path]) -> List[List[Call]]:
+    """Load every chatlog in *paths*, dropping those without MCP tool calls."""
+    sessions = [load_session(p) for p in paths]
+    return [s for s in sessions if s]
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+def _error_text(result) -> str:
+    return " ".join(getattr(c, "text", "") for c in result.content) or "tool returned isError"
+
+
+def _session_caller(session) -> Caller:
+    async def call(name: str, args: Dict[str, Any]) -> Optional[str]:
+        result = await session.call_tool(name, args)
+        return _error_text(result) if result.isError else None
+    return call
+
+
+def _build_mcp():
+    from mcp.server.fastmcp import FastMCP
+
+    from mcp_tools import register_all_tools
+
+    mcp = FastMCP("duck-demo-replay")
+    register_all_tools(mcp)
+    return mcp
+
+
+@asynccontextmanager
+async def open_callers(transport: str, workers: int, url: str, proxy_log: Path) -> AsyncIterator[List[Caller]]:
+    """Yield one caller per worker for *transport*.
+
+    ``inprocess`` runs each call on a worker thread so the service layer
+    sees real concurrent connections; ``http`` opens one session per worker;
+    ``stdio`` shares one session over the single server process.
+    """
+    if transport == "inprocess":
+        mcp = _build_mcp()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay")
+        loop = asyncio.get_running_loop()
+
+        def run(name: str, args: Dict[str, Any]) -> Optional[str]:
+            try:
+                asyncio.run(mcp.call_tool(name, args))
+            except Exception as e:
+                return str(e)
+            return None
+
+        async def call(name: str, args: Dict[str, Any]) -> Optional[str]:
+            return await loop.run_in_executor(executor, run, name, args)
+
+        try:
+            yield [call] * workers
+        finally:
+            executor.shutdown(wait=True)
+        return
+
+    from mcp import ClientSession
+
+    async with AsyncExitStack() as stack:
+        if transport == "http":
+            from mcp.client.streamable_http import streamablehttp_client
+
+            callers = []
+            for _ in range(workers):
+                read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                callers.append(_session_caller(session))
+            yield callers
+            return
+
+        from mcp.client.stdio import StdioServerParameters, stdio_client
+
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=[str(db.ROOT / "mcp_proxy.py"), str(proxy_log), str(db.ROOT / "server.py"), "--stdio"],
+            env={**os.environ, "INFERENCE_FAKE": "true"},
+            cwd=str(db.ROOT),
+        )
+        # Server logging goes next to the proxy log rather than onto the report
+        errlog = stack.enter_context(open(Path(f"{proxy_log}.stderr"), "w"))
+        read, write = await stack.enter_async_context(stdio_client(params, errlog=errlog))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        yield [_session_caller(session)] * workers
+
+
+# ---------------------------------------------------------------------------
+# Load loop
+# ---------------------------------------------------------------------------
+
+class _Pacer:
+    """Spaces calls across all workers to at most *rate* per second (0 = unpaced)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = time.perf_counter()
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.perf_counter()
+            slot = max(self.next_at, now)
+            self.next_at = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _is_lock_error(error: str) -> bool:
+    lowered = error.lower()
+    return any(marker in lowered for marker in LOCK_MARKERS)
+
+
+async def replay(
+    sessions: List[List[Call]],
+    callers: List[Caller],
+    iterations: int = 1,
+    rate: float = 0.0,
+    duration: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Replay each session *iterations* times across the workers in *callers*.
+
+    Stops early once *duration* seconds have passed.  Returns the report dict.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(iterations):
+        for session in sessions:
+            queue.put_nowait(session)
+
+    pacer = _Pacer(rate)
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, List[str]] = {}
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker(call: Caller) -> None:
+        while not queue.empty():
+            session = queue.get_nowait()
+            for name, args in session:
+                if deadline and time.perf_counter() > deadline:
+                    return
+                await pacer.wait()
+                t0 = time.perf_counter()
+                try:
+                    error = await call(name, args)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                samples.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+                if error:
+                    errors.setdefault(name, []).append(error)
+
+    await asyncio.gather(*(worker(c) for c in callers))
+    return build_report(samples, errors, time.perf_counter() - started)
+
+
+def build_report(samples: Dict[str, List[float]], errors: Dict[str, List[str]], wall_s: float) -> Dict[str, Any]:
+    """Summarise per-tool latencies (ms) and error texts collected by :func:`replay`."""
+    tools = {}
+    for name in sorted(samples):
+        ms = sorted(samples[name])
+        errs = errors.get(name, [])
+        tools[name] = {
+            "calls": len(ms),
+            "errors": len(errs),
+            "error_rate": round(len(errs) / len(ms), 4),
+            "lock_errors": sum(1 for e in errs if _is_lock_error(e)),
+            "p50_ms": round(_percentile(ms, 50), 3),
+            "p95_ms": round(_percentile(ms, 95), 3),
+            "p99_ms": round(_percentile(ms, 99), 3),
+            "max_ms": round(ms[-1], 3),
+            "sample_error": errs[0][:200] if errs else None,
+        }
+    calls = sum(t["calls"] for t in tools.values())
+    failed = sum(t["errors"] for t in tools.values())
+    lock_errors = sum(t["lock_errors"] for t in tools.values())
+    return {
+        "calls": calls,
+        "errors": failed,
+        "error_rate": round(failed / calls, 4) if calls else 0.0,
+        "wall_s": round(wall_s, 3),
+        "throughput_cps": round(calls / wall_s, 2) if wall_s else 0.0,
+        "lock_errors": lock_errors,
+        "lock_contention": lock_errors > 0,
+        "tools": tools,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    """Human-readable lines for *report*."""
+    lines = [
+        f"{'tool':<34} {'calls':>6} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for name, t in report["tools"].items():
+        lines.append(
+            f"{name:<34} {t['calls']:>6} {t['error_rate'] * 100:>5.1f}% "
+            f"{t['p50_ms']:>9.2f} {t['p95_ms']:>9.2f} {t['p99_ms']:>9.2f}"
+        )
+    lines.append(
+        f"{report['calls']} calls in {report['wall_s']:.1f}s — {report['throughput_cps']:.1f} calls/s, "
+        f"{report['error_rate'] * 100:.1f}% errors"
+    )
+    if report["lock_contention"]:
+        lines.append(
+            f"WARNING: SQLite lock contention — {report['lock_errors']} calls failed with 'database is locked'"
+        )
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded MCP tool-call sessions under load.")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="inprocess", help="Default inprocess")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="Server URL for --transport http")
+    parser.add_argument("--sessions", nargs="*", type=Path, default=None,
+                        help="Chatlog files to replay (default chatlogs/*.json)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers (default 4)")
+    parser.add_argument("--iterations", type=int, default=10, help="Times each session is replayed (default 10)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Max calls per second across workers (default unpaced)")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--db", type=Path, default=None, help="Database for --transport inprocess (default demo.db)")
+    parser.add_argument("--proxy-log", type=Path, default=Path(tempfile.gettempdir()) / "duck-replay-proxy.log",
+                        help="mcp_proxy.py log for --transport stdio")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%H:%M:%S")
+    # Per-call tool logging would dominate the output
+    logging.getLogger("duck-demo").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+
+    os.environ["INFERENCE_FAKE"] = "true"
+    import config
+    config.INFERENCE_FAKE = True
+    if args.db:
+        db.DB_PATH = args.db
+
+    paths = args.sessions or sorted(CHATLOG_DIR.glob("*.json"))
+    sessions = load_sessions(paths)
+    if not sessions:
+        parser.error("no MCP tool calls found in the given sessions")
+    logger.info("Replaying %d sessions (%d calls) × %d over %s with %d workers",
+                len(sessions), sum(len(s) for s in sessions), args.iterations, args.transport, args.concurrency)
+
+    async def go():
+        async with open_callers(args.transport, args.concurrency, args.url, args.proxy_log) as callers:
+            return await replay(sessions, callers, args.iterations, args.rate, args.duration)
+
+    report = asyncio.run(go())
+    report.update({
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "transport": args.transport,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "sessions": [str(p) for p in paths],
+    })
+    for line in format_report(report):
+        print(line)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare REST response encoding before/after: latency and bytes on the wire.
+
+Runs the largest REST payloads against a generated scale database twice:
+
+    before  stdlib json, no compression, no streaming
+    after   the configured setup (orjson when installed, brotli/gzip above
+            ``RESPONSE_COMPRESSION_MIN_BYTES``, streamed long lists)
+
+and prints median/p95 milliseconds and the bytes actually transferred
+(``Accept-Encoding: br, gzip``) for each route.
+
+Usage:
+    python -m benchmarks.responses --scale 10
+    python -m benchmarks.responses --scale 100 --repeat 20 --out /tmp/responses.json
+"""
+
+import argparse
+import json
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import config
+import db
+from benchmarks import datagen
+from benchmarks.run import DATA_DIR, _get, _rest_client, _stage_import_job, _working_copy, time_call
+
+logger = logging.getLogger("benchmarks.responses")
+
+VARIANTS = {
+    "before": {"JSON_BACKEND": "stdlib", "RESPONSE_COMPRESSION_ENABLED": False, "RESPONSE_STREAM_MIN_ITEMS": 10**9},
+    "after": {},
+}
+
+
+@contextmanager
+def _variant(overrides: Dict[str, Any]) -> Iterator[None]:
+    saved = {name: getattr(config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def build_routes(conn) -> List[Tuple[str, str]]:
+    """(name, URL) pairs for the heaviest REST payloads in the current DB."""
+    order_id = conn.execute(
+        "SELECT sales_order_id FROM sales_order_lines GROUP BY sales_order_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    job_id = _stage_import_job(conn)
+    return [
+        ("supply_chain", f"/api/sales-orders/{order_id}/supply-chain"),
+        ("import_job", f"/api/import-jobs/{job_id}"),
+        ("activity_log_500", "/api/activity-log?limit=500"),
+    ]
+
+
+def run(scale: int, repeat: int, seed: int = 42) -> Dict[str, Any]:
+    source = DATA_DIR / f"scale-{scale}-seed-{seed}.db"
+    datagen.ensure_database(source, scale=scale, seed=seed)
+    work = DATA_DIR / f"scale-{scale}-work.db"
+    _working_copy(source, work)
+
+    original = db.DB_PATH
+    db.DB_PATH = work
+    try:
+        conn = db.get_connection()
+        try:
+            db.init_db(conn)  # cached scale files may predate the latest migrations
+            routes = build_routes(conn)
+        finally:
+            conn.close()
+        client = _rest_client()
+        client.headers["Accept-Encoding"] = "br, gzip"
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, url in routes:
+            for variant, overrides in VARIANTS.items():
+                with _variant(overrides):
+                    call = _get(client, url)
+                    resp = call()
+                    stats = time_call(call, repeat)
+                stats.update({
+                    "wire_bytes": resp.num_bytes_downloaded,
+                    "body_bytes": len(resp.content),
+                    "encoding": resp.headers.get("content-encoding", "identity"),
+                })
+                results.setdefault(name, {})[variant] = stats
+    finally:
+        db.DB_PATH = original
+    return {"scale": scale, "json_backend": "orjson" if _orjson_available() else "stdlib", "routes": results}
+
+
+def _orjson_available() -> bool:
+    from api_routes import _common
+    return _common.orjson is not None and config.JSON_BACKEND != "stdlib"
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"scale={report['scale']} json backend after: {report['json_backend']}",
+        f"{'route':<20} {'variant':<8} {'median ms':>10} {'p95 ms':>9} {'wire bytes':>11} {'encoding':>9}",
+    ]
+    for name, variants in report["routes"].items():
+        for variant, s in variants.items():
+            lines.append(f"{name:<20} {variant:<8} {s['median_ms']:>10.2f} {s['p95_ms']:>9.2f} "
+                         f"{s['wire_bytes']:>11} {s['encoding']:>9}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare REST response encoding before/after.")
+    parser.add_argument("--scale", type=int, default=10, help="Scale factor of the generated DB (default 10)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed repetitions per route and variant (default 10)")
+    parser.add_argument("--seed", type=int, default=42, help="Data generator seed (default 42)")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%H:%M:%S")
+    logging.getLogger("duck-demo").setLevel(logging.WARNING)
+    for name in ("httpx", "httpx2"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    report = run(args.scale, args.repeat, args.seed)
+    for line in format_report(report):
+        print(line)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Time the backend hot paths against synthetic databases and write JSON results.
+
+Each benchmark runs against a fresh working copy of the generated database
+(copied with the SQLite backup API), once to warm caches and then
+``--repeat`` times.  Results carry min / median / p95 / mean milliseconds per
+benchmark and scale together with the row counts, git revision, Python and
+SQLite versions, so files from different runs can be diffed or passed back
+as ``--baseline`` to print the ratio against an earlier run.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import db
+from benchmarks import datagen
+
+logger = logging.getLogger("benchmarks.run")
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / "data"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Rows staged for the data-import resolution benchmark
+IMPORT_ROWS = 50
+# Ready rows in each job the data-import execute benchmark runs
+EXECUTE_ROWS = 20_000
+
+
+# ---------------------------------------------------------------------------
+# Benchmark setup
+# ---------------------------------------------------------------------------
+
+def _stage_import_job(conn: sqlite3.Connection) -> str:
+    """Stage a customer import job whose rows half-match existing customers."""
+    job_id = "IMP-BENCH"
+    existing = conn.execute(
+        "SELECT name, company, email, city FROM customers ORDER BY id LIMIT ?", (IMPORT_ROWS // 2,)
+    ).fetchall()
+    conn.execute(
+        "INSERT INTO import_jobs (id, entity_type, source_filename, source_format, status, row_count, created_at) "
+        "VALUES (?, 'customer', 'bench.csv', 'csv', 'review', ?, '2025-12-29 08:00:00')",
+        (job_id, IMPORT_ROWS),
+    )
+    rows = []
+    for i in range(IMPORT_ROWS):
+        if i < len(existing):
+            mapped = dict(existing[i])
+        else:
+            mapped = {"name": f"Nouveau Client {i}", "company": None, "email": f"new{i}@bench.example", "city": "Lyon"}
+        rows.append((f"{job_id}-{i:04d}", job_id, i + 1, json.dumps(mapped), json.dumps(mapped), "ready"))
+    conn.executemany(
+        "INSERT INTO import_rows (id, job_id, source_row, raw_data, mapped_data, status) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return job_id
+
+
+def _execute_import_job() -> Callable[[], Any]:
+    """Stage a fresh validated customer job per call and execute it (staging is one executemany)."""
+    from services.data_import import data_import_service
+    runs = iter(range(1, 10**6))
+
+    def call():
+        job_id = f"IMP-EXEC-{next(runs)}"
+        conn = db.get_connection()
+        try:
+            conn.execute(
+                "INSERT INTO import_jobs (id, entity_type, status, row_count, created_at) "
+                "VALUES (?, 'customer', 'validated', ?, '2025-12-29 08:00:00')",
+                (job_id, EXECUTE_ROWS),
+            )
+            conn.executemany(
+                "INSERT INTO import_rows (id, job_id, source_row, raw_data, mapped_data, status) VALUES (?, ?, ?, '{}', ?, 'ready')",
+                [(f"{job_id}-{i:05d}", job_id, i, json.dumps({"name": f"Bulk {i}", "city": "Lyon", "country": "FR"}))
+                 for i in range(EXECUTE_ROWS)],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return data_import_service.execute(job_id=job_id)
+    return call
+
+
+def _rest_client():
+    """A Starlette TestClient over the full FastMCP app, as the UI would call it."""
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.transport_security import TransportSecuritySettings
+    from starlette.testclient import TestClient
+
+    from api_routes import register_all_routes
+    from mcp_tools import register_all_tools
+
+    mcp = FastMCP(
+        "duck-demo-bench",
+        stateless_http=True,
+        json_response=True,
+        transport_security=TransportSecuritySettings(enable_dns_rebinding_protection=False),
+    )
+    register_all_tools(mcp)
+    register_all_routes(mcp)
+    return TestClient(mcp.streamable_http_app(), raise_server_exceptions=True)
+
+
+def _get(client, url: str) -> Callable[[], Any]:
+    def call():
+        resp = client.get(url)
+        resp.raise_for_status()
+        return resp
+    return call
+
+
+def build_benchmarks(conn: sqlite3.Connection) -> List[Tuple[str, Callable[[], Any]]]:
+    """Return (name, zero-arg callable) pairs for the hot paths, bound to the current DB."""
+    from services import (
+        catalog_service,
+        inventory_service,
+        sales_service,
+        simulation_service,
+        stats_service,
+    )
+    from services.data_import import data_import_service
+
+    busiest_item = conn.execute(
+        "SELECT item_id FROM stock GROUP BY item_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    shipment_ids = [r[0] for r in conn.execute(
+        "SELECT reference_id FROM stock_movements WHERE movement_type = 'shipment_out' "
+        "GROUP BY reference_id ORDER BY reference_id DESC LIMIT 5"
+    )]
+    sim_time = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()[0]
+    since = conn.execute("SELECT date(?, '-30 days')", (sim_time,)).fetchone()[0]
+    job_id = _stage_import_job(conn)
+    client = _rest_client()
+
+    def stats(entity, metric, group_by=None, field=None):
+        return lambda: stats_service.get_statistics(
+            entity, metric, group_by, field, None, None, None, None, None, 20,
+        )
+
+    return [
+        ("advance_time_1d", lambda: simulation_service.advance_time(days=1)),
+        ("get_stock_summary", lambda: inventory_service.get_stock_summary(busiest_item)),
+        ("search_items", lambda: catalog_service.search_items(["elvis duck 20"], limit=10)),
+        ("get_statistics.sales_lines_by_item", stats("sales_order_lines", "sum", "item_id", "line_total")),
+        ("get_statistics.invoices_by_status", stats("invoices", "count", "status")),
+        ("get_supply_chain_trace", lambda: sales_service.get_supply_chain_trace(shipment_ids)),
+        ("route.dashboard", _get(client, "/api/dashboard")),
+        ("route.dashboard_30d", _get(client, f"/api/dashboard?since={since}&until={sim_time[:10]}")),
+        ("route.stats_spotlight", _get(client, "/api/stats/spotlight")),
+        ("route.activity_log", _get(client, "/api/activity-log?limit=50")),
+        ("data_import.resolve_entities", lambda: data_import_service._resolve_entities(job_id=job_id)),
+        ("data_import.execute_20k", _execute_import_job()),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_ms: List[float], pct: float) -> float:
+    idx = min(len(sorted_ms) - 1, int(round(pct / 100 * (len(sorted_ms) - 1))))
+    return sorted_ms[idx]
+
+
+def time_call(func: Callable[[], Any], repeat: int, budget_s: float = 30.0) -> Dict[str, float]:
+    """Run *func* once to warm up, then up to *repeat* times; return timing stats in ms.
+
+    Repetitions stop early once *budget_s* seconds have been spent, so one
+    pathological path cannot stall a 1000× run; ``repeat`` in the result is
+    the number of samples actually taken.
+    """
+    func()
+    samples = []
+    deadline = time.perf_counter() + budget_s
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+        if time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "repeat": len(samples),
+    }
+
+
+def _working_copy(source: Path, target: Path) -> None:
+    """Copy *source* to *target* with the SQLite backup API (consistent even under WAL)."""
+    for path in (target, Path(f"{target}-wal"), Path(f"{target}-shm")):
+        path.unlink(missing_ok=True)
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def run_scale(scale: int, repeat: int, seed: int, only: Optional[List[str]] = None,
+              budget_s: float = 30.0) -> Dict[str, Any]:
+    """Generate (or reuse) the database for *scale* and time every benchmark on it."""
+    source = DATA_DIR / f"scale-{scale}-seed-{seed}.db"
+    meta = datagen.ensure_database(source, scale=scale, seed=seed)
+    work = DATA_DIR / f"scale-{scale}-work.db"
+    _working_copy(source, work)
+
+    original = db.DB_PATH
+    db.DB_PATH = work
+    try:
+        conn = db.get_connection()
+        try:
+            benchmarks = build_benchmarks(conn)
+        finally:
+            conn.close()
+        results = {}
+        for name, func in benchmarks:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = time_call(func, repeat, budget_s)
+            logger.info("scale=%-5d %-40s median %9.2f ms  p95 %9.2f ms",
+                        scale, name, results[name]["median_ms"], results[name]["p95_ms"])
+    finally:
+        db.DB_PATH = original
+    return {"scale": scale, "rows": meta["rows"], "build_seconds": meta["build_seconds"], "benchmarks": results}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines comparing median times in *current* against *baseline* (ratio > 1 is slower)."""
+    base = {(r["scale"], name): b for r in baseline["runs"] for name, b in r["benchmarks"].items()}
+    lines = []
+    for run in current["runs"]:
+        for name, b in run["benchmarks"].items():
+            old = base.get((run["scale"], name))
+            if not old or not old["median_ms"]:
+                continue
+            ratio = b["median_ms"] / old["median_ms"]
+            lines.append(f"scale={run['scale']:<5} {name:<40} {old['median_ms']:>9.2f} → {b['median_ms']:>9.2f} ms  ×{ratio:.2f}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run duck-demo scale benchmarks.")
+    parser.add_argument("--scales", default="10,100", help="Comma-separated scale factors (default 10,100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark (default 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Data generator seed (default 42)")
+    parser.add_argument("--budget", type=float, default=30.0, help="Max seconds of repetitions per benchmark (default 30)")
+    parser.add_argument("--only", default=None, help="Comma-separated benchmark name prefixes to run")
+    parser.add_argument("--out", type=Path, default=None, help="Result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%H:%M:%S")
+    # Service-layer INFO logging would dominate the output
+    logging.getLogger("duck-demo").setLevel(logging.WARNING)
+    logging.getLogger("scenarios").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    started = datetime.now(timezone.utc)
+    report = {
+        "started_at": started.isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "runs": [run_scale(scale, args.repeat, args.seed, only, args.budget) for scale in scales],
+    }
+
+    out = args.out or RESULTS_DIR / f"{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {out}")
+
+    if args.baseline:
+        for line in compare(report, json.loads(args.baseline.read_text())):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
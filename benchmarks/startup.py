@@ -0,0 +1,156 @@
+"""Measure the cold-start import cost of server.py and enforce a budget.
+
+Each run spawns a fresh interpreter with ``-X importtime`` that imports
+``server`` against a throwaway database and log file, so the measurement
+covers exactly what ``python server.py --stdio`` pays before it can answer.
+The report lists the slowest top-level packages and modules by self time,
+and names any library from :data:`DEFERRED_MODULES` that was imported at
+startup even though it should only load on first use.
+
+The fastest of ``--runs`` runs is compared against ``--budget`` (default
+``STARTUP_BUDGET_SECONDS``); the exit status is 1 when it is over budget
+or a deferred library was loaded, so CI can run this as a gate.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --top 20 --out /tmp/startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+import db
+
+# Libraries only a few tools need; they must not be imported by `import server`
+DEFERRED_MODULES = ("reportlab", "matplotlib", "squarify", "PIL", "openai", "requests", "chardet")
+
+_BOOTSTRAP = """
+import json, sys, pathlib
+sys.path.insert(0, {root!r})
+import db
+db.DB_PATH = pathlib.Path({db_path!r})
+import server
+print(json.dumps(sorted(m for m in {deferred!r} if m in sys.modules)))
+"""
+
+# import time: <self us> | <cumulative us> | <indent><module>
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into ``{module, self_ms, cumulative_ms, depth}`` rows."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self_ms": int(m.group(1)) / 1000,
+                "cumulative_ms": int(m.group(2)) / 1000,
+                "depth": (len(m.group(3)) - 1) // 2,
+            })
+    return rows
+
+
+def measure_once() -> Dict[str, Any]:
+    """Import ``server`` in a fresh interpreter and return its import profile."""
+    with tempfile.TemporaryDirectory(prefix="duck-startup-") as tmp:
+        env = dict(os.environ, LOG_FILE=str(Path(tmp) / "duck-demo.log"))
+        code = _BOOTSTRAP.format(root=str(db.ROOT), db_path=str(Path(tmp) / "startup.db"), deferred=DEFERRED_MODULES)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=tmp, env=env, capture_output=True, text=True, timeout=120,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import server failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    server = next(r for r in reversed(rows) if r["module"] == "server")
+    return {
+        "import_ms": server["cumulative_ms"],
+        "modules": rows,
+        "deferred_loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def summarize(profile: Dict[str, Any], top: int = 10) -> Dict[str, Any]:
+    """Slowest top-level packages and modules (by self time) of one profile."""
+    packages: Dict[str, float] = {}
+    for row in profile["modules"]:
+        name = row["module"].split(".")[0]
+        packages[name] = packages.get(name, 0.0) + row["self_ms"]
+    slowest = sorted(profile["modules"], key=lambda r: r["self_ms"], reverse=True)[:top]
+    return {
+        "import_ms": round(profile["import_ms"], 1),
+        "deferred_loaded": profile["deferred_loaded"],
+        "packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+        "modules": [{"module": r["module"], "self_ms": round(r["self_ms"], 1)} for r in slowest],
+    }
+
+
+def run(runs: int = 3, budget: Optional[float] = None, top: int = 10) -> Dict[str, Any]:
+    """Measure *runs* cold starts and check the fastest against *budget* seconds."""
+    budget = config.STARTUP_BUDGET_SECONDS if budget is None else budget
+    profiles = [measure_once() for _ in range(max(1, runs))]
+    best = min(profiles, key=lambda p: p["import_ms"])
+    report = summarize(best, top)
+    report.update({
+        "runs_ms": [round(p["import_ms"], 1) for p in profiles],
+        "budget_ms": round(budget * 1000, 1),
+        "deferred_loaded": sorted({m for p in profiles for m in p["deferred_loaded"]}),
+    })
+    report["ok"] = report["import_ms"] <= report["budget_ms"] and not report["deferred_loaded"]
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"import server: {report['import_ms']:.0f} ms (budget {report['budget_ms']:.0f} ms, "
+        f"runs {', '.join(f'{ms:.0f}' for ms in report['runs_ms'])})",
+        "",
+        f"{'package':<32} {'self ms':>9}",
+    ]
+    lines += [f"{p['package']:<32} {p['self_ms']:>9.1f}" for p in report["packages"]]
+    lines += ["", f"{'module':<48} {'self ms':>9}"]
+    lines += [f"{m['module']:<48} {m['self_ms']:>9.1f}" for m in report["modules"]]
+    if report["deferred_loaded"]:
+        lines += ["", f"Deferred libraries imported at startup: {', '.join(report['deferred_loaded'])}"]
+    lines += ["", "OK" if report["ok"] else "FAIL"]
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure server.py cold-start import time.")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure; the fastest counts (default 3)")
+    parser.add_argument("--budget", type=float, default=None,
+                        help=f"Max seconds for import server (default STARTUP_BUDGET_SECONDS={config.STARTUP_BUDGET_SECONDS})")
+    parser.add_argument("--top", type=int, default=10, help="Packages and modules listed (default 10)")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    report = run(args.runs, args.budget, args.top)
+    for line in format_report(report):
+        print(line)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.out}")
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ PRICING_VOLUME_DISCOUNT_PCT = 0.05
 PRICING_FREE_SHIPPING_THRESHOLD = 300.0
 PRICING_FLAT_SHIPPING = 20.0
 PRICING_CURRENCY = "EUR"
+# Volume discount tiers: (minimum total qty, discount rate); the highest tier
+# an order reaches applies to its whole subtotal
+PRICING_VOLUME_TIERS = ((PRICING_VOLUME_QTY_THRESHOLD, PRICING_VOLUME_DISCOUNT_PCT),)
 
 # Substitution constants
 SUBSTITUTION_PRICE_SLACK_PCT = 0.15  # within ±15% of requested SKU
@@ -18,6 +21,7 @@ INVOICE_PAYMENT_TERMS_DAYS = 30
 
 # Quote constants
 QUOTE_VALIDITY_DAYS = 30
+SALES_BULK_MAX_ORDERS = 500  # orders accepted by one bulk ingestion call
 
 # Lead time constants
 TRANSIT_DAYS_DEFAULT = 2
@@ -30,6 +34,10 @@ LOC_FINISHED_GOODS = "FG"
 LOC_PRODUCTION_OUT = "PROD-OUT"
 LOC_RAW_MATERIAL_RECV = "RM/RECV-01"
 
+# Stock picking: locations listed here are drained first, in this order; the
+# rest follow.  Within a tier the oldest stock row (lot) goes first (FIFO).
+STOCK_PICK_LOCATION_PREFERENCE: tuple[str, ...] = ()
+
 # Tariff and shipping destination constants
 WAREHOUSE_COUNTRY = "FR"
 TARIFF_REQUIRED_DESTINATIONS = {"CH", "GB", "US", "CA", "JP", "AU", "NO"}
@@ -42,6 +50,17 @@ SUPPORTED_SHIP_COUNTRIES = EU_COUNTRIES | TARIFF_REQUIRED_DESTINATIONS
 
 # Logging configuration
 LOG_FILE = os.getenv("LOG_FILE", "duck-demo.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # rotate the log file at this size
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# MCP tool-call tracing (tracing.py): fraction of successful calls traced
+# (errors always are) and the size caps applied to traced args/results
+TOOL_TRACE_SAMPLE_RATE = float(os.getenv("TOOL_TRACE_SAMPLE_RATE", "1.0"))
+TOOL_TRACE_MAX_FIELD_CHARS = int(os.getenv("TOOL_TRACE_MAX_FIELD_CHARS", "200"))
+TOOL_TRACE_MAX_ITEMS = 20   # list entries / dict keys kept per container
+TOOL_TRACE_MAX_DEPTH = 4
+# Argument / result fields whose values are never logged (images, file contents)
+TOOL_TRACE_REDACT_FIELDS = frozenset({"image", "image_base64", "content_base64", "file_content", "pdf_bytes"})
 
 # Base URL for all absolute URLs (API resources, UI deep links)
 # Override with API_BASE environment variable for production/tunnel deployments
@@ -57,9 +76,14 @@ QC_INFERENCE_MODEL = os.getenv("QC_INFERENCE_MODEL", "gpt-5.4")
 # Data Import constants
 DATA_IMPORT_MODEL = os.getenv("DATA_IMPORT_MODEL", "gpt-4o")
 IMAGE_IMPORT_MODEL = os.getenv("IMAGE_IMPORT_MODEL", "gpt-4o")  # vision model for image-based import
+IMPORT_EXECUTE_CHUNK_SIZE = 5000  # rows per transaction when executing an import
+CUSTOMER_MATCH_MIN_CONFIDENCE = 0.3  # below this, an imported document's customer is "not found"
 QC_LABEL_MODEL = os.getenv("QC_LABEL_MODEL", "gpt-5.4")  # model used for MO-label extraction from images
 # Set QC_INFERENCE_MOCK=true to skip the real API call and return a canned result
 QC_INFERENCE_MOCK = os.getenv("QC_INFERENCE_MOCK", "false").lower() == "true"
+# Set INFERENCE_FAKE=true to answer every LLM call locally (load tests, offline runs)
+INFERENCE_FAKE = os.getenv("INFERENCE_FAKE", "false").lower() == "true"
+INFERENCE_FAKE_LATENCY_MS = float(os.getenv("INFERENCE_FAKE_LATENCY_MS", "0"))
 
 # Work center capacity (max concurrent operations per center)
 WORK_CENTER_CAPACITY = {
@@ -70,3 +94,50 @@ WORK_CENTER_CAPACITY = {
     "QC": 2,
     "PACKAGING": 3,
 }
+
+# Finite-capacity scheduling: dispatch rule for queued operations ("edd" or "fifo")
+SCHEDULING_DISPATCH_RULE = os.getenv("SCHEDULING_DISPATCH_RULE", "edd")
+
+# Pagination: how long an "approx" list total may be served from cache
+PAGINATION_TOTAL_CACHE_SECONDS = 30
+
+# SQL query tracing (db.get_connection): opt-in statement timing and slow-query log
+SQL_TRACE_ENABLED = os.getenv("SQL_TRACE", "false").lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_TRACE_SAMPLES = 1024  # per-statement latency samples kept for p50/p99
+
+# History retention: activity_log / stock_movements rows older than this many
+# sim-days move to their *_archive tables on each tick (0 keeps everything hot)
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+
+# Cold-start budget: seconds `import server` may take (checked by python -m benchmarks.startup)
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "1.5"))
+
+# MCP App UI bundles (mcp_apps.py): dev-only polling reload of rebuilt mcp_apps_ui/*.html
+MCP_APPS_HOT_RELOAD = os.getenv("MCP_APPS_HOT_RELOAD", "false").lower() == "true"
+MCP_APPS_RELOAD_INTERVAL = float(os.getenv("MCP_APPS_RELOAD_INTERVAL", "1.0"))  # seconds between mtime polls
+
+# REST responses (api_routes._common): JSON backend ("auto" uses orjson when
+# installed, "stdlib" forces the json module), compression and streaming
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_STREAM_MIN_ITEMS = int(os.getenv("RESPONSE_STREAM_MIN_ITEMS", "500"))  # list responses streamed above this
+
+# Server-sent events (/api/events, events.py)
+EVENTS_REPLAY_BUFFER = int(os.getenv("EVENTS_REPLAY_BUFFER", "1000"))  # events kept for Last-Event-ID resume
+EVENTS_SUBSCRIBER_QUEUE = int(os.getenv("EVENTS_SUBSCRIBER_QUEUE", "500"))  # backlog per client before a reset
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_DELTA_DEBOUNCE_SECONDS = float(os.getenv("EVENTS_DELTA_DEBOUNCE_SECONDS", "0.5"))
+
+# Multi-process deployments (server.py --workers N): SQLite lock handling.
+# Every connection waits up to DB_BUSY_TIMEOUT_MS for a lock; write
+# transactions (services._base.write_transaction) take the write lock up
+# front with BEGIN IMMEDIATE, waiting DB_WRITE_LOCK_TIMEOUT_MS per attempt and
+# retrying with jittered exponential backoff between attempts
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_WRITE_LOCK_TIMEOUT_MS = int(os.getenv("DB_WRITE_LOCK_TIMEOUT_MS", "100"))
+DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "12"))
+DB_WRITE_BACKOFF_MS = float(os.getenv("DB_WRITE_BACKOFF_MS", "10"))
+DB_WRITE_BACKOFF_MAX_MS = float(os.getenv("DB_WRITE_BACKOFF_MAX_MS", "500"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
@@ -1,28 +1,453 @@
+import functools
+import logging
+import re
 import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
 
 ROOT = Path(__file__).parent
 DB_PATH = ROOT / "demo.db"
 SCHEMA_PATH = ROOT / "schema.sql"
 
 
+# ---------------------------------------------------------------------------
+# Query tracing (opt-in: SQL_TRACE=true or set_query_tracing(True))
+# ---------------------------------------------------------------------------
+# Connections opened while tracing is on time every statement, from execute
+# until the cursor is re-executed, closed or released, so fetch time is
+# included.  Statistics are keyed by normalised SQL and attributed to the
+# MCP tool / REST route set with ``query_origin()``.
+
+sql_logger = logging.getLogger("duck-demo.sql")
+
+_trace_enabled = config.SQL_TRACE_ENABLED
+_trace_lock = threading.Lock()
+_trace_stats: dict[str, dict] = {}
+_query_origin: ContextVar[str] = ContextVar("query_origin", default="-")
+
+_SQL_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_RE = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_SQL_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SQL_SPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """Collapse literals, IN-lists and whitespace so equivalent statements share one key."""
+    sql = _SQL_STRING_RE.sub("?", sql)
+    sql = _SQL_NUMBER_RE.sub("?", sql)
+    sql = _SQL_IN_LIST_RE.sub("IN (...)", sql)
+    return _SQL_SPACE_RE.sub(" ", sql).strip()
+
+
+@contextmanager
+def query_origin(name: str) -> Iterator[None]:
+    """Attribute statements executed inside the block to *name* (e.g. ``mcp:sales_search_orders``)."""
+    token = _query_origin.set(name)
+    try:
+        yield
+    finally:
+        _query_origin.reset(token)
+
+
+def _record_query(sql: str, elapsed: float, rows: int) -> None:
+    key = normalize_sql(sql)
+    origin = _query_origin.get()
+    elapsed_ms = elapsed * 1000.0
+    with _trace_lock:
+        entry = _trace_stats.get(key)
+        if entry is None:
+            entry = _trace_stats[key] = {
+                "calls": 0, "total_ms": 0.0, "rows": 0,
+                "samples": deque(maxlen=config.SQL_TRACE_SAMPLES),
+                "origins": Counter(),
+            }
+        entry["calls"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["rows"] += rows
+        entry["samples"].append(elapsed_ms)
+        entry["origins"][origin] += 1
+    if elapsed_ms >= config.SQL_SLOW_QUERY_MS:
+        sql_logger.warning("[SlowQuery] %.1fms rows=%d origin=%s sql=%s", elapsed_ms, rows, origin, key)
+
+
+class _TracedCursor(sqlite3.Cursor):
+    """Cursor that times each statement including the rows fetched from it."""
+
+    _pending: Optional[list] = None  # [sql, elapsed, rows_fetched]
+
+    def _finish(self) -> None:
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, elapsed, fetched = pending
+            _record_query(sql, elapsed, fetched or max(self.rowcount, 0))
+
+    def _timed(self, sql: str, run: Callable[[], Any]) -> Any:
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return run()
+        finally:
+            self._pending = [sql, time.perf_counter() - t0, 0]
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sql, lambda: super(_TracedCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sql, lambda: super(_TracedCursor, self).executemany(sql, seq_of_parameters))
+
+    def executescript(self, sql_script):
+        return self._timed(sql_script, lambda: super(_TracedCursor, self).executescript(sql_script))
+
+    def _fetched(self, t0: float, count: int) -> None:
+        if self._pending is not None:
+            self._pending[1] += time.perf_counter() - t0
+            self._pending[2] += count
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t0, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(t0, len(rows))
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t0, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(t0, 0)
+            self._finish()
+            raise
+        self._fetched(t0, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class _TracedConnection(sqlite3.Connection):
+    """Connection whose shortcut ``execute*`` methods go through :class:`_TracedCursor`."""
+
+    def cursor(self, factory=_TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def set_query_tracing(enabled: bool) -> None:
+    """Turn query tracing on or off for connections opened from now on."""
+    global _trace_enabled
+    _trace_enabled = enabled
+
+
+def query_tracing_enabled() -> bool:
+    return _trace_enabled
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def get_query_stats(limit: int = 20, sort: str = "total_ms") -> list[dict]:
+    """Return the top *limit* traced statements ordered by *sort* (descending).
+
+    *sort* is one of ``total_ms``, ``calls``, ``p99_ms``, ``rows``.
+    """
+    if sort not in ("total_ms", "calls", "p99_ms", "rows"):
+        raise ValueError(f"sort must be total_ms, calls, p99_ms or rows, got {sort!r}")
+    with _trace_lock:
+        snapshot = [
+            (sql, e["calls"], e["total_ms"], e["rows"], sorted(e["samples"]), dict(e["origins"]))
+            for sql, e in _trace_stats.items()
+        ]
+    stats = [
+        {
+            "sql": sql,
+            "calls": calls,
+            "total_ms": round(total_ms, 3),
+            "mean_ms": round(total_ms / calls, 3),
+            "p50_ms": round(_percentile(samples, 0.50), 3),
+            "p99_ms": round(_percentile(samples, 0.99), 3),
+            "rows": rows,
+            "origins": origins,
+        }
+        for sql, calls, total_ms, rows, samples, origins in snapshot
+    ]
+    stats.sort(key=lambda s: s[sort], reverse=True)
+    return stats[:limit]
+
+
+def reset_query_stats() -> int:
+    """Drop all collected statistics; return how many statements were tracked."""
+    with _trace_lock:
+        count = len(_trace_stats)
+        _trace_stats.clear()
+    return count
+
+
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+                           factory=_TracedConnection if _trace_enabled else sqlite3.Connection)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.row_factory = sqlite3.Row
     return conn
 
 
+# One long-lived connection per process, used only to ask whether anyone
+# else has committed (``--workers N`` cache coherence)
+_watch_conn: Optional[sqlite3.Connection] = None
+_watch_path: Optional[Path] = None
+_watch_lock = threading.Lock()
+
+
+def data_version() -> int:
+    """SQLite's ``PRAGMA data_version`` as seen by this process's watch connection.
+
+    The value changes whenever another connection — another thread's, or
+    another worker process's — commits, so in-process caches can compare it
+    with the value they were built at and drop themselves when it moved.
+    """
+    global _watch_conn, _watch_path
+    with _watch_lock:
+        if _watch_conn is None or _watch_path != DB_PATH:
+            if _watch_conn is not None:
+                _watch_conn.close()
+            _watch_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _watch_path = DB_PATH
+        return _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# Migrations
+# ---------------------------------------------------------------------------
+# ``schema.sql`` always describes the latest schema and is what a fresh
+# database is built from.  Databases created by an older schema are brought
+# forward by the numbered steps below; the applied version is stored in
+# ``PRAGMA user_version``.  Append new steps — never edit or renumber old ones.
+# A step may meet a database that predates a table it touches; it skips that
+# table, and ``schema.sql`` (run after the migrations) then creates it whole.
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    """``ALTER TABLE ... ADD COLUMN`` unless the column (or the table) does not need it."""
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if cols and column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _create_index(conn: sqlite3.Connection, ddl: str) -> None:
+    """Run a ``CREATE INDEX ... ON table(...)`` statement if its table exists."""
+    table = ddl.split(" ON ", 1)[1].split("(", 1)[0].strip()
+    if _table_exists(conn, table):
+        conn.execute(ddl)
+
+
+def _m001_hot_path_indexes(conn: sqlite3.Connection) -> None:
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS idx_mo_so ON production_orders(sales_order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_mo_parent ON production_orders(parent_production_order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_so_status_cust ON sales_orders(status, customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_so_cust ON sales_orders(customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_quotes_status_valid ON quotes(status, valid_until)",
+        "CREATE INDEX IF NOT EXISTS idx_quotes_cust ON quotes(customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_quotes_supersedes ON quotes(supersedes_quote_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ship_status_arrival ON shipments(status, planned_arrival)",
+        "CREATE INDEX IF NOT EXISTS idx_inv_status_due ON invoices(status, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_inv_cust ON invoices(customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_stock_item_onhand ON stock(item_id, on_hand)",
+        "CREATE INDEX IF NOT EXISTS idx_so_quote ON sales_orders(quote_id)",
+        "CREATE INDEX IF NOT EXISTS idx_qc_hold_batch_item ON qc_hold_batches(item_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_stock_mov_type_ref ON stock_movements(movement_type, reference_id)",
+        "CREATE INDEX IF NOT EXISTS idx_actlog_ts_id ON activity_log(timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_so_created ON sales_orders(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_inv_created ON invoices(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_ship_departure ON shipments(planned_departure, id)",
+        "CREATE INDEX IF NOT EXISTS idx_stock_location ON stock(warehouse, location, id)",
+    ):
+        _create_index(conn, ddl)
+
+
+def _m002_planned_schedule(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "production_orders", "planned_start", "TEXT")
+    _add_column(conn, "production_orders", "planned_finish", "TEXT")
+    _add_column(conn, "production_operations", "planned_start", "TEXT")
+    _add_column(conn, "production_operations", "planned_end", "TEXT")
+
+
+def _m003_atp_indexes(conn: sqlite3.Connection) -> None:
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS idx_mo_item_status ON production_orders(item_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_purchord_item_status ON purchase_orders(item_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_ri_input_item ON recipe_ingredients(input_item_id)",
+    ):
+        _create_index(conn, ddl)
+
+
+
+def _m004_positive_stock_index(conn: sqlite3.Connection) -> None:
+    _create_index(conn, "CREATE INDEX IF NOT EXISTS idx_stock_positive ON stock(item_id, id, warehouse, location, on_hand) WHERE on_hand > 0")
+
+
+def _m005_stock_movement_ts_index(conn: sqlite3.Connection) -> None:
+    _create_index(conn, "CREATE INDEX IF NOT EXISTS idx_stock_mov_ts ON stock_movements(timestamp)")
+
+
+def _m006_customer_search_index(conn: sqlite3.Connection) -> None:
+    if not _table_exists(conn, "customers"):
+        return
+    cols = "name, company, email, city, phone"
+    old = ", ".join(f"old.{c}" for c in cols.split(", "))
+    new = ", ".join(f"new.{c}" for c in cols.split(", "))
+    delete = f"INSERT INTO customers_fts (customers_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old});"
+    insert = f"INSERT INTO customers_fts (rowid, {cols}) VALUES (new.rowid, {new});"
+    conn.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5({cols}, "
+        "content = 'customers', content_rowid = 'rowid', tokenize = 'trigram')"
+    )
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN {insert} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN {delete} END")
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF {cols} ON customers "
+        f"BEGIN {delete} {insert} END"
+    )
+    conn.execute("INSERT INTO customers_fts (customers_fts) VALUES ('rebuild')")
+
+
+def _m007_quote_chain(conn: sqlite3.Connection) -> None:
+    if not _table_exists(conn, "quotes"):
+        return
+    _add_column(conn, "quotes", "quote_chain_id", "TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_chain ON quotes(quote_chain_id, revision_number)")
+    # Roots (superseding nothing, or a quote that no longer exists) start
+    # their own chain; then each pass hands the chain ID one revision down
+    conn.execute(
+        "UPDATE quotes SET quote_chain_id = id WHERE quote_chain_id IS NULL AND "
+        "(supersedes_quote_id IS NULL OR supersedes_quote_id NOT IN (SELECT id FROM quotes))"
+    )
+    while conn.execute(
+        "UPDATE quotes SET quote_chain_id = "
+        "(SELECT p.quote_chain_id FROM quotes p WHERE p.id = quotes.supersedes_quote_id) "
+        "WHERE quote_chain_id IS NULL AND supersedes_quote_id IN "
+        "(SELECT id FROM quotes WHERE quote_chain_id IS NOT NULL)"
+    ).rowcount:
+        pass
+
+
+def _m008_activity_trace_id(conn: sqlite3.Connection) -> None:
+    for table in ("activity_log", "activity_log_archive"):
+        _add_column(conn, table, "trace_id", "TEXT")
+
+
+def _m009_sales_order_sort_index(conn: sqlite3.Connection) -> None:
+    _create_index(conn, "CREATE INDEX IF NOT EXISTS idx_so_created_sort ON sales_orders(COALESCE(created_at, ''), id)")
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "hot-path and keyset pagination indexes", _m001_hot_path_indexes),
+    (2, "finite-capacity planned start/finish columns", _m002_planned_schedule),
+    (3, "available-to-promise projection indexes", _m003_atp_indexes),
+    (4, "partial index on positive stock rows", _m004_positive_stock_index),
+    (5, "stock movement timestamp index for archival", _m005_stock_movement_ts_index),
+    (6, "trigram full-text index for customer search", _m006_customer_search_index),
+    (7, "quote revision chain column and backfill", _m007_quote_chain),
+    (8, "trace ID on activity_log rows", _m008_activity_trace_id),
+    (9, "NULL-safe sales order recency index", _m009_sales_order_sort_index),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """Apply pending migrations in order; return the versions applied.
+
+    Each step runs in its own transaction together with the
+    ``user_version`` bump, so an interrupted run resumes where it stopped.
+    Steps must use ``conn.execute`` — ``executescript`` would commit early.
+    The write lock is taken before the version is re-checked, so several
+    worker processes starting at once apply each step exactly once.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version <= current:  # another process got here first
+            conn.rollback()
+            continue
+        logger.info("Applying migration %03d: %s", version, description)
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
 def init_db(conn: Optional[sqlite3.Connection] = None) -> None:
+    """Create the schema on a fresh database or migrate an existing one.
+
+    A database without tables is built straight from ``schema.sql`` and
+    stamped with the latest version.  An existing database is migrated
+    first, then ``schema.sql`` creates any tables it is still missing.
+    """
     owns_conn = False
     if conn is None:
         conn = get_connection()
         owns_conn = True
     with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
         schema_sql = f.read()
+    fresh = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchone()[0] == 0
+    if not fresh:
+        migrate(conn)
     conn.executescript(schema_sql)
+    if fresh:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     if owns_conn:
         conn.close()
@@ -32,6 +457,10 @@ def dict_rows(rows: Iterable[sqlite3.Row]) -> list[dict]:
     return [dict(r) for r in rows]
 
 
+# Tables whose old rows services/archive.py moves to "<table>_archive"
+ARCHIVED_TABLES = ("activity_log", "stock_movements")
+
+
 def generate_id(conn: sqlite3.Connection, prefix: str, table: str, column: str = "id") -> str:
     seed_defaults = {"CUST": 101, "SO": 1041, "SHIP": 899, "INV": 2000, "PAY": 3000, "ACT": 0}
     pattern = f"{prefix}-%"
@@ -41,4 +470,15 @@ def generate_id(conn: sqlite3.Connection, prefix: str, table: str, column: str =
         (prefix_len, pattern),
     ).fetchone()
     max_num = row[0] if row[0] is not None else seed_defaults.get(prefix, 0)
+    if table in ARCHIVED_TABLES:
+        # IDs moved to the archive must never be handed out again
+        archived = conn.execute("SELECT max_id FROM archive_state WHERE table_name = ?", (table,)).fetchone()
+        if archived:
+            max_num = max(max_num, archived[0])
     return f"{prefix}-{max_num + 1:04d}"
+
+
+def generate_ids(conn: sqlite3.Connection, prefix: str, table: str, count: int, column: str = "id") -> list[str]:
+    """Reserve *count* consecutive IDs with a single MAX lookup (for batched inserts)."""
+    first = int(generate_id(conn, prefix, table, column).rsplit("-", 1)[1])
+    return [f"{prefix}-{n:04d}" for n in range(first, first + count)]
@@ -0,0 +1,205 @@
+"""In-process event bus behind the ``/api/events`` server-sent event stream.
+
+Services :func:`publish` events as they write (``activity`` rows from the
+activity log).  Each event gets an ID ``<boot>-<seq>`` and is kept in a
+bounded replay buffer, so a reconnecting client that sends its
+``Last-Event-ID`` receives what it missed.  A client whose ID is older than
+the buffer, or from before a server restart, gets a ``reset`` event
+instead and should refetch its data.
+
+Subscribers have bounded queues: when a slow client falls
+``EVENTS_SUBSCRIBER_QUEUE`` events behind, its queue is dropped and it gets
+a ``reset`` too, so one stalled connection cannot grow memory.
+
+Dashboard deltas: writers call :func:`notify_changed` (a flag, no database
+work).  While at least one client is subscribed, a background thread
+debounces those flags, recomputes the unfiltered KPIs and status
+distributions once and publishes a ``dashboard`` event with only the
+values that changed (absolute, so applying one twice is harmless).  With
+no subscribers nothing is queried.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import config
+import metrics
+
+logger = logging.getLogger("duck-demo")
+
+BOOT_ID = uuid.uuid4().hex[:8]
+
+_lock = threading.Lock()
+_seq = itertools.count(1)
+_buffer: deque = deque(maxlen=config.EVENTS_REPLAY_BUFFER)
+_subscribers: set = set()
+
+_dirty = threading.Event()
+_snapshot: Optional[Dict[str, Any]] = None
+_worker: Optional[threading.Thread] = None
+
+
+def _reset_event(reason: str) -> Dict[str, Any]:
+    return {"id": None, "type": "reset", "data": {"reason": reason}}
+
+
+class Subscriber:
+    """One stream's queue; filled by publishers on any thread, drained on its event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._overflowed = False
+
+    def _push(self, event: Dict[str, Any]) -> None:
+        # Called with _lock held
+        if self._overflowed:
+            return
+        if len(self._queue) >= config.EVENTS_SUBSCRIBER_QUEUE:
+            self._queue.clear()
+            self._overflowed = True
+            metrics.EVENTS_DROPPED.inc()
+        else:
+            self._queue.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:  # loop closed; the stream is going away
+            pass
+
+    async def get(self, timeout: float) -> List[Dict[str, Any]]:
+        """Queued events, waiting up to *timeout* seconds for one (``[]`` on timeout)."""
+        self._wakeup.clear()
+        if not self._queue and not self._overflowed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        with _lock:
+            if self._overflowed:
+                self._overflowed = False
+                return [_reset_event("client fell behind")]
+            batch = list(self._queue)
+            self._queue.clear()
+        return batch
+
+
+def publish(event_type: str, data: Any) -> str:
+    """Append an event to the replay buffer and every subscriber queue; returns its ID."""
+    with _lock:
+        seq = next(_seq)
+        event = {"id": f"{BOOT_ID}-{seq}", "seq": seq, "type": event_type, "data": data}
+        _buffer.append(event)
+        for sub in _subscribers:
+            sub._push(event)
+    metrics.EVENTS_PUBLISHED.inc(event_type)
+    return event["id"]
+
+
+def subscribe(last_event_id: Optional[str] = None) -> Subscriber:
+    """Register a subscriber on the running event loop, replaying events after *last_event_id*."""
+    global _snapshot
+    sub = Subscriber(asyncio.get_running_loop())
+    if _snapshot is None:
+        _snapshot = _dashboard_snapshot()
+    with _lock:
+        if last_event_id:
+            boot, _, seq = last_event_id.partition("-")
+            oldest = _buffer[0]["seq"] if _buffer else None
+            if boot != BOOT_ID or not seq.isdigit():
+                sub._queue.append(_reset_event("server restarted"))
+            elif oldest is not None and int(seq) + 1 < oldest:
+                sub._queue.append(_reset_event("replay buffer exceeded"))
+            else:
+                sub._queue.extend(e for e in _buffer if e["seq"] > int(seq))
+        _subscribers.add(sub)
+    _ensure_worker()
+    return sub
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    global _snapshot
+    with _lock:
+        _subscribers.discard(sub)
+        if not _subscribers:
+            _snapshot = None
+
+
+def subscriber_count() -> int:
+    return len(_subscribers)
+
+
+# ---------------------------------------------------------------------------
+# Dashboard deltas
+# ---------------------------------------------------------------------------
+
+def notify_changed() -> None:
+    """Mark the dashboard aggregates as possibly changed (no database work)."""
+    _dirty.set()
+
+
+def _dashboard_snapshot() -> Dict[str, Any]:
+    from services.dashboard import dashboard_service
+    return dashboard_service.get_snapshot()
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    kpis = {k: v for k, v in new["kpis"].items() if old["kpis"].get(k) != v}
+    statuses = {}
+    for entity, rows in new["status_distributions"].items():
+        before = {r["status"]: r["count"] for r in old["status_distributions"].get(entity, [])}
+        after = {r["status"]: r["count"] for r in rows}
+        changed = {s: after.get(s, 0) for s in before.keys() | after.keys() if before.get(s, 0) != after.get(s, 0)}
+        if changed:
+            statuses[entity] = changed
+    return {"kpis": kpis, "status_distributions": statuses}
+
+
+def publish_dashboard_delta() -> Optional[str]:
+    """Recompute the dashboard aggregates and publish what changed, if anyone listens."""
+    global _snapshot
+    if not _subscribers:
+        return None
+    current = _dashboard_snapshot()
+    previous, _snapshot = _snapshot, current
+    if previous is None:
+        return None
+    delta = _diff(previous, current)
+    if not delta["kpis"] and not delta["status_distributions"]:
+        return None
+    return publish("dashboard", delta)
+
+
+def _run_worker() -> None:
+    while True:
+        _dirty.wait()
+        # Coalesce a burst of writes into one recomputation
+        time.sleep(config.EVENTS_DELTA_DEBOUNCE_SECONDS)
+        _dirty.clear()
+        try:
+            publish_dashboard_delta()
+        except Exception:
+            logger.exception("Dashboard delta failed")
+
+
+def _ensure_worker() -> None:
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="events-dashboard", daemon=True)
+            _worker.start()
+
+
+def reset() -> None:
+    """Forget buffered events and the dashboard baseline (tests, database resets)."""
+    global _snapshot
+    with _lock:
+        _buffer.clear()
+        _snapshot = None
+    _dirty.clear()
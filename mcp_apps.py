@@ -0,0 +1,159 @@
+"""MCP App UI bundles: one table of ``ui://`` resources served from memory.
+
+Each app is a single-file HTML bundle built into ``mcp_apps_ui/`` (several
+hundred KB).  A bundle is read once and kept as an immutable
+:class:`Bundle` (text, gzip variant, mtime and SHA-256 ETag) keyed by path;
+resource fetches never touch the disk again.  With ``MCP_APPS_HOT_RELOAD``
+a background thread polls the files and swaps in a fresh bundle when one
+is rebuilt, so ``npm run build:mcp-app`` shows up without a restart.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, NamedTuple, Optional
+
+import config
+
+logger = logging.getLogger("duck-demo")
+
+UI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_apps_ui")
+MIME_TYPE = "text/html;profile=mcp-app"
+
+# (resource URI, bundle file, description)
+UI_APPS = (
+    ("ui://generic-confirm/dialog", "generic-confirm.html", "Serves the generic confirmation MCP App UI."),
+    ("ui://item-inspect/viewer", "item-inspect.html", "Serves the 3D item inspector MCP App UI."),
+    ("ui://tariff-picker/selector", "tariff-picker.html", "Serves the tariff picker MCP App UI."),
+    ("ui://qc-inspection/result", "qc-inspection.html", "Serves the QC inspection result MCP App UI."),
+    ("ui://data-import/mapping", "data-import-mapping.html", "Serves the data import mapping review (Phase 1) MCP App UI."),
+    ("ui://data-import/rows", "data-import-rows.html", "Serves the data import row review (Phase 2) MCP App UI."),
+)
+
+NOT_BUILT_HTML = "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
+
+
+class Bundle(NamedTuple):
+    path: str
+    mtime_ns: int
+    etag: str
+    text: str
+    gzip: bytes
+
+
+_cache: Dict[str, Bundle] = {}
+_lock = threading.Lock()
+_watcher: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _read(path: str) -> Bundle:
+    with open(path, "rb") as f:
+        raw = f.read()
+    return Bundle(
+        path=path,
+        mtime_ns=os.stat(path).st_mtime_ns,
+        etag=hashlib.sha256(raw).hexdigest()[:32],
+        text=raw.decode("utf-8"),
+        gzip=gzip.compress(raw, compresslevel=9, mtime=0),
+    )
+
+
+def get_bundle(filename: str) -> Optional[Bundle]:
+    """Cached bundle for *filename* in ``mcp_apps_ui/``, or ``None`` if it is not built."""
+    path = os.path.join(UI_DIR, os.path.basename(filename))
+    bundle = _cache.get(path)
+    if bundle is not None:
+        return bundle
+    with _lock:
+        bundle = _cache.get(path)
+        if bundle is None:
+            try:
+                bundle = _read(path)
+            except FileNotFoundError:
+                return None
+            _cache[path] = bundle
+    return bundle
+
+
+def read_ui(filename: str) -> str:
+    """HTML of *filename*, or a placeholder page when the bundle is missing."""
+    bundle = get_bundle(filename)
+    if bundle is None:
+        logger.warning("MCP App UI not found at %s. Run 'cd ui && npm run build:mcp-app' to build it.",
+                       os.path.join(UI_DIR, filename))
+        return NOT_BUILT_HTML
+    return bundle.text
+
+
+def reload_changed() -> int:
+    """Re-read cached bundles whose file changed on disk; returns how many were swapped."""
+    swapped = 0
+    for path, bundle in list(_cache.items()):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            with _lock:
+                _cache.pop(path, None)
+            continue
+        if mtime_ns == bundle.mtime_ns:
+            continue
+        fresh = _read(path)
+        with _lock:
+            _cache[path] = fresh
+        if fresh.etag != bundle.etag:
+            swapped += 1
+            logger.info("MCP App UI reloaded: %s", os.path.basename(path))
+    return swapped
+
+
+def invalidate() -> None:
+    """Drop every cached bundle."""
+    with _lock:
+        _cache.clear()
+
+
+def start_watcher(interval: Optional[float] = None) -> threading.Thread:
+    """Poll cached bundles for changes in a daemon thread (dev only); idempotent."""
+    global _watcher
+    if _watcher is not None and _watcher.is_alive():
+        return _watcher
+    interval = config.MCP_APPS_RELOAD_INTERVAL if interval is None else interval
+    _stop.clear()
+
+    def _run():
+        while not _stop.wait(interval):
+            try:
+                reload_changed()
+            except Exception:
+                logger.exception("MCP App UI reload failed")
+
+    _watcher = threading.Thread(target=_run, name="mcp-apps-watcher", daemon=True)
+    _watcher.start()
+    return _watcher
+
+
+def stop_watcher() -> None:
+    global _watcher
+    _stop.set()
+    if _watcher is not None:
+        _watcher.join(timeout=5)
+    _watcher = None
+
+
+def _handler(filename: str):
+    # Resource functions must take no arguments (otherwise FastMCP makes a template)
+    def handler() -> str:
+        return read_ui(filename)
+    return handler
+
+
+def register(mcp):
+    """Register one ``ui://`` resource per :data:`UI_APPS` entry."""
+    for uri, filename, description in UI_APPS:
+        name = "get_" + filename.removesuffix(".html").replace("-", "_") + "_ui"
+        mcp.resource(uri, name=name, description=description, mime_type=MIME_TYPE)(_handler(filename))
+    if config.MCP_APPS_HOT_RELOAD:
+        start_watcher()
@@ -22,6 +22,8 @@ def main():
     extra_args = sys.argv[3:]
 
     venv_python = os.path.join(os.path.dirname(os.path.abspath(__file__)), "venv", "bin", "python")
+    if not os.path.exists(venv_python):
+        venv_python = sys.executable
 
     proc = subprocess.Popen(
         [venv_python, script] + extra_args,
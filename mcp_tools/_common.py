@@ -3,10 +3,15 @@
 import functools
 import json
 import logging
+import time
 from typing import Any, Dict, List, Optional, TypedDict
 
 from mcp.types import CallToolResult, TextContent
 
+import metrics
+import tracing
+from db import query_origin
+
 logger = logging.getLogger("duck-demo")
 
 # ---------------------------------------------------------------------------
@@ -75,44 +80,62 @@ def _extract_entity(result: Any) -> tuple:
     return None, None
 
 
+def _trace_json(value: Any) -> str:
+    return json.dumps(tracing.summarize(value), default=str)
+
+
 def log_tool(name: str):
-    """Decorator to log tool calls with parameters and results.
+    """Decorator to trace tool calls and record their metrics.
 
-    If the tool is in TOOL_ACTION_MAP, also writes an activity_log entry.
+    Each call runs under its own trace ID (see :mod:`tracing`).  Sampled
+    calls log size-capped parameters and results; failures are always
+    logged.  If the tool is in TOOL_ACTION_MAP, also writes an
+    activity_log entry.
     """
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            try:
-                params_str = json.dumps({"args": args, "kwargs": kwargs}, default=str)
-            except Exception:
-                params_str = f"args={args}, kwargs={kwargs}"
-            logger.info("[CallToolRequest] tool=%s params=%s", name, params_str)
-            try:
-                result = func(*args, **kwargs)
+            metrics.MCP_TOOL_CALLS.inc(name)
+            traced = tracing.sampled() and tracing.trace_logger.isEnabledFor(logging.INFO)
+            with tracing.trace() as trace_id:
+                if traced:
+                    tracing.trace_logger.info(
+                        "[CallToolRequest] tool=%s trace=%s params=%s",
+                        name, trace_id, _trace_json({"args": args, "kwargs": kwargs}),
+                    )
+                t0 = time.perf_counter()
                 try:
-                    result_str = json.dumps(result, default=str)
-                except Exception:
-                    result_str = str(result)
-                logger.info("[CallToolResponse] tool=%s result=%s", name, result_str)
-
-                # Write activity_log for mapped mutating tools
-                mapping = TOOL_ACTION_MAP.get(name)
-                if mapping:
-                    try:
-                        from services.activity import log_activity
-                        category, action = mapping
-                        entity_type, entity_id = _extract_entity(result)
-                        # Derive actor from tool name prefix
-                        actor = f"mcp:{name.split('_')[0]}" if "_" in name else "mcp"
-                        log_activity(actor, category, action, entity_type, entity_id)
-                    except Exception:
-                        logger.debug("activity_log write failed for tool %s", name, exc_info=True)
-
-                return result
-            except Exception as exc:
-                logger.exception("[CallToolError] tool=%s error=%s", name, exc)
-                raise
+                    with query_origin(f"mcp:{name}"):
+                        result = func(*args, **kwargs)
+                    elapsed = time.perf_counter() - t0
+                    metrics.MCP_TOOL_DURATION.observe(elapsed, name)
+                    if traced:
+                        tracing.trace_logger.info(
+                            "[CallToolResponse] tool=%s trace=%s ms=%.1f result=%s",
+                            name, trace_id, elapsed * 1000, _trace_json(result),
+                        )
+
+                    # Write activity_log for mapped mutating tools
+                    mapping = TOOL_ACTION_MAP.get(name)
+                    if mapping:
+                        try:
+                            from services.activity import log_activity
+                            category, action = mapping
+                            entity_type, entity_id = _extract_entity(result)
+                            # Derive actor from tool name prefix
+                            actor = f"mcp:{name.split('_')[0]}" if "_" in name else "mcp"
+                            log_activity(actor, category, action, entity_type, entity_id)
+                        except Exception:
+                            logger.debug("activity_log write failed for tool %s", name, exc_info=True)
+
+                    return result
+                except Exception as exc:
+                    metrics.MCP_TOOL_ERRORS.inc(name)
+                    tracing.trace_logger.error(
+                        "[CallToolError] tool=%s trace=%s params=%s error=%s",
+                        name, trace_id, _trace_json({"args": args, "kwargs": kwargs}), exc, exc_info=True,
+                    )
+                    raise
         return wrapper
     return decorator
 
@@ -19,6 +19,7 @@ def register(mcp):
         entity_ids: Optional[List[str]] = None,
         since: Optional[str] = None,
         until: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Query the factory activity log.
 
@@ -33,9 +34,11 @@ def register(mcp):
             entity_ids: Filter by specific entity IDs, e.g. ['SO-1042', 'SO-1043'].
             since: ISO datetime lower bound (inclusive).
             until: ISO datetime upper bound (inclusive).
+            cursor: 'next_cursor' from a previous call, to fetch the next (older) page.
 
         Returns:
-            Dict with 'entries' list and 'total' count.
+            Dict with 'entries' list, approximate 'total' count and 'next_cursor'
+            (None when there are no older entries).
         """
         capped_limit = min(max(1, limit), 100)
         return activity_service.get_log(
@@ -47,4 +50,6 @@ def register(mcp):
             entity_ids=entity_ids,
             since=since,
             until=until,
+            cursor=cursor,
+            total_mode="approx",
         )
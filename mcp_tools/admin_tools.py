@@ -1,4 +1,4 @@
-"""MCP tools – admin / database reset."""
+"""MCP tools – admin / database reset and SQL query statistics."""
 
 from typing import Any, Dict
 
@@ -22,3 +22,22 @@ def register(mcp):
             Dictionary with status message and initial_time
         """
         return admin_service.reset_database(secret)
+
+    @mcp.tool(name="admin_query_stats", meta={"tags": ["shared"]})
+    @log_tool("admin_query_stats")
+    def admin_query_stats(limit: int = 20, sort: str = "total_ms") -> Dict[str, Any]:
+        """
+        Show which SQL statements dominate database time (needs SQL tracing enabled).
+
+        Read-only: clearing the statistics or switching tracing is done with
+        POST /api/admin/query-stats/reset.
+
+        Parameters:
+            limit: Number of statements to return (default 20)
+            sort: Order by 'total_ms' (default), 'calls', 'p99_ms' or 'rows'
+
+        Returns:
+            Dictionary with tracing_enabled, slow_query_ms and a statements array
+            (normalized sql, calls, total/mean/p50/p99 ms, rows, calls per tool/route)
+        """
+        return admin_service.get_query_stats(limit=limit, sort=sort)
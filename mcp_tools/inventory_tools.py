@@ -1,9 +1,9 @@
 """MCP tools – inventory / stock queries."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from mcp_tools._common import log_tool
-from services import catalog_service, inventory_service
+from services import atp_service, catalog_service, inventory_service, stock_history_service
 
 
 def register(mcp):
@@ -67,3 +67,38 @@ def register(mcp):
             quantity: The quantity needed
         """
         return inventory_service.check_availability(item_sku, quantity)
+
+    @mcp.tool(name="inventory_get_atp", meta={"tags": ["shared"]})
+    @log_tool("inventory_get_atp")
+    def inventory_get_atp(item_sku: str, quantity: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Time-phased available-to-promise projection for an item.
+        Combines stock on hand, open production and purchase orders, and open sales demand per day.
+
+        Parameters:
+            item_sku: The SKU of the item
+            quantity: Optional quantity to promise; adds the earliest promise date
+                      ('atp' from open supply, or 'ctp' after the production lead time)
+
+        Returns:
+            Dictionary with today, projection array (date, balance, available_to_promise)
+            and, when quantity is given, promise (date, source, available_today)
+        """
+        return atp_service.get_item_atp(item_sku, quantity)
+
+    @mcp.tool(name="inventory_get_stock_as_of", meta={"tags": ["shared"]})
+    @log_tool("inventory_get_stock_as_of")
+    def inventory_get_stock_as_of(as_of: str, item_skus: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        On-hand stock per item at the end of a past day (e.g. "what was on hand on 2025-10-15").
+        Reconstructed from daily inventory snapshots and the stock movement ledger.
+
+        Parameters:
+            as_of: Day to report (YYYY-MM-DD); today or later returns current stock
+            item_skus: Optional list of SKUs; omitted returns every item that had stock
+
+        Returns:
+            Dictionary with as_of and items array (item_id, item_sku, item_name, on_hand).
+            For stock over a date range use stats_get_summary with entity='stock_history'.
+        """
+        return stock_history_service.get_stock_as_of(as_of, item_skus)
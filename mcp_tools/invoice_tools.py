@@ -75,7 +75,7 @@ def register(mcp):
 
     @mcp.tool(name="invoice_list", meta={"tags": ["sales"]})
     @log_tool("invoice_list")
-    def invoice_list(customer_ids: Optional[List[str]] = None, status: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    def invoice_list(customer_ids: Optional[List[str]] = None, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
         """
         List invoices with optional filters.
 
@@ -83,11 +83,12 @@ def register(mcp):
             customer_ids: Optional list of customer IDs to filter by (e.g., ['CUST-0001', 'CUST-0002'])
             status: Optional status filter (draft, issued, paid, overdue)
             limit: Maximum results (default: 50)
+            cursor: 'next_cursor' from a previous call, to fetch the next page
 
         Returns:
-            Dictionary with invoices array
+            Dictionary with invoices array and next_cursor
         """
-        return invoice_service.list_invoices(customer_ids=customer_ids, status=status, limit=limit)
+        return invoice_service.list_invoices(customer_ids=customer_ids, status=status, limit=limit, cursor=cursor)
 
     # MUTATING TOOL
     @mcp.tool(name="invoice_issue", meta={
@@ -97,7 +97,8 @@ def register(mcp):
         customer_ids: Optional[List[str]] = None,
         status: Optional[str] = None,
         limit: int = 50,
-        show_superseded: bool = False
+        show_superseded: bool = False,
+        quote_chain_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         List quotes with optional filters. By default, hides superseded quotes.
@@ -107,11 +108,12 @@ def register(mcp):
             status: Optional status filter (draft, sent, accepted, rejected, expired, superseded)
             limit: Maximum results (default: 50)
             show_superseded: Whether to show superseded quotes (default: false)
+            quote_chain_id: Only revisions of this chain (the ID of its first quote)
 
         Returns:
             Dictionary with quotes array
         """
-        return quote_service.list_quotes(customer_ids, status, limit, show_superseded)
+        return quote_service.list_quotes(customer_ids, status, limit, show_superseded, quote_chain_id)
 
     # MUTATING TOOL
     @mcp.tool(name="quote_send", meta={
@@ -39,7 +39,7 @@ def register(mcp):
 
     @mcp.tool(name="sales_search_orders", meta={"tags": ["sales"]})
     @log_tool("sales_search_orders")
-    def search_sales_orders(customer_ids: Optional[List[str]] = None, limit: int = 5, sort: str = "most_recent") -> Dict[str, Any]:
+    def search_sales_orders(customer_ids: Optional[List[str]] = None, limit: int = 5, sort: str = "most_recent", cursor: Optional[str] = None) -> Dict[str, Any]:
         """
         Search sales orders, optionally filtered by customers. Returns full order details including pricing and fulfillment state.
 
@@ -47,29 +47,51 @@ def register(mcp):
             customer_ids: Optional list of customer IDs to filter by (e.g., ['CUST-0001', 'CUST-0002']). If omitted, searches all orders.
             limit: Maximum results (default: 5)
             sort: Sort order - 'most_recent' or by ID
+            cursor: 'next_cursor' from a previous call, to fetch the next page
 
         Returns:
-            Dictionary with sales_orders array including customer info, lines, total, currency, and fulfillment_state
+            Dictionary with sales_orders array including customer info, lines, total, currency, and fulfillment_state, plus next_cursor
         """
-        return sales_service.search_orders(customer_ids, limit, sort)
+        return sales_service.search_orders(customer_ids, limit, sort, cursor)
 
     @mcp.tool(name="sales_get_order", meta={"tags": ["sales"]})
     @log_tool("sales_get_order")
     def get_sales_order(sales_order_id: str) -> Dict[str, Any]:
         """
-        Get complete sales order details including customer, lines, pricing, and linked shipments.
+        Get complete sales order details including customer, lines, pricing, linked shipments
+        and the finite-capacity production plan.
 
         Parameters:
             sales_order_id: The sales order ID (e.g., 'SO-1000')
 
         Returns:
-            Full order details with customer, lines array, pricing breakdown, and shipments array
+            Full order details with customer, lines array, pricing breakdown, shipments array,
+            production_orders (planned_start/planned_finish per MO) and production_eta
+            (latest planned finish, null when nothing is being produced)
         """
         detail = sales_service.get_order_details(sales_order_id)
         if not detail:
             raise ValueError("Sales order not found")
         return detail
 
+    # MUTATING TOOL
+    @mcp.tool(name="sales_bulk_create_orders", meta={"tags": ["sales"]})
+    @log_tool("sales_bulk_create_orders")
+    def bulk_create_sales_orders(orders: List[Dict[str, Any]], confirm: bool = True) -> Dict[str, Any]:
+        """
+        Validate, price and book many orders at once (quote accepted + sales order per order).
+
+        Parameters:
+            orders: List of orders, each with customer_id, lines [{sku, qty}] and optional
+                    requested_delivery_date, ship_to and note
+            confirm: Confirm the created sales orders (default: True); False leaves them draft
+
+        Returns:
+            Dictionary with created/failed counts and per-order results (index, status,
+            quote_id, sales_order_id, total — or error for orders that were rejected)
+        """
+        return sales_service.bulk_create_orders(orders, confirm=confirm, actor="mcp:sales")
+
     # MUTATING TOOL
     @mcp.tool(name="sales_link_shipment", meta={
         "tags": ["sales"],
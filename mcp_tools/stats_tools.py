@@ -53,6 +53,7 @@ def register(mcp):
             - sales_order_lines: fields=[qty, line_total], groups=[sales_order_id, item_id], dates=[created_at] 📦 Use for order quantities & revenue (dates from parent sales_orders)
             - items: fields=[unit_price], groups=[type]
             - stock: fields=[on_hand], groups=[warehouse, location, item_id]
+            - stock_history: groups=[date, item_id] 📈 end-of-day on_hand over time (date_from required for date grouping, date_to defaults to today; metric/field ignored)
             - production_orders: fields=[id, qty], groups=[status, item_id], dates=[started_at, completed_at, eta_finish, eta_ship] 🏭 qty via join with recipes
             - shipments: fields=[id], groups=[status], dates=[planned_departure, planned_arrival]
             - shipment_lines: fields=[qty], groups=[shipment_id, item_id], dates=[planned_departure, planned_arrival] 📦 Use for shipment quantities with dates via join
@@ -87,6 +88,9 @@ def register(mcp):
             Most popular duck in October 2025:
                 entity="sales_order_lines", metric="sum", field="qty", group_by="item_id", date_from="2025-10-01", date_to="2025-10-31", limit=1
 
+            Stock level of two ducks over October, one line per item:
+                entity="stock_history", group_by=["date", "item_id"], item_ids=["ITEM-PIRATE-15", "ITEM-CLASSIC-10"], date_from="2025-10-01", date_to="2025-10-31", return_chart="line"
+
             Revenue per month for pirate ducks:
                 entity="sales_order_lines", metric="sum", field="line_total", item_ids=["ITEM-PIRATE-15"], group_by="month:created_at"
         """
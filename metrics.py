@@ -0,0 +1,162 @@
+"""In-process metrics registry rendered in Prometheus text exposition format.
+
+Instrumented code updates counters and histograms in memory (a lock plus a
+few additions per observation); nothing is formatted until ``/api/metrics``
+is scraped, so the cost when nobody scrapes is negligible.  No external
+client library is needed.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Default latency buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels → [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _label_str(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _label_str(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, labels)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, labels)} {count}")
+        return lines
+
+
+_REGISTRY: List = []
+
+
+def _register(metric):
+    _REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Render every registered metric in Prometheus text format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+MCP_TOOL_CALLS = _register(Counter(
+    "duck_mcp_tool_calls_total", "MCP tool calls.", ["tool"]))
+MCP_TOOL_ERRORS = _register(Counter(
+    "duck_mcp_tool_errors_total", "MCP tool calls that raised.", ["tool"]))
+MCP_TOOL_DURATION = _register(Histogram(
+    "duck_mcp_tool_duration_seconds", "MCP tool call latency.", ["tool"]))
+
+HTTP_REQUEST_DURATION = _register(Histogram(
+    "duck_http_request_duration_seconds", "REST route latency.", ["route", "method", "status"]))
+
+DB_CONNECT_DURATION = _register(Histogram(
+    "duck_db_connect_seconds", "Time to open and configure a SQLite connection."))
+DB_SESSION_DURATION = _register(Histogram(
+    "duck_db_session_seconds", "Time an outermost db_conn() block held its connection."))
+
+LLM_CALL_DURATION = _register(Histogram(
+    "duck_llm_call_duration_seconds", "LLM chat completion latency.", ["provider", "model"]))
+LLM_CALL_ERRORS = _register(Counter(
+    "duck_llm_call_errors_total", "LLM chat completions that raised.", ["provider", "model"]))
+LLM_TOKENS = _register(Counter(
+    "duck_llm_tokens_total", "LLM tokens consumed.", ["provider", "model", "kind"]))
+
+SIM_TICK_DURATION = _register(Histogram(
+    "duck_simulation_tick_seconds", "Duration of advance_time including side effects."))
+SIM_EVENTS = _register(Counter(
+    "duck_simulation_events_total", "Business events produced by simulation ticks.", ["event"]))
+
+EVENTS_PUBLISHED = _register(Counter(
+    "duck_events_published_total", "Events published to the /api/events bus.", ["type"]))
+EVENTS_DROPPED = _register(Counter(
+    "duck_events_subscriber_resets_total", "Event stream subscribers reset after falling behind."))
+
+DB_WRITE_LOCK_WAIT = _register(Histogram(
+    "duck_db_write_lock_wait_seconds", "Time write_transaction() waited for the SQLite write lock."))
+DB_BUSY_RETRIES = _register(Counter(
+    "duck_db_busy_retries_total", "BEGIN IMMEDIATE attempts that found the database locked and backed off."))
+DB_BUSY_FAILURES = _register(Counter(
+    "duck_db_busy_failures_total", "Write transactions that gave up after DB_WRITE_RETRIES locked attempts."))
@@ -5,22 +5,37 @@ chronological order.  Each scenario module must expose a ``run(ctx)`` function
 that receives a context dict (customer IDs, SKU pools, etc.) and returns
 a summary dict.
 
+After base_setup and after each module the database and ``ctx`` are saved
+as a checkpoint under ``.cache/scenarios/``.  ``--from`` restores the latest
+valid checkpoint before the named module and continues from there.
+
 Usage:
     python -m scenarios                     # run all scenarios
     python -m scenarios --only s01,s02      # run selected scenarios
     python -m scenarios --base-only         # base setup only (no scenarios)
+    python -m scenarios --fast              # build in memory, then copy to demo.db
+    python -m scenarios --from s05          # resume from the checkpoint before s05
 """
 
 import argparse
+import hashlib
 import importlib
 import logging
+import os
+import pickle
+import random
+import sqlite3
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from db import DB_PATH, init_db, get_connection
-from services._base import db_conn
+import db
+import events
+from db import init_db, get_connection
+from services._base import db_conn, pinned_connection
+from services.atp import atp_service
+from services.pricing import pricing_service
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -50,27 +65,213 @@ SCENARIO_MODULES = [
 # DB reset (without re-seeding old data)
 # ---------------------------------------------------------------------------
 
-def reset_database() -> None:
+def reset_database(conn: Optional[sqlite3.Connection] = None) -> None:
     """Drop all tables and recreate schema from schema.sql.
 
     Unlike AdminService.reset_database(), this does NOT re-seed with
     seed_demo.py data — we want a blank slate for the scenario framework.
+    With *conn* (``--fast`` mode) the schema is created on that connection
+    instead and ``demo.db`` is left untouched until the run is written out.
     """
-    if DB_PATH.exists():
-        DB_PATH.unlink()
-    init_db()
+    if conn is None:
+        if db.DB_PATH.exists():
+            db.DB_PATH.unlink()
+        init_db()
+        target = get_connection()
+    else:
+        init_db(conn)
+        target = conn
 
     # Initialize simulation_state row (required by SimulationService)
-    conn = get_connection()
     try:
-        conn.execute(
+        target.execute(
             "INSERT OR REPLACE INTO simulation_state (id, sim_time) VALUES (1, '2025-01-01 00:00:00')"
         )
-        conn.commit()
+        target.commit()
     finally:
-        conn.close()
+        if conn is None:
+            target.close()
+
+    atp_service.invalidate()
+    pricing_service.invalidate()
+    events.reset()
+    logger.info("Database reset — schema recreated at %s", ":memory:" if conn is not None else db.DB_PATH)
+
+
+# ---------------------------------------------------------------------------
+# Fast mode: in-memory build, one commit per simulated day
+# ---------------------------------------------------------------------------
+
+class DailyCommitConnection(sqlite3.Connection):
+    """Connection whose ``commit()`` only commits when the simulated day changes.
+
+    Services commit after every call; in ``--fast`` mode those commits are
+    folded into one transaction per simulated day.  Nothing else reads the
+    database during the run, so the rows written are exactly those of a
+    normal run — only the number of transactions differs.
+    """
+
+    deferring = False
+    commits = 0
+    _day: Optional[str] = None
+    _pending = False  # a commit was deferred since the last real one
+
+    def commit(self) -> None:
+        if self.deferring:
+            row = self.execute("SELECT substr(sim_time, 1, 10) FROM simulation_state WHERE id = 1").fetchone()
+            day = row[0] if row else None
+            if day == self._day:
+                self._pending = self.in_transaction
+                return
+            self._day = day
+        self.flush()
+
+    def rollback(self) -> None:
+        """Roll back, unless that would also drop writes whose commit was deferred."""
+        if self._pending:
+            raise RuntimeError(
+                "rollback in --fast mode would discard the simulated day's deferred commits; "
+                "the failing write must run inside write_transaction() (a savepoint)"
+            )
+        super().rollback()
+
+    def flush(self) -> None:
+        """Commit now, whatever the simulated day (before taking a checkpoint)."""
+        super().commit()
+        self._pending = False
+        self.commits += 1
+
+
+def open_memory_database() -> DailyCommitConnection:
+    """In-memory connection configured like ``db.get_connection()``."""
+    conn = sqlite3.connect(":memory:", factory=DailyCommitConnection)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def write_database(conn: sqlite3.Connection, path: Optional[Path] = None) -> None:
+    """Copy *conn*'s database to *path* (default ``db.DB_PATH``) with the backup API."""
+    path = Path(path or db.DB_PATH)
+    for stale in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+        stale.unlink(missing_ok=True)
+    target = sqlite3.connect(path)
+    try:
+        conn.backup(target)
+    finally:
+        target.close()
+    logger.info("Database written to %s", path)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+CHECKPOINT_DIR = db.ROOT / ".cache" / "scenarios"
+
+_SCENARIOS_DIR = Path(__file__).resolve().parent
+
+# Sources every stage depends on: editing any of them invalidates all checkpoints
+_SHARED_SOURCES = [
+    db.SCHEMA_PATH,
+    db.ROOT / "db.py",
+    db.ROOT / "config.py",
+    # Top-level modules the service layer imports
+    db.ROOT / "utils.py",
+    db.ROOT / "events.py",
+    db.ROOT / "metrics.py",
+    db.ROOT / "tracing.py",
+    _SCENARIOS_DIR / "base_setup.py",
+    _SCENARIOS_DIR / "helpers.py",
+]
+
+
+def checkpoint_key(chain: List[str]) -> str:
+    """Hash of the sources a database built by base_setup + *chain* depends on.
+
+    Covers schema.sql, db/config, the service layer and the top-level
+    modules it imports (utils, events, metrics, tracing), base_setup,
+    helpers and each module in *chain* in order — editing s05 leaves the
+    checkpoints after s01–s04 valid.
+    """
+    digest = hashlib.sha256()
+    sources = _SHARED_SOURCES + sorted((db.ROOT / "services").rglob("*.py"))
+    sources += [_SCENARIOS_DIR / f"{name}.py" for name in chain]
+    for path in sources:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _checkpoint_paths(chain: List[str]) -> Tuple[Path, Path]:
+    stage = chain[-1] if chain else "base_setup"
+    stem = f"{len(chain):02d}-{stage}-{checkpoint_key(chain)}"
+    return CHECKPOINT_DIR / f"{stem}.db", CHECKPOINT_DIR / f"{stem}.ctx.pkl"
+
+
+def save_checkpoint(chain: List[str], ctx: Dict[str, Any],
+                    conn: Optional[DailyCommitConnection] = None) -> None:
+    """Snapshot the database and *ctx* after base_setup + *chain*.
+
+    Older checkpoints for the same stage are removed.
+    """
+    db_path, ctx_path = _checkpoint_paths(chain)
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CHECKPOINT_DIR.glob(f"{db_path.name.rsplit('-', 1)[0]}-*"):
+        stale.unlink(missing_ok=True)
+
+    tmp = db_path.with_suffix(".tmp")
+    target = sqlite3.connect(tmp)
+    try:
+        if conn is not None:
+            conn.flush()
+            conn.backup(target)
+        else:
+            with db_conn() as source:
+                source.backup(target)
+    finally:
+        target.close()
+    ctx_path.write_bytes(pickle.dumps({"ctx": ctx, "random_state": random.getstate()}))
+    os.replace(tmp, db_path)
+    logger.info("Checkpoint saved: %s", db_path.name)
+
+
+def restore_checkpoint(
+    target: List[str],
+    conn: Optional[DailyCommitConnection] = None,
+) -> Optional[Tuple[List[str], Dict[str, Any]]]:
+    """Restore the latest valid checkpoint along *target* (longest prefix first).
+
+    Returns ``(chain, ctx)`` for the checkpoint restored, or ``None`` when no
+    prefix — not even base_setup — has a checkpoint matching the current
+    sources.  The database goes to *conn* in ``--fast`` mode, otherwise to
+    ``demo.db``.
+    """
+    for n in range(len(target), -1, -1):
+        chain = target[:n]
+        db_path, ctx_path = _checkpoint_paths(chain)
+        if not (db_path.exists() and ctx_path.exists()):
+            continue
+        try:
+            state = pickle.loads(ctx_path.read_bytes())
+        except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning("Ignoring unreadable checkpoint %s: %s", ctx_path.name, e)
+            continue
 
-    logger.info("Database reset — schema recreated at %s", DB_PATH)
+        source = sqlite3.connect(db_path)
+        try:
+            if conn is not None:
+                source.backup(conn)
+            else:
+                write_database(source)
+        finally:
+            source.close()
+        random.setstate(state["random_state"])
+        atp_service.invalidate()
+        pricing_service.invalidate()
+        events.reset()
+        logger.info("Restored checkpoint %s", db_path.name)
+        return chain, state["ctx"]
+    return None
 
 
 # ---------------------------------------------------------------------------
@@ -114,25 +315,83 @@ def print_summary() -> None:
 def run_scenarios(
     only: Optional[List[str]] = None,
     base_only: bool = False,
+    fast: bool = False,
+    start_from: Optional[str] = None,
+    checkpoints: bool = True,
 ) -> None:
-    """Main orchestration: reset → base_setup → scenarios."""
+    """Main orchestration: reset → base_setup → scenarios.
 
-    t0 = time.time()
+    With ``fast`` the whole run goes through one in-memory connection that
+    commits once per simulated day, and the result is copied to ``demo.db``
+    with the SQLite backup API at the end.  The rows are the same as a
+    normal run's.
 
-    # 1. Reset
-    logger.info("Step 1/3: Resetting database...")
-    reset_database()
+    With ``start_from`` (a module prefix such as ``"s05"``) the latest valid
+    checkpoint before that module is restored and the run continues from
+    there to the last module; without any valid checkpoint it starts from
+    scratch.  ``checkpoints=False`` skips writing checkpoints.
+    """
+    if not fast:
+        _run(only, base_only, start_from=start_from, checkpoints=checkpoints)
+        return
 
-    # 2. Base setup
-    logger.info("Step 2/3: Running base_setup...")
-    from scenarios import base_setup
-    base_result = base_setup.populate()
+    conn = open_memory_database()
+    try:
+        with pinned_connection(conn):
+            _run(only, base_only, conn, start_from, checkpoints)
+        conn.deferring = False
+        conn.commit()
+        logger.info("Fast mode: %d commits", conn.commits)
+        write_database(conn)
+    finally:
+        conn.close()
 
-    # Build context dict that scenarios can use
-    ctx: Dict = {
-        "customer_ids": base_result["customer_ids"],
-        "base_result": base_result,
-    }
+
+def _run(
+    only: Optional[List[str]],
+    base_only: bool,
+    conn: Optional[DailyCommitConnection] = None,
+    start_from: Optional[str] = None,
+    checkpoints: bool = True,
+) -> None:
+    t0 = time.time()
+
+    resumed = None
+    if start_from:
+        matched = [i for i, m in enumerate(SCENARIO_MODULES) if m.startswith(start_from.strip())]
+        if not matched:
+            raise ValueError(f"No scenario matching '{start_from}'")
+        resumed = restore_checkpoint(SCENARIO_MODULES[:matched[0]], conn)
+        if resumed is None:
+            logger.warning("No valid checkpoint before %s — running from scratch",
+                           SCENARIO_MODULES[matched[0]])
+
+    if resumed is not None:
+        chain, ctx = resumed
+        if conn is not None:
+            conn.deferring = True
+        logger.info("Steps 1-2/3: resumed after %s", chain[-1] if chain else "base_setup")
+    else:
+        chain = []
+
+        # 1. Reset
+        logger.info("Step 1/3: Resetting database...")
+        reset_database(conn)
+        if conn is not None:
+            conn.deferring = True
+
+        # 2. Base setup
+        logger.info("Step 2/3: Running base_setup...")
+        from scenarios import base_setup
+        base_result = base_setup.populate()
+
+        # Build context dict that scenarios can use
+        ctx: Dict = {
+            "customer_ids": base_result["customer_ids"],
+            "base_result": base_result,
+        }
+        if checkpoints:
+            save_checkpoint(chain, ctx, conn)
 
     if base_only:
         logger.info("--base-only specified, skipping scenarios")
@@ -145,7 +404,9 @@ def run_scenarios(
     logger.info("Step 3/3: Running scenarios...")
 
     modules_to_run = SCENARIO_MODULES
-    if only:
+    if start_from:
+        modules_to_run = SCENARIO_MODULES[len(chain):]
+    elif only:
         # Filter: accept "s01", "s01_steady_state", etc.
         modules_to_run = []
         for name in only:
@@ -178,6 +439,10 @@ def run_scenarios(
             logger.exception("FAILED: %s", module_name)
             raise
 
+        chain.append(module_name)
+        if checkpoints:
+            save_checkpoint(chain, ctx, conn)
+
     print_summary()
     elapsed = time.time() - t0
     logger.info("All done in %.1fs", elapsed)
@@ -202,10 +467,35 @@ def main():
         action="store_true",
         help="Only run base_setup (no scenarios)",
     )
+    parser.add_argument(
+        "--from",
+        dest="start_from",
+        type=str,
+        default=None,
+        help="Restore the latest checkpoint before this scenario (e.g. s05) and run from there",
+    )
+    parser.add_argument(
+        "--no-checkpoints",
+        action="store_true",
+        help="Do not write checkpoints under .cache/scenarios/",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Build in memory with one commit per simulated day, then copy to demo.db",
+    )
     args = parser.parse_args()
+    if args.start_from and (args.only or args.base_only):
+        parser.error("--from cannot be combined with --only or --base-only")
 
     only = [s.strip() for s in args.only.split(",")] if args.only else None
-    run_scenarios(only=only, base_only=args.base_only)
+    run_scenarios(
+        only=only,
+        base_only=args.base_only,
+        fast=args.fast,
+        start_from=args.start_from,
+        checkpoints=not args.no_checkpoints,
+    )
 
 
 if __name__ == "__main__":
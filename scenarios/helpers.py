@@ -623,3 +623,12 @@ def pick_random_lines(
     n = min(n_lines, len(sku_pool))
     skus = random.sample(sku_pool, n)
     return [{"sku": s, "qty": random.randint(*qty_range)} for s in skus]
+
+
+def sample_rows(rows: List[Any], k: int) -> List[Any]:
+    """Pick up to *k* rows with the seeded ``random`` module.
+
+    Use instead of SQL ``ORDER BY RANDOM()``, which cannot be seeded — the
+    query should order by a key so the candidate list is stable.
+    """
+    return random.sample(list(rows), min(k, len(rows)))
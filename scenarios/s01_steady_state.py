@@ -26,6 +26,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     sim_date,
@@ -319,11 +320,11 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
          "dispatched.\n\nBest regards,\nDuck Inc Logistics"),
     ]
     with db_conn() as conn:
-        sample = conn.execute(
+        sample = sample_rows(conn.execute(
             "SELECT so.id, so.customer_id, c.name FROM sales_orders so "
             "JOIN customers c ON so.customer_id = c.id "
-            "ORDER BY RANDOM() LIMIT 10",
-        ).fetchall()
+            "ORDER BY so.id",
+        ).fetchall(), 10)
     for row in sample:
         t = random.choice(templates)
         subj = t[0].format(so_id=row["id"], name=row["name"])
@@ -22,6 +22,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     set_time,
@@ -316,11 +317,12 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
             "JOIN customers c ON so.customer_id = c.id "
             "WHERE so.status = 'confirmed' "
             "AND so.id IN ({}) "
-            "ORDER BY RANDOM() LIMIT 10".format(
+            "ORDER BY so.id".format(
                 ",".join("?" for _ in all_so_ids)
             ),
             all_so_ids,
         ).fetchall()
+        delayed = sample_rows(delayed, 10)
 
     for row in delayed:
         t = random.choice(inquiry_templates)
@@ -27,6 +27,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     set_time,
@@ -368,11 +369,12 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
                 "JOIN customers c ON so.customer_id = c.id "
                 "WHERE so.status = 'confirmed' "
                 "AND so.id IN ({}) "
-                "ORDER BY RANDOM() LIMIT 12".format(
+                "ORDER BY so.id".format(
                     ",".join("?" for _ in complaint_so_pool)
                 ),
                 complaint_so_pool,
             ).fetchall()
+            delayed = sample_rows(delayed, 12)
         else:
             delayed = []
 
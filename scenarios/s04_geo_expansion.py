@@ -26,6 +26,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     set_time,
@@ -368,13 +369,13 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
          "Beste Grüße,\nDuck Inc Team"),
     ]
     with db_conn() as conn:
-        de_so_sample = conn.execute(
+        de_so_sample = sample_rows(conn.execute(
             "SELECT so.id, so.customer_id, c.name "
             "FROM sales_orders so "
             "JOIN customers c ON so.customer_id = c.id "
             "WHERE c.country = 'DE' "
-            "ORDER BY RANDOM() LIMIT 8",
-        ).fetchall()
+            "ORDER BY so.id",
+        ).fetchall(), 8)
     for row in de_so_sample:
         t = random.choice(welcome_templates)
         subj = t[0].format(so_id=row["id"], name=row["name"])
@@ -417,11 +418,12 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
                 "JOIN customers c ON so.customer_id = c.id "
                 "WHERE so.status = 'confirmed' "
                 "AND so.id IN ({}) "
-                "ORDER BY RANDOM() LIMIT 8".format(
+                "ORDER BY so.id".format(
                     ",".join("?" for _ in all_so_ids)
                 ),
                 all_so_ids,
             ).fetchall()
+            delayed = sample_rows(delayed, 8)
         else:
             delayed = []
     for row in delayed:
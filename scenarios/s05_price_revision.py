@@ -24,6 +24,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     set_time,
@@ -34,6 +35,7 @@ from services import (
     activity_service,
     fulfillment_service,
     mrp_service,
+    pricing_service,
     quote_service,
     sales_service,
 )
@@ -269,6 +271,7 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
             (1 + PRICE_INCREASE_PCT / 100,),
         )
         conn.commit()
+        pricing_service.invalidate()
 
         items_affected = len(old_prices)
         sample = conn.execute(
@@ -566,23 +569,21 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
     logger.info("Creating price-complaint emails...")
     with db_conn() as conn:
         # Pick recent SOs for email context
-        recent_sos = conn.execute(
+        recent_sos = sample_rows(conn.execute(
             "SELECT so.id, so.customer_id, c.name "
             "FROM sales_orders so "
             "JOIN customers c ON so.customer_id = c.id "
             "WHERE so.created_at >= '2026-01-01' "
-            "ORDER BY RANDOM() LIMIT ?",
-            (PRICE_COMPLAINT_EMAILS,),
-        ).fetchall()
+            "ORDER BY so.id",
+        ).fetchall(), PRICE_COMPLAINT_EMAILS)
 
         # Fall back to any customers if not enough recent SOs
         if len(recent_sos) < PRICE_COMPLAINT_EMAILS:
-            extra_custs = conn.execute(
+            extra_custs = sample_rows(conn.execute(
                 "SELECT c.id as customer_id, c.name "
                 "FROM customers c "
-                "ORDER BY RANDOM() LIMIT ?",
-                (PRICE_COMPLAINT_EMAILS - len(recent_sos),),
-            ).fetchall()
+                "ORDER BY c.id",
+            ).fetchall(), PRICE_COMPLAINT_EMAILS - len(recent_sos))
         else:
             extra_custs = []
 
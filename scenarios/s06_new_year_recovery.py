@@ -21,6 +21,7 @@ from scenarios.helpers import (
     get_customer_ship_to,
     pick_random_lines,
     restock_materials,
+    sample_rows,
     send_email,
     set_day_time,
     set_time,
@@ -574,15 +575,14 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
 
     # 4a. Thank-you emails from FR customers
     with db_conn() as conn:
-        recent_completed = conn.execute(
+        recent_completed = sample_rows(conn.execute(
             "SELECT so.id, so.customer_id, c.name "
             "FROM sales_orders so "
             "JOIN customers c ON so.customer_id = c.id "
             "WHERE so.status = 'completed' "
             "AND c.country = 'FR' "
-            "ORDER BY RANDOM() LIMIT ?",
-            (THANK_YOU_EMAIL_COUNT,),
-        ).fetchall()
+            "ORDER BY so.id",
+        ).fetchall(), THANK_YOU_EMAIL_COUNT)
 
     for row in recent_completed:
         t = random.choice(THANK_YOU_TEMPLATES)
@@ -600,11 +600,10 @@ def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
 
     # 4b. Planning emails from DE customers
     with db_conn() as conn:
-        de_cust_rows = conn.execute(
+        de_cust_rows = sample_rows(conn.execute(
             "SELECT id as customer_id, name FROM customers "
-            "WHERE country = 'DE' ORDER BY RANDOM() LIMIT ?",
-            (PLANNING_EMAIL_COUNT,),
-        ).fetchall()
+            "WHERE country = 'DE' ORDER BY id",
+        ).fetchall(), PLANNING_EMAIL_COUNT)
 
     for row in de_cust_rows:
         t = random.choice(PLANNING_TEMPLATES)
@@ -1,4 +1,6 @@
 -- SQLite schema for duck-demo MCP server
+-- Always the latest schema.  Changes that existing databases need (new
+-- columns, new indexes) must also be added as a step in db.MIGRATIONS.
 
 -- Simulation state - single row table for tracking simulated time
 CREATE TABLE IF NOT EXISTS simulation_state (
@@ -25,6 +27,32 @@ CREATE TABLE IF NOT EXISTS customers (
     created_at TEXT
 );
 
+-- Trigram full-text index over the searchable customer fields (substring
+-- LIKE filters and ranked fuzzy search).  External content keyed on the
+-- customers rowid and kept in sync by the triggers below; after a VACUUM,
+-- re-sync with INSERT INTO customers_fts(customers_fts) VALUES ('rebuild').
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    name, company, email, city, phone,
+    content = 'customers', content_rowid = 'rowid', tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN
+    INSERT INTO customers_fts (rowid, name, company, email, city, phone)
+    VALUES (new.rowid, new.name, new.company, new.email, new.city, new.phone);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN
+    INSERT INTO customers_fts (customers_fts, rowid, name, company, email, city, phone)
+    VALUES ('delete', old.rowid, old.name, old.company, old.email, old.city, old.phone);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF name, company, email, city, phone ON customers BEGIN
+    INSERT INTO customers_fts (customers_fts, rowid, name, company, email, city, phone)
+    VALUES ('delete', old.rowid, old.name, old.company, old.email, old.city, old.phone);
+    INSERT INTO customers_fts (rowid, name, company, email, city, phone)
+    VALUES (new.rowid, new.name, new.company, new.email, new.city, new.phone);
+END;
+
 CREATE TABLE IF NOT EXISTS items (
     id TEXT PRIMARY KEY,
     sku TEXT NOT NULL UNIQUE,
@@ -53,6 +81,7 @@ CREATE TABLE IF NOT EXISTS quotes (
     customer_id TEXT NOT NULL,
     revision_number INTEGER NOT NULL DEFAULT 1,
     supersedes_quote_id TEXT,
+    quote_chain_id TEXT,       -- ID of the chain's first revision (the root quote)
     requested_delivery_date TEXT,
     ship_to_line1 TEXT,
     ship_to_line2 TEXT,
@@ -161,7 +190,9 @@ CREATE TABLE IF NOT EXISTS production_orders (
     eta_finish TEXT,
     eta_ship TEXT,
     inspection_required INTEGER NOT NULL DEFAULT 0,
-    inspection_status TEXT NOT NULL DEFAULT 'none'
+    inspection_status TEXT NOT NULL DEFAULT 'none',
+    planned_start TEXT,   -- finite-capacity plan (services/scheduling.py)
+    planned_finish TEXT
 );
 
 -- Production operations track execution of each step in a production order
@@ -178,7 +209,9 @@ CREATE TABLE IF NOT EXISTS production_operations (
     started_at TEXT,
     completed_at TEXT,
     blocked_reason TEXT,
-    blocked_at TEXT
+    blocked_at TEXT,
+    planned_start TEXT,   -- finite-capacity plan (services/scheduling.py)
+    planned_end TEXT
 );
 
 -- Suppliers for raw materials
@@ -341,6 +374,35 @@ CREATE INDEX IF NOT EXISTS idx_purchord_status ON purchase_orders(status, expect
 CREATE INDEX IF NOT EXISTS idx_sos_ship ON sales_order_shipments(shipment_id);
 CREATE INDEX IF NOT EXISTS idx_payments_inv ON payments(invoice_id);
 CREATE INDEX IF NOT EXISTS idx_emails_cust ON emails(customer_id);
+CREATE INDEX IF NOT EXISTS idx_mo_so ON production_orders(sales_order_id);
+CREATE INDEX IF NOT EXISTS idx_mo_parent ON production_orders(parent_production_order_id);
+CREATE INDEX IF NOT EXISTS idx_so_cust ON sales_orders(customer_id);
+CREATE INDEX IF NOT EXISTS idx_so_quote ON sales_orders(quote_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_cust ON quotes(customer_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_supersedes ON quotes(supersedes_quote_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_chain ON quotes(quote_chain_id, revision_number);
+CREATE INDEX IF NOT EXISTS idx_inv_cust ON invoices(customer_id);
+
+-- Status-driven scans (simulation side effects, dashboards)
+CREATE INDEX IF NOT EXISTS idx_so_status_cust ON sales_orders(status, customer_id);
+CREATE INDEX IF NOT EXISTS idx_quotes_status_valid ON quotes(status, valid_until);
+CREATE INDEX IF NOT EXISTS idx_ship_status_arrival ON shipments(status, planned_arrival);
+CREATE INDEX IF NOT EXISTS idx_inv_status_due ON invoices(status, due_date);
+CREATE INDEX IF NOT EXISTS idx_stock_item_onhand ON stock(item_id, on_hand);
+-- Stock allocation only ever reads rows with something left to pick (covering)
+CREATE INDEX IF NOT EXISTS idx_stock_positive ON stock(item_id, id, warehouse, location, on_hand) WHERE on_hand > 0;
+
+-- Time-phased ATP projection (services/atp.py): supply and demand per item
+CREATE INDEX IF NOT EXISTS idx_mo_item_status ON production_orders(item_id, status);
+CREATE INDEX IF NOT EXISTS idx_purchord_item_status ON purchase_orders(item_id, status);
+CREATE INDEX IF NOT EXISTS idx_ri_input_item ON recipe_ingredients(input_item_id);
+
+-- Keyset pagination: composite (sort key, id) indexes for list endpoints
+CREATE INDEX IF NOT EXISTS idx_so_created ON sales_orders(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_so_created_sort ON sales_orders(COALESCE(created_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_inv_created ON invoices(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_ship_departure ON shipments(planned_departure, id);
+CREATE INDEX IF NOT EXISTS idx_stock_location ON stock(warehouse, location, id);
 
 -- Stock movements: full audit trail for every stock change
 -- stock_id is nullable for QC scrap movements (scrapped qty has no stock row)
@@ -359,6 +421,8 @@ CREATE TABLE IF NOT EXISTS stock_movements (
 CREATE INDEX IF NOT EXISTS idx_stock_mov_item ON stock_movements(item_id, timestamp);
 CREATE INDEX IF NOT EXISTS idx_stock_mov_stock ON stock_movements(stock_id);
 CREATE INDEX IF NOT EXISTS idx_stock_mov_ref ON stock_movements(reference_type, reference_id);
+CREATE INDEX IF NOT EXISTS idx_stock_mov_type_ref ON stock_movements(movement_type, reference_id);
+CREATE INDEX IF NOT EXISTS idx_stock_mov_ts ON stock_movements(timestamp);
 
 -- QC Hold: one batch per flagged production order completion
 CREATE TABLE IF NOT EXISTS qc_hold_batches (
@@ -376,6 +440,7 @@ CREATE TABLE IF NOT EXISTS qc_hold_batches (
 CREATE INDEX IF NOT EXISTS idx_po_qc_required ON production_orders(inspection_required, status);
 CREATE INDEX IF NOT EXISTS idx_qc_hold_batch_status ON qc_hold_batches(status, created_at);
 CREATE INDEX IF NOT EXISTS idx_qc_hold_batch_po ON qc_hold_batches(production_order_id);
+CREATE INDEX IF NOT EXISTS idx_qc_hold_batch_item ON qc_hold_batches(item_id, status);
 
 -- QC Hold images: evidence image (stored as BLOB) attached by operator
 CREATE TABLE IF NOT EXISTS qc_hold_images (
@@ -429,13 +494,73 @@ CREATE TABLE IF NOT EXISTS activity_log (
     action      TEXT NOT NULL,
     entity_type TEXT,
     entity_id   TEXT,
-    details     TEXT
+    details     TEXT,
+    trace_id    TEXT          -- MCP tool call that wrote the row (tracing.py)
 );
 CREATE INDEX IF NOT EXISTS idx_actlog_ts       ON activity_log(timestamp);
+CREATE INDEX IF NOT EXISTS idx_actlog_ts_id    ON activity_log(timestamp, id);
 CREATE INDEX IF NOT EXISTS idx_actlog_entity   ON activity_log(entity_type, entity_id);
 CREATE INDEX IF NOT EXISTS idx_actlog_action   ON activity_log(action);
 CREATE INDEX IF NOT EXISTS idx_actlog_category ON activity_log(category);
 
+-- Cold history: activity_log / stock_movements rows past ARCHIVE_RETENTION_DAYS
+-- (same columns as the hot tables; see services/archive.py)
+CREATE TABLE IF NOT EXISTS activity_log_archive (
+    id          TEXT PRIMARY KEY,
+    timestamp   TEXT NOT NULL,
+    actor       TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    action      TEXT NOT NULL,
+    entity_type TEXT,
+    entity_id   TEXT,
+    details     TEXT,
+    trace_id    TEXT          -- MCP tool call that wrote the row (tracing.py)
+);
+CREATE INDEX IF NOT EXISTS idx_actlog_arch_ts_id  ON activity_log_archive(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_actlog_arch_entity ON activity_log_archive(entity_type, entity_id);
+
+CREATE TABLE IF NOT EXISTS stock_movements_archive (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    movement_type TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    stock_id TEXT,
+    reference_type TEXT,
+    reference_id TEXT,
+    notes TEXT,
+    qc_inspection_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stock_mov_arch_stock    ON stock_movements_archive(stock_id);
+CREATE INDEX IF NOT EXISTS idx_stock_mov_arch_type_ref ON stock_movements_archive(movement_type, reference_id);
+
+-- Per-day rollups of archived rows, kept hot for dashboards:
+-- activity_log → (category, action), stock_movements → (item_id, movement_type)
+CREATE TABLE IF NOT EXISTS archive_summaries (
+    source_table TEXT NOT NULL,
+    day          TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    subkey       TEXT NOT NULL,
+    row_count    INTEGER NOT NULL,
+    qty_total    INTEGER,
+    PRIMARY KEY (source_table, day, key, subkey)
+);
+
+-- One row per archived table: archive boundary and highest archived ID number
+CREATE TABLE IF NOT EXISTS archive_state (
+    table_name      TEXT PRIMARY KEY,
+    archived_before TEXT NOT NULL,
+    max_id          INTEGER NOT NULL
+);
+
+-- Closing on-hand per item for each sim-day a tick left (services/stock_history.py)
+CREATE TABLE IF NOT EXISTS inventory_snapshots (
+    day     TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    on_hand INTEGER NOT NULL,
+    PRIMARY KEY (day, item_id)
+);
+
 -- Data Import: staging tables for file-based data import
 CREATE TABLE IF NOT EXISTS import_jobs (
     id TEXT PRIMARY KEY,
@@ -555,24 +555,24 @@ def seed(from_admin=False):
 
         # Quotes
         conn.executemany(
-            "INSERT INTO quotes (id, customer_id, revision_number, requested_delivery_date, ship_to_line1, ship_to_postal_code, ship_to_city, ship_to_country, note, subtotal, discount, shipping, tax, total, currency, valid_until, status, created_at, sent_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO quotes (id, customer_id, revision_number, requested_delivery_date, ship_to_line1, ship_to_postal_code, ship_to_city, ship_to_country, note, subtotal, discount, shipping, tax, total, currency, valid_until, status, created_at, sent_at, quote_chain_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
             [
                 # QT-0001: sent quote expiring soon
                 ("QT-0001", "CUST-0102", 1, "2026-01-15", "45 Rue Duck", "75001", "Paris", "FR",
                  "Quote for Elvis Duck bulk order", 288.0, 14.40, 0.0, 0.0, 273.60, "EUR",
-                 "2025-12-28", "sent", "2025-12-20 10:00:00", "2025-12-20 11:00:00"),
+                 "2025-12-28", "sent", "2025-12-20 10:00:00", "2025-12-20 11:00:00", "QT-0001"),
                 # QT-0002: draft quote (newest)
                 ("QT-0002", "CUST-0103", 1, "2026-01-20", "12 Promenade des Anglais", "06000", "Nice", "FR",
                  "Quote for mixed duck order", 450.0, 22.50, 15.0, 0.0, 442.50, "EUR",
-                 "2026-01-10", "draft", "2025-12-23 14:00:00", None),
+                 "2026-01-10", "draft", "2025-12-23 14:00:00", None, "QT-0002"),
                 # QT-0003: accepted quote
                 ("QT-0003", "CUST-0044", 1, "2025-12-30", "12 Rue Client", "75002", "Paris", "FR",
                  "Quote for Classic Ducks", 100.0, 0.0, 10.0, 0.0, 110.0, "EUR",
-                 "2025-12-20", "accepted", "2025-12-10 09:00:00", "2025-12-10 10:00:00"),
+                 "2025-12-20", "accepted", "2025-12-10 09:00:00", "2025-12-10 10:00:00", "QT-0003"),
                 # QT-0004: sent quote with longer validity
                 ("QT-0004", "CUST-0105", 1, "2026-02-01", "8 Place Wilson", "31000", "Toulouse", "FR",
                  "Quote for Pirate Duck collection", 580.0, 29.0, 0.0, 0.0, 551.0, "EUR",
-                 "2026-01-15", "sent", "2025-12-22 16:00:00", "2025-12-22 17:00:00"),
+                 "2026-01-15", "sent", "2025-12-22 16:00:00", "2025-12-22 17:00:00", "QT-0004"),
             ]
         )
 
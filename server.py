@@ -14,7 +14,6 @@ MCP Apps: Interactive UI components served via ui:// scheme for human-in-the-loo
 """
 
 import logging
-import os
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
@@ -23,6 +22,8 @@ from db import init_db
 from mcp_tools import register_all_tools
 from api_routes import register_all_routes
 import config
+import mcp_apps
+import tracing
 
 
 # Basic logging setup with timestamps
@@ -35,6 +36,9 @@ logging.basicConfig(
 logger = logging.getLogger("duck-demo")
 
 
+# Bring an existing database up to the current schema version
+init_db()
+
 # Single MCP server with ALL tools
 mcp = FastMCP(
     "duck-demo",
@@ -56,79 +60,26 @@ register_all_tools(mcp)
 # Register REST API routes (for UI compatibility)
 register_all_routes(mcp)
 
-# Register MCP App UI resources
-@mcp.resource("ui://generic-confirm/dialog", mime_type="text/html;profile=mcp-app")
-def get_generic_confirm_ui() -> str:
-    """Serves the generic confirmation MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "generic-confirm.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    else:
-        logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-        return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
-
-@mcp.resource("ui://item-inspect/viewer", mime_type="text/html;profile=mcp-app")
-def get_item_inspect_ui() -> str:
-    """Serves the 3D item inspector MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "item-inspect.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    else:
-        logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-        return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
-
-
-@mcp.resource("ui://tariff-picker/selector", mime_type="text/html;profile=mcp-app")
-def get_tariff_picker_ui() -> str:
-    """Serves the tariff picker MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "tariff-picker.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-    return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
-
-@mcp.resource("ui://qc-inspection/result", mime_type="text/html;profile=mcp-app")
-def get_qc_inspection_ui() -> str:
-    """Serves the QC inspection result MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "qc-inspection.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-    return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
-
-@mcp.resource("ui://data-import/mapping", mime_type="text/html;profile=mcp-app")
-def get_data_import_mapping_ui() -> str:
-    """Serves the data import mapping review (Phase 1) MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "data-import-mapping.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-    return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
-
-@mcp.resource("ui://data-import/rows", mime_type="text/html;profile=mcp-app")
-def get_data_import_rows_ui() -> str:
-    """Serves the data import row review (Phase 2) MCP App UI."""
-    ui_path = os.path.join(os.path.dirname(__file__), "mcp_apps_ui", "data-import-rows.html")
-    if os.path.exists(ui_path):
-        with open(ui_path, "r", encoding="utf-8") as f:
-            return f.read()
-    logger.warning(f"MCP App UI not found at {ui_path}. Run 'cd ui && npm run build:mcp-app' to build it.")
-    return "<html><body><p>MCP App UI not built yet. Please run: cd ui && npm run build:mcp-app</p></body></html>"
+# Register MCP App UI resources (ui:// scheme), served from an in-memory cache
+mcp_apps.register(mcp)
 
 logger.info("Duck Demo MCP Server ready (53 tools)")
 
 
+def create_app():
+    """ASGI app for ``uvicorn server:create_app --factory`` (one per worker process)."""
+    tracing.setup_logging()
+    return mcp.streamable_http_app()
+
+
 if __name__ == "__main__":
+    import os
     import sys
     
     # Check for --stdio flag
     if "--stdio" in sys.argv:
         logger.info("Starting Duck Demo MCP Server in STDIO mode")
+        tracing.setup_logging()
         mcp.run(transport="stdio")
     else:
         import uvicorn
@@ -140,6 +91,23 @@ if __name__ == "__main__":
         UVICORN_DEFAULT_CONFIG["formatters"]["access"]["fmt"] = '%(asctime)s %(levelname)s %(client_addr)s - "%(request_line)s" %(status_code)s'
         UVICORN_DEFAULT_CONFIG["formatters"]["access"]["datefmt"] = "%Y-%m-%dT%H:%M:%S"
         
+        workers = config.SERVER_WORKERS
+        if "--workers" in sys.argv:
+            workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+        if workers > 1:
+            # Hand over to the uvicorn CLI: its workers import server.py once
+            # each (a spawned child of this script would import it twice).
+            # The env var tells their caches to watch for the others' commits.
+            logger.info("Starting Duck Demo MCP Server with %d worker processes", workers)
+            os.environ["SERVER_WORKERS"] = str(workers)
+            os.execv(sys.executable, [
+                sys.executable, "-m", "uvicorn", "server:create_app", "--factory",
+                "--workers", str(workers), "--host", mcp.settings.host, "--port", str(mcp.settings.port),
+            ])
+
+        # Tool-call traces go to the rotating LOG_FILE from a background thread
+        tracing.setup_logging()
         try:
             mcp.run(transport="streamable-http")
         except KeyboardInterrupt:
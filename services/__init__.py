@@ -1,9 +1,11 @@
 """Services package — re-exports all singleton instances for backward compatibility."""
 
-from services._base import db_conn
+from services._base import db_conn, write_transaction
 from services.simulation import simulation_service, SimulationService
 from services.customer import customer_service, CustomerService
 from services.inventory import inventory_service, InventoryService
+from services.atp import atp_service, AtpService
+from services.stock_history import stock_history_service, StockHistoryService
 from services.catalog import catalog_service, CatalogService
 from services.pricing import pricing_service, PricingService
 from services.sales import sales_service, SalesService
@@ -16,10 +18,13 @@ from services.quote import quote_service, QuoteService
 from services.invoice import invoice_service, InvoiceService
 from services.document import document_service, DocumentService
 from services.stats import stats_service, StatsService
+from services.dashboard import dashboard_service, DashboardService
 from services.admin import admin_service, AdminService
 from services.chart import chart_service, ChartService
 from services.activity import activity_service, ActivityService
+from services.archive import archive_service, ArchiveService
 from services.mrp import mrp_service, MrpService
+from services.scheduling import scheduling_service, SchedulingService
 from services.fulfillment import fulfillment_service, FulfillmentService
 from services.qc import qc_service, QcService
 from services.data_import import data_import_service, DataImportService
@@ -27,9 +32,12 @@ from services.image_import import image_import_service, ImageImportService
 
 __all__ = [
     "db_conn",
+    "write_transaction",
     "simulation_service", "SimulationService",
     "customer_service", "CustomerService",
     "inventory_service", "InventoryService",
+    "atp_service", "AtpService",
+    "stock_history_service", "StockHistoryService",
     "catalog_service", "CatalogService",
     "pricing_service", "PricingService",
     "sales_service", "SalesService",
@@ -42,10 +50,13 @@ __all__ = [
     "invoice_service", "InvoiceService",
     "document_service", "DocumentService",
     "stats_service", "StatsService",
+    "dashboard_service", "DashboardService",
     "admin_service", "AdminService",
     "chart_service", "ChartService",
     "activity_service", "ActivityService",
+    "archive_service", "ArchiveService",
     "mrp_service", "MrpService",
+    "scheduling_service", "SchedulingService",
     "fulfillment_service", "FulfillmentService",
     "qc_service", "QcService",
     "data_import_service", "DataImportService",
@@ -1,11 +1,18 @@
 """Shared base utilities for service modules."""
 
+import base64
+import json
 import sqlite3
 import logging
+import random
 import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import config
+import metrics
 from db import get_connection
 
 logger = logging.getLogger(__name__)
@@ -26,10 +33,257 @@ def db_conn() -> Iterator[sqlite3.Connection]:
         yield existing
         return
 
+    t0 = time.perf_counter()
     conn = get_connection()
+    t1 = time.perf_counter()
+    metrics.DB_CONNECT_DURATION.observe(t1 - t0)
     _local.conn = conn
     try:
         yield conn
     finally:
         _local.conn = None
         conn.close()
+        metrics.DB_SESSION_DURATION.observe(time.perf_counter() - t1)
+
+
+@contextmanager
+def pinned_connection(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Route every ``db_conn()`` on this thread to *conn* until the block exits.
+
+    The caller owns *conn* and closes it.  Used by the scenario engine's
+    ``--fast`` mode to drive the whole service layer through one in-memory
+    database.
+    """
+    previous = getattr(_local, "conn", None)
+    _local.conn = conn
+    try:
+        yield conn
+    finally:
+        _local.conn = previous
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(exc) or "busy" in str(exc)
+
+
+def begin_immediate(conn: sqlite3.Connection) -> int:
+    """Start a transaction holding the SQLite write lock; return the retries it took.
+
+    Each attempt waits at most ``DB_WRITE_LOCK_TIMEOUT_MS`` inside SQLite's
+    busy handler.  Between attempts the caller sleeps a random share of an
+    exponentially growing delay (``DB_WRITE_BACKOFF_MS`` doubling up to
+    ``DB_WRITE_BACKOFF_MAX_MS``), so writers in several processes spread out
+    instead of retrying in lockstep.  Re-raises the ``OperationalError``
+    after ``DB_WRITE_RETRIES`` retries.
+    """
+    t0 = time.perf_counter()
+    conn.execute(f"PRAGMA busy_timeout = {config.DB_WRITE_LOCK_TIMEOUT_MS}")
+    try:
+        for attempt in range(config.DB_WRITE_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as exc:
+                if not _is_busy(exc):
+                    raise
+                if attempt == config.DB_WRITE_RETRIES:
+                    metrics.DB_BUSY_FAILURES.inc()
+                    logger.warning("Gave up on the write lock after %d retries (%.0f ms)",
+                                   attempt, (time.perf_counter() - t0) * 1000)
+                    raise
+                metrics.DB_BUSY_RETRIES.inc()
+                delay = min(config.DB_WRITE_BACKOFF_MAX_MS, config.DB_WRITE_BACKOFF_MS * 2 ** attempt)
+                time.sleep(random.uniform(0, delay) / 1000)
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {config.DB_BUSY_TIMEOUT_MS}")
+        metrics.DB_WRITE_LOCK_WAIT.observe(time.perf_counter() - t0)
+    return attempt
+
+
+@contextmanager
+def write_transaction() -> Iterator[sqlite3.Connection]:
+    """``db_conn()`` for writes: one atomic transaction that holds the write lock.
+
+    The transaction starts with :func:`begin_immediate`, so reads inside it
+    (``generate_id``'s ``MAX(id)``, stock levels) cannot be invalidated by
+    another process before the writes land, and SQLite never has to upgrade
+    a read lock (the deferred-transaction deadlock that fails with
+    ``database is locked`` regardless of the busy timeout).  Commits on
+    success and rolls back on any exception.
+
+    A block may still call ``conn.commit()`` itself, e.g. to invalidate a
+    cache only once the rows are visible; that ends the transaction early.
+    Nested blocks join the outermost one, which alone commits.  Inside a
+    plain ``db_conn()`` block that already has uncommitted changes the
+    lock cannot be taken up front; the block's work is then committed on
+    exit as before.  A block that joins a transaction it did not start
+    runs inside a ``SAVEPOINT``: an exception undoes only that block's
+    writes and leaves the caller's earlier work pending.
+
+    Callbacks registered with :func:`after_commit` run once the outermost
+    block has committed and are dropped if it rolls back.
+    """
+    with db_conn() as conn:
+        depth = getattr(_local, "write_depth", 0)
+        if depth:
+            _local.write_depth += 1
+            try:
+                with _savepoint(conn, f"write_{depth}"):
+                    yield conn
+            finally:
+                _local.write_depth -= 1
+            return
+        joined = conn.in_transaction
+        if not joined:
+            begin_immediate(conn)
+        _local.write_depth = 1
+        _local.after_commit = []
+        try:
+            if joined:
+                with _savepoint(conn, "write_0"):
+                    yield conn
+            else:
+                yield conn
+            conn.commit()
+        except BaseException:
+            if not joined:
+                conn.rollback()
+            raise
+        finally:
+            _local.write_depth = 0
+            pending, _local.after_commit = _local.after_commit, []
+        for callback in pending:
+            callback()
+
+
+@contextmanager
+def _savepoint(conn: sqlite3.Connection, name: str) -> Iterator[None]:
+    """Undo only this block's writes if it raises; the enclosing transaction stays open."""
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except BaseException:
+        if conn.in_transaction:
+            try:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            except sqlite3.OperationalError:
+                # The block committed part-way; what is left is all its own
+                conn.rollback()
+        raise
+    if conn.in_transaction:
+        try:
+            conn.execute(f"RELEASE {name}")
+        except sqlite3.OperationalError:
+            pass  # the block committed part-way, which released the savepoint
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Run *callback* when the enclosing :func:`write_transaction` commits.
+
+    Used for side effects that must only be seen once the rows are durable
+    (e.g. pushing activity to ``/api/events``).  Outside a write
+    transaction the callback runs immediately.
+    """
+    if getattr(_local, "write_depth", 0):
+        _local.after_commit.append(callback)
+    else:
+        callback()
+
+
+# ---------------------------------------------------------------------------
+# Keyset pagination
+# ---------------------------------------------------------------------------
+
+# Total-count strategies accepted by paginated list functions.
+TOTAL_MODES = ("exact", "approx", "none")
+
+# (table, where, params) → (monotonic_ts, count), least recently used first.
+# Every distinct filter adds a key, so the cache is capped.
+_TOTAL_CACHE_MAX_ENTRIES = 256
+_total_cache: "OrderedDict[Tuple, Tuple[float, int]]" = OrderedDict()
+_total_cache_lock = threading.Lock()
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row of a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> List[Any]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises ``ValueError`` when the cursor is malformed or does not carry
+    *width* sort-key values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+    if not isinstance(values, list) or len(values) != width:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+
+def keyset_condition(columns: Sequence[str], cursor: str, descending: bool) -> Tuple[str, List[Any]]:
+    """Return a ``(sql, params)`` predicate selecting rows strictly after *cursor*.
+
+    Uses a row-value comparison so SQLite can seek a composite index on
+    *columns* instead of skipping OFFSET rows; the redundant bound on the
+    first column lets it seek an expression index too.  A NULL compares
+    as unknown, so a nullable sort column must be wrapped (e.g. in
+    ``COALESCE``) both here and in the ORDER BY.
+    """
+    values = decode_cursor(cursor, len(columns))
+    op = "<" if descending else ">"
+    cols = ", ".join(columns)
+    marks = ", ".join("?" for _ in columns)
+    return f"({cols}) {op} ({marks}) AND {columns[0]} {op}= ?", [*values, values[0]]
+
+
+def page_cursor(rows: List[Any], keys: Sequence[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim a ``limit + 1`` fetch to *limit* rows and build the next cursor.
+
+    Callers fetch one extra row to learn whether another page exists; the
+    returned cursor is ``None`` on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[k] for k in keys])
+
+
+def count_total(conn: sqlite3.Connection, table: str, where: str, params: Sequence[Any], mode: str) -> Optional[int]:
+    """Count rows in *table* matching *where* according to *mode*.
+
+    ``exact`` runs ``COUNT(*)``.  ``approx`` serves a recent count from a
+    short-lived cache (``PAGINATION_TOTAL_CACHE_SECONDS``, at most
+    ``_TOTAL_CACHE_MAX_ENTRIES`` filters), unfiltered tables included:
+    ``MAX(rowid)`` would overstate them once rows are deleted or archived.  ``none`` skips counting.
+    """
+    if mode not in TOTAL_MODES:
+        raise ValueError(f"total mode must be one of {TOTAL_MODES}, got {mode!r}")
+    if mode == "none":
+        return None
+    if mode == "approx":
+        key = (table, where, tuple(params))
+        now = time.monotonic()
+        with _total_cache_lock:
+            hit = _total_cache.get(key)
+            if hit and now - hit[0] < config.PAGINATION_TOTAL_CACHE_SECONDS:
+                _total_cache.move_to_end(key)
+                return hit[1]
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        with _total_cache_lock:
+            _total_cache[key] = (now, total)
+            _total_cache.move_to_end(key)
+            while len(_total_cache) > _TOTAL_CACHE_MAX_ENTRIES:
+                _total_cache.popitem(last=False)
+        return total
+    return conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
@@ -5,11 +5,26 @@ import logging
 from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 
-from db import generate_id
-from services._base import db_conn
+import events
+from db import generate_id, generate_ids
+from services._base import after_commit, count_total, db_conn, keyset_condition, page_cursor, write_transaction
+from services.archive import archive_service
+from tracing import current_trace_id
 
 logger = logging.getLogger(__name__)
 
+_COLUMNS = ("id", "timestamp", "actor", "category", "action", "entity_type", "entity_id", "details", "trace_id")
+
+
+def _publish(rows: List[tuple]) -> None:
+    """Push committed rows to /api/events subscribers, shaped like get_log entries."""
+    for row in rows:
+        entry = dict(zip(_COLUMNS, row))
+        if entry["details"]:
+            entry["details"] = json.loads(entry["details"])
+        events.publish("activity", entry)
+    events.notify_changed()
+
 
 # ---------------------------------------------------------------------------
 # Write
@@ -38,54 +53,69 @@ def log_activity(
     Returns:
         The generated activity_log ID.
     """
-    with db_conn() as conn:
+    with write_transaction() as conn:
         if timestamp is None:
             row = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()
             timestamp = row[0] if row else ""
         act_id = generate_id(conn, "ACT", "activity_log")
         details_json = json.dumps(details, default=str) if details else None
+        row = (act_id, timestamp, actor, category, action, entity_type, entity_id, details_json, current_trace_id())
         conn.execute(
-            "INSERT INTO activity_log (id, timestamp, actor, category, action, entity_type, entity_id, details) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (act_id, timestamp, actor, category, action, entity_type, entity_id, details_json),
+            "INSERT INTO activity_log (id, timestamp, actor, category, action, entity_type, entity_id, details, trace_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            row,
         )
-        conn.commit()
+        after_commit(lambda: _publish([row]))
     return act_id
 
 
-def log_batch(entries: List[Dict[str, Any]]) -> int:
+def log_batch(entries: List[Dict[str, Any]], conn=None) -> int:
     """Bulk-insert activity_log rows for scenario efficiency.
 
     Each entry dict must contain: actor, category, action.
     Optional keys: entity_type, entity_id, details, timestamp.
 
+    Accepts an optional *conn* so callers can write the rows inside their
+    own transaction (no commit is issued when conn is provided).  The rows
+    reach ``/api/events`` subscribers only once that transaction commits.
+
     Returns:
         Count of rows inserted.
     """
     if not entries:
         return 0
-    with db_conn() as conn:
-        sim_time = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()
+
+    def _do(c):
+        sim_time = c.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()
         default_ts = sim_time[0] if sim_time else ""
-        for entry in entries:
-            act_id = generate_id(conn, "ACT", "activity_log")
-            details = entry.get("details")
-            details_json = json.dumps(details, default=str) if details else None
-            conn.execute(
-                "INSERT INTO activity_log (id, timestamp, actor, category, action, entity_type, entity_id, details) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    act_id,
-                    entry.get("timestamp", default_ts),
-                    entry["actor"],
-                    entry["category"],
-                    entry["action"],
-                    entry.get("entity_type"),
-                    entry.get("entity_id"),
-                    details_json,
-                ),
+        act_ids = generate_ids(c, "ACT", "activity_log", len(entries))
+        trace_id = current_trace_id()
+        rows = [
+            (
+                act_id,
+                entry.get("timestamp", default_ts),
+                entry["actor"],
+                entry["category"],
+                entry["action"],
+                entry.get("entity_type"),
+                entry.get("entity_id"),
+                json.dumps(entry["details"], default=str) if entry.get("details") else None,
+                trace_id,
             )
-        conn.commit()
+            for act_id, entry in zip(act_ids, entries)
+        ]
+        c.executemany(
+            "INSERT INTO activity_log (id, timestamp, actor, category, action, entity_type, entity_id, details, trace_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        after_commit(lambda: _publish(rows))
+
+    if conn is not None:
+        _do(conn)
+    else:
+        with write_transaction() as c:
+            _do(c)
     return len(entries)
 
 
@@ -102,11 +132,21 @@ def get_log(
     entity_ids: Optional[List[str]] = None,
     since: Optional[str] = None,
     until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact",
+    trace_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Paginated, filterable activity log query.
 
+    *trace_id* selects the rows written during one MCP tool call.
+
+    Pass the previous page's ``next_cursor`` as *cursor* to continue with a
+    keyset seek on ``(timestamp, id)``; *offset* is ignored in that case.
+    *total_mode* is ``exact``, ``approx`` (cached count) or ``none``.
+
     Returns:
-        {"entries": [...], "total": int, "limit": int, "offset": int}
+        {"entries": [...], "total": int | None, "limit": int, "offset": int,
+         "next_cursor": str | None}
     """
     conditions: List[str] = []
     params: List[Any] = []
@@ -130,15 +170,32 @@ def get_log(
     if until:
         conditions.append("timestamp <= ?")
         params.append(until)
+    if trace_id:
+        conditions.append("trace_id = ?")
+        params.append(trace_id)
 
     where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
 
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if cursor:
+        seek_sql, seek_params = keyset_condition(("timestamp", "id"), cursor, descending=True)
+        page_conditions.append(seek_sql)
+        page_params.extend(seek_params)
+        offset = 0
+    page_where = (" WHERE " + " AND ".join(page_conditions)) if page_conditions else ""
+
     with db_conn() as conn:
-        total = conn.execute(f"SELECT COUNT(*) FROM activity_log{where}", params).fetchone()[0]
+        # Only reach into the archive when the range starts before its boundary
+        source = archive_service.source(conn, "activity_log", since)
+        total = count_total(conn, "activity_log", where, params, total_mode)
+        if total is not None and source != "activity_log":
+            total += count_total(conn, "activity_log_archive", where, params, total_mode)
         rows = conn.execute(
-            f"SELECT * FROM activity_log{where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
-            params + [limit, offset],
+            f"SELECT * FROM {source}{page_where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            page_params + [limit + 1, offset],
         ).fetchall()
+    rows, next_cursor = page_cursor(rows, ("timestamp", "id"), limit)
 
     entries = []
     for r in rows:
@@ -150,7 +207,7 @@ def get_log(
                 pass
         entries.append(entry)
 
-    return {"entries": entries, "total": total, "limit": limit, "offset": offset}
+    return {"entries": entries, "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
 
 
 def get_daily_summary(
@@ -180,7 +237,13 @@ def get_daily_summary(
             f"ORDER BY date(timestamp)",
             params,
         ).fetchall()
-    return [dict(r) for r in rows]
+        # Archived days are served from their rollups, not the cold table
+        archived = archive_service.get_summaries("activity_log", since, until, conn=conn)
+    summary = [
+        {"date": r["day"], "category": r["key"], "action": r["subkey"], "count": r["row_count"]}
+        for r in archived
+    ]
+    return summary + [dict(r) for r in rows]
 
 
 # ---------------------------------------------------------------------------
@@ -1,15 +1,24 @@
 """Service for admin operations."""
 
 from types import SimpleNamespace
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import config
+import db
+import events
 from services._base import db_conn
+from services.atp import atp_service
+from services.pricing import pricing_service
 
 
-def reset_database(confirm: str) -> Dict[str, Any]:
-    """Reset database to initial demo state."""
+def _check_confirmation(confirm: Optional[str]) -> None:
     if confirm != "kondor":
         raise ValueError("Invalid confirmation")
+
+
+def reset_database(confirm: str) -> Dict[str, Any]:
+    """Reset database to initial demo state."""
+    _check_confirmation(confirm)
     from seed_demo import seed
     with db_conn() as conn:
         tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'").fetchall()
@@ -17,11 +26,40 @@ def reset_database(confirm: str) -> Dict[str, Any]:
             conn.execute(f"DROP TABLE IF EXISTS {table[0]}")
         conn.commit()
     seed(from_admin=True)
+    atp_service.invalidate()
+    pricing_service.invalidate()
+    events.reset()
     return {"status": "Database reset complete", "initial_time": "2025-12-24 08:30:00"}
 
 
+def get_query_stats(limit: int = 20, sort: str = "total_ms", reset: bool = False,
+                    tracing: Optional[bool] = None, confirm: Optional[str] = None) -> Dict[str, Any]:
+    """Dump SQL statement statistics collected by the connection-layer tracer.
+
+    *reset* clears the statistics after they are read; *tracing* turns
+    tracing on or off for connections opened afterwards.  Both change
+    server-wide state and need the same *confirm* secret as
+    :func:`reset_database`.
+    """
+    if reset or tracing is not None:
+        _check_confirmation(confirm)
+    statements = db.get_query_stats(limit=limit, sort=sort)
+    if reset:
+        db.reset_query_stats()
+    if tracing is not None:
+        db.set_query_tracing(tracing)
+    return {
+        "tracing_enabled": db.query_tracing_enabled(),
+        "slow_query_ms": config.SQL_SLOW_QUERY_MS,
+        "sort": sort,
+        "statements": statements,
+        "reset": reset,
+    }
+
+
 # Namespace for backward compatibility
 admin_service = SimpleNamespace(
     reset_database=reset_database,
+    get_query_stats=get_query_stats,
 )
 AdminService = admin_service
@@ -0,0 +1,155 @@
+"""Hot/cold history: move old activity_log and stock_movements rows to archive tables.
+
+Rows older than ``ARCHIVE_RETENTION_DAYS`` sim-days move to
+``<table>_archive`` with the same columns.  Each archived day leaves a
+rollup in ``archive_summaries`` so charts never touch the cold tables.
+Stock movements of batches that are still in ``stock`` stay hot, so
+provenance lookups for live stock never need the archive.
+
+``archive_state`` records, per table, the archive boundary (every row
+dated before it may be cold) and the highest archived ID number, which
+``db.generate_id`` honours so archived IDs are never reused.  Readers call
+:func:`source` with the start of their time range and get either the hot
+table or a ``UNION ALL`` of hot and archive.
+"""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import config
+from services._base import db_conn, write_transaction
+
+_COLUMNS = {
+    "activity_log": (
+        "id", "timestamp", "actor", "category", "action", "entity_type", "entity_id", "details", "trace_id",
+    ),
+    "stock_movements": (
+        "id", "timestamp", "item_id", "movement_type", "qty", "stock_id",
+        "reference_type", "reference_id", "notes", "qc_inspection_id",
+    ),
+}
+
+# Rows eligible for archival, beyond the timestamp cutoff
+_KEEP_HOT = {
+    "activity_log": "",
+    "stock_movements": " AND NOT EXISTS (SELECT 1 FROM stock s WHERE s.id = stock_movements.stock_id)",
+}
+
+# Rollup dimensions and summed quantity per table
+_SUMMARY = {
+    "activity_log": ("category", "action", "NULL"),
+    "stock_movements": ("item_id", "movement_type", "SUM(qty)"),
+}
+
+
+def boundary(conn, table: str) -> Optional[str]:
+    """Day before which rows of *table* may live in the archive (``None``: nothing archived)."""
+    row = conn.execute("SELECT archived_before FROM archive_state WHERE table_name = ?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def source(conn, table: str, since: Optional[str]) -> str:
+    """FROM-clause source for reading *table* from *since* onward.
+
+    The hot table alone when the range starts at or after the archive
+    boundary, otherwise a ``UNION ALL`` subquery over hot and archive.
+    """
+    cut = boundary(conn, table)
+    if cut is None or (since and since[:10] >= cut):
+        return table
+    cols = ", ".join(_COLUMNS[table])
+    return f"(SELECT {cols} FROM {table} UNION ALL SELECT {cols} FROM {table}_archive)"
+
+
+def archive_before(day: str, *, conn=None) -> Dict[str, int]:
+    """Move rows dated before *day* (``YYYY-MM-DD``) to the archive tables.
+
+    Per table: roll the rows up into ``archive_summaries``, copy them to the
+    archive, delete them from the hot table and advance ``archive_state`` —
+    all in one transaction.  Returns the number of rows moved per table.
+    Re-running with the same *day* moves nothing.
+    """
+    def _do(c) -> Dict[str, int]:
+        moved = {}
+        for table, cols in _COLUMNS.items():
+            where = f"WHERE timestamp < ?{_KEEP_HOT[table]}"
+            key, subkey, qty = _SUMMARY[table]
+            c.execute(
+                "INSERT INTO archive_summaries (source_table, day, key, subkey, row_count, qty_total) "
+                f"SELECT ?, substr(timestamp, 1, 10), {key}, {subkey}, COUNT(*), {qty} FROM {table} {where} "
+                "GROUP BY 2, 3, 4 "
+                "ON CONFLICT (source_table, day, key, subkey) DO UPDATE SET "
+                "row_count = row_count + excluded.row_count, qty_total = qty_total + excluded.qty_total",
+                (table, day),
+            )
+            # IDs are "ACT-nnnn" / "MOV-nnnn"
+            max_id = c.execute(
+                f"SELECT MAX(CAST(SUBSTR(id, 5) AS INTEGER)) FROM {table} {where}", (day,)
+            ).fetchone()[0] or 0
+            col_list = ", ".join(cols)
+            c.execute(f"INSERT INTO {table}_archive ({col_list}) SELECT {col_list} FROM {table} {where}", (day,))
+            moved[table] = c.execute(f"DELETE FROM {table} {where}", (day,)).rowcount
+            c.execute(
+                "INSERT INTO archive_state (table_name, archived_before, max_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (table_name) DO UPDATE SET "
+                "archived_before = max(archived_before, excluded.archived_before), "
+                "max_id = max(max_id, excluded.max_id)",
+                (table, day, max_id),
+            )
+        return moved
+
+    if conn is not None:
+        return _do(conn)
+    with write_transaction() as c:
+        return _do(c)
+
+
+def run_retention(conn=None) -> Dict[str, Any]:
+    """Archive everything older than ``ARCHIVE_RETENTION_DAYS`` before the sim date.
+
+    No-op when retention is disabled (``0``).  Commits unless *conn* is given.
+    """
+    if not config.ARCHIVE_RETENTION_DAYS:
+        return {"cutoff": None, "archived": 0}
+    if conn is None:
+        with write_transaction() as c:
+            return run_retention(c)
+    today = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()[0][:10]
+    cutoff = (date.fromisoformat(today) - timedelta(days=config.ARCHIVE_RETENTION_DAYS)).isoformat()
+    moved = archive_before(cutoff, conn=conn)
+    return {"cutoff": cutoff, "archived": sum(moved.values()), **moved}
+
+
+def get_summaries(table: str, since: Optional[str] = None, until: Optional[str] = None, *, conn=None):
+    """Archived per-day rollups of *table* within ``[since, until]``."""
+    conditions = ["source_table = ?"]
+    params: list = [table]
+    if since:
+        conditions.append("day >= ?")
+        params.append(since[:10])
+    if until:
+        conditions.append("day <= ?")
+        params.append(until)
+    sql = (
+        "SELECT day, key, subkey, row_count, qty_total FROM archive_summaries "
+        f"WHERE {' AND '.join(conditions)} ORDER BY day, key, subkey"
+    )
+    if conn is not None:
+        return conn.execute(sql, params).fetchall()
+    with db_conn() as c:
+        return c.execute(sql, params).fetchall()
+
+
+# ---------------------------------------------------------------------------
+# Service singleton
+# ---------------------------------------------------------------------------
+
+archive_service = SimpleNamespace(
+    boundary=boundary,
+    source=source,
+    archive_before=archive_before,
+    run_retention=run_retention,
+    get_summaries=get_summaries,
+)
+ArchiveService = archive_service
@@ -0,0 +1,210 @@
+"""Time-phased available-to-promise (ATP) projection.
+
+For each item the projection merges, per day:
+
+    + on_hand today
+    + open MO output on its ``eta_finish`` (``planned_finish`` as fallback)
+    + open PO receipts on ``expected_delivery``
+    - open sales-order lines on the order's ``requested_delivery_date``
+    - ingredients of not-yet-started MOs today (they are reserved already)
+    - unreleased QC hold quantity today
+
+Anything dated in the past (or undated) lands on today.
+
+``floor[i]`` is the lowest balance from day ``i`` onward — the quantity that
+can be promised on day ``i`` without starving any later commitment.  It never
+decreases, so "earliest date for qty N" is a bisect over a cached projection.
+Writers that touch stock, orders or POs call :func:`invalidate` for the items
+they change; a simulation tick invalidates everything.  With several server
+workers (``SERVER_WORKERS`` > 1) those calls only reach the writer's own
+process, so the whole cache is also dropped whenever ``db.data_version()``
+shows a commit from another connection.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+from types import SimpleNamespace
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import config
+import db
+from services._base import db_conn
+
+
+class Projection(NamedTuple):
+    today: str
+    days: List[str]      # ascending, first entry is today
+    balance: List[int]   # projected balance at end of each day
+    floor: List[int]     # min(balance[i:]) — promisable qty on days[i]
+
+
+_cache: Dict[str, Projection] = {}
+_generation = 0
+_data_version: Optional[int] = None
+_lock = threading.Lock()
+
+_OPEN_SO_STATUSES = ("draft", "confirmed", "in_production")
+_OPEN_MO_STATUSES = ("planned", "waiting", "ready", "in_progress")
+_UNSTARTED_MO_STATUSES = ("planned", "waiting", "ready")
+
+
+def _marks(values) -> str:
+    return ",".join("?" for _ in values)
+
+
+def _build(conn, item_id: str) -> Projection:
+    today = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()[0][:10]
+    on_hand = conn.execute(
+        "SELECT COALESCE(SUM(on_hand), 0) FROM stock WHERE item_id = ?", (item_id,)
+    ).fetchone()[0]
+    held = conn.execute(
+        "SELECT COALESCE(SUM(qty_on_hold - qty_released - qty_scrapped), 0) FROM qc_hold_batches "
+        "WHERE item_id = ? AND status != 'closed'",
+        (item_id,),
+    ).fetchone()[0]
+
+    deltas: Dict[str, int] = {today: on_hand - held}
+
+    def add(rows, sign: int) -> None:
+        for day, qty in rows:
+            key = max((day or today)[:10], today)
+            deltas[key] = deltas.get(key, 0) + sign * qty
+
+    add(conn.execute(
+        "SELECT COALESCE(po.eta_finish, po.planned_finish), r.output_qty "
+        "FROM production_orders po JOIN recipes r ON r.id = po.recipe_id "
+        f"WHERE po.item_id = ? AND po.status IN ({_marks(_OPEN_MO_STATUSES)})",
+        (item_id, *_OPEN_MO_STATUSES),
+    ), 1)
+    add(conn.execute(
+        "SELECT expected_delivery, qty FROM purchase_orders WHERE item_id = ? AND status = 'ordered'",
+        (item_id,),
+    ), 1)
+    add(conn.execute(
+        "SELECT so.requested_delivery_date, sol.qty FROM sales_order_lines sol "
+        "JOIN sales_orders so ON so.id = sol.sales_order_id "
+        f"WHERE sol.item_id = ? AND so.status IN ({_marks(_OPEN_SO_STATUSES)})",
+        (item_id, *_OPEN_SO_STATUSES),
+    ), -1)
+    add(conn.execute(
+        "SELECT NULL, ri.input_qty FROM recipe_ingredients ri "
+        "JOIN production_orders po ON po.recipe_id = ri.recipe_id "
+        f"WHERE ri.input_item_id = ? AND po.status IN ({_marks(_UNSTARTED_MO_STATUSES)})",
+        (item_id, *_UNSTARTED_MO_STATUSES),
+    ), -1)
+
+    days = sorted(deltas)
+    balance = list(accumulate(deltas[d] for d in days))
+    floor = list(accumulate(reversed(balance), min))[::-1]
+    return Projection(today, days, balance, floor)
+
+
+def get_projection(item_id: str, *, conn=None) -> Projection:
+    """Return the (cached) time-phased projection for *item_id*."""
+    if config.SERVER_WORKERS > 1:
+        _sync_with_workers()
+    hit = _cache.get(item_id)
+    if hit is not None:
+        return hit
+    generation = _generation
+    if conn is not None:
+        projection = _build(conn, item_id)
+    else:
+        with db_conn() as c:
+            projection = _build(c, item_id)
+    with _lock:
+        # Drop the result if an invalidation raced with the build
+        if generation == _generation:
+            _cache[item_id] = projection
+    return projection
+
+
+def _sync_with_workers() -> None:
+    global _data_version
+    version = db.data_version()
+    if version != _data_version:
+        invalidate()
+        _data_version = version
+
+
+def invalidate(*item_ids: str) -> None:
+    """Forget cached projections for *item_ids* (all items when none are given)."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if item_ids:
+            for item_id in item_ids:
+                _cache.pop(item_id, None)
+        else:
+            _cache.clear()
+
+
+def earliest_date(item_id: str, qty: int, *, conn=None) -> Optional[str]:
+    """Earliest day *qty* units of *item_id* can be promised, or ``None``.
+
+    ``None`` means open supply never covers the quantity; the caller has to
+    fall back to capable-to-promise (new production or purchasing).
+    """
+    p = get_projection(item_id, conn=conn)
+    i = bisect_left(p.floor, qty)
+    return p.days[i] if i < len(p.days) else None
+
+
+def available_on(item_id: str, day: str, *, conn=None) -> int:
+    """Quantity of *item_id* that can be promised for delivery on *day*."""
+    p = get_projection(item_id, conn=conn)
+    i = bisect_right(p.days, day[:10]) - 1
+    return max(0, p.floor[max(i, 0)])
+
+
+def promise_date(item_id: str, qty: int, lead_days: int, *, conn=None) -> Dict[str, Any]:
+    """ATP date for *qty*, else the capable-to-promise date after *lead_days*.
+
+    Production only has to cover what open supply cannot, so the CTP date
+    is today plus the production lead.
+    """
+    p = get_projection(item_id, conn=conn)
+    atp = earliest_date(item_id, qty, conn=conn)
+    if atp is not None:
+        return {"date": atp, "source": "atp", "available_today": max(0, p.floor[0])}
+    ctp = (date.fromisoformat(p.today) + timedelta(days=lead_days)).isoformat()
+    return {"date": ctp, "source": "ctp", "available_today": max(0, p.floor[0])}
+
+
+def get_item_atp(item_sku: str, qty: Optional[int] = None) -> Dict[str, Any]:
+    """Time-phased projection of an item, optionally with the promise date for *qty*."""
+    from services.catalog import catalog_service
+
+    item = catalog_service.load_item(item_sku)
+    if not item:
+        raise ValueError(f"Item {item_sku} not found")
+    p = get_projection(item["id"])
+    result: Dict[str, Any] = {
+        "item_sku": item_sku,
+        "today": p.today,
+        "projection": [
+            {"date": d, "balance": b, "available_to_promise": max(0, f)}
+            for d, b, f in zip(p.days, p.balance, p.floor)
+        ],
+    }
+    if qty is not None:
+        lead = config.PRODUCTION_LEAD_DAYS_BY_TYPE.get(item["type"], config.PRODUCTION_LEAD_DAYS_DEFAULT)
+        result["promise"] = promise_date(item["id"], qty, lead)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Service singleton
+# ---------------------------------------------------------------------------
+
+atp_service = SimpleNamespace(
+    get_projection=get_projection,
+    invalidate=invalidate,
+    earliest_date=earliest_date,
+    available_on=available_on,
+    promise_date=promise_date,
+    get_item_atp=get_item_atp,
+)
+AtpService = atp_service
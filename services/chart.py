@@ -7,10 +7,15 @@ from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 
 import config
+from utils import lazy_import
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+
+def _use_agg_backend() -> None:
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+plt = lazy_import("matplotlib.pyplot", before=_use_agg_backend)
 
 
 def generate_chart(
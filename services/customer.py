@@ -5,7 +5,12 @@ from typing import Any, Dict, List, Optional
 
 from db import dict_rows, generate_id
 from utils import ui_href
-from services._base import db_conn
+from services._base import db_conn, write_transaction
+
+
+# Fields covered by the customers_fts trigram index
+_SEARCH_FIELDS = ("name", "company", "email", "city", "phone")
+_LIST_COLUMNS = "c.id, c.name, c.company, c.email, c.phone, c.city, c.country, c.created_at"
 
 
 def find_customers(
@@ -17,30 +22,36 @@ def find_customers(
     phone: Optional[str] = None,
     limit: int = 5,
 ) -> Dict[str, Any]:
-    """Find matching customers with filters."""
+    """Find matching customers with filters.
+
+    Text filters are case-insensitive substring matches served by the
+    ``customers_fts`` trigram index; values shorter than a trigram are
+    matched against ``customers`` directly, since the trigram LIKE misses
+    short non-ASCII patterns.  *country* is an exact match.
+    """
+    text_filters = {"name": name, "email": email, "company": company, "city": city, "phone": phone}
+    fts_filters = []
+    fts_params: List[Any] = []
     filters = []
-    params: List[str] = []
-    if name:
-        filters.append("LOWER(name) LIKE ?")
-        params.append(f"%{name.lower()}%")
-    if email:
-        filters.append("LOWER(email) LIKE ?")
-        params.append(f"%{email.lower()}%")
-    if company:
-        filters.append("LOWER(company) LIKE ?")
-        params.append(f"%{company.lower()}%")
-    if city:
-        filters.append("LOWER(city) LIKE ?")
-        params.append(f"%{city.lower()}%")
+    params: List[Any] = []
+    for field, value in text_filters.items():
+        if not value:
+            continue
+        if len(value) < 3:
+            filters.append(f"LOWER(c.{field}) LIKE ?")
+            params.append(f"%{value.lower()}%")
+        else:
+            fts_filters.append(f"{field} LIKE ?")
+            fts_params.append(f"%{value}%")
+    if fts_filters:
+        filters.append(f"c.rowid IN (SELECT rowid FROM customers_fts WHERE {' AND '.join(fts_filters)})")
+        params.extend(fts_params)
     if country:
-        filters.append("UPPER(country) = ?")
+        filters.append("UPPER(c.country) = ?")
         params.append(country.upper())
-    if phone:
-        filters.append("phone LIKE ?")
-        params.append(f"%{phone}%")
 
     where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
-    sql = f"SELECT id, name, company, email, phone, city, country, created_at FROM customers {where_clause} ORDER BY id LIMIT ?"
+    sql = f"SELECT {_LIST_COLUMNS} FROM customers c {where_clause} ORDER BY c.id LIMIT ?"
     params.append(limit)
 
     with db_conn() as conn:
@@ -49,6 +60,60 @@ def find_customers(
             row["ui_url"] = ui_href("customers", row["id"])
         return {"customers": rows}
 
+
+def _trigrams(text: str) -> set:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _similarity(query_grams: set, text: Optional[str]) -> float:
+    """Dice coefficient of the trigram sets of the query and *text*."""
+    grams = _trigrams(text or "")
+    if not query_grams or not grams:
+        return 0.0
+    return 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+
+
+def search_customers(query: str, limit: int = 5, min_confidence: float = 0.0) -> Dict[str, Any]:
+    """Ranked, typo-tolerant customer search over name, company, email, city and phone.
+
+    Candidates are customers sharing any trigram with *query*, ranked by
+    BM25.  Each result carries a ``confidence`` in ``[0, 1]`` — the best
+    trigram similarity between the query and one of the searched fields —
+    and results are ordered by it; results below *min_confidence* are
+    dropped.  Queries shorter than three characters fall back to substring
+    matching.
+    """
+    query = query.strip()
+    grams = _trigrams(query)
+    with db_conn() as conn:
+        if grams:
+            match = " OR ".join('"' + g.replace('"', '""') + '"' for g in sorted(grams))
+            rows = dict_rows(conn.execute(
+                f"SELECT {_LIST_COLUMNS} FROM customers_fts f JOIN customers c ON c.rowid = f.rowid "
+                "WHERE customers_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (match, max(limit * 10, 50)),
+            ))
+        else:
+            # Too short for the trigram index, which misses short non-ASCII patterns
+            where = " OR ".join(f"LOWER(c.{field}) LIKE ?" for field in _SEARCH_FIELDS)
+            rows = dict_rows(conn.execute(
+                f"SELECT {_LIST_COLUMNS} FROM customers c WHERE {where} ORDER BY c.id LIMIT ?",
+                [f"%{query.lower()}%"] * len(_SEARCH_FIELDS) + [limit],
+            ))
+
+    for row in rows:
+        if grams:
+            row["confidence"] = round(max(_similarity(grams, row[field]) for field in _SEARCH_FIELDS), 2)
+        else:
+            row["confidence"] = 1.0 if any(
+                (row[field] or "").lower() == query.lower() for field in _SEARCH_FIELDS
+            ) else 0.5
+        row["ui_url"] = ui_href("customers", row["id"])
+    # Stable sort keeps the BM25 order among equal confidences
+    rows.sort(key=lambda r: -r["confidence"])
+    return {"customers": [r for r in rows if r["confidence"] >= min_confidence][:limit]}
+
 def create_customer(
     name: str,
     gender: Optional[str] = None,
@@ -68,7 +133,7 @@ def create_customer(
     """Create a new customer."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         customer_id = generate_id(conn, "CUST", "customers")
         sim_time = simulation_service.get_current_time()
         conn.execute(
@@ -77,7 +142,6 @@ def create_customer(
                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (customer_id, gender, name, company, email, phone, address_line1, address_line2, city, postal_code, country, tax_id, payment_terms, currency, notes, sim_time),
         )
-        conn.commit()
         row = conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
         row_dict = dict(row)
         row_dict["ui_url"] = ui_href("customers", customer_id)
@@ -105,7 +169,7 @@ def update_customer(
     notes: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Update an existing customer. Only provided fields are updated."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         cust = conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
         if not cust:
             raise ValueError(f"Customer {customer_id} not found")
@@ -131,7 +195,6 @@ def update_customer(
             f"UPDATE customers SET {', '.join(updates)} WHERE id = ?",
             params,
         )
-        conn.commit()
         row = conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
         row_dict = dict(row)
         row_dict["ui_url"] = ui_href("customers", customer_id)
@@ -195,6 +258,7 @@ def get_customer_details(customer_id: str, include_orders: bool = True) -> Dict[
 # Namespace for backward compatibility
 customer_service = SimpleNamespace(
     find_customers=find_customers,
+    search_customers=search_customers,
     create_customer=create_customer,
     update_customer=update_customer,
     get_customer_details=get_customer_details,
@@ -0,0 +1,144 @@
+"""Dashboard aggregates: status distributions per entity and headline KPIs.
+
+Shared by ``/api/dashboard`` and the ``/api/events`` delta publisher.
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from services._base import db_conn
+
+
+# Status order mappings for logical workflow progression
+STATUS_ORDER = {
+    "sales_orders": ["draft", "confirmed", "completed", "cancelled"],
+    "production_orders": ["planned", "waiting", "ready", "in_progress", "completed", "cancelled"],
+    "quotes": ["draft", "sent", "accepted", "rejected", "expired"],
+    "invoices": ["draft", "issued", "paid", "overdue", "cancelled"],
+    "shipments": ["planned", "in_transit", "delivered", "cancelled"],
+}
+
+# Terminal statuses — objects in these states are "done"
+TERMINAL_STATUSES = {
+    "sales_orders":      ("completed", "cancelled"),
+    "production_orders": ("completed", "cancelled"),
+    "quotes":            ("accepted", "rejected", "expired"),
+    "invoices":          ("paid", "cancelled"),
+    "shipments":         ("delivered", "cancelled"),
+}
+
+# Best date column per entity for "when was this object active"
+DATE_COLUMN = {
+    "sales_orders":      "created_at",
+    "production_orders": "started_at",
+    "quotes":            "created_at",
+    "invoices":          "created_at",
+    "shipments":         "planned_departure",
+}
+
+
+def _sort_by_status_order(status_list, entity_type):
+    """Sort status distribution by logical workflow order."""
+    order = STATUS_ORDER.get(entity_type, [])
+    order_map = {status: idx for idx, status in enumerate(order)}
+    return sorted(status_list, key=lambda x: order_map.get(x["status"], 999))
+
+
+def _status_distribution_sql(table, since, until):
+    """Build SQL + params for 'active in range' status distribution.
+
+    Active means: created/started during the range, OR already existed
+    and still open (non-terminal) at range start.
+    """
+    if not since or not until:
+        return f"SELECT status, COUNT(*) as count FROM {table} GROUP BY status", []
+
+    date_col = DATE_COLUMN[table]
+    terminals = TERMINAL_STATUSES[table]
+    placeholders = ",".join("?" * len(terminals))
+
+    if date_col == "started_at":
+        # production_orders: started_at can be NULL for planned/waiting
+        sql = (
+            f"SELECT status, COUNT(*) as count FROM {table} "
+            f"WHERE ({date_col} >= ? AND {date_col} <= ?) "
+            f"   OR ({date_col} < ? AND status NOT IN ({placeholders})) "
+            f"   OR ({date_col} IS NULL AND status NOT IN ({placeholders})) "
+            f"GROUP BY status"
+        )
+        params = [since, until, since, *terminals, *terminals]
+    else:
+        sql = (
+            f"SELECT status, COUNT(*) as count FROM {table} "
+            f"WHERE ({date_col} >= ? AND {date_col} <= ?) "
+            f"   OR ({date_col} < ? AND status NOT IN ({placeholders})) "
+            f"GROUP BY status"
+        )
+        params = [since, until, since, *terminals]
+    return sql, params
+
+
+def get_status_distributions(conn, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """``{entity: [{status, count}, ...]}`` for objects active in ``[since, until]`` (all when open)."""
+    distributions = {}
+    for table in STATUS_ORDER:
+        sql, params = _status_distribution_sql(table, since, until)
+        rows = conn.execute(sql, params).fetchall()
+        distributions[table] = _sort_by_status_order([dict(r) for r in rows], table)
+    return distributions
+
+
+def get_kpis(conn, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+    """Headline counts (instant) and revenue (within ``[since, until]`` when given)."""
+    open_orders = conn.execute(
+        "SELECT COUNT(*) FROM sales_orders WHERE status IN ('confirmed', 'draft')"
+    ).fetchone()[0]
+    in_progress_mos = conn.execute(
+        "SELECT COUNT(*) FROM production_orders WHERE status IN ('ready', 'in_progress')"
+    ).fetchone()[0]
+    pending_shipments = conn.execute(
+        "SELECT COUNT(*) FROM shipments WHERE status IN ('planned', 'in_transit')"
+    ).fetchone()[0]
+    overdue_invoices = conn.execute(
+        "SELECT COUNT(*) FROM invoices WHERE status = 'overdue'"
+    ).fetchone()[0]
+
+    # Revenue is time-filtered when a range is given
+    rev_sql = "SELECT COALESCE(SUM(amount), 0) FROM payments"
+    rev_params: list = []
+    rev_conditions: list[str] = []
+    if since:
+        rev_conditions.append("payment_date >= ?")
+        rev_params.append(since)
+    if until:
+        rev_conditions.append("payment_date <= ?")
+        rev_params.append(until)
+    if rev_conditions:
+        rev_sql += " WHERE " + " AND ".join(rev_conditions)
+    total_revenue = conn.execute(rev_sql, rev_params).fetchone()[0]
+
+    return {
+        "open_orders": open_orders,
+        "in_progress_mos": in_progress_mos,
+        "pending_shipments": pending_shipments,
+        "overdue_invoices": overdue_invoices,
+        "total_revenue": total_revenue,
+    }
+
+
+def get_snapshot() -> Dict[str, Any]:
+    """Unfiltered KPIs and status distributions, as ``/api/dashboard`` shows them without a range."""
+    with db_conn() as conn:
+        return {"kpis": get_kpis(conn), "status_distributions": get_status_distributions(conn)}
+
+
+# ---------------------------------------------------------------------------
+# Service singleton
+# ---------------------------------------------------------------------------
+
+dashboard_service = SimpleNamespace(
+    get_status_distributions=get_status_distributions,
+    get_kpis=get_kpis,
+    get_snapshot=get_snapshot,
+)
+DashboardService = dashboard_service
@@ -14,13 +14,15 @@ import os
 import re
 import threading
 import urllib.parse
-
-import chardet
+from typing import Callable
 
 import config
-from db import dict_rows, generate_id
-from services._base import db_conn
+from db import dict_rows, generate_id, generate_ids
+from services._base import db_conn, write_transaction
 from services.myforterro import chat_completion
+from utils import lazy_import
+
+chardet = lazy_import("chardet")
 
 logger = logging.getLogger("duck-demo")
 
@@ -1329,16 +1331,30 @@ class DataImportService:
     # Core: execute
     # ------------------------------------------------------------------
 
-    def execute(self, *, job_id: str, exclude_columns: list[str] | None = None) -> dict:
-        """Execute import — create records via service layer."""
-        from services.customer import create_customer
+    def execute(
+        self,
+        *,
+        job_id: str,
+        exclude_columns: list[str] | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict:
+        """Execute import — create records for every ready row.
+
+        The job's metadata is checked first; then the job moves to
+        ``executing`` while rows are written.  Customers are inserted in
+        chunks of ``IMPORT_EXECUTE_CHUNK_SIZE`` rows, one transaction per
+        chunk; *on_progress* is called with ``(done, total)`` after each
+        chunk commits.  A failure before anything is imported returns the job
+        to its previous status so it can be executed again.  If a later chunk
+        fails the job stays ``executing`` with the earlier chunks imported —
+        ``rollback`` undoes them.
+        """
         from services.quote import quote_service
         from services.activity import log_activity
         excluded = set(exclude_columns) if exclude_columns else set()
 
         with db_conn() as conn:
             job = dict(conn.execute("SELECT * FROM import_jobs WHERE id = ?", (job_id,)).fetchone())
-
             if job["status"] not in ("validated", "ready_to_execute"):
                 raise ValueError(f"Cannot execute job in status '{job['status']}'")
 
@@ -1348,93 +1364,50 @@ class DataImportService:
                 (job_id,),
             ).fetchall())
 
-        created = []
-
-        if entity_type == "sales_order":
-            # Build quote lines from rows
-            lines = []
-            for row in rows:
-                mapped = json.loads(row["mapped_data"]) if row["mapped_data"] else {}
-                sku = mapped.get("sku")
-                qty = mapped.get("qty")
-                if sku and qty:
-                    try:
-                        qty = int(qty)
-                    except (ValueError, TypeError):
-                        qty = 1
-                    lines.append({"sku": sku, "qty": qty})
-
-            # Get order metadata from global_instructions
-            metadata = {}
-            if job.get("global_instructions"):
-                try:
-                    metadata = json.loads(job["global_instructions"])
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            customer_id = metadata.get("customer_id")
-            if not customer_id:
-                raise ValueError("Cannot create sales order: no customer_id in job metadata")
-
-            # Create quote
-            quote_args = {
-                "customer_id": customer_id,
-                "lines": lines,
-                "requested_delivery_date": metadata.get("delivery_date"),
-                "ship_to": None,
-            }
-            if metadata.get("notes"):
-                quote_args["note"] = metadata["notes"]
-
-            result = quote_service.create_quote(**quote_args)
-            entity_id = result.get("quote_id") or result.get("id")
-
-            # Mark rows as imported
-            with db_conn() as conn:
-                for row in rows:
-                    conn.execute(
-                        "UPDATE import_rows SET status = 'imported', created_entity_type = ?, created_entity_id = ? WHERE id = ?",
-                        ("quote", entity_id, row["id"]),
-                    )
-                conn.commit()
-
-            created.append({"row": "all", "entity_type": "quote", "entity_id": entity_id})
-
-        else:
-            for row in rows:
-                mapped = json.loads(row["mapped_data"]) if row["mapped_data"] else {}
-
-                if entity_type == "customer":
-                    # Filter to valid create_customer kwargs
-                    valid_keys = {
-                        "name", "gender", "company", "email", "phone", "address_line1",
-                        "address_line2", "city", "postal_code", "country",
-                        "tax_id", "payment_terms", "currency", "notes",
-                    }
-                    kwargs = {k: v for k, v in mapped.items() if k in valid_keys and k not in excluded and v is not None and v != ""}
-                    if "name" not in kwargs:
-                        kwargs["name"] = mapped.get("company", "Unknown")
+            if entity_type == "sales_order":
+                quote_args = self._quote_args(conn, job, rows)
+
+            # Claim the job atomically so two callers cannot execute it twice
+            claimed = conn.execute(
+                "UPDATE import_jobs SET status = 'executing' WHERE id = ? AND status = ?",
+                (job_id, job["status"]),
+            ).rowcount
+            if not claimed:
+                current = conn.execute("SELECT status FROM import_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+                raise ValueError(f"Cannot execute job in status '{current}'")
+            conn.commit()
 
-                    result = create_customer(**kwargs)
-                    entity_id = result["customer_id"]
+        created = []
+        try:
+            if entity_type == "sales_order":
+                result = quote_service.create_quote(**quote_args)
+                entity_id = result.get("quote_id") or result.get("id")
 
-                    with db_conn() as conn:
+                # Mark rows as imported
+                with write_transaction() as conn:
+                    for row in rows:
                         conn.execute(
                             "UPDATE import_rows SET status = 'imported', created_entity_type = ?, created_entity_id = ? WHERE id = ?",
-                            ("customer", entity_id, row["id"]),
+                            ("quote", entity_id, row["id"]),
                         )
-                        conn.commit()
 
-                    created.append({"row": row["source_row"], "entity_type": "customer", "entity_id": entity_id})
+                created.append({"row": "all", "entity_type": "quote", "entity_id": entity_id})
+
+            elif entity_type == "customer":
+                created = self._insert_customers(job_id=job_id, rows=rows, excluded=excluded, on_progress=on_progress)
+        except Exception:
+            self._release_claim(job_id, job["status"])
+            raise
 
         # Update job
-        with db_conn() as conn:
+        with write_transaction() as conn:
             now = _sim_now(conn)
-            conn.execute(
-                "UPDATE import_jobs SET status = 'executed', executed_at = ? WHERE id = ?",
+            finished = conn.execute(
+                "UPDATE import_jobs SET status = 'executed', executed_at = ? WHERE id = ? AND status = 'executing'",
                 (now, job_id),
-            )
-            conn.commit()
+            ).rowcount
+            if not finished:
+                self._check_still_executing(conn, job_id)
 
         log_activity(
             actor="mcp:data_import",
@@ -1449,41 +1422,143 @@ class DataImportService:
         state["created"] = created
         return state
 
+    @staticmethod
+    def _quote_args(conn, job: dict, rows: list[dict]) -> dict:
+        """``create_quote`` arguments for a sales-order job; raises ``ValueError`` when it cannot run."""
+        lines = []
+        for row in rows:
+            mapped = json.loads(row["mapped_data"]) if row["mapped_data"] else {}
+            sku = mapped.get("sku")
+            qty = mapped.get("qty")
+            if sku and qty:
+                try:
+                    qty = int(qty)
+                except (ValueError, TypeError):
+                    qty = 1
+                lines.append({"sku": sku, "qty": qty})
+
+        # Get order metadata from global_instructions
+        metadata = {}
+        if job.get("global_instructions"):
+            try:
+                metadata = json.loads(job["global_instructions"])
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+        customer_id = metadata.get("customer_id")
+        if not customer_id:
+            raise ValueError("Cannot create sales order: no customer_id in job metadata")
+        if not conn.execute("SELECT 1 FROM customers WHERE id = ?", (customer_id,)).fetchone():
+            raise ValueError(f"Cannot create sales order: customer {customer_id} not found")
+
+        quote_args = {
+            "customer_id": customer_id,
+            "lines": lines,
+            "requested_delivery_date": metadata.get("delivery_date"),
+            "ship_to": None,
+        }
+        if metadata.get("notes"):
+            quote_args["note"] = metadata["notes"]
+        return quote_args
+
+    @staticmethod
+    def _check_still_executing(conn, job_id: str) -> None:
+        """Raise ``ValueError`` if the job left ``executing`` (e.g. it was rolled back meanwhile)."""
+        status = conn.execute("SELECT status FROM import_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        if status != "executing":
+            raise ValueError(f"Import {job_id} is no longer executing (status '{status}'); stopped")
+
+    @staticmethod
+    def _release_claim(job_id: str, status: str) -> None:
+        """Return an ``executing`` job to *status* if none of its rows were imported."""
+        with write_transaction() as conn:
+            conn.execute(
+                "UPDATE import_jobs SET status = ? WHERE id = ? AND status = 'executing' AND NOT EXISTS ("
+                "SELECT 1 FROM import_rows WHERE job_id = ? AND status = 'imported')",
+                (status, job_id, job_id),
+            )
+
+    _CUSTOMER_COLUMNS = (
+        "gender", "name", "company", "email", "phone", "address_line1", "address_line2",
+        "city", "postal_code", "country", "tax_id", "payment_terms", "currency", "notes",
+    )
+
+    def _insert_customers(self, *, job_id: str, rows: list[dict], excluded: set, on_progress) -> list[dict]:
+        """Insert customer rows in chunked transactions and mark them imported."""
+        chunk_size = config.IMPORT_EXECUTE_CHUNK_SIZE
+        created = []
+        with db_conn() as conn:
+            now = _sim_now(conn)
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                with write_transaction():
+                    self._check_still_executing(conn, job_id)
+                    customer_ids = generate_ids(conn, "CUST", "customers", len(chunk))
+                    values = []
+                    for row in chunk:
+                        mapped = json.loads(row["mapped_data"]) if row["mapped_data"] else {}
+                        fields = {
+                            k: v for k, v in mapped.items()
+                            if k in self._CUSTOMER_COLUMNS and k not in excluded and v is not None and v != ""
+                        }
+                        fields.setdefault("name", mapped.get("company", "Unknown"))
+                        values.append(tuple(fields.get(c) for c in self._CUSTOMER_COLUMNS))
+
+                    conn.executemany(
+                        f"INSERT INTO customers (id, {', '.join(self._CUSTOMER_COLUMNS)}, created_at) "
+                        f"VALUES (?, {', '.join('?' for _ in self._CUSTOMER_COLUMNS)}, ?)",
+                        [(cid, *v, now) for cid, v in zip(customer_ids, values)],
+                    )
+                    conn.executemany(
+                        "UPDATE import_rows SET status = 'imported', created_entity_type = 'customer', created_entity_id = ? WHERE id = ?",
+                        [(cid, row["id"]) for cid, row in zip(customer_ids, chunk)],
+                    )
+
+                created.extend(
+                    {"row": row["source_row"], "entity_type": "customer", "entity_id": cid}
+                    for cid, row in zip(customer_ids, chunk)
+                )
+                logger.info("import %s: %d/%d customer rows executed", job_id, len(created), len(rows))
+                if on_progress:
+                    on_progress(len(created), len(rows))
+        return created
+
     # ------------------------------------------------------------------
     # Core: rollback
     # ------------------------------------------------------------------
 
     def rollback(self, *, job_id: str) -> dict:
-        """Undo an executed import by deleting created records."""
+        """Undo an executed (or partially executed) import by deleting created records.
+
+        Set-based and idempotent: rolling back a rolled-back job is a no-op.
+        The job leaves ``executing`` in the same write transaction, so an
+        ``execute`` still running on it stops before its next chunk.
+        """
         from services.activity import log_activity
 
-        with db_conn() as conn:
+        with write_transaction() as conn:
             job = dict(conn.execute("SELECT * FROM import_jobs WHERE id = ?", (job_id,)).fetchone())
 
-            if job["status"] != "executed":
+            if job["status"] == "rolled_back":
+                return self._build_staging_state(job_id)
+            if job["status"] not in ("executed", "executing"):
                 raise ValueError(f"Cannot rollback job in status '{job['status']}'")
 
-            entity_type = job["entity_type"]
-            schema = ENTITY_SCHEMAS.get(entity_type)
-
-            rows = dict_rows(conn.execute(
-                "SELECT * FROM import_rows WHERE job_id = ? AND status = 'imported' AND created_entity_id IS NOT NULL",
-                (job_id,),
-            ).fetchall())
-
-            for row in rows:
-                if schema:
-                    conn.execute(
-                        f"DELETE FROM {schema['table']} WHERE id = ?",
-                        (row["created_entity_id"],),
-                    )
+            schema = ENTITY_SCHEMAS.get(job["entity_type"])
+            if schema and schema.get("table"):
                 conn.execute(
-                    "UPDATE import_rows SET status = 'ready', created_entity_id = NULL, created_entity_type = NULL WHERE id = ?",
-                    (row["id"],),
+                    f"DELETE FROM {schema['table']} WHERE id IN ("
+                    "SELECT created_entity_id FROM import_rows "
+                    "WHERE job_id = ? AND status = 'imported' AND created_entity_id IS NOT NULL)",
+                    (job_id,),
                 )
+            reverted = conn.execute(
+                "UPDATE import_rows SET status = 'ready', created_entity_id = NULL, created_entity_type = NULL "
+                "WHERE job_id = ? AND status = 'imported'",
+                (job_id,),
+            ).rowcount
 
             conn.execute("UPDATE import_jobs SET status = 'rolled_back' WHERE id = ?", (job_id,))
-            conn.commit()
 
         log_activity(
             actor="mcp:data_import",
@@ -1491,6 +1566,7 @@ class DataImportService:
             action="import.rolled_back",
             entity_type="import_job",
             entity_id=job_id,
+            details={"reverted_count": reverted},
         )
 
         return self._build_staging_state(job_id)
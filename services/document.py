@@ -4,7 +4,7 @@ from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 
 from db import generate_id
-from services._base import db_conn
+from services._base import db_conn, write_transaction
 
 
 def store_document(
@@ -19,7 +19,7 @@ def store_document(
     """Store a document in the database."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         sim_time = simulation_service.get_current_time()
         doc_id = generate_id(conn, "DOC", "documents")
         conn.execute(
@@ -27,7 +27,6 @@ def store_document(
             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (doc_id, entity_type, entity_id, document_type, content, mime_type, filename, sim_time, notes)
         )
-        conn.commit()
         return doc_id
 
 def get_document(entity_type: str, entity_id: str, document_type: str) -> Optional[Dict[str, Any]]:
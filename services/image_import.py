@@ -156,16 +156,10 @@ def _resolve_customer(*, name: str) -> dict:
 
     Returns {id, name, confidence, alternatives}.
     """
-    from services.customer import find_customers
-    import difflib
+    from services.customer import search_customers
 
-    # Try name search first, then company search
-    result = find_customers(name=name, limit=5)
-    candidates = result.get("customers", [])
-
-    if not candidates:
-        result = find_customers(company=name, limit=5)
-        candidates = result.get("customers", [])
+    # Ranked trigram search over name/company/email/city/phone, already scored
+    candidates = search_customers(name, limit=4, min_confidence=config.CUSTOMER_MATCH_MIN_CONFIDENCE)["customers"]
 
     if not candidates:
         return {
@@ -176,30 +170,16 @@ def _resolve_customer(*, name: str) -> dict:
             "message": f"No customer found matching '{name}'. Create the customer first.",
         }
 
-    # Score candidates by name/company similarity
-    scored = []
-    for cust in candidates:
-        name_score = difflib.SequenceMatcher(
-            None, name.lower(), (cust.get("name") or "").lower()
-        ).ratio()
-        company_score = difflib.SequenceMatcher(
-            None, name.lower(), (cust.get("company") or "").lower()
-        ).ratio()
-        score = max(name_score, company_score)
-        scored.append((score, cust))
-
-    scored.sort(key=lambda x: -x[0])
-    best_score, best = scored[0]
-
+    best = candidates[0]
     display_name = best.get("name") or best.get("company") or best["id"]
 
     return {
         "id": best["id"],
         "name": display_name,
-        "confidence": round(best_score, 2),
+        "confidence": best["confidence"],
         "alternatives": [
-            {"id": c["id"], "name": c.get("name") or c.get("company") or c["id"], "confidence": round(s, 2)}
-            for s, c in scored[1:4]
+            {"id": c["id"], "name": c.get("name") or c.get("company") or c["id"], "confidence": c["confidence"]}
+            for c in candidates[1:4]
         ],
     }
 
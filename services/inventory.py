@@ -1,10 +1,32 @@
 """Service for inventory and stock operations."""
 
 from types import SimpleNamespace
-from typing import Any, Dict, Optional
-
-from services._base import db_conn
-from db import dict_rows, generate_id
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import config
+from services._base import db_conn, write_transaction
+from services.atp import atp_service
+from db import dict_rows, generate_ids
+
+
+# Reserved qty per item (same rules as _compute_reserved), for joins over many items
+RESERVED_BY_ITEM_SQL = """
+    SELECT item_id, SUM(qty) AS reserved FROM (
+        SELECT sol.item_id, sol.qty
+        FROM sales_order_lines sol
+        JOIN sales_orders so ON sol.sales_order_id = so.id
+        WHERE so.status IN ('draft', 'confirmed', 'in_production')
+        UNION ALL
+        SELECT ri.input_item_id, ri.input_qty
+        FROM production_orders po
+        JOIN recipe_ingredients ri ON po.recipe_id = ri.recipe_id
+        WHERE po.status IN ('planned', 'waiting', 'ready')
+        UNION ALL
+        SELECT b.item_id, b.qty_on_hold - b.qty_released - b.qty_scrapped
+        FROM qc_hold_batches b
+        WHERE b.status != 'closed'
+    ) GROUP BY item_id
+"""
 
 
 def _compute_reserved(conn, item_id: str) -> int:
@@ -74,92 +96,150 @@ def check_availability(item_sku: str, quantity: int) -> Dict[str, Any]:
         "qty_available": available,
         "is_available": is_available,
         "shortfall": shortfall,
+        "earliest_available_date": atp_service.earliest_date(item["id"], quantity),
         "stock_locations": summary["by_location"]
     }
 
-def deduct_stock(item_id: str, qty: int, conn=None,
-                 reference_type: str = None, reference_id: str = None) -> Dict[str, Any]:
-    """Deduct stock for an item using FIFO across locations.
+# movement_type written for each reference_type (anything else is an adjustment)
+_MOVE_TYPE = {
+    "shipment": "shipment_out",
+    "production_order": "production_consume",
+}
 
-    Reduces on_hand across stock rows (oldest/first rows first) until
-    the requested qty is fully deducted.  Removes rows that reach zero.
-    Accepts an optional *conn* so callers can embed the deduction inside
-    their own transaction (no commit is issued when conn is provided).
 
-    When *reference_type* / *reference_id* are supplied, a
-    ``stock_movements`` row is written for every stock record touched,
-    providing a full audit trail.
+def _pick_key(row, warehouse: Optional[str]) -> Tuple:
+    prefs = config.STOCK_PICK_LOCATION_PREFERENCE
+    location_rank = prefs.index(row["location"]) if row["location"] in prefs else len(prefs)
+    # Stock IDs are zero-padded sequence numbers, so shorter/smaller is older
+    return (warehouse is not None and row["warehouse"] != warehouse, location_rank, len(row["id"]), row["id"])
 
-    Returns a summary of what was deducted.
+
+def plan_picks(rows: Sequence[Any], demand: Dict[str, int], warehouse: Optional[str] = None) -> Dict[str, Any]:
+    """Plan which stock rows (lots) cover *demand* (item ID → qty), in memory.
+
+    Rows from *warehouse* come first, then the configured location
+    preference, then the oldest lot (FIFO).  Returns ``picks`` (item ID →
+    list of ``(row, take)``) and ``shortages`` (item ID → qty that could
+    not be covered).
     """
-    # Determine movement_type from context
-    _MOVE_TYPE = {
-        "shipment": "shipment_out",
-        "production_order": "production_consume",
-    }
+    by_item: Dict[str, List[Any]] = {item_id: [] for item_id in demand}
+    for row in rows:
+        if row["item_id"] in by_item:
+            by_item[row["item_id"]].append(row)
+
+    picks: Dict[str, List[Tuple[Any, int]]] = {}
+    shortages: Dict[str, int] = {}
+    for item_id, qty in demand.items():
+        remaining = qty
+        picks[item_id] = []
+        for row in sorted(by_item[item_id], key=lambda r: _pick_key(r, warehouse)):
+            if remaining <= 0:
+                break
+            take = min(row["on_hand"], remaining)
+            picks[item_id].append((row, take))
+            remaining -= take
+        if remaining > 0:
+            shortages[item_id] = remaining
+    return {"picks": picks, "shortages": shortages}
+
+
+def allocate_stock(lines: Iterable[Tuple[str, int]], *, conn=None, warehouse: Optional[str] = None,
+                   reference_type: str = None, reference_id: str = None) -> Dict[str, Any]:
+    """Deduct a whole pick list of ``(item_id, qty)`` lines in one batch.
+
+    Lines for the same item are merged.  All positive stock rows for the
+    listed items are read in one query, picks are planned with
+    :func:`plan_picks`, and the stock updates, deletions of emptied rows
+    and ``stock_movements`` inserts are each issued as one ``executemany``.
+    Nothing is written when any item is short (``ValueError``).
+
+    Accepts an optional *conn* so callers can embed the allocation inside
+    their own transaction (no commit is issued when conn is provided).
+    """
+    demand: Dict[str, int] = {}
+    for item_id, qty in lines:
+        demand[item_id] = demand.get(item_id, 0) + int(qty)
 
     def _do(c):
         from services.simulation import simulation_service
         sim_time = simulation_service.get_current_time()
         move_type = _MOVE_TYPE.get(reference_type, "adjustment")
 
+        marks = ",".join("?" for _ in demand)
         rows = c.execute(
-            "SELECT id, warehouse, location, on_hand FROM stock "
-            "WHERE item_id = ? AND on_hand > 0 ORDER BY id",
-            (item_id,),
+            "SELECT id, item_id, warehouse, location, on_hand FROM stock "
+            f"WHERE item_id IN ({marks}) AND on_hand > 0 ORDER BY item_id, id",
+            list(demand),
         ).fetchall()
-
-        remaining = qty
-        deducted_from = []
-        for row in rows:
-            if remaining <= 0:
-                break
-            take = min(row["on_hand"], remaining)
-            new_on_hand = row["on_hand"] - take
-            if new_on_hand <= 0:
-                c.execute("DELETE FROM stock WHERE id = ?", (row["id"],))
-            else:
-                c.execute(
-                    "UPDATE stock SET on_hand = ? WHERE id = ?",
-                    (new_on_hand, row["id"]),
-                )
-            # Log the stock movement (negative qty for deduction)
-            movement_id = generate_id(c, "MOV", "stock_movements")
-            c.execute(
-                "INSERT INTO stock_movements "
-                "(id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (movement_id, sim_time, item_id, move_type, -take, row["id"],
-                 reference_type, reference_id),
-            )
-            remaining -= take
-            deducted_from.append({
-                "stock_id": row["id"],
-                "warehouse": row["warehouse"],
-                "location": row["location"],
-                "qty_taken": take,
-            })
-
-        if remaining > 0:  # all stock deducted
+        plan = plan_picks(rows, demand, warehouse)
+        if plan["shortages"]:
+            item_id, short = next(iter(plan["shortages"].items()))
             raise ValueError(
                 f"Insufficient stock for item {item_id}: "
-                f"needed {qty}, could only deduct {qty - remaining}"
+                f"needed {demand[item_id]}, could only deduct {demand[item_id] - short}"
             )
-        return {"item_id": item_id, "qty_deducted": qty, "deducted_from": deducted_from}
 
+        touched = [(item_id, row, take) for item_id, picks in plan["picks"].items() for row, take in picks]
+        movement_ids = generate_ids(c, "MOV", "stock_movements", len(touched))
+        c.executemany(
+            "DELETE FROM stock WHERE id = ?",
+            [(row["id"],) for _, row, take in touched if take == row["on_hand"]],
+        )
+        c.executemany(
+            "UPDATE stock SET on_hand = ? WHERE id = ?",
+            [(row["on_hand"] - take, row["id"]) for _, row, take in touched if take < row["on_hand"]],
+        )
+        # Negative qty: stock leaving the location
+        c.executemany(
+            "INSERT INTO stock_movements "
+            "(id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (movement_id, sim_time, item_id, move_type, -take, row["id"], reference_type, reference_id)
+                for movement_id, (item_id, row, take) in zip(movement_ids, touched)
+            ],
+        )
+        atp_service.invalidate(*demand)
+        return {
+            "allocations": [
+                {
+                    "item_id": item_id,
+                    "qty_deducted": qty,
+                    "deducted_from": [
+                        {"stock_id": row["id"], "warehouse": row["warehouse"], "location": row["location"], "qty_taken": take}
+                        for row, take in plan["picks"][item_id]
+                    ],
+                }
+                for item_id, qty in demand.items()
+            ],
+        }
+
+    if not demand:
+        return {"allocations": []}
     if conn is not None:
         return _do(conn)
-    else:
-        with db_conn() as c:
-            result = _do(c)
-            c.commit()
-            return result
+    with write_transaction() as c:
+        result = _do(c)
+        return result
+
+
+def deduct_stock(item_id: str, qty: int, conn=None,
+                 reference_type: str = None, reference_id: str = None) -> Dict[str, Any]:
+    """Deduct stock for a single item (see :func:`allocate_stock`).
+
+    Returns a summary of what was deducted.
+    """
+    result = allocate_stock([(item_id, qty)], conn=conn,
+                            reference_type=reference_type, reference_id=reference_id)
+    return result["allocations"][0]
 
 
 # Namespace for backward compatibility
 inventory_service = SimpleNamespace(
     get_stock_summary=get_stock_summary,
     check_availability=check_availability,
+    plan_picks=plan_picks,
+    allocate_stock=allocate_stock,
     deduct_stock=deduct_stock,
 )
 InventoryService = inventory_service
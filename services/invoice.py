@@ -9,14 +9,7 @@ from typing import Any, Dict, List, Optional
 import config
 from db import dict_rows, generate_id
 from utils import ui_href, format_qty
-from services._base import db_conn
-
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_RIGHT, TA_CENTER
+from services._base import db_conn, keyset_condition, page_cursor, write_transaction
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +18,7 @@ def create_invoice(sales_order_id: str) -> Dict[str, Any]:
     """Create a draft invoice from a sales order, using stored pricing."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         so = conn.execute("SELECT * FROM sales_orders WHERE id = ?", (sales_order_id,)).fetchone()
         if not so:
             raise ValueError(f"Sales order {sales_order_id} not found")
@@ -63,7 +56,6 @@ def create_invoice(sales_order_id: str) -> Dict[str, Any]:
                 sim_time,
             ),
         )
-        conn.commit()
 
         message = f"📄 Invoice {inv_id} created for order {sales_order_id} — {p['currency']} {p['total']:.2f}"
         warning = None
@@ -88,7 +80,7 @@ def issue_invoice(invoice_id: str) -> Dict[str, Any]:
     from services.simulation import simulation_service
     from services.document import document_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         inv = conn.execute("SELECT * FROM invoices WHERE id = ?", (invoice_id,)).fetchone()
         if not inv:
             raise ValueError(f"Invoice {invoice_id} not found")
@@ -107,33 +99,32 @@ def issue_invoice(invoice_id: str) -> Dict[str, Any]:
             "UPDATE invoices SET status = 'issued', due_date = ?, issued_at = ? WHERE id = ?",
             (due_date, sim_time, invoice_id),
         )
-        conn.commit()
-
-        try:
-            pdf_bytes = generate_invoice_pdf(invoice_id)
-            document_service.store_document(
-                entity_type="invoice",
-                entity_id=invoice_id,
-                document_type="invoice_pdf",
-                content=pdf_bytes,
-                filename=f"invoice_{invoice_id}.pdf",
-                notes="Generated when invoice was issued"
-            )
-        except Exception as e:
-            logger.error(f"Failed to generate PDF for {invoice_id}: {e}")
-            pdf_warning = f"PDF generation failed: {e}"
-        else:
-            pdf_warning = None
 
-        result = {
-            "invoice_id": invoice_id,
-            "status": "issued",
-            "due_date": due_date,
-            "ui_url": ui_href("invoices", invoice_id),
-            "message": f"\U0001f4e8 Invoice {invoice_id} issued — due {due_date}",
-        }
-        if pdf_warning:
-            result["warning"] = pdf_warning
+    try:
+        pdf_bytes = generate_invoice_pdf(invoice_id)
+        document_service.store_document(
+            entity_type="invoice",
+            entity_id=invoice_id,
+            document_type="invoice_pdf",
+            content=pdf_bytes,
+            filename=f"invoice_{invoice_id}.pdf",
+            notes="Generated when invoice was issued"
+        )
+    except Exception as e:
+        logger.error(f"Failed to generate PDF for {invoice_id}: {e}")
+        pdf_warning = f"PDF generation failed: {e}"
+    else:
+        pdf_warning = None
+
+    result = {
+        "invoice_id": invoice_id,
+        "status": "issued",
+        "due_date": due_date,
+        "ui_url": ui_href("invoices", invoice_id),
+        "message": f"\U0001f4e8 Invoice {invoice_id} issued — due {due_date}",
+    }
+    if pdf_warning:
+        result["warning"] = pdf_warning
     return result
 
 
@@ -185,8 +176,12 @@ def list_invoices(
     sales_order_id: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """List invoices with optional filters."""
+    """List invoices with optional filters, newest first.
+
+    Pass the previous page's ``next_cursor`` as *cursor* to fetch the next page.
+    """
     filters: List[str] = []
     params: List[Any] = []
     if customer_ids:
@@ -199,18 +194,22 @@ def list_invoices(
     if status:
         filters.append("inv.status = ?")
         params.append(status)
+    if cursor:
+        seek_sql, seek_params = keyset_condition(("inv.created_at", "inv.id"), cursor, descending=True)
+        filters.append(seek_sql)
+        params.extend(seek_params)
     where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
     sql = (
         f"SELECT inv.*, c.name as customer_name, c.company as customer_company "
         f"FROM invoices inv LEFT JOIN customers c ON inv.customer_id = c.id "
-        f"{where_clause} ORDER BY inv.created_at DESC LIMIT ?"
+        f"{where_clause} ORDER BY inv.created_at DESC, inv.id DESC LIMIT ?"
     )
-    params.append(limit)
+    params.append(limit + 1)
     with db_conn() as conn:
-        rows = dict_rows(conn.execute(sql, params))
+        rows, next_cursor = page_cursor(dict_rows(conn.execute(sql, params)), ("created_at", "id"), limit)
         for row in rows:
             row["ui_url"] = ui_href("invoices", row["id"])
-    return {"invoices": rows}
+    return {"invoices": rows, "next_cursor": next_cursor}
 
 
 def record_payment(
@@ -223,7 +222,7 @@ def record_payment(
     """Record a payment against an invoice. Auto-marks as 'paid' when fully covered."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         inv = conn.execute("SELECT * FROM invoices WHERE id = ?", (invoice_id,)).fetchone()
         if not inv:
             raise ValueError(f"Invoice {invoice_id} not found")
@@ -251,8 +250,6 @@ def record_payment(
                 (sim_time, invoice_id),
             )
 
-        conn.commit()
-
         result = {
             "payment_id": pay_id,
             "invoice_id": invoice_id,
@@ -273,18 +270,24 @@ def record_payment(
 
 def mark_overdue(sim_time: str) -> int:
     """Mark issued invoices as overdue if sim_time > due_date. Returns count updated."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         cur = conn.execute(
             "UPDATE invoices SET status = 'overdue' "
             "WHERE status = 'issued' AND due_date IS NOT NULL AND due_date < ?",
             (sim_time[:10],),
         )
-        conn.commit()
     return cur.rowcount
 
 
 def generate_invoice_pdf(invoice_id: str) -> bytes:
     """Generate a PDF for an invoice using ReportLab."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.enums import TA_RIGHT, TA_CENTER
+
     invoice_data = get_invoice(invoice_id)
     if not invoice_data:
         raise ValueError(f"Invoice {invoice_id} not found")
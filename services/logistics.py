@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Optional
 import config
 from db import dict_rows, generate_id
 from utils import ship_to_columns, ui_href
-from services._base import db_conn
+from services._base import db_conn, write_transaction
 
 
 def create_shipment(ship_from: Dict[str, Any], ship_to: Dict[str, Any], planned_departure: str, planned_arrival: str, packages: List[Dict[str, Any]], reference: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -31,7 +31,7 @@ def create_shipment(ship_from: Dict[str, Any], ship_to: Dict[str, Any], planned_
     if missing_fields:
         raise ValueError(f"Cannot create shipment: ship_to address is missing required fields: {', '.join(missing_fields)}. Please provide a complete shipping address.")
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         shipment_id = generate_id(conn, "SHIP", "shipments")
         conn.execute("INSERT INTO shipments (id, ship_from_warehouse, ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, planned_departure, planned_arrival, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (shipment_id, ship_from.get("warehouse"), *ship_to_columns(ship_to), planned_departure, planned_arrival, "planned"))
         line_counter = 1
@@ -56,7 +56,6 @@ def create_shipment(ship_from: Dict[str, Any], ship_to: Dict[str, Any], planned_
                 line_counter += 1
         if reference and reference.get("type") == "sales_order" and reference.get("id"):
             conn.execute("INSERT OR IGNORE INTO sales_order_shipments (sales_order_id, shipment_id) VALUES (?, ?)", (reference["id"], shipment_id))
-        conn.commit()
         return {"shipment_id": shipment_id, "status": "planned", "planned_departure": planned_departure, "planned_arrival": planned_arrival, "ui_url": ui_href("shipments", shipment_id)}
 
 def get_shipment_status(shipment_id: str) -> Dict[str, Any]:
@@ -94,30 +93,29 @@ def dispatch_shipment(shipment_id: str) -> Dict[str, Any]:
     from services.inventory import inventory_service
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         row = conn.execute("SELECT * FROM shipments WHERE id = ?", (shipment_id,)).fetchone()
         if not row:
             raise ValueError(f"Shipment {shipment_id} not found")
         if row["status"] != "planned":
             raise ValueError(f"Shipment {shipment_id} is not planned (current status: {row['status']})")
 
-        # Deduct stock for each shipment line
+        # Pick stock for all shipment lines in one batch, ship-from warehouse first
         lines = conn.execute(
             "SELECT item_id, qty FROM shipment_lines WHERE shipment_id = ?",
             (shipment_id,)
         ).fetchall()
-        for line in lines:
-            inventory_service.deduct_stock(
-                line["item_id"], line["qty"], conn=conn,
-                reference_type="shipment", reference_id=shipment_id,
-            )
+        inventory_service.allocate_stock(
+            [(line["item_id"], line["qty"]) for line in lines], conn=conn,
+            warehouse=row["ship_from_warehouse"],
+            reference_type="shipment", reference_id=shipment_id,
+        )
 
         sim_time = simulation_service.get_current_time()
         conn.execute(
             "UPDATE shipments SET status = 'in_transit', tracking_ref = ?, dispatched_at = ? WHERE id = ?",
             (f"TRK-{shipment_id}", sim_time, shipment_id)
         )
-        conn.commit()
         return {
             "shipment_id": shipment_id,
             "status": "in_transit",
@@ -131,7 +129,7 @@ def deliver_shipment(shipment_id: str) -> Dict[str, Any]:
     """Mark a shipment as delivered."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         row = conn.execute("SELECT * FROM shipments WHERE id = ?", (shipment_id,)).fetchone()
         if not row:
             raise ValueError(f"Shipment {shipment_id} not found")
@@ -143,7 +141,6 @@ def deliver_shipment(shipment_id: str) -> Dict[str, Any]:
             "UPDATE shipments SET status = 'delivered', delivered_at = ? WHERE id = ?",
             (sim_time, shipment_id,)
         )
-        conn.commit()
         return {
             "shipment_id": shipment_id,
             "status": "delivered",
@@ -5,14 +5,14 @@ from typing import Any, Dict, List, Optional
 
 from db import dict_rows, generate_id
 from utils import ui_href
-from services._base import db_conn
+from services._base import db_conn, write_transaction
 
 
 def create_email(customer_id: str, subject: str, body: str, sales_order_id: Optional[str] = None, recipient_email: Optional[str] = None, recipient_name: Optional[str] = None) -> Dict[str, Any]:
     """Create a new email draft."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         customer = conn.execute("SELECT id, name, email FROM customers WHERE id = ?", (customer_id,)).fetchone()
         if not customer:
             raise ValueError(f"Customer {customer_id} not found")
@@ -29,7 +29,6 @@ def create_email(customer_id: str, subject: str, body: str, sales_order_id: Opti
         email_id = generate_id(conn, "EMAIL", "emails")
         sim_time = simulation_service.get_current_time()
         conn.execute("INSERT INTO emails (id, customer_id, sales_order_id, recipient_email, recipient_name, subject, body, status, created_at, modified_at) VALUES (?, ?, ?, ?, ?, ?, ?, 'draft', ?, ?)", (email_id, customer_id, sales_order_id, final_recipient_email, final_recipient_name, subject, body, sim_time, sim_time))
-        conn.commit()
         email = dict(conn.execute("SELECT * FROM emails WHERE id = ?", (email_id,)).fetchone())
         email["ui_url"] = ui_href("emails", email_id)
         return {"email_id": email_id, "email": email, "message": f"Email draft '{subject}' created with ID {email_id} at {sim_time}"}
@@ -81,7 +80,7 @@ def update_email(email_id: str, subject: Optional[str], body: Optional[str]) ->
     """Update email subject/body."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         email = conn.execute("SELECT status FROM emails WHERE id = ?", (email_id,)).fetchone()
         if not email:
             raise ValueError(f"Email {email_id} not found")
@@ -103,7 +102,6 @@ def update_email(email_id: str, subject: Optional[str], body: Optional[str]) ->
         params.append(email_id)
         sql = f"UPDATE emails SET {', '.join(updates)} WHERE id = ?"
         conn.execute(sql, params)
-        conn.commit()
         updated_email = dict(conn.execute("SELECT * FROM emails WHERE id = ?", (email_id,)).fetchone())
         updated_email["ui_url"] = ui_href("emails", email_id)
         return {"email_id": email_id, "email": updated_email, "message": f"Email {email_id} updated at {sim_time}"}
@@ -112,7 +110,7 @@ def send_email(email_id: str) -> Dict[str, Any]:
     """Mark email as sent."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         email = conn.execute("SELECT status FROM emails WHERE id = ?", (email_id,)).fetchone()
         if not email:
             raise ValueError(f"Email {email_id} not found")
@@ -120,21 +118,19 @@ def send_email(email_id: str) -> Dict[str, Any]:
             raise ValueError(f"Cannot send email {email_id}: status is '{email['status']}', must be 'draft'")
         sim_time = simulation_service.get_current_time()
         conn.execute("UPDATE emails SET status = 'sent', sent_at = ?, modified_at = ? WHERE id = ?", (sim_time, sim_time, email_id))
-        conn.commit()
         sent_email = dict(conn.execute("SELECT * FROM emails WHERE id = ?", (email_id,)).fetchone())
         sent_email["ui_url"] = ui_href("emails", email_id)
         return {"email_id": email_id, "email": sent_email, "message": f"Email {email_id} marked as sent at {sim_time}"}
 
 def delete_email(email_id: str) -> Dict[str, Any]:
     """Delete an email."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         email = conn.execute("SELECT status FROM emails WHERE id = ?", (email_id,)).fetchone()
         if not email:
             raise ValueError(f"Email {email_id} not found")
         if email["status"] != "draft":
             raise ValueError(f"Cannot delete email {email_id}: status is '{email['status']}', must be 'draft'")
         conn.execute("DELETE FROM emails WHERE id = ?", (email_id,))
-        conn.commit()
         return {"email_id": email_id, "message": f"Email {email_id} deleted"}
 
 
@@ -3,9 +3,14 @@
 import logging
 import os
 import time
+from types import SimpleNamespace
 
-import openai
-import requests
+import config
+import metrics
+from utils import lazy_import
+
+openai = lazy_import("openai")
+requests = lazy_import("requests")
 
 logger = logging.getLogger("duck-demo")
 
@@ -50,7 +55,7 @@ def get_token() -> str:
     return _token
 
 
-def get_inference_client() -> openai.OpenAI:
+def get_inference_client() -> "openai.OpenAI":
     """Return an OpenAI client configured for MyForterro inference."""
     creds = _get_credentials()
     return openai.OpenAI(
@@ -60,26 +65,67 @@ def get_inference_client() -> openai.OpenAI:
     )
 
 
+class _FakeClient:
+    """Local stand-in for the OpenAI client (``INFERENCE_FAKE=true``).
+
+    Answers every completion with an empty JSON object after
+    ``INFERENCE_FAKE_LATENCY_MS``, so load tests exercise the tool path
+    without credentials or network.
+    """
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    @staticmethod
+    def _create(*, model: str, messages: list[dict], **kwargs):
+        time.sleep(config.INFERENCE_FAKE_LATENCY_MS / 1000)
+        message = SimpleNamespace(role="assistant", content="{}", tool_calls=None)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+        )
+
+
+def _observed_completion(client: "openai.OpenAI", provider: str, model: str, messages: list[dict], **kwargs):
+    """Run a chat completion and record its latency and token usage."""
+    t0 = time.time()
+    try:
+        result = client.chat.completions.create(
+            model=model, messages=messages, **kwargs
+        )
+    except Exception:
+        metrics.LLM_CALL_ERRORS.inc(provider, model)
+        raise
+    finally:
+        metrics.LLM_CALL_DURATION.observe(time.time() - t0, provider, model)
+    usage = result.usage
+    if usage is not None:
+        metrics.LLM_TOKENS.inc(provider, model, "prompt", amount=usage.prompt_tokens)
+        metrics.LLM_TOKENS.inc(provider, model, "completion", amount=usage.completion_tokens)
+    return result
+
+
 def chat_completion(*, model: str, messages: list[dict], **kwargs):
     """Send a chat completion request via MyForterro inference."""
+    if config.INFERENCE_FAKE:
+        return _observed_completion(_FakeClient(), "fake", model, messages, **kwargs)
     client = get_inference_client()
     t0 = time.time()
-    result = client.chat.completions.create(
-        model=model, messages=messages, **kwargs
-    )
+    result = _observed_completion(client, "myforterro", model, messages, **kwargs)
     logger.info("LLM call [%s] completed in %.1fs", model, time.time() - t0)
     return result
 
 
 def openai_chat_completion(*, model: str, messages: list[dict], **kwargs):
     """Send a chat completion request directly to OpenAI."""
+    if config.INFERENCE_FAKE:
+        return _observed_completion(_FakeClient(), "fake", model, messages, **kwargs)
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY not set — cannot use openai provider")
     client = openai.OpenAI(api_key=api_key)
     t0 = time.time()
-    result = client.chat.completions.create(
-        model=model, messages=messages, **kwargs
-    )
+    result = _observed_completion(client, "openai", model, messages, **kwargs)
     logger.info("LLM call [%s] (openai) completed in %.1fs", model, time.time() - t0)
     return result
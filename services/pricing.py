@@ -1,20 +1,80 @@
 """Service for pricing and quoting operations."""
 
+import threading
+from datetime import date, timedelta
 from types import SimpleNamespace
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import config
+import db
 from services._base import db_conn
-from utils import eta_from_days, parse_date
+from services.atp import atp_service
+from utils import parse_date
+
+
+# Item ID → unit price for every priced item, loaded once and shared by all
+# requests.  No API edits a single price; everything that rewrites them (the
+# s05 price revision, the admin database reset) calls invalidate(), and every
+# simulation tick clears it too.  With several server workers a commit seen
+# through db.data_version() clears it, since another process's invalidate()
+# cannot reach this one.
+_price_list: Optional[Dict[str, float]] = None
+_generation = 0
+_data_version: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_price_list(*, conn=None) -> Dict[str, float]:
+    """Return the (cached) map of item ID → unit price."""
+    global _price_list
+    if config.SERVER_WORKERS > 1:
+        _sync_with_workers()
+    prices = _price_list
+    if prices is not None:
+        return prices
+    generation = _generation
+    sql = "SELECT id, unit_price FROM items WHERE unit_price IS NOT NULL"
+    if conn is not None:
+        prices = {r[0]: float(r[1]) for r in conn.execute(sql)}
+    else:
+        with db_conn() as c:
+            prices = {r[0]: float(r[1]) for r in c.execute(sql)}
+    with _lock:
+        # Drop the result if an invalidation raced with the load
+        if generation == _generation:
+            _price_list = prices
+    return prices
+
+
+def _sync_with_workers() -> None:
+    global _data_version
+    version = db.data_version()
+    if version != _data_version:
+        invalidate()
+        _data_version = version
+
+
+def invalidate() -> None:
+    """Forget the cached price list (call after changing ``items.unit_price``)."""
+    global _price_list, _generation
+    with _lock:
+        _generation += 1
+        _price_list = None
 
 
 def get_unit_price(item_id: str) -> float:
     """Get unit price for an item."""
-    with db_conn() as conn:
-        item_row = conn.execute("SELECT unit_price FROM items WHERE id = ?", (item_id,)).fetchone()
-        if item_row and item_row["unit_price"] is not None:
-            return float(item_row["unit_price"])
-        return config.PRICING_DEFAULT_UNIT_PRICE
+    return get_price_list().get(item_id, config.PRICING_DEFAULT_UNIT_PRICE)
+
+
+def volume_tier(total_qty: int) -> Optional[Tuple[int, float]]:
+    """The highest ``(min_qty, rate)`` of ``PRICING_VOLUME_TIERS`` that *total_qty* reaches."""
+    reached = None
+    for tier in sorted(config.PRICING_VOLUME_TIERS):
+        if total_qty >= tier[0]:
+            reached = tier
+    return reached
+
 
 def compute_totals(subtotal: float, total_qty: int) -> Dict[str, float]:
     """Compute discount and shipping based on subtotal and quantity.
@@ -26,17 +86,48 @@ def compute_totals(subtotal: float, total_qty: int) -> Dict[str, float]:
     Returns:
         Dict with 'discount' and 'shipping' keys
     """
-    discount = config.PRICING_VOLUME_DISCOUNT_PCT * subtotal if total_qty >= config.PRICING_VOLUME_QTY_THRESHOLD else 0.0
+    tier = volume_tier(total_qty)
+    discount = tier[1] * subtotal if tier else 0.0
     shipping = 0.0 if subtotal >= config.PRICING_FREE_SHIPPING_THRESHOLD else config.PRICING_FLAT_SHIPPING
     return {"discount": discount, "shipping": shipping}
 
+
+def price_lines(lines: List[Tuple[str, int]], *, conn=None) -> Dict[str, Any]:
+    """Price ``(item_id, qty)`` lines in one pass against the cached price list.
+
+    Returns ``lines`` (``item_id``/``qty``/``unit_price``/``line_total``),
+    ``subtotal``, ``total_qty`` and the :func:`compute_totals` keys plus
+    ``total``.
+    """
+    prices = get_price_list(conn=conn)
+    priced = []
+    for item_id, qty in lines:
+        unit_price = prices.get(item_id, config.PRICING_DEFAULT_UNIT_PRICE)
+        priced.append({"item_id": item_id, "qty": int(qty), "unit_price": unit_price, "line_total": int(qty) * unit_price})
+    subtotal = sum(line["line_total"] for line in priced)
+    total_qty = sum(line["qty"] for line in priced)
+    totals = compute_totals(subtotal, total_qty)
+    return {
+        "lines": priced,
+        "subtotal": subtotal,
+        "total_qty": total_qty,
+        **totals,
+        "total": subtotal - totals["discount"] + totals["shipping"],
+    }
+
+
 def find_substitutions(
     requested_item: Dict[str, Any],
     allowed_subs: List[str],
     price_slack_pct: float = None
 ) -> List[Dict[str, Any]]:
-    """Find substitute items based on type and price band."""
-    from services.inventory import inventory_service
+    """Find substitute items based on type and price band.
+
+    One query over items of the same type within the price band, joined
+    with their on-hand totals and reservations; only candidates with
+    positive available stock are returned.
+    """
+    from services.inventory import RESERVED_BY_ITEM_SQL
 
     if price_slack_pct is None:
         price_slack_pct = config.SUBSTITUTION_PRICE_SLACK_PCT
@@ -45,30 +136,35 @@ def find_substitutions(
     lower = base_price * (1 - price_slack_pct)
     upper = base_price * (1 + price_slack_pct)
 
+    sku_sql = f" AND i.sku IN ({','.join('?' for _ in allowed_subs)})" if allowed_subs else ""
     with db_conn() as conn:
-        candidates = conn.execute(
-            "SELECT id, sku, name, type FROM items WHERE type = ? AND id != ?",
-            (requested_item["type"], requested_item["id"]),
+        rows = conn.execute(
+            "SELECT i.id, i.sku, i.name, i.type, COALESCE(i.unit_price, ?) AS unit_price, "
+            "COALESCE(s.on_hand, 0) AS on_hand, COALESCE(r.reserved, 0) AS reserved "
+            "FROM items i "
+            "LEFT JOIN (SELECT item_id, SUM(on_hand) AS on_hand FROM stock GROUP BY item_id) s ON s.item_id = i.id "
+            f"LEFT JOIN ({RESERVED_BY_ITEM_SQL}) r ON r.item_id = i.id "
+            f"WHERE i.type = ? AND i.id != ? AND COALESCE(i.unit_price, ?) BETWEEN ? AND ?{sku_sql} "
+            "AND COALESCE(s.on_hand, 0) - COALESCE(r.reserved, 0) > 0 "
+            "ORDER BY i.rowid",
+            (config.PRICING_DEFAULT_UNIT_PRICE, requested_item["type"], requested_item["id"],
+             config.PRICING_DEFAULT_UNIT_PRICE, lower, upper, *(allowed_subs or ())),
         ).fetchall()
 
-        filtered: List[Dict[str, Any]] = []
-        for cand in candidates:
-            if allowed_subs and cand["sku"] not in allowed_subs:
-                continue
-            cand_price = get_unit_price(cand["id"])
-            if not (lower <= cand_price <= upper):
-                continue
-            cand_stock = inventory_service.get_stock_summary(cand["id"])
-            if cand_stock["available_total"] <= 0:
-                continue
-            filtered.append(
-                {
-                    "item": dict(cand),
-                    "unit_price": cand_price,
-                    "stock": cand_stock,
-                }
-            )
-        return filtered
+    return [
+        {
+            "item": {"id": r["id"], "sku": r["sku"], "name": r["name"], "type": r["type"]},
+            "unit_price": float(r["unit_price"]),
+            "stock": {
+                "item_id": r["id"],
+                "on_hand_total": r["on_hand"],
+                "reserved_total": r["reserved"],
+                "available_total": r["on_hand"] - r["reserved"],
+            },
+        }
+        for r in rows
+    ]
+
 
 def compute_pricing(sales_order_id: str) -> Dict[str, Any]:
     """Compute pricing for a sales order."""
@@ -80,36 +176,30 @@ def compute_pricing(sales_order_id: str) -> Dict[str, Any]:
         lines = cur.fetchall()
         if not lines:
             raise ValueError("Sales order has no lines")
-        line_totals = []
-        total_qty = 0
-        subtotal = 0.0
-        for row in lines:
-            qty = int(row["qty"])
-            total_qty += qty
-            unit_price = get_unit_price(row["item_id"])
-            line_total = qty * unit_price
-            subtotal += line_total
-            line_totals.append({"sku": row["sku"], "qty": qty, "unit_price": unit_price, "line_total": line_total})
+        priced = price_lines([(row["item_id"], row["qty"]) for row in lines], conn=conn)
 
-    totals = compute_totals(subtotal, total_qty)
-    discount = totals["discount"]
-    shipping = totals["shipping"]
-    total = subtotal - discount + shipping
+    line_totals = [
+        {"sku": row["sku"], "qty": line["qty"], "unit_price": line["unit_price"], "line_total": line["line_total"]}
+        for row, line in zip(lines, priced["lines"])
+    ]
+    discount = priced["discount"]
+    shipping = priced["shipping"]
+    tier = volume_tier(priced["total_qty"])
     return {
         "sales_order_id": sales_order_id,
         "pricing": {
             "currency": config.PRICING_CURRENCY,
-            "subtotal": subtotal,
+            "subtotal": priced["subtotal"],
             "discount": discount,
             "lines": line_totals,
             "discounts": []
             if discount == 0
             else [
-                {"type": "volume", "description": "24+ units discount", "amount": -discount}
+                {"type": "volume", "description": f"{tier[0]}+ units discount", "amount": -discount}
             ],
             "shipping": shipping,
             "shipping_note": "Free shipping threshold" if shipping == 0 else "Flat shipping",
-            "total": total,
+            "total": priced["total"],
         },
     }
 
@@ -133,20 +223,22 @@ def calculate_quote_options(sku: str, qty: int, delivery_date: Optional[str], al
     def next_id(idx: int) -> str:
         return f"OPT-{idx}"
 
+    item_ids = {sku: item["id"]}
+
     def option_eta(lines: List[Dict[str, Any]]) -> str:
-        stock_eta: Optional[str] = None
-        latest_prod_eta: Optional[str] = None
+        # Promise each SKU's total qty from the time-phased projection; SKUs
+        # that open supply cannot cover fall back to the production lead.
+        totals: Dict[str, int] = {}
+        leads: Dict[str, int] = {}
         for line in lines:
-            source = line.get("source", "")
-            if "production" in source:
-                lead = int(line.get("lead_days", production_lead_days))
-                eta_val = eta_from_days(lead + transit_days)
-                if latest_prod_eta is None or eta_val > latest_prod_eta:
-                    latest_prod_eta = eta_val
-            elif "stock" in source:
-                stock_eta = eta_from_days(transit_days)
-        candidate = latest_prod_eta or stock_eta or eta_from_days(transit_days)
-        return candidate
+            totals[line["sku"]] = totals.get(line["sku"], 0) + line["qty"]
+            if "production" in line.get("source", ""):
+                leads[line["sku"]] = int(line.get("lead_days", production_lead_days))
+        ready = max(
+            atp_service.promise_date(item_ids[line_sku], line_qty, leads.get(line_sku, production_lead_days))["date"]
+            for line_sku, line_qty in totals.items()
+        )
+        return (date.fromisoformat(ready) + timedelta(days=transit_days)).isoformat()
 
     def add_option(idx: int, summary: str, lines: List[Dict[str, Any]], notes: str) -> None:
         options.append(
@@ -195,6 +287,7 @@ def calculate_quote_options(sku: str, qty: int, delivery_date: Optional[str], al
     substitutions = find_substitutions(item, allowed_subs)
     for sub in substitutions:
         sub_item = sub["item"]
+        item_ids[sub_item["sku"]] = sub_item["id"]
         sub_avail = max(0, sub["stock"]["available_total"])
         if sub_avail <= 0:
             continue
@@ -232,8 +325,12 @@ def calculate_quote_options(sku: str, qty: int, delivery_date: Optional[str], al
 
 # Namespace for backward compatibility
 pricing_service = SimpleNamespace(
+    get_price_list=get_price_list,
+    invalidate=invalidate,
     get_unit_price=get_unit_price,
+    volume_tier=volume_tier,
     compute_totals=compute_totals,
+    price_lines=price_lines,
     find_substitutions=find_substitutions,
     compute_pricing=compute_pricing,
     calculate_quote_options=calculate_quote_options,
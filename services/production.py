@@ -6,7 +6,9 @@ from typing import Any, Dict, List, Optional
 
 from db import dict_rows, generate_id
 from utils import ui_href
-from services._base import db_conn
+from services._base import db_conn, write_transaction
+from services.atp import atp_service
+from services.scheduling import scheduling_service
 
 
 # ---------------------------------------------------------------------------
@@ -141,7 +143,7 @@ def create_order(recipe_id: str, sales_order_id: str, notes: Optional[str] = Non
     from services.inventory import inventory_service
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         recipe_data = recipe_service.get_recipe(recipe_id)
         shortfalls = []
         for ing in recipe_data["ingredients"]:
@@ -172,8 +174,10 @@ def create_order(recipe_id: str, sales_order_id: str, notes: Optional[str] = Non
                  op["operation_name"], op["duration_hours"],
                  op.get("work_center"), "pending"),
             )
-        conn.commit()
-        return {"production_order_id": order_id, "recipe_id": recipe_id, "output_item": recipe_data["output_sku"], "output_qty": recipe_data["output_qty"], "status": status, "eta_finish": eta_finish, "eta_ship": eta_ship, "ingredient_shortfalls": shortfalls, "ui_url": ui_href("production-orders", order_id)}
+        scheduling_service.replan(conn)
+        planned_finish = conn.execute("SELECT planned_finish FROM production_orders WHERE id = ?", (order_id,)).fetchone()[0]
+    atp_service.invalidate(recipe_data["output_item_id"], *(ing["input_item_id"] for ing in recipe_data["ingredients"]))
+    return {"production_order_id": order_id, "planned_finish": planned_finish, "recipe_id": recipe_id, "output_item": recipe_data["output_sku"], "output_qty": recipe_data["output_qty"], "status": status, "eta_finish": eta_finish, "eta_ship": eta_ship, "ingredient_shortfalls": shortfalls, "ui_url": ui_href("production-orders", order_id)}
 
 
 def start_order(production_order_id: str) -> Dict[str, Any]:
@@ -189,7 +193,7 @@ def start_order(production_order_id: str) -> Dict[str, Any]:
     from services.inventory import inventory_service
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         order = conn.execute("SELECT * FROM production_orders WHERE id = ?", (production_order_id,)).fetchone()
         if not order:
             raise ValueError(f"Production order {production_order_id} not found")
@@ -229,7 +233,6 @@ def start_order(production_order_id: str) -> Dict[str, Any]:
                 "UPDATE production_orders SET status = 'waiting' WHERE id = ?",
                 (production_order_id,),
             )
-            conn.commit()
             return {
                 "production_order_id": production_order_id,
                 "status": "waiting_for_stock",
@@ -238,11 +241,10 @@ def start_order(production_order_id: str) -> Dict[str, Any]:
             }
 
         # All ingredients available — deduct and start
-        for ing in ingredients:
-            inventory_service.deduct_stock(
-                ing["input_item_id"], ing["input_qty"], conn=conn,
-                reference_type="production_order", reference_id=production_order_id,
-            )
+        inventory_service.allocate_stock(
+            [(ing["input_item_id"], ing["input_qty"]) for ing in ingredients], conn=conn,
+            reference_type="production_order", reference_id=production_order_id,
+        )
 
         # Close any lingering waits (e.g. from a previous waiting→ready cycle)
         _close_open_waits(conn, production_order_id, sim_time)
@@ -258,7 +260,6 @@ def start_order(production_order_id: str) -> Dict[str, Any]:
             ")",
             (sim_time, production_order_id, production_order_id),
         )
-        conn.commit()
         return {"production_order_id": production_order_id, "status": "in_progress", "current_operation": current_operation, "message": f"Production order {production_order_id} started"}
 
 
@@ -273,7 +274,7 @@ def complete_order(production_order_id: str, qty_produced: int, warehouse: str,
     from services.simulation import simulation_service
     from services.qc import qc_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         order = conn.execute("SELECT * FROM production_orders WHERE id = ?", (production_order_id,)).fetchone()
         if not order:
             raise ValueError(f"Production order {production_order_id} not found")
@@ -285,6 +286,7 @@ def complete_order(production_order_id: str, qty_produced: int, warehouse: str,
         # Close any remaining open waits
         _close_open_waits(conn, production_order_id, sim_time)
         conn.execute("UPDATE production_orders SET status = 'completed', completed_at = ?, qty_produced = ?, current_operation = NULL WHERE id = ?", (sim_time, qty_produced, production_order_id))
+        scheduling_service.replan(conn)
 
         if order["inspection_required"]:
             # QC branch: hold the output, do not insert into stock
@@ -297,6 +299,7 @@ def complete_order(production_order_id: str, qty_produced: int, warehouse: str,
                 sim_time=sim_time,
             )
             conn.commit()
+            atp_service.invalidate(order["item_id"])
             return {
                 "production_order_id": production_order_id,
                 "status": "completed",
@@ -320,6 +323,7 @@ def complete_order(production_order_id: str, qty_produced: int, warehouse: str,
                 (movement_id, sim_time, order["item_id"], "production_in", qty_produced, stock_id, "production_order", production_order_id),
             )
             conn.commit()
+            atp_service.invalidate(order["item_id"])
             return {"production_order_id": production_order_id, "status": "completed", "qty_produced": qty_produced, "stock_id": stock_id, "warehouse": warehouse, "location": location, "message": f"Production order {production_order_id} completed, {qty_produced} units added to stock"}
 
 
@@ -333,7 +337,7 @@ def update_readiness() -> Dict[str, Any]:
     from services.simulation import simulation_service as _sim_svc
     sim_time = _sim_svc.get_current_time()
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         waiting = conn.execute(
             "SELECT po.id, po.recipe_id FROM production_orders po WHERE po.status = 'waiting'"
         ).fetchall()
@@ -362,8 +366,6 @@ def update_readiness() -> Dict[str, Any]:
                 _close_open_waits(conn, wo["id"], sim_time)
                 promoted.append(wo["id"])
 
-        if promoted:
-            conn.commit()
         return {"checked": len(waiting), "promoted_to_ready": promoted}
 
 
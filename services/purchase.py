@@ -5,7 +5,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 from db import generate_id
-from services._base import db_conn
+from services._base import db_conn, write_transaction
+from services.atp import atp_service
 
 
 def create_order(item_sku: str, qty: int, supplier_name: Optional[str]) -> Dict[str, Any]:
@@ -13,7 +14,7 @@ def create_order(item_sku: str, qty: int, supplier_name: Optional[str]) -> Dict[
     from services.catalog import catalog_service
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         item = catalog_service.load_item(item_sku)
         if not item:
             raise ValueError(f"Item {item_sku} not found")
@@ -33,8 +34,8 @@ def create_order(item_sku: str, qty: int, supplier_name: Optional[str]) -> Dict[
         expected_delivery = (sim_date + timedelta(days=supplier["lead_time_days"] if supplier["lead_time_days"] else 7)).isoformat()
         cost = item.get("cost_price") or item.get("unit_price") or 0
         conn.execute("INSERT INTO purchase_orders (id, supplier_id, item_id, qty, unit_price, total, currency, status, expected_delivery, ordered_at) VALUES (?, ?, ?, ?, ?, ?, 'EUR', 'ordered', ?, ?)", (po_id, supplier["id"], item["id"], qty, cost, cost * qty, expected_delivery, sim_time))
-        conn.commit()
-        return {"purchase_order_id": po_id, "supplier_name": supplier["name"], "item_sku": item_sku, "item_name": item["name"], "qty": qty, "status": "ordered", "expected_delivery": expected_delivery, "message": f"Purchase order {po_id} created for {qty} {item['uom']} of {item['name']} from {supplier['name']}"}
+    atp_service.invalidate(item["id"])
+    return {"purchase_order_id": po_id, "supplier_name": supplier["name"], "item_sku": item_sku, "item_name": item["name"], "qty": qty, "status": "ordered", "expected_delivery": expected_delivery, "message": f"Purchase order {po_id} created for {qty} {item['uom']} of {item['name']} from {supplier['name']}"}
 
 def restock_materials() -> Dict[str, Any]:
     """Check and create purchase orders for low stock items."""
@@ -50,7 +51,7 @@ def restock_materials() -> Dict[str, Any]:
 
 def receive(purchase_order_id: str, warehouse: str, location: str) -> Dict[str, Any]:
     """Receive a purchase order."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         po = conn.execute("SELECT po.*, i.sku as item_sku, i.name as item_name FROM purchase_orders po JOIN items i ON po.item_id = i.id WHERE po.id = ?", (purchase_order_id,)).fetchone()
         if not po:
             raise ValueError(f"Purchase order {purchase_order_id} not found")
@@ -68,8 +69,8 @@ def receive(purchase_order_id: str, warehouse: str, location: str) -> Dict[str,
             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (movement_id, sim_time, po["item_id"], "purchase_in", po["qty"], stock_id, "purchase_order", purchase_order_id),
         )
-        conn.commit()
-        return {"purchase_order_id": purchase_order_id, "item_sku": po["item_sku"], "item_name": po["item_name"], "qty_received": po["qty"], "stock_id": stock_id, "warehouse": warehouse, "location": location, "message": f"Purchase order {purchase_order_id} received, {po['qty']} units added to stock"}
+    atp_service.invalidate(po["item_id"])
+    return {"purchase_order_id": purchase_order_id, "item_sku": po["item_sku"], "item_name": po["item_name"], "qty_received": po["qty"], "stock_id": stock_id, "warehouse": warehouse, "location": location, "message": f"Purchase order {purchase_order_id} received, {po['qty']} units added to stock"}
 
 
 # Namespace for backward compatibility
@@ -12,11 +12,13 @@ import math
 import os
 from typing import Any
 
-from PIL import Image
-
 import config
 from db import dict_rows, generate_id
-from services._base import db_conn
+from services._base import db_conn, write_transaction
+from services.atp import atp_service
+from utils import lazy_import
+
+Image = lazy_import("PIL.Image")
 
 logger = logging.getLogger("duck-demo")
 
@@ -447,7 +449,7 @@ class QcService:
                         "description": desc,
                     })
 
-            with db_conn() as conn:
+            with write_transaction() as conn:
                 sim_time = simulation_service.get_current_time()
                 conn.execute(
                     "UPDATE qc_inspections SET status='completed', decision=?, "
@@ -484,7 +486,6 @@ class QcService:
                     "UPDATE qc_hold_batches SET status = 'inspected' WHERE id = ?",
                     (batch_id,),
                 )
-                conn.commit()
 
             logger.info(
                 "[QC Inspection] batch=%s — decision=%s ducks=%d findings=%d",
@@ -493,12 +494,11 @@ class QcService:
 
         except Exception as exc:
             logger.exception("[QC Inspection] batch=%s — inspection failed: %s", batch_id, exc)
-            with db_conn() as conn:
+            with write_transaction() as conn:
                 conn.execute(
                     "UPDATE qc_inspections SET status = 'failed' WHERE id = ?",
                     (inspection_id,),
                 )
-                conn.commit()
             raise
 
         return self._load_inspection(inspection_id=inspection_id)
@@ -525,7 +525,7 @@ class QcService:
         if action not in DISPOSITION_ACTIONS:
             raise ValueError(f"Invalid disposition action '{action}'. Must be one of: {DISPOSITION_ACTIONS}")
 
-        with db_conn() as conn:
+        with write_transaction() as conn:
             inspection = conn.execute(
                 "SELECT * FROM qc_inspections WHERE id = ?",
                 (qc_inspection_id,),
@@ -616,6 +616,7 @@ class QcService:
             )
 
             conn.commit()
+            atp_service.invalidate(batch["item_id"])
 
         return self._load_inspection(inspection_id=qc_inspection_id)
 
@@ -732,7 +733,7 @@ class QcService:
             logger.info("[QC Submit] Phase 1 — extracted label: %s", mo_id)
 
         # Phase 2: Validate MO and attach image
-        with db_conn() as conn:
+        with write_transaction() as conn:
             mo = conn.execute(
                 "SELECT id, inspection_status FROM production_orders WHERE id = ?",
                 (mo_id,),
@@ -761,7 +762,6 @@ class QcService:
                 "VALUES (?, ?, ?, ?, ?)",
                 (img_id, batch_id, img_bytes, sim_time, uploaded_by),
             )
-            conn.commit()
 
         # Phase 3: Run inspection
         logger.info(
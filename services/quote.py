@@ -10,14 +10,7 @@ from types import SimpleNamespace
 import config
 from db import dict_rows, generate_id
 from utils import ship_to_columns, ship_to_dict, ui_href, format_qty
-from services._base import db_conn
-
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_RIGHT, TA_CENTER
+from services._base import db_conn, write_transaction
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +26,7 @@ def create_quote(
     """Create a draft quote with frozen pricing."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         customer = conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
         if not customer:
             raise ValueError(f"Customer {customer_id} not found")
@@ -76,12 +69,12 @@ def create_quote(
         valid_until = (datetime.fromisoformat(sim_time) + timedelta(days=valid_days)).strftime("%Y-%m-%d")
 
         conn.execute(
-            "INSERT INTO quotes (id, customer_id, revision_number, requested_delivery_date, "
+            "INSERT INTO quotes (id, customer_id, revision_number, quote_chain_id, requested_delivery_date, "
             "ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, note, "
             "subtotal, discount, shipping, tax, total, currency, valid_until, status, created_at) "
-            "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'draft', ?)",
+            "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'draft', ?)",
             (
-                quote_id, customer_id, requested_delivery_date,
+                quote_id, customer_id, quote_id, requested_delivery_date,
                 *ship_to_columns(ship_to),
                 note,
                 subtotal, discount, shipping, tax, total, config.PRICING_CURRENCY,
@@ -96,8 +89,6 @@ def create_quote(
                 (line["id"], quote_id, line["item_id"], line["qty"], line["unit_price"], line["line_total"])
             )
 
-        conn.commit()
-
         return {
             "quote_id": quote_id,
             "customer_id": customer_id,
@@ -111,6 +102,49 @@ def create_quote(
         }
 
 
+# Revision chain of a quote whose quote_chain_id was never set: walk up
+# supersedes_quote_id to the root, then down to every later revision
+_LEGACY_CHAIN_SQL = """
+    WITH RECURSIVE up(id, supersedes) AS (
+        SELECT id, supersedes_quote_id FROM quotes WHERE id = ?
+        UNION
+        SELECT q.id, q.supersedes_quote_id FROM quotes q JOIN up ON q.id = up.supersedes
+    ),
+    chain(id) AS (
+        SELECT id FROM up WHERE supersedes IS NULL OR supersedes NOT IN (SELECT id FROM quotes)
+        UNION
+        SELECT q.id FROM quotes q JOIN chain ON q.supersedes_quote_id = chain.id
+    )
+    SELECT id FROM chain
+"""
+
+
+def get_revision_chain(quote_id: str, *, conn=None) -> List[Dict[str, Any]]:
+    """All revisions in *quote_id*'s chain, oldest first (empty if the quote does not exist).
+
+    One indexed query on ``quote_chain_id``; rows that predate the column
+    fall back to a recursive CTE over ``supersedes_quote_id``.
+    """
+    def _do(c) -> List[Dict[str, Any]]:
+        row = c.execute("SELECT quote_chain_id FROM quotes WHERE id = ?", (quote_id,)).fetchone()
+        if not row:
+            return []
+        if row[0]:
+            where, params = "quote_chain_id = ?", (row[0],)
+        else:
+            where, params = f"id IN ({_LEGACY_CHAIN_SQL})", (quote_id,)
+        return dict_rows(c.execute(
+            "SELECT id, revision_number, status, created_at, sent_at, accepted_at, rejected_at, "
+            f"supersedes_quote_id FROM quotes WHERE {where} ORDER BY revision_number",
+            params,
+        ))
+
+    if conn is not None:
+        return _do(conn)
+    with db_conn() as c:
+        return _do(c)
+
+
 def get_quote(quote_id: str) -> Optional[Dict[str, Any]]:
     """Get full quote details with customer, lines, and pricing."""
     with db_conn() as conn:
@@ -152,39 +186,13 @@ def get_quote(quote_id: str) -> Optional[Dict[str, Any]]:
         ).fetchone()
         sales_order_id = so_row[0] if so_row else None
 
-        # Build revision chain
-        revisions = []
-        # Walk backwards through supersedes chain to find the root
-        root_id = quote_id
-        visited = {root_id}
-        while True:
-            prev = conn.execute(
-                "SELECT supersedes_quote_id FROM quotes WHERE id = ?", (root_id,)
-            ).fetchone()
-            if prev and prev[0] and prev[0] not in visited:
-                root_id = prev[0]
-                visited.add(root_id)
-            else:
-                break
-        # Walk forward from root collecting all revisions
-        queue = [root_id]
-        all_ids = []
-        while queue:
-            current = queue.pop(0)
-            all_ids.append(current)
-            children = conn.execute(
-                "SELECT id FROM quotes WHERE supersedes_quote_id = ? ORDER BY revision_number",
-                (current,),
-            ).fetchall()
-            for child in children:
-                if child[0] not in all_ids:
-                    queue.append(child[0])
-        if len(all_ids) > 1:
-            placeholders = ",".join("?" for _ in all_ids)
-            revisions = dict_rows(conn.execute(
-                f"SELECT id, revision_number, status, created_at FROM quotes WHERE id IN ({placeholders}) ORDER BY revision_number",
-                all_ids,
-            ).fetchall())
+        chain = get_revision_chain(quote_id, conn=conn)
+        revisions = [
+            {k: r[k] for k in ("id", "revision_number", "status", "created_at")} for r in chain
+        ] if len(chain) > 1 else []
+        latest_revision = None
+        if chain and chain[-1]["id"] != quote_id:
+            latest_revision = {"id": chain[-1]["id"], "ui_url": ui_href("quotes", chain[-1]["id"])}
 
         result = {
             "quote": quote_dict,
@@ -192,6 +200,7 @@ def get_quote(quote_id: str) -> Optional[Dict[str, Any]]:
             "lines": lines,
             "superseded_quote": superseded_quote,
             "newer_revision": newer_revision_dict,
+            "latest_revision": latest_revision,
             "revisions": revisions,
         }
         if sales_order_id:
@@ -203,12 +212,19 @@ def list_quotes(
     customer_ids: Optional[List[str]] = None,
     status: Optional[str] = None,
     limit: int = 50,
-    show_superseded: bool = False
+    show_superseded: bool = False,
+    quote_chain_id: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """List quotes with optional filters. By default, hides superseded quotes."""
+    """List quotes with optional filters. By default, hides superseded quotes.
+
+    *quote_chain_id* restricts the list to the revisions of one chain.
+    """
     filters: List[str] = []
     params: List[Any] = []
 
+    if quote_chain_id:
+        filters.append("q.quote_chain_id = ?")
+        params.append(quote_chain_id)
     if customer_ids:
         placeholders = ','.join('?' * len(customer_ids))
         filters.append(f"q.customer_id IN ({placeholders})")
@@ -240,7 +256,7 @@ def send_quote(quote_id: str) -> Dict[str, Any]:
     from services.simulation import simulation_service
     from services.document import document_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         quote = conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
         if not quote:
             raise ValueError(f"Quote {quote_id} not found")
@@ -252,35 +268,34 @@ def send_quote(quote_id: str) -> Dict[str, Any]:
             "UPDATE quotes SET status = 'sent', sent_at = ? WHERE id = ?",
             (sim_time, quote_id)
         )
-        conn.commit()
-
-        try:
-            pdf_bytes = generate_quote_pdf(quote_id)
-            document_service.store_document(
-                entity_type="quote",
-                entity_id=quote_id,
-                document_type="quote_pdf",
-                content=pdf_bytes,
-                filename=f"quote_{quote_id}.pdf",
-                notes="Generated when quote was sent"
-            )
-        except Exception as e:
-            logger.error(f"Failed to generate PDF for {quote_id}: {e}")
-            pdf_warning = f"PDF generation failed: {e}"
-        else:
-            pdf_warning = None
 
-        result = {
-            "quote_id": quote_id,
-            "status": "sent",
-            "sent_at": sim_time,
-            "valid_until": quote["valid_until"],
-            "ui_url": ui_href("quotes", quote_id),
-            "message": f"\U0001f4e8 Quote {quote_id} sent to customer (valid until {quote['valid_until']})"
-        }
-        if pdf_warning:
-            result["warning"] = pdf_warning
-        return result
+    try:
+        pdf_bytes = generate_quote_pdf(quote_id)
+        document_service.store_document(
+            entity_type="quote",
+            entity_id=quote_id,
+            document_type="quote_pdf",
+            content=pdf_bytes,
+            filename=f"quote_{quote_id}.pdf",
+            notes="Generated when quote was sent"
+        )
+    except Exception as e:
+        logger.error(f"Failed to generate PDF for {quote_id}: {e}")
+        pdf_warning = f"PDF generation failed: {e}"
+    else:
+        pdf_warning = None
+
+    result = {
+        "quote_id": quote_id,
+        "status": "sent",
+        "sent_at": sim_time,
+        "valid_until": quote["valid_until"],
+        "ui_url": ui_href("quotes", quote_id),
+        "message": f"\U0001f4e8 Quote {quote_id} sent to customer (valid until {quote['valid_until']})"
+    }
+    if pdf_warning:
+        result["warning"] = pdf_warning
+    return result
 
 
 def accept_quote(quote_id: str) -> Dict[str, Any]:
@@ -288,7 +303,7 @@ def accept_quote(quote_id: str) -> Dict[str, Any]:
     from services.simulation import simulation_service
     from services.sales import sales_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         quote = conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
         if not quote:
             raise ValueError(f"Quote {quote_id} not found")
@@ -333,7 +348,6 @@ def accept_quote(quote_id: str) -> Dict[str, Any]:
             "UPDATE quotes SET status = 'accepted', accepted_at = ? WHERE id = ?",
             (sim_time, quote_id)
         )
-        conn.commit()
 
         return {
             "quote_id": quote_id,
@@ -349,7 +363,7 @@ def reject_quote(quote_id: str, reason: Optional[str] = None) -> Dict[str, Any]:
     """Reject a quote."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         quote = conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
         if not quote:
             raise ValueError(f"Quote {quote_id} not found")
@@ -365,7 +379,6 @@ def reject_quote(quote_id: str, reason: Optional[str] = None) -> Dict[str, Any]:
             "UPDATE quotes SET status = 'rejected', rejected_at = ?, note = ? WHERE id = ?",
             (sim_time, note, quote_id)
         )
-        conn.commit()
 
         return {
             "quote_id": quote_id,
@@ -379,7 +392,7 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
     """Create a new revision of a quote, marking the old one as superseded."""
     from services.simulation import simulation_service
 
-    with db_conn() as conn:
+    with write_transaction() as conn:
         original_quote = conn.execute("SELECT * FROM quotes WHERE id = ?", (quote_id,)).fetchone()
         if not original_quote:
             raise ValueError(f"Quote {quote_id} not found")
@@ -396,6 +409,15 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
 
         new_revision_num = original_quote["revision_number"] + 1
         new_quote_id = f"{base_id}-R{new_revision_num}"
+        chain_id = original_quote["quote_chain_id"]
+        if not chain_id:
+            # Pre-migration chain: stamp its revisions so the new one joins them
+            legacy = [q["id"] for q in get_revision_chain(quote_id, conn=conn)] or [quote_id]
+            chain_id = legacy[0]
+            conn.execute(
+                f"UPDATE quotes SET quote_chain_id = ? WHERE id IN ({','.join('?' for _ in legacy)})",
+                (chain_id, *legacy),
+            )
 
         sim_time = simulation_service.get_current_time()
 
@@ -433,8 +455,10 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
             })
 
         total_qty = sum(line["qty"] for line in lines_to_use)
-        discount = config.PRICING_VOLUME_DISCOUNT_PCT * subtotal if total_qty >= config.PRICING_VOLUME_QTY_THRESHOLD else 0.0
-        shipping = 0.0 if subtotal >= config.PRICING_FREE_SHIPPING_THRESHOLD else config.PRICING_FLAT_SHIPPING
+        from services.pricing import pricing_service
+        totals = pricing_service.compute_totals(subtotal, total_qty)
+        discount = totals["discount"]
+        shipping = totals["shipping"]
         tax = 0.0
         total = subtotal - discount + shipping + tax
 
@@ -442,12 +466,12 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
         valid_until = (datetime.fromisoformat(sim_time) + timedelta(days=valid_days)).strftime("%Y-%m-%d")
 
         conn.execute(
-            "INSERT INTO quotes (id, customer_id, revision_number, supersedes_quote_id, requested_delivery_date, "
-            "ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, note, "
+            "INSERT INTO quotes (id, customer_id, revision_number, supersedes_quote_id, quote_chain_id, "
+            "requested_delivery_date, ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, note, "
             "subtotal, discount, shipping, tax, total, currency, valid_until, status, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'draft', ?)",
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'draft', ?)",
             (
-                new_quote_id, original_quote["customer_id"], new_revision_num, quote_id, requested_delivery_date,
+                new_quote_id, original_quote["customer_id"], new_revision_num, quote_id, chain_id, requested_delivery_date,
                 *ship_to_columns(ship_to),
                 note,
                 subtotal, discount, shipping, tax, total, config.PRICING_CURRENCY,
@@ -467,12 +491,11 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
             (quote_id,)
         )
 
-        conn.commit()
-
         return {
             "quote_id": new_quote_id,
             "revision_number": new_revision_num,
             "supersedes": quote_id,
+            "quote_chain_id": chain_id,
             "status": "draft",
             "total": total,
             "currency": config.PRICING_CURRENCY,
@@ -484,6 +507,13 @@ def revise_quote(quote_id: str, changes: Optional[Dict[str, Any]] = None) -> Dic
 
 def generate_quote_pdf(quote_id: str) -> bytes:
     """Generate a PDF for a quote using ReportLab."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.enums import TA_RIGHT, TA_CENTER
+
     quote_data = get_quote(quote_id)
     if not quote_data:
         raise ValueError(f"Quote {quote_id} not found")
@@ -636,6 +666,7 @@ def generate_quote_pdf(quote_id: str) -> bytes:
 quote_service = SimpleNamespace(
     create_quote=create_quote,
     get_quote=get_quote,
+    get_revision_chain=get_revision_chain,
     list_quotes=list_quotes,
     send_quote=send_quote,
     accept_quote=accept_quote,
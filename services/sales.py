@@ -1,14 +1,24 @@
 """Service for sales order operations."""
 
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from types import SimpleNamespace
 
-from db import dict_rows, generate_id
+import config
+from db import dict_rows, generate_id, generate_ids
 from utils import ship_to_columns, ui_href
-from services._base import db_conn
+from services._base import db_conn, keyset_condition, page_cursor, write_transaction
+from services.activity import activity_service
+from services.archive import archive_service
 from services.catalog import catalog_service
 from services.simulation import simulation_service
 from services.pricing import pricing_service
+from services.scheduling import scheduling_service
+from services.atp import atp_service
+
+# Production orders that can still move the delivery date; completed or
+# cancelled MOs keep their stale planned_finish and must not set the ETA.
+_OPEN_MO_STATUSES = ("planned", "waiting", "ready", "in_progress")
 
 
 def create_order(
@@ -30,7 +40,7 @@ def create_order(
     if not quote_id:
         raise ValueError("quote_id is required — every sales order must originate from a quote")
     ship_to = ship_to or {}
-    with db_conn() as conn:
+    with write_transaction() as conn:
         so_id = generate_id(conn, "SO", "sales_orders")
         sim_time = simulation_service.get_current_time()
 
@@ -51,10 +61,9 @@ def create_order(
                 line["line_total"] = up * qty
                 subtotal += line["line_total"]
                 total_qty += qty
-            import config as _cfg
-            discount = _cfg.PRICING_VOLUME_DISCOUNT_PCT * subtotal if total_qty >= _cfg.PRICING_VOLUME_QTY_THRESHOLD else 0.0
-            shipping = 0.0 if subtotal >= _cfg.PRICING_FREE_SHIPPING_THRESHOLD else _cfg.PRICING_FLAT_SHIPPING
-            p = {"subtotal": subtotal, "discount": discount, "shipping": shipping, "tax": 0.0, "total": subtotal - discount + shipping, "currency": _cfg.PRICING_CURRENCY}
+            totals = pricing_service.compute_totals(subtotal, total_qty)
+            discount, shipping = totals["discount"], totals["shipping"]
+            p = {"subtotal": subtotal, "discount": discount, "shipping": shipping, "tax": 0.0, "total": subtotal - discount + shipping, "currency": config.PRICING_CURRENCY}
 
         conn.execute(
             "INSERT INTO sales_orders (id, quote_id, customer_id, requested_delivery_date, "
@@ -67,6 +76,7 @@ def create_order(
              p["total"], p["currency"], "draft", sim_time))
 
         line_results = []
+        item_ids = []
         for idx, line in enumerate(lines, start=1):
             item = catalog_service.load_item(line["sku"])
             if not item:
@@ -78,20 +88,169 @@ def create_order(
                 "INSERT INTO sales_order_lines (id, sales_order_id, item_id, qty, unit_price, line_total) VALUES (?, ?, ?, ?, ?, ?)",
                 (line_id, so_id, item["id"], int(line["qty"]), unit_price, line_total))
             line_results.append({"line_id": line_id, "sku": line["sku"], "qty": int(line["qty"]), "unit_price": unit_price, "line_total": line_total})
-        conn.commit()
-        return {"sales_order_id": so_id, "status": "draft", "lines": line_results, "total": p["total"], "currency": p["currency"], "ui_url": ui_href("orders", so_id)}
+            item_ids.append(item["id"])
+    atp_service.invalidate(*item_ids)
+    return {"sales_order_id": so_id, "status": "draft", "lines": line_results, "total": p["total"], "currency": p["currency"], "ui_url": ui_href("orders", so_id)}
+
+
+def _bulk_order_error(order: Dict[str, Any], customers: set, items: Dict[str, Any]) -> Optional[str]:
+    """Return why *order* cannot be ingested, or ``None`` when it is valid."""
+    if order.get("customer_id") not in customers:
+        return f"Customer {order.get('customer_id')} not found"
+    lines = order.get("lines")
+    if not lines:
+        return "lines required"
+    for line in lines:
+        if line.get("sku") not in items:
+            return f"Unknown SKU {line.get('sku')}"
+        qty = line.get("qty")
+        if not isinstance(qty, int) or isinstance(qty, bool) or qty <= 0:
+            return f"Invalid qty {qty!r} for {line['sku']}"
+    return None
+
+
+def bulk_create_orders(orders: List[Dict[str, Any]], confirm: bool = True, actor: str = "system") -> Dict[str, Any]:
+    """Validate, price and book many orders in one transaction.
+
+    Each order dict takes ``customer_id``, ``lines`` (``sku``/``qty``) and
+    optionally ``requested_delivery_date``, ``ship_to`` and ``note``.  Every
+    valid order becomes an accepted quote plus a sales order (confirmed
+    unless *confirm* is false) with the same frozen pricing the single-order
+    flow produces.  Customers and items are looked up once for the whole
+    batch, IDs are reserved up front and all rows are written with
+    ``executemany`` before a single commit.
+
+    Invalid orders do not abort the batch: they are reported in
+    ``results`` with ``status: "error"`` and skipped.  Quote PDFs are not
+    generated here; the PDF route renders them on demand.
+    """
+    if len(orders) > config.SALES_BULK_MAX_ORDERS:
+        raise ValueError(f"At most {config.SALES_BULK_MAX_ORDERS} orders per bulk call (got {len(orders)})")
+
+    with write_transaction() as conn:
+        sim_time = simulation_service.get_current_time()
+        valid_until = (datetime.fromisoformat(sim_time) + timedelta(days=config.QUOTE_VALIDITY_DAYS)).strftime("%Y-%m-%d")
+
+        customer_ids = list({o.get("customer_id") for o in orders if isinstance(o.get("customer_id"), str)})
+        skus = list({l.get("sku") for o in orders for l in (o.get("lines") or []) if isinstance(l.get("sku"), str)})
+        customers = {
+            r[0] for r in conn.execute(
+                f"SELECT id FROM customers WHERE id IN ({','.join('?' for _ in customer_ids)})", customer_ids
+            )
+        } if customer_ids else set()
+        items = {
+            r["sku"]: r for r in conn.execute(
+                f"SELECT id, sku FROM items WHERE sku IN ({','.join('?' for _ in skus)})", skus
+            )
+        } if skus else {}
+
+        results: List[Dict[str, Any]] = []
+        valid = []
+        for index, order in enumerate(orders):
+            error = _bulk_order_error(order, customers, items)
+            if error:
+                results.append({"index": index, "status": "error", "error": error})
+            else:
+                valid.append((index, order))
+
+        quote_ids = generate_ids(conn, "QUOTE", "quotes", len(valid))
+        so_ids = generate_ids(conn, "SO", "sales_orders", len(valid))
+        so_status = "confirmed" if confirm else "draft"
+        quote_rows, quote_line_rows, so_rows, so_line_rows, activity = [], [], [], [], []
+        item_ids = set()
+
+        for (index, order), quote_id, so_id in zip(valid, quote_ids, so_ids):
+            pricing = pricing_service.price_lines([(items[l["sku"]]["id"], l["qty"]) for l in order["lines"]], conn=conn)
+            priced = [(l["item_id"], l["qty"], l["unit_price"], l["line_total"]) for l in pricing["lines"]]
+            item_ids.update(p[0] for p in priced)
+            subtotal, total = pricing["subtotal"], pricing["total"]
+            head = (
+                order["customer_id"], order.get("requested_delivery_date"), *ship_to_columns(order.get("ship_to") or {}),
+            )
+            money = (subtotal, pricing["discount"], pricing["shipping"], 0.0, total, config.PRICING_CURRENCY)
+
+            quote_rows.append((quote_id, *head, order.get("note"), *money, valid_until, sim_time, sim_time, sim_time, quote_id))
+            so_rows.append((so_id, quote_id, *head, f"Created from quote {quote_id}", *money, so_status, sim_time))
+            for idx, line in enumerate(priced, start=1):
+                quote_line_rows.append((f"{quote_id}-{idx:02d}", quote_id, *line))
+                so_line_rows.append((f"{so_id}-{idx:02d}", so_id, *line))
+
+            activity += [
+                {"actor": actor, "category": "sales", "action": "quote.created", "entity_type": "quote",
+                 "entity_id": quote_id, "details": {"customer_id": order["customer_id"]}},
+                {"actor": actor, "category": "sales", "action": "quote.accepted", "entity_type": "quote",
+                 "entity_id": quote_id, "details": {"sales_order_id": so_id}},
+                {"actor": actor, "category": "sales", "action": "sales_order.created", "entity_type": "sales_order",
+                 "entity_id": so_id},
+            ]
+            if confirm:
+                activity.append({"actor": actor, "category": "sales", "action": "sales_order.confirmed",
+                                 "entity_type": "sales_order", "entity_id": so_id})
+            results.append({
+                "index": index, "status": "created", "quote_id": quote_id, "sales_order_id": so_id,
+                "total": total, "currency": config.PRICING_CURRENCY, "ui_url": ui_href("orders", so_id),
+            })
+
+        conn.executemany(
+            "INSERT INTO quotes (id, customer_id, requested_delivery_date, "
+            "ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, note, "
+            "subtotal, discount, shipping, tax, total, currency, valid_until, created_at, sent_at, accepted_at, "
+            "revision_number, quote_chain_id, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, 'accepted')",
+            quote_rows,
+        )
+        conn.executemany(
+            "INSERT INTO quote_lines (id, quote_id, item_id, qty, unit_price, line_total) VALUES (?, ?, ?, ?, ?, ?)",
+            quote_line_rows,
+        )
+        conn.executemany(
+            "INSERT INTO sales_orders (id, quote_id, customer_id, requested_delivery_date, "
+            "ship_to_line1, ship_to_line2, ship_to_postal_code, ship_to_city, ship_to_country, "
+            "note, subtotal, discount, shipping, tax, total, currency, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            so_rows,
+        )
+        conn.executemany(
+            "INSERT INTO sales_order_lines (id, sales_order_id, item_id, qty, unit_price, line_total) VALUES (?, ?, ?, ?, ?, ?)",
+            so_line_rows,
+        )
+        activity_service.log_batch(activity, conn=conn)
+
+    atp_service.invalidate(*item_ids)
+    results.sort(key=lambda r: r["index"])
+    return {"created": len(valid), "failed": len(orders) - len(valid), "results": results}
+
 
+def search_orders(customer_ids: Optional[List[str]], limit: int, sort: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Return recent sales orders.
 
-def search_orders(customer_ids: Optional[List[str]], limit: int, sort: str) -> Dict[str, Any]:
-    """Return recent sales orders."""
-    order_clause = "ORDER BY created_at DESC" if sort == "most_recent" else "ORDER BY id"
+    Pass the previous page's ``next_cursor`` as *cursor* to continue the
+    listing with a keyset seek.
+    """
+    # created_at is nullable; NULL sorts as '' (oldest) and stays seekable
+    if sort == "most_recent":
+        seek_columns, sort_keys, descending = ("COALESCE(created_at, '')", "id"), ("sort_created_at", "id"), True
+        order_clause = "ORDER BY COALESCE(created_at, '') DESC, id DESC"
+    else:
+        seek_columns, sort_keys, descending = ("id",), ("id",), False
+        order_clause = "ORDER BY id"
+    conditions: List[str] = []
+    params: List[Any] = []
+    if customer_ids:
+        placeholders = ','.join('?' * len(customer_ids))
+        conditions.append(f"customer_id IN ({placeholders})")
+        params.extend(customer_ids)
+    if cursor:
+        seek_sql, seek_params = keyset_condition(seek_columns, cursor, descending)
+        conditions.append(seek_sql)
+        params.extend(seek_params)
+    where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
     with db_conn() as conn:
-        if customer_ids:
-            placeholders = ','.join('?' * len(customer_ids))
-            cur = conn.execute(f"SELECT * FROM sales_orders WHERE customer_id IN ({placeholders}) {order_clause} LIMIT ?", (*customer_ids, limit))
-        else:
-            cur = conn.execute(f"SELECT * FROM sales_orders {order_clause} LIMIT ?", (limit,))
-        rows = cur.fetchall()
+        cur = conn.execute(
+            f"SELECT *, COALESCE(created_at, '') AS sort_created_at FROM sales_orders{where} {order_clause} LIMIT ?",
+            (*params, limit + 1),
+        )
+        rows, next_cursor = page_cursor(cur.fetchall(), sort_keys, limit)
         sales_orders = []
         for row in rows:
             line_cur = conn.execute("SELECT i.sku, sol.qty FROM sales_order_lines sol JOIN items i ON sol.item_id = i.id WHERE sol.sales_order_id = ?", (row["id"],))
@@ -105,7 +264,7 @@ def search_orders(customer_ids: Optional[List[str]], limit: int, sort: str) -> D
             customer_name = customer_row["name"] if customer_row else None
             customer_company = customer_row["company"] if customer_row else None
             sales_orders.append({"sales_order_id": row["id"], "quote_id": row["quote_id"], "customer_id": row["customer_id"], "customer_name": customer_name, "customer_company": customer_company, "created_at": row["created_at"], "summary": summary, "fulfillment_state": fulfillment_state, "lines": lines, "total": row["total"], "currency": row["currency"], "ui_url": ui_href("orders", row["id"])})
-        return {"sales_orders": sales_orders}
+        return {"sales_orders": sales_orders, "next_cursor": next_cursor}
 
 
 def get_order_details(sales_order_id: str) -> Optional[Dict[str, Any]]:
@@ -133,27 +292,37 @@ def get_order_details(sales_order_id: str) -> Optional[Dict[str, Any]]:
         order_dict["ui_url"] = ui_href("orders", sales_order_id)
         for shipment in shipments:
             shipment["ui_url"] = ui_href("shipments", shipment["id"])
-        return {"sales_order": order_dict, "customer": customer_dict, "lines": lines, "pricing": pricing, "shipments": shipments}
+        production_orders = scheduling_service.get_order_etas(conn, sales_order_id)
+        return {
+            "sales_order": order_dict,
+            "customer": customer_dict,
+            "lines": lines,
+            "pricing": pricing,
+            "shipments": shipments,
+            "production_orders": production_orders,
+            "production_eta": max(
+                (mo["planned_finish"] for mo in production_orders if mo["planned_finish"] and mo["status"] in _OPEN_MO_STATUSES),
+                default=None,
+            ),
+        }
 
 
 def link_shipment(sales_order_id: str, shipment_id: str) -> Dict[str, Any]:
     """Link an existing shipment to a sales order."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         conn.execute("INSERT OR IGNORE INTO sales_order_shipments (sales_order_id, shipment_id) VALUES (?, ?)", (sales_order_id, shipment_id))
-        conn.commit()
         return {"status": "linked"}
 
 
 def confirm_order(sales_order_id: str) -> Dict[str, Any]:
     """Confirm a draft sales order (draft -> confirmed)."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         order = conn.execute("SELECT * FROM sales_orders WHERE id = ?", (sales_order_id,)).fetchone()
         if not order:
             raise ValueError(f"Sales order {sales_order_id} not found")
         if order["status"] != "draft":
             raise ValueError(f"Sales order {sales_order_id} is not draft (current status: {order['status']})")
         conn.execute("UPDATE sales_orders SET status = 'confirmed' WHERE id = ?", (sales_order_id,))
-        conn.commit()
         return {
             "sales_order_id": sales_order_id,
             "status": "confirmed",
@@ -164,7 +333,7 @@ def confirm_order(sales_order_id: str) -> Dict[str, Any]:
 
 def complete_order(sales_order_id: str) -> Dict[str, Any]:
     """Mark a sales order as completed."""
-    with db_conn() as conn:
+    with write_transaction() as conn:
         order = conn.execute("SELECT * FROM sales_orders WHERE id = ?", (sales_order_id,)).fetchone()
         if not order:
             raise ValueError(f"Sales order {sales_order_id} not found")
@@ -173,13 +342,16 @@ def complete_order(sales_order_id: str) -> Dict[str, Any]:
         if order["status"] != "confirmed":
             raise ValueError(f"Sales order {sales_order_id} must be confirmed before completing (current status: {order['status']})")
         conn.execute("UPDATE sales_orders SET status = 'completed' WHERE id = ?", (sales_order_id,))
-        conn.commit()
-        return {
-            "sales_order_id": sales_order_id,
-            "status": "completed",
-            "message": f"Sales order {sales_order_id} completed",
-            "ui_url": ui_href("orders", sales_order_id),
-        }
+        item_ids = [r[0] for r in conn.execute(
+            "SELECT item_id FROM sales_order_lines WHERE sales_order_id = ?", (sales_order_id,)
+        )]
+    atp_service.invalidate(*item_ids)
+    return {
+        "sales_order_id": sales_order_id,
+        "status": "completed",
+        "message": f"Sales order {sales_order_id} completed",
+        "ui_url": ui_href("orders", sales_order_id),
+    }
 
 
 def get_order_timeline(sales_order_id: str) -> Optional[Dict[str, Any]]:
@@ -197,21 +369,11 @@ def get_order_timeline(sales_order_id: str) -> Optional[Dict[str, Any]]:
         # ---- Quote revision chain ----
         quotes: List[Dict[str, Any]] = []
         if so["quote_id"]:
-            # Walk backwards through supersedes_quote_id
-            seen: set = set()
-            q_id: Optional[str] = so["quote_id"]
-            while q_id and q_id not in seen:
-                seen.add(q_id)
-                q_row = conn.execute(
-                    "SELECT id, revision_number, status, created_at, sent_at, "
-                    "accepted_at, rejected_at, supersedes_quote_id FROM quotes WHERE id = ?",
-                    (q_id,),
-                ).fetchone()
-                if not q_row:
-                    break
-                quotes.append(dict(q_row))
-                q_id = q_row["supersedes_quote_id"]
-            quotes.reverse()  # oldest first
+            from services.quote import get_revision_chain
+            # The order's quote and the revisions it superseded, oldest first
+            chain = get_revision_chain(so["quote_id"], conn=conn)
+            ordered = next((q["revision_number"] for q in chain if q["id"] == so["quote_id"]), None)
+            quotes = [q for q in chain if q["revision_number"] <= ordered]
 
         # ---- Production orders + operations + waits ----
         mo_rows = conn.execute(
@@ -306,8 +468,13 @@ def get_fulfillment_sources(sales_order_id: str) -> Optional[Dict[str, Any]]:
             (sales_order_id,),
         ).fetchall()
 
+        # Batches picked for a shipment may have been received long before
+        history = archive_service.source(conn, "stock_movements", None)
+
         shipments = []
         for ship in ship_rows:
+            # Picks of an emptied batch move to the archive once they age out
+            picks = archive_service.source(conn, "stock_movements", ship["dispatched_at"])
             # Trace each deduction back to its source batch
             source_rows = conn.execute(
                 "SELECT sm_out.item_id, i.sku AS item_sku, i.name AS item_name, "
@@ -315,9 +482,9 @@ def get_fulfillment_sources(sales_order_id: str) -> Optional[Dict[str, Any]]:
                 "       sm_in.movement_type AS source_type, "
                 "       sm_in.reference_id AS source_id, "
                 "       sm_in.timestamp AS source_timestamp "
-                "FROM stock_movements sm_out "
+                f"FROM {picks} sm_out "
                 "JOIN items i ON sm_out.item_id = i.id "
-                "LEFT JOIN stock_movements sm_in "
+                f"LEFT JOIN {history} sm_in "
                 "  ON sm_in.stock_id = sm_out.stock_id "
                 "  AND sm_in.movement_type IN ('production_in', 'purchase_in', 'adjustment') "
                 "WHERE sm_out.reference_type = 'shipment' "
@@ -368,7 +535,11 @@ def get_supply_chain_trace(shipment_ids: list[str], cutoff_date: Optional[str] =
     Args:
         shipment_ids: List of shipment IDs to trace
         cutoff_date: Optional cutoff date to exclude pre-existing stock
-                     (typically the sales order creation date)
+                     (typically the sales order creation date).  Shipment
+                     movements are only read from the archive when it
+                     predates the archive boundary, or when no cutoff is
+                     given; the production and purchase history behind a
+                     shipped batch is always read including the archive.
 
     Returns a graph with ``nodes`` and ``edges`` suitable for flow rendering.
     """
@@ -376,13 +547,18 @@ def get_supply_chain_trace(shipment_ids: list[str], cutoff_date: Optional[str] =
         return {"nodes": [], "edges": []}
 
     with db_conn() as conn:
+        # Shipments before the cutoff can only matter when it reaches into the archive
+        movements = archive_service.source(conn, "stock_movements", cutoff_date)
+        # A batch shipped now may have been produced or purchased long before
+        history = archive_service.source(conn, "stock_movements", None)
+
         # --- Layer 1: shipments → FG batches consumed ----------------------
         placeholders = ','.join('?' * len(shipment_ids))
         fg_rows = conn.execute(
             f"SELECT sm.reference_id AS shipment_id, sm.stock_id AS fg_stock_id, "
             f"       sm.item_id, i.sku AS fg_sku, i.name AS fg_name, "
             f"       -sm.qty AS qty, sm.timestamp "
-            f"FROM stock_movements sm "
+            f"FROM {movements} sm "
             f"JOIN items i ON sm.item_id = i.id "
             f"WHERE sm.movement_type = 'shipment_out' "
             f"  AND sm.reference_id IN ({placeholders})",
@@ -438,7 +614,7 @@ def get_supply_chain_trace(shipment_ids: list[str], cutoff_date: Optional[str] =
         for stk_id in fg_stock_ids:
             prod_row = conn.execute(
                 "SELECT reference_id AS mo_id, timestamp "
-                "FROM stock_movements "
+                f"FROM {history} "
                 "WHERE stock_id = ? AND movement_type = 'production_in'",
                 (stk_id,),
             ).fetchone()
@@ -470,7 +646,7 @@ def get_supply_chain_trace(shipment_ids: list[str], cutoff_date: Optional[str] =
                 "SELECT sm.stock_id AS rm_stock_id, sm.item_id, "
                 "       i.sku AS rm_sku, i.name AS rm_name, "
                 "       -sm.qty AS qty, sm.timestamp "
-                "FROM stock_movements sm "
+                f"FROM {history} sm "
                 "JOIN items i ON sm.item_id = i.id "
                 "WHERE sm.reference_id = ? AND sm.movement_type = 'production_consume'",
                 (mo_id,),
@@ -481,7 +657,7 @@ def get_supply_chain_trace(shipment_ids: list[str], cutoff_date: Optional[str] =
                 # Find the PO that delivered this RM batch
                 po_row = conn.execute(
                     "SELECT reference_id AS po_id, timestamp "
-                    "FROM stock_movements "
+                    f"FROM {history} "
                     "WHERE stock_id = ? AND movement_type = 'purchase_in'",
                     (rm_stk,),
                 ).fetchone()
@@ -571,6 +747,7 @@ def get_supply_chain_trace_for_order(sales_order_id: str) -> Optional[Dict[str,
 
 sales_service = SimpleNamespace(
     create_order=create_order,
+    bulk_create_orders=bulk_create_orders,
     search_orders=search_orders,
     get_order_details=get_order_details,
     get_order_timeline=get_order_timeline,
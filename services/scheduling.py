@@ -0,0 +1,253 @@
+"""Finite-capacity work-center scheduling.
+
+Plans every open production operation onto its work center, honouring
+``work_centers.max_concurrent`` and the operation sequence within each MO:
+
+    - operations already in progress keep their slot until they finish;
+    - whenever a slot frees up, the waiting operation with the best priority
+      takes it (non-delay dispatch);
+    - priority is EDD (earliest requested delivery date of the parent sales
+      order, then MO age) or FIFO (MO age only).
+
+The result is written to ``production_operations.planned_start/planned_end``
+and ``production_orders.planned_start/planned_finish``.  ``eta_finish`` is
+left alone — the simulation's safety net still keys off it.
+
+Planning runs in memory in O(n log n) for n open operations; ``replan``
+rewrites only the rows whose plan changed, so it is cheap to call after
+every MO creation or completion.
+"""
+
+import heapq
+import logging
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from services._base import db_conn
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_RULES = ("edd", "fifo")
+
+# MO statuses whose remaining operations get planned
+OPEN_MO_STATUSES = ("planned", "waiting", "ready", "in_progress")
+
+# Sort key for MOs without a requested delivery date under EDD
+_NO_DUE_DATE = "9999-12-31"
+
+# (op_id, work_center, duration_hours, started_offset_hours or None)
+PlanOp = Tuple[str, Optional[str], float, Optional[float]]
+
+
+# ---------------------------------------------------------------------------
+# Core algorithm
+# ---------------------------------------------------------------------------
+
+def _mo_age_key(mo_id: str) -> Tuple[int, str]:
+    # IDs are zero-padded to four digits, so longer IDs are newer
+    return len(mo_id), mo_id
+
+
+def compute_schedule(
+    orders: List[Tuple[str, Optional[str], List[PlanOp]]],
+    capacity: Dict[str, int],
+    rule: str = "edd",
+) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, Tuple[float, float]]]:
+    """Plan *orders* onto work centers with finite *capacity*.
+
+    *orders* holds ``(mo_id, due_date, ops)`` with the MO's remaining
+    operations in sequence order.  Times are hours relative to now: an
+    in-progress operation carries its (usually negative) start offset, all
+    other operations are released at 0.  Work centers missing from
+    *capacity* are treated as unconstrained.
+
+    Returns ``(op_plan, mo_plan)`` mapping operation ID → ``(start, end)``
+    and MO ID → ``(start, finish)``, in hours from now.
+    """
+    if rule not in DISPATCH_RULES:
+        raise ValueError(f"Unknown dispatch rule '{rule}' (expected one of {', '.join(DISPATCH_RULES)})")
+
+    op_plan: Dict[str, Tuple[float, float]] = {}
+    mo_plan: Dict[str, Tuple[float, float]] = {}
+    busy: Dict[str, int] = {wc: 0 for wc in capacity}
+    ready: Dict[str, list] = {wc: [] for wc in capacity}
+    events: list = []  # (end, seq, order index)
+    cursor = [0] * len(orders)
+    priority = [
+        ((due or _NO_DUE_DATE) if rule == "edd" else "", _mo_age_key(mo_id))
+        for mo_id, due, _ in orders
+    ]
+    seq = 0
+
+    def start(idx: int, at: float) -> None:
+        nonlocal seq
+        op_id, wc, duration, _ = orders[idx][2][cursor[idx]]
+        op_plan[op_id] = (at, at + duration)
+        if orders[idx][0] not in mo_plan:
+            mo_plan[orders[idx][0]] = (at, at)
+        if wc in busy:
+            busy[wc] += 1
+        seq += 1
+        heapq.heappush(events, (at + duration, seq, idx))
+
+    def release(idx: int, at: float, touched: set) -> None:
+        ops = orders[idx][2]
+        if cursor[idx] >= len(ops):
+            mo_id = orders[idx][0]
+            mo_plan[mo_id] = (mo_plan.get(mo_id, (at, at))[0], at)
+            return
+        wc = ops[cursor[idx]][1]
+        if wc in ready:
+            heapq.heappush(ready[wc], (priority[idx], idx))
+            touched.add(wc)
+        else:
+            start(idx, at)
+
+    def dispatch(wc: str, at: float) -> None:
+        queue = ready[wc]
+        while queue and busy[wc] < capacity[wc]:
+            _, idx = heapq.heappop(queue)
+            start(idx, at)
+
+    touched: set = set()
+    for idx, (mo_id, _, ops) in enumerate(orders):
+        if not ops:
+            mo_plan[mo_id] = (0.0, 0.0)
+            continue
+        op_id, wc, duration, started = ops[0]
+        if started is not None:
+            # Running operation: keeps its slot until it is due to finish
+            end = max(started + duration, 0.0)
+            op_plan[op_id] = (started, end)
+            mo_plan[mo_id] = (started, end)
+            if wc in busy:
+                busy[wc] += 1
+            seq += 1
+            heapq.heappush(events, (end, seq, idx))
+        else:
+            release(idx, 0.0, touched)
+    for wc in sorted(touched):
+        dispatch(wc, 0.0)
+
+    while events:
+        now = events[0][0]
+        touched = set()
+        # Free every slot that ends at this instant before dispatching, so
+        # priority decides between operations released at the same time
+        while events and events[0][0] == now:
+            _, _, idx = heapq.heappop(events)
+            wc = orders[idx][2][cursor[idx]][1]
+            if wc in busy:
+                busy[wc] -= 1
+                touched.add(wc)
+            cursor[idx] += 1
+            release(idx, now, touched)
+        for wc in sorted(touched):
+            dispatch(wc, now)
+
+    return op_plan, mo_plan
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def _fmt(base: datetime, hours: float) -> str:
+    return (base + timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def replan(conn=None, rule: Optional[str] = None) -> Dict[str, Any]:
+    """Recompute the finite-capacity plan for all open MOs and store it.
+
+    Only operations and MOs whose planned times changed are updated.  Pass
+    *conn* to plan inside the caller's transaction (the caller commits).
+    """
+    rule = rule or config.SCHEDULING_DISPATCH_RULE
+
+    def _inner(c) -> Dict[str, Any]:
+        now = datetime.fromisoformat(
+            c.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()[0]
+        )
+        capacity = {r["name"]: r["max_concurrent"] for r in c.execute("SELECT name, max_concurrent FROM work_centers")}
+        marks = ",".join("?" for _ in OPEN_MO_STATUSES)
+        rows = c.execute(
+            "SELECT po.id AS mo_id, po.planned_start AS mo_planned_start, "
+            "po.planned_finish AS mo_planned_finish, so.requested_delivery_date AS due, "
+            "op.id, op.work_center, op.duration_hours, op.status, op.started_at, "
+            "op.planned_start, op.planned_end "
+            "FROM production_orders po "
+            "LEFT JOIN sales_orders so ON so.id = po.sales_order_id "
+            "JOIN production_operations op ON op.production_order_id = po.id "
+            f"WHERE po.status IN ({marks}) AND op.status != 'completed' "
+            "ORDER BY po.id, op.sequence_order",
+            OPEN_MO_STATUSES,
+        ).fetchall()
+
+        orders: List[Tuple[str, Optional[str], List[PlanOp]]] = []
+        stored_ops: Dict[str, Tuple] = {}
+        stored_mos: Dict[str, Tuple] = {}
+        for r in rows:
+            if not orders or orders[-1][0] != r["mo_id"]:
+                orders.append((r["mo_id"], r["due"], []))
+                stored_mos[r["mo_id"]] = (r["mo_planned_start"], r["mo_planned_finish"])
+            started = None
+            if r["status"] == "in_progress" and r["started_at"] and not orders[-1][2]:
+                started = (datetime.fromisoformat(r["started_at"]) - now).total_seconds() / 3600
+            orders[-1][2].append((r["id"], r["work_center"], r["duration_hours"] or 0.0, started))
+            stored_ops[r["id"]] = (r["planned_start"], r["planned_end"])
+
+        op_plan, mo_plan = compute_schedule(orders, capacity, rule)
+
+        op_updates = []
+        for op_id, (s, e) in op_plan.items():
+            planned = (_fmt(now, s), _fmt(now, e))
+            if planned != stored_ops[op_id]:
+                op_updates.append((*planned, op_id))
+        mo_updates = []
+        for mo_id, (s, f) in mo_plan.items():
+            planned = (_fmt(now, s), _fmt(now, f))
+            if planned != stored_mos[mo_id]:
+                mo_updates.append((*planned, mo_id))
+        if op_updates:
+            c.executemany("UPDATE production_operations SET planned_start = ?, planned_end = ? WHERE id = ?", op_updates)
+        if mo_updates:
+            c.executemany("UPDATE production_orders SET planned_start = ?, planned_finish = ? WHERE id = ?", mo_updates)
+
+        return {
+            "rule": rule,
+            "planned_operations": len(op_plan),
+            "planned_orders": len(mo_plan),
+            "updated_operations": len(op_updates),
+            "updated_orders": len(mo_updates),
+            "last_finish": _fmt(now, max((f for _, f in mo_plan.values()), default=0.0)),
+        }
+
+    if conn is not None:
+        return _inner(conn)
+    with db_conn() as c:
+        result = _inner(c)
+        c.commit()
+        return result
+
+
+def get_order_etas(conn, sales_order_id: str) -> List[Dict[str, Any]]:
+    """Planned start/finish of the MOs serving *sales_order_id*."""
+    return [dict(r) for r in conn.execute(
+        "SELECT id AS production_order_id, status, planned_start, planned_finish, eta_finish "
+        "FROM production_orders WHERE sales_order_id = ? ORDER BY id",
+        (sales_order_id,),
+    )]
+
+
+# ---------------------------------------------------------------------------
+# Service singleton
+# ---------------------------------------------------------------------------
+
+scheduling_service = SimpleNamespace(
+    compute_schedule=compute_schedule,
+    replan=replan,
+    get_order_etas=get_order_etas,
+)
+SchedulingService = scheduling_service
@@ -1,10 +1,13 @@
 """Service for managing simulated time."""
 
+import time
 from types import SimpleNamespace
 from typing import Any, Dict, Optional
 
 import config
-from services._base import db_conn
+import events
+import metrics
+from services._base import db_conn, write_transaction
 
 
 def get_current_time() -> str:
@@ -20,6 +23,17 @@ def get_current_time() -> str:
             )
         return result[0]
 
+# advance_time result keys that report business events (int count or list of IDs)
+_TICK_EVENT_KEYS = (
+    "invoices_marked_overdue",
+    "production_orders_completed",
+    "shipments_delivered",
+    "quotes_expired",
+    "production_orders_promoted",
+    "history_archived",
+)
+
+
 def advance_time(
     hours: Optional[float] = None,
     days: Optional[int] = None,
@@ -39,43 +53,72 @@ def advance_time(
             - expire sent quotes whose valid_until has passed
             - promote waiting production orders to ready when materials available
             - mark overdue invoices
+            - archive history older than ARCHIVE_RETENTION_DAYS (when set)
 
     Returns:
         Dictionary with old_time, new_time, and side-effect counts
     """
+    t0 = time.perf_counter()
+    result = _advance_time(hours, days, to_time, side_effects)
+    # "Today" moved and side effects touched stock and orders across items
+    from services.atp import atp_service
+    from services.pricing import pricing_service
+    atp_service.invalidate()
+    pricing_service.invalidate()
+    events.notify_changed()
+    metrics.SIM_TICK_DURATION.observe(time.perf_counter() - t0)
+    for key in _TICK_EVENT_KEYS:
+        value = result.get(key)
+        if value:
+            metrics.SIM_EVENTS.inc(key, amount=value if isinstance(value, int) else len(value))
+    return result
+
+
+def _advance_time(
+    hours: Optional[float],
+    days: Optional[int],
+    to_time: Optional[str],
+    side_effects: bool,
+) -> Dict[str, Any]:
+    # Each phase below is its own write transaction: the tick never holds the
+    # write lock for long, and concurrent writers never see a half-done phase.
     with db_conn() as conn:
-        old_time = conn.execute(
-            "SELECT sim_time FROM simulation_state WHERE id = 1"
-        ).fetchone()
-        if old_time is None:
-            raise RuntimeError(
-                "simulation_state row missing — the database was not properly initialised. "
-                "Run 'python seed_demo.py' or 'python -m scenarios' to populate it."
-            )
-        old_time = old_time[0]
-        if to_time:
-            conn.execute(
-                "UPDATE simulation_state SET sim_time = ? WHERE id = 1",
-                (to_time,)
-            )
-        elif hours:
-            conn.execute(
-                "UPDATE simulation_state SET sim_time = datetime(sim_time, ? || ' hours') WHERE id = 1",
-                (f'+{hours}',)
-            )
-        elif days:
-            conn.execute(
-                "UPDATE simulation_state SET sim_time = datetime(sim_time, ? || ' days') WHERE id = 1",
-                (f'+{days}',)
-            )
-        else:
-            raise ValueError("Must specify hours, days, or to_time")
+        with write_transaction():
+            old_time = conn.execute(
+                "SELECT sim_time FROM simulation_state WHERE id = 1"
+            ).fetchone()
+            if old_time is None:
+                raise RuntimeError(
+                    "simulation_state row missing — the database was not properly initialised. "
+                    "Run 'python seed_demo.py' or 'python -m scenarios' to populate it."
+                )
+            old_time = old_time[0]
+            if to_time:
+                conn.execute(
+                    "UPDATE simulation_state SET sim_time = ? WHERE id = 1",
+                    (to_time,)
+                )
+            elif hours:
+                conn.execute(
+                    "UPDATE simulation_state SET sim_time = datetime(sim_time, ? || ' hours') WHERE id = 1",
+                    (f'+{hours}',)
+                )
+            elif days:
+                conn.execute(
+                    "UPDATE simulation_state SET sim_time = datetime(sim_time, ? || ' days') WHERE id = 1",
+                    (f'+{days}',)
+                )
+            else:
+                raise ValueError("Must specify hours, days, or to_time")
 
-        conn.commit()
+            new_time = conn.execute(
+                "SELECT sim_time FROM simulation_state WHERE id = 1"
+            ).fetchone()[0]
 
-        new_time = conn.execute(
-            "SELECT sim_time FROM simulation_state WHERE id = 1"
-        ).fetchone()[0]
+            # Leaving a sim-day: stock still holds that day's closing position
+            if new_time[:10] > old_time[:10]:
+                from services.stock_history import stock_history_service
+                stock_history_service.take_snapshot(old_time[:10], conn=conn)
 
         result: Dict[str, Any] = {
             "old_time": old_time,
@@ -98,20 +141,53 @@ def advance_time(
             log_activity("system", "billing", "invoice.overdue", details={"count": overdue_count}, timestamp=new_time)
 
         # --- Side-effect 2: auto-complete production orders ---
-        # Phase A: tick operations for all in-progress MOs based on elapsed time
-        from services.production import advance_operations
-        from db import generate_id
-        completed_mos = []
-        all_in_progress = conn.execute(
-            "SELECT po.id, po.item_id, r.output_qty "
-            "FROM production_orders po "
-            "JOIN recipes r ON po.recipe_id = r.id "
-            "WHERE po.status = 'in_progress' "
-            "ORDER BY po.started_at",
-        ).fetchall()
-        for mo in all_in_progress:
-            op_result = advance_operations(mo["id"], new_time, conn=conn)
-            if op_result["all_done"]:
+        with write_transaction():
+            # Phase A: tick operations for all in-progress MOs based on elapsed time
+            from services.production import advance_operations
+            from db import generate_id
+            completed_mos = []
+            all_in_progress = conn.execute(
+                "SELECT po.id, po.item_id, r.output_qty "
+                "FROM production_orders po "
+                "JOIN recipes r ON po.recipe_id = r.id "
+                "WHERE po.status = 'in_progress' "
+                "ORDER BY po.started_at",
+            ).fetchall()
+            for mo in all_in_progress:
+                op_result = advance_operations(mo["id"], new_time, conn=conn)
+                if op_result["all_done"]:
+                    conn.execute(
+                        "UPDATE production_orders SET status = 'completed', "
+                        "completed_at = ?, qty_produced = ?, current_operation = NULL WHERE id = ?",
+                        (new_time, mo["output_qty"], mo["id"]),
+                    )
+                    stock_id = generate_id(conn, "STK", "stock")
+                    conn.execute(
+                        "INSERT INTO stock (id, item_id, warehouse, location, on_hand) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (stock_id, mo["item_id"], config.LOC_FINISHED_GOODS, config.LOC_PRODUCTION_OUT, mo["output_qty"]),
+                    )
+                    # Log stock movement for production output
+                    mov_id = generate_id(conn, "MOV", "stock_movements")
+                    conn.execute(
+                        "INSERT INTO stock_movements (id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (mov_id, new_time, mo["item_id"], "production_in", mo["output_qty"], stock_id, "production_order", mo["id"]),
+                    )
+                    completed_mos.append(mo["id"])
+
+            # Phase B: safety-net — force-complete MOs past eta_finish that
+            # weren't caught by operation ticking (e.g. missing operation rows)
+            stragglers = conn.execute(
+                "SELECT po.id, po.item_id, po.started_at, r.output_qty "
+                "FROM production_orders po "
+                "JOIN recipes r ON po.recipe_id = r.id "
+                "WHERE po.status = 'in_progress' AND po.eta_finish IS NOT NULL AND po.eta_finish <= ?",
+                (new_date,)
+            ).fetchall()
+            for mo in stragglers:
+                from services.production import _finalize_all_operations
+                _finalize_all_operations(conn, mo["id"], mo["started_at"], new_time)
                 conn.execute(
                     "UPDATE production_orders SET status = 'completed', "
                     "completed_at = ?, qty_produced = ?, current_operation = NULL WHERE id = ?",
@@ -131,82 +207,53 @@ def advance_time(
                     (mov_id, new_time, mo["item_id"], "production_in", mo["output_qty"], stock_id, "production_order", mo["id"]),
                 )
                 completed_mos.append(mo["id"])
+            if completed_mos:
+                result["production_orders_completed"] = completed_mos
+                from services.activity import log_batch
+                log_batch([
+                    {"actor": "system", "category": "production", "action": "production_order.completed",
+                     "entity_type": "production_order", "entity_id": mo_id, "timestamp": new_time}
+                    for mo_id in completed_mos
+                ], conn=conn)
 
-        # Phase B: safety-net — force-complete MOs past eta_finish that
-        # weren't caught by operation ticking (e.g. missing operation rows)
-        stragglers = conn.execute(
-            "SELECT po.id, po.item_id, po.started_at, r.output_qty "
-            "FROM production_orders po "
-            "JOIN recipes r ON po.recipe_id = r.id "
-            "WHERE po.status = 'in_progress' AND po.eta_finish IS NOT NULL AND po.eta_finish <= ?",
-            (new_date,)
-        ).fetchall()
-        for mo in stragglers:
-            from services.production import _finalize_all_operations
-            _finalize_all_operations(conn, mo["id"], mo["started_at"], new_time)
-            conn.execute(
-                "UPDATE production_orders SET status = 'completed', "
-                "completed_at = ?, qty_produced = ?, current_operation = NULL WHERE id = ?",
-                (new_time, mo["output_qty"], mo["id"]),
-            )
-            stock_id = generate_id(conn, "STK", "stock")
-            conn.execute(
-                "INSERT INTO stock (id, item_id, warehouse, location, on_hand) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (stock_id, mo["item_id"], config.LOC_FINISHED_GOODS, config.LOC_PRODUCTION_OUT, mo["output_qty"]),
-            )
-            # Log stock movement for production output
-            mov_id = generate_id(conn, "MOV", "stock_movements")
-            conn.execute(
-                "INSERT INTO stock_movements (id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (mov_id, new_time, mo["item_id"], "production_in", mo["output_qty"], stock_id, "production_order", mo["id"]),
-            )
-            completed_mos.append(mo["id"])
-        if completed_mos:
-            conn.commit()
-            result["production_orders_completed"] = completed_mos
-            from services.activity import log_batch
-            log_batch([
-                {"actor": "system", "category": "production", "action": "production_order.completed",
-                 "entity_type": "production_order", "entity_id": mo_id, "timestamp": new_time}
-                for mo_id in completed_mos
-            ])
+            # Phase C: re-plan the remaining operations from the new time
+            from services.scheduling import scheduling_service
+            scheduling_service.replan(conn)
 
         # --- Side-effect 3: auto-deliver shipments ---
-        delivered_ships = []
-        in_transit = conn.execute(
-            "SELECT id FROM shipments "
-            "WHERE status = 'in_transit' AND planned_arrival IS NOT NULL AND planned_arrival <= ?",
-            (new_date,)
-        ).fetchall()
-        for ship in in_transit:
-            conn.execute(
-                "UPDATE shipments SET status = 'delivered', delivered_at = ? WHERE id = ?",
-                (new_time, ship["id"],)
-            )
-            delivered_ships.append(ship["id"])
-        if delivered_ships:
-            conn.commit()
-            result["shipments_delivered"] = delivered_ships
-            from services.activity import log_batch
-            log_batch([
-                {"actor": "system", "category": "logistics", "action": "shipment.delivered",
-                 "entity_type": "shipment", "entity_id": sid, "timestamp": new_time}
-                for sid in delivered_ships
-            ])
+        with write_transaction():
+            delivered_ships = []
+            in_transit = conn.execute(
+                "SELECT id FROM shipments "
+                "WHERE status = 'in_transit' AND planned_arrival IS NOT NULL AND planned_arrival <= ?",
+                (new_date,)
+            ).fetchall()
+            for ship in in_transit:
+                conn.execute(
+                    "UPDATE shipments SET status = 'delivered', delivered_at = ? WHERE id = ?",
+                    (new_time, ship["id"],)
+                )
+                delivered_ships.append(ship["id"])
+            if delivered_ships:
+                result["shipments_delivered"] = delivered_ships
+                from services.activity import log_batch
+                log_batch([
+                    {"actor": "system", "category": "logistics", "action": "shipment.delivered",
+                     "entity_type": "shipment", "entity_id": sid, "timestamp": new_time}
+                    for sid in delivered_ships
+                ], conn=conn)
 
         # --- Side-effect 4: expire quotes ---
-        expired_count = conn.execute(
-            "UPDATE quotes SET status = 'expired' "
-            "WHERE status = 'sent' AND valid_until IS NOT NULL AND valid_until < ?",
-            (new_date,)
-        ).rowcount
-        if expired_count > 0:
-            result["quotes_expired"] = expired_count
-            from services.activity import log_activity
-            log_activity("system", "sales", "quote.expired", details={"count": expired_count}, timestamp=new_time)
-        conn.commit()  # release write lock before update_readiness opens a new connection
+        with write_transaction():
+            expired_count = conn.execute(
+                "UPDATE quotes SET status = 'expired' "
+                "WHERE status = 'sent' AND valid_until IS NOT NULL AND valid_until < ?",
+                (new_date,)
+            ).rowcount
+            if expired_count > 0:
+                result["quotes_expired"] = expired_count
+                from services.activity import log_activity
+                log_activity("system", "sales", "quote.expired", details={"count": expired_count}, timestamp=new_time)
 
         # --- Side-effect 5: promote waiting → ready production orders ---
         from services.production import production_service
@@ -220,6 +267,12 @@ def advance_time(
                 for mo_id in readiness["promoted_to_ready"]
             ])
 
+        # --- Side-effect 6: move history past the retention window to the archive ---
+        from services.archive import archive_service
+        archived = archive_service.run_retention()
+        if archived["archived"]:
+            result["history_archived"] = archived["archived"]
+
         return result
 
 
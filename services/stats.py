@@ -26,6 +26,9 @@ def get_statistics(
         """Get flexible statistics for any entity, optionally returning a chart."""
         import config as cfg
 
+        if entity == "stock_history":
+            return _stock_history_statistics(group_by, item_ids, date_from, date_to, limit, return_chart, chart_title)
+
         entity_config = {
             "customers": {"table": "customers", "join": None, "field_mapping": {}, "date_field_table": None, "valid_fields": ["id"], "valid_groups": ["city", "company"], "date_fields": ["created_at"]},
             "sales_orders": {"table": "sales_orders", "join": None, "field_mapping": {}, "date_field_table": None, "valid_fields": ["id"], "valid_groups": ["status", "customer_id"], "date_fields": ["created_at", "requested_delivery_date"]},
@@ -141,7 +144,9 @@ def get_statistics(
                         if entity == "stock":
                             return {
                                 "error": f"stock table has no date fields (it's a current snapshot, not historical data). "
-                                        f"For inventory changes over time, use transaction tables:\n"
+                                        f"For on-hand quantities over time use entity='stock_history', group_by='date' "
+                                f"(or ['date', 'item_id']) with date_from/date_to.\n"
+                                f"For inventory changes over time, use transaction tables:\n"
                                         f"  - Production: entity='production_orders', metric='sum', field='qty', group_by='date:completed_at'\n"
                                         f"  - Shipments: entity='shipment_lines', metric='sum', field='qty', group_by='date:planned_departure'\n"
                                         f"  - Purchases: entity='purchase_orders', metric='sum', field='qty', group_by='date:received_at'"
@@ -202,6 +207,53 @@ def get_statistics(
                 result_row = conn.execute(sql, params).fetchone()
                 return {"entity": entity, "metric": metric, "value": result_row["value"] if result_row["value"] is not None else 0}
 
+def _stock_history_statistics(
+        group_by: Optional[Union[str, List[str]]],
+        item_ids: Optional[List[str]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        limit: int,
+        return_chart: Optional[str],
+        chart_title: Optional[str],
+    ) -> Dict[str, Any]:
+        """End-of-day on-hand quantities reconstructed from snapshots and movements."""
+        from services.simulation import simulation_service
+        from services.stock_history import stock_history_service
+
+        groups = group_by if isinstance(group_by, list) else ([group_by] if group_by else [])
+        groups = ["date" if g.split(":", 1)[0] == "date" else g for g in groups]
+        for g in groups:
+            if g not in ("date", "item_id"):
+                return {"error": f"Invalid group_by '{g}' for entity 'stock_history'. Valid: ['date', 'item_id']"}
+        date_to = date_to or simulation_service.get_current_time()[:10]
+
+        if "date" in groups:
+            if not date_from:
+                return {"error": "date_from is required to group stock_history by date"}
+            data = stock_history_service.get_series(date_from, date_to, item_ids)
+            series, days = data["series"], data["days"]
+            if groups == ["date"]:
+                rows = [{"date": day, "value": sum(values[n] for values in series.values())} for n, day in enumerate(days)]
+            else:
+                # Chart the `limit` items with the largest closing quantity
+                top = sorted(series, key=lambda i: series[i][-1] if series[i] else 0, reverse=True)[:limit]
+                rows = [{"date": day, "item_id": item_id, "value": series[item_id][n]} for item_id in top for n, day in enumerate(days)]
+        else:
+            positions = stock_history_service.get_on_hand_as_of(date_to, item_ids)
+            if not groups:
+                return {"entity": "stock_history", "metric": "sum", "as_of": date_to, "value": sum(positions.values())}
+            rows = [{"item_id": i, "value": q} for i, q in sorted(positions.items(), key=lambda p: p[1], reverse=True)[:limit]]
+
+        result: Dict[str, Any] = {"entity": "stock_history", "metric": "sum", "group_by": group_by, "results": rows}
+        if return_chart:
+            chart_group = groups if len(groups) > 1 else groups[0]
+            chart_result = _generate_chart_from_results(return_chart, rows, chart_group, chart_title, "stock_history", "sum")
+            if "error" in chart_result:
+                return chart_result
+            result["chart_url"] = chart_result["chart_url"]
+            result["chart_filename"] = chart_result["chart_filename"]
+        return result
+
 def _generate_chart_from_results(
         chart_type: str,
         rows: List[Dict[str, Any]],
@@ -232,17 +284,14 @@ def _generate_chart_from_results(
             labels = sorted(list(labels_set))
             series_names = sorted(list(series_set))
 
-            series_data = []
-            for series_name in series_names:
-                values = []
-                for label in labels:
-                    value = 0
-                    for row in rows:
-                        if str(row[label_field]) == label and str(row[series_field]) == series_name:
-                            value = row.get("value", 0)
-                            break
-                    values.append(value)
-                series_data.append({"name": series_name, "values": values})
+            # First row wins for a (label, series) pair
+            cells: Dict[tuple, Any] = {}
+            for row in rows:
+                cells.setdefault((str(row[label_field]), str(row[series_field])), row.get("value", 0))
+            series_data = [
+                {"name": series_name, "values": [cells.get((label, series_name), 0) for label in labels]}
+                for series_name in series_names
+            ]
 
             title = chart_title or f"{entity.replace('_', ' ').title()} by {label_field} and {series_field}"
             chart_result = chart_service.generate_chart(
@@ -0,0 +1,174 @@
+"""Point-in-time inventory: daily snapshots plus the stock_movements ledger.
+
+When a simulation tick leaves a sim-day, the closing on-hand quantity of
+every item is stored in ``inventory_snapshots`` for that day.  The
+position at the end of any day is then the nearest anchor — a snapshot
+before or after the day, or the live ``stock`` table — adjusted by the
+movements in between, so no query replays the whole ledger.
+
+Quantities are per item (summed over warehouses): emptied stock rows are
+deleted, so movements cannot be attributed to a warehouse after the fact.
+Only movements with a ``stock_id`` change stock; QC scrap movements do not.
+"""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from services._base import db_conn, write_transaction
+from services.archive import archive_service
+
+
+def _next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def _item_filter(item_ids: Optional[List[str]]):
+    if not item_ids:
+        return "", []
+    return f" AND item_id IN ({','.join('?' for _ in item_ids)})", list(item_ids)
+
+
+def take_snapshot(day: str, *, conn=None) -> int:
+    """Store the current on-hand quantity of every item as the closing position of *day*."""
+    def _do(c) -> int:
+        c.execute("DELETE FROM inventory_snapshots WHERE day = ?", (day,))
+        return c.execute(
+            "INSERT INTO inventory_snapshots (day, item_id, on_hand) "
+            "SELECT ?, item_id, SUM(on_hand) FROM stock GROUP BY item_id HAVING SUM(on_hand) != 0",
+            (day,),
+        ).rowcount
+
+    if conn is not None:
+        return _do(conn)
+    with write_transaction() as c:
+        return _do(c)
+
+
+def _movement_totals(conn, start: str, end: Optional[str], item_ids, by_day: bool = False):
+    """Sum stock-changing movements with ``start <= timestamp < end`` (days, *end* open if None)."""
+    source = archive_service.source(conn, "stock_movements", start)
+    item_sql, item_params = _item_filter(item_ids)
+    end_sql, end_params = (" AND timestamp < ?", [end]) if end else ("", [])
+    day_col = "substr(timestamp, 1, 10)"
+    return conn.execute(
+        f"SELECT item_id, {day_col if by_day else 'NULL'} AS day, SUM(qty) AS qty FROM {source} "
+        f"WHERE timestamp >= ?{end_sql} AND stock_id IS NOT NULL{item_sql} "
+        f"GROUP BY item_id{', ' + day_col if by_day else ''}",
+        [start, *end_params, *item_params],
+    ).fetchall()
+
+
+def _positions(conn, day: str, item_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """Closing on-hand per item at the end of *day*, from the nearest anchor."""
+    today = conn.execute("SELECT sim_time FROM simulation_state WHERE id = 1").fetchone()[0][:10]
+    item_sql, item_params = _item_filter(item_ids)
+    if day >= today:
+        rows = conn.execute(
+            f"SELECT item_id, SUM(on_hand) FROM stock WHERE 1 = 1{item_sql} GROUP BY item_id", item_params
+        ).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    before = conn.execute("SELECT MAX(day) FROM inventory_snapshots WHERE day <= ?", (day,)).fetchone()[0]
+    after = conn.execute("SELECT MIN(day) FROM inventory_snapshots WHERE day > ?", (day,)).fetchone()[0]
+    gap = lambda a, b: (date.fromisoformat(b) - date.fromisoformat(a)).days  # noqa: E731
+    # (distance in days, anchor day or None for live stock, roll forward?)
+    anchors = [(gap(day, today), None, False)]
+    if after:
+        anchors.append((gap(day, after), after, False))
+    if before:
+        anchors.append((gap(before, day), before, True))
+    _, anchor, forward = min(anchors, key=lambda a: a[0])
+
+    if anchor is None:
+        base = conn.execute(
+            f"SELECT item_id, SUM(on_hand) FROM stock WHERE 1 = 1{item_sql} GROUP BY item_id", item_params
+        ).fetchall()
+    else:
+        base = conn.execute(
+            f"SELECT item_id, on_hand FROM inventory_snapshots WHERE day = ?{item_sql}", [anchor, *item_params]
+        ).fetchall()
+    positions = {r[0]: r[1] for r in base}
+
+    if forward:
+        # Roll forward: movements after the snapshot day, through *day*
+        deltas, sign = _movement_totals(conn, _next_day(anchor), _next_day(day), item_ids), 1
+    else:
+        # Roll back: undo movements after *day*, up to the anchor
+        end = _next_day(anchor) if anchor else None
+        deltas, sign = _movement_totals(conn, _next_day(day), end, item_ids), -1
+    for r in deltas:
+        positions[r["item_id"]] = positions.get(r["item_id"], 0) + sign * r["qty"]
+    return positions
+
+
+def get_on_hand_as_of(day: str, item_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """On-hand quantity per item at the end of *day* (``YYYY-MM-DD``); zero positions omitted."""
+    with db_conn() as conn:
+        positions = _positions(conn, day[:10], item_ids)
+    return {item_id: qty for item_id, qty in positions.items() if qty}
+
+
+def get_series(date_from: str, date_to: str, item_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """End-of-day on-hand per item for every day in ``[date_from, date_to]``.
+
+    One anchor lookup for *date_from*, then one grouped query for the daily
+    movement totals of the whole range.  Returns ``days`` and ``series``
+    (item ID → list of quantities aligned with ``days``).
+    """
+    date_from, date_to = date_from[:10], date_to[:10]
+    days = []
+    d = date.fromisoformat(date_from)
+    while d.isoformat() <= date_to:
+        days.append(d.isoformat())
+        d += timedelta(days=1)
+
+    with db_conn() as conn:
+        current = _positions(conn, date_from, item_ids)
+        daily: Dict[str, Dict[str, int]] = {}
+        for r in _movement_totals(conn, _next_day(date_from), _next_day(date_to), item_ids, by_day=True):
+            daily.setdefault(r["day"], {})[r["item_id"]] = r["qty"]
+
+    tracked = set(item_ids or ()) | set(current) | {i for totals in daily.values() for i in totals}
+    series: Dict[str, List[int]] = {item_id: [] for item_id in sorted(tracked)}
+    for day in days:
+        for item_id, qty in daily.get(day, {}).items():
+            current[item_id] = current.get(item_id, 0) + qty
+        for item_id, values in series.items():
+            values.append(current.get(item_id, 0))
+    return {"days": days, "series": series}
+
+
+def get_stock_as_of(as_of: str, item_skus: Optional[List[str]] = None) -> Dict[str, Any]:
+    """On-hand per item at the end of *as_of*, optionally for the given SKUs only."""
+    with db_conn() as conn:
+        if item_skus:
+            marks = ",".join("?" for _ in item_skus)
+            items = conn.execute(f"SELECT id, sku, name FROM items WHERE sku IN ({marks})", item_skus).fetchall()
+            missing = set(item_skus) - {r["sku"] for r in items}
+            if missing:
+                raise ValueError(f"Item {sorted(missing)[0]} not found")
+        else:
+            items = conn.execute("SELECT id, sku, name FROM items ORDER BY sku").fetchall()
+        positions = _positions(conn, as_of[:10], [r["id"] for r in items] if item_skus else None)
+    return {
+        "as_of": as_of[:10],
+        "items": [
+            {"item_id": r["id"], "item_sku": r["sku"], "item_name": r["name"], "on_hand": positions.get(r["id"], 0)}
+            for r in items
+            if item_skus or positions.get(r["id"])
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Service singleton
+# ---------------------------------------------------------------------------
+
+stock_history_service = SimpleNamespace(
+    take_snapshot=take_snapshot,
+    get_on_hand_as_of=get_on_hand_as_of,
+    get_series=get_series,
+    get_stock_as_of=get_stock_as_of,
+)
+StockHistoryService = stock_history_service
@@ -1,8 +1,9 @@
 """Shared pytest fixtures for duck-demo contract tests.
 
 Key fixtures:
-- ``test_db``   – creates a fresh temporary SQLite DB with schema + seed data;
-                  monkeypatches ``db.DB_PATH`` so all services use it.
+- ``test_db``   – gives every test a fresh copy of a template SQLite DB (schema +
+                  seed data, built once per session / xdist worker) and points
+                  ``db.DB_PATH`` at it, so tests cannot see each other's writes.
 - ``rest_client`` – Starlette ``TestClient`` wired to the FastMCP app with REST routes.
 - ``mcp_app``   – the FastMCP instance with all tools registered (for direct calls).
 """
@@ -17,49 +18,74 @@ from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
 import db
+import events
+from services.atp import atp_service
+from services.pricing import pricing_service
 from tests.seed_test_data import TABLE_DATA
 
 
 # ---------------------------------------------------------------------------
-# Database fixture — fresh for each test *session* (fast, deterministic)
+# Template databases — schema + seed built once, cloned per test
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="session")
-def _db_path(tmp_path_factory):
-    """Create a temporary DB file, apply schema + seed data once per session."""
-    tmp = tmp_path_factory.mktemp("duck_test")
-    db_file = tmp / "test.db"
-
-    # Point the app's DB module at the temp file
-    original = db.DB_PATH
-    db.DB_PATH = db_file
-
-    # Create schema
-    db.init_db()
+def _build_template(seed_data) -> sqlite3.Connection:
+    """Create an in-memory database with the schema and *seed_data* rows.
 
-    # Seed test data
-    conn = db.get_connection()
-    for table_name, rows in TABLE_DATA:
+    *seed_data* is a list of ``(table, rows)`` pairs inserted in order.
+    """
+    conn = sqlite3.connect(":memory:")
+    db.init_db(conn)
+    for table_name, rows in seed_data:
         if not rows:
             continue
         cols = list(rows[0].keys())
         placeholders = ", ".join("?" for _ in cols)
         col_names = ", ".join(cols)
-        for row in rows:
-            values = [row[c] for c in cols]
-            conn.execute(f"INSERT INTO {table_name} ({col_names}) VALUES ({placeholders})", values)
+        conn.executemany(
+            f"INSERT INTO {table_name} ({col_names}) VALUES ({placeholders})",
+            [[row[c] for c in cols] for row in rows],
+        )
     conn.commit()
+    return conn
+
+
+def _clone(template: sqlite3.Connection, path: Path) -> None:
+    """Overwrite the database at *path* with a copy of *template* (SQLite backup API)."""
+    target = sqlite3.connect(path)
+    try:
+        template.backup(target)
+    finally:
+        target.close()
+
+
+@pytest.fixture(scope="session")
+def _template_db():
+    """Schema + ``TABLE_DATA``, built once per session (per worker under xdist)."""
+    conn = _build_template(TABLE_DATA)
+    yield conn
     conn.close()
 
-    yield db_file
 
+@pytest.fixture(scope="session")
+def _db_path(tmp_path_factory, _template_db):
+    """Per-session database file that ``test_db`` refreshes before every test."""
+    db_file = tmp_path_factory.mktemp("duck_test") / "test.db"
+    _clone(_template_db, db_file)
+
+    original = db.DB_PATH
+    db.DB_PATH = db_file
+    yield db_file
     db.DB_PATH = original
 
 
 @pytest.fixture(autouse=True)
-def test_db(_db_path):
-    """Ensure every test uses the test DB (auto-applied)."""
+def test_db(_db_path, _template_db):
+    """Reset the test DB to the template and point the app at it (auto-applied)."""
+    _clone(_template_db, _db_path)
     db.DB_PATH = _db_path
+    atp_service.invalidate()
+    pricing_service.invalidate()
+    events.reset()
 
 
 # ---------------------------------------------------------------------------
@@ -84,9 +110,11 @@ def _mcp_instance(_db_path):
 
     from mcp_tools import register_all_tools
     from api_routes import register_all_routes
+    import mcp_apps
 
     register_all_tools(mcp)
     register_all_routes(mcp)
+    mcp_apps.register(mcp)
     return mcp
 
 
@@ -107,13 +135,9 @@ def mcp_app(_mcp_instance):
 # Per-function-scoped QC DB fixture (for mutation tests that write QC state)
 # ---------------------------------------------------------------------------
 
-@pytest.fixture()
-def qc_db(tmp_path, monkeypatch):
-    """Create a fresh temporary DB with schema + minimal QC seed data per test.
-
-    Uses function scope so QC mutation tests are fully isolated from each other
-    and from the session-scoped shared DB.
-    """
+@pytest.fixture(scope="session")
+def _qc_template_db():
+    """Schema + minimal QC seed data, built once per session."""
     from tests.seed_test_data import (
         CUSTOMERS, SUPPLIERS, ITEMS, STOCK, STOCK_MOVEMENTS,
         RECIPES, RECIPE_INGREDIENTS, RECIPE_OPERATIONS, WORK_CENTERS,
@@ -125,12 +149,6 @@ def qc_db(tmp_path, monkeypatch):
         SIM_TIME,
     )
 
-    db_file = tmp_path / "qc_test.db"
-    monkeypatch.setattr(db, "DB_PATH", db_file)
-
-    db.init_db()
-
-    conn = db.get_connection()
     ordered_data = [
         ("simulation_state", [{"id": 1, "sim_time": SIM_TIME}]),
         ("suppliers", SUPPLIERS),
@@ -154,19 +172,20 @@ def qc_db(tmp_path, monkeypatch):
         ("production_orders", QC_PRODUCTION_ORDERS),
         ("qc_hold_batches", QC_HOLD_BATCHES),
     ]
-    for table_name, rows in ordered_data:
-        if not rows:
-            continue
-        cols = list(rows[0].keys())
-        placeholders = ", ".join("?" for _ in cols)
-        col_names = ", ".join(cols)
-        for row in rows:
-            values = [row[c] for c in cols]
-            conn.execute(
-                f"INSERT INTO {table_name} ({col_names}) VALUES ({placeholders})",
-                values,
-            )
-    conn.commit()
+    conn = _build_template(ordered_data)
+    yield conn
     conn.close()
 
+
+@pytest.fixture()
+def qc_db(tmp_path, monkeypatch, _qc_template_db):
+    """Fresh copy of the QC template DB per test.
+
+    Uses function scope so QC mutation tests are fully isolated from each other
+    and from the shared test DB.
+    """
+    db_file = tmp_path / "qc_test.db"
+    _clone(_qc_template_db, db_file)
+    monkeypatch.setattr(db, "DB_PATH", db_file)
+
     yield db_file
@@ -214,6 +214,7 @@ QUOTES = [
         "customer_id": "CUST-0101",
         "revision_number": 1,
         "supersedes_quote_id": None,
+        "quote_chain_id": "QUO-T001",
         "requested_delivery_date": "2025-08-20",
         "ship_to_line1": "1 Rue du Test",
         "ship_to_line2": None,
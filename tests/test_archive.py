@@ -0,0 +1,125 @@
+"""Hot/cold history archival and archive-aware reads."""
+
+import config
+from db import generate_id
+from services._base import db_conn
+from services.activity import activity_service
+from services.archive import archive_service
+from services.sales import sales_service
+from services.simulation import simulation_service
+
+
+def _old_activity(n, day="2025-07-01"):
+    activity_service.log_batch([
+        {"actor": "test", "category": "sales", "action": "quote.created", "timestamp": f"{day}T09:00:00"}
+        for _ in range(n)
+    ])
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_old_rows_move_to_archive_with_daily_rollup():
+    _old_activity(3)
+    moved = archive_service.archive_before("2025-07-15")
+
+    assert moved == {"activity_log": 3, "stock_movements": 0}
+    with db_conn() as conn:
+        assert _count(conn, "activity_log_archive") == 3
+        assert conn.execute("SELECT COUNT(*) FROM activity_log WHERE timestamp < '2025-07-15'").fetchone()[0] == 0
+    summary = activity_service.get_daily_summary()
+    assert {"date": "2025-07-01", "category": "sales", "action": "quote.created", "count": 3} in summary
+    assert archive_service.archive_before("2025-07-15")["activity_log"] == 0
+
+
+def test_get_log_reads_archive_only_when_range_reaches_it():
+    _old_activity(2)
+    archive_service.archive_before("2025-07-15")
+
+    with db_conn() as conn:
+        assert archive_service.source(conn, "activity_log", "2025-07-20") == "activity_log"
+        assert "activity_log_archive" in archive_service.source(conn, "activity_log", "2025-06-01")
+    full = activity_service.get_log(action="quote.created")
+    recent = activity_service.get_log(action="quote.created", since="2025-07-20")
+    assert full["total"] == 2 and len(full["entries"]) == 2
+    assert recent["total"] == 0
+
+
+def test_archived_ids_are_not_reused():
+    _old_activity(2)
+    with db_conn() as conn:
+        last = conn.execute("SELECT MAX(id) FROM activity_log WHERE actor = 'test'").fetchone()[0]
+    archive_service.archive_before("2025-07-15")
+
+    with db_conn() as conn:
+        assert generate_id(conn, "ACT", "activity_log") > last
+
+
+def test_movements_of_live_stock_stay_hot():
+    with db_conn() as conn:
+        conn.execute("UPDATE stock_movements SET timestamp = '2025-06-01T08:00:00'")
+        conn.execute("DELETE FROM stock WHERE id = 'STK-T003'")
+        conn.commit()
+    assert archive_service.archive_before("2025-07-01")["stock_movements"] == 1
+
+    with db_conn() as conn:
+        assert conn.execute("SELECT id FROM stock_movements_archive").fetchall()[0][0] == "MOV-T003"
+        summary = conn.execute("SELECT key, subkey, qty_total FROM archive_summaries WHERE source_table = 'stock_movements'").fetchone()
+    assert tuple(summary) == ("ITEM-BOX-SMALL", "adjustment", 200)
+
+
+def test_simulation_tick_applies_retention(monkeypatch):
+    _old_activity(4)
+    result = simulation_service.advance_time(hours=1)
+    assert "history_archived" not in result
+
+    monkeypatch.setattr(config, "ARCHIVE_RETENTION_DAYS", 7)
+    result = simulation_service.advance_time(hours=1)
+    assert result["history_archived"] == 4
+    with db_conn() as conn:
+        assert archive_service.boundary(conn, "activity_log") == "2025-07-25"
+
+
+def test_supply_chain_trace_follows_archived_production_history():
+    with db_conn() as conn:
+        conn.executemany(
+            "INSERT INTO stock_movements (id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("MOV-T901", "2025-05-20T08:00:00", "ITEM-PVC", "purchase_in", 5, "STK-GONE-RM", "purchase_order", "PO-T901"),
+                ("MOV-T902", "2025-06-01T08:00:00", "ITEM-PVC", "production_consume", -5, "STK-GONE-RM", "production_order", "MO-T001"),
+                ("MOV-T903", "2025-06-01T08:00:00", "ITEM-CLASSIC-10", "production_in", 10, "STK-GONE-FG", "production_order", "MO-T001"),
+                ("MOV-T904", "2025-07-20T08:00:00", "ITEM-CLASSIC-10", "shipment_out", -10, "STK-GONE-FG", "shipment", "SHIP-T001"),
+            ],
+        )
+        conn.commit()
+    # Both batches are used up, so all but the shipment leave the hot table
+    assert archive_service.archive_before("2025-07-01")["stock_movements"] == 3
+
+    trace = sales_service.get_supply_chain_trace(["SHIP-T001"], cutoff_date="2025-07-10")
+    nodes = {n["id"]: n for n in trace["nodes"]}
+    assert nodes["STK-GONE-FG"]["timestamp"] == "2025-06-01T08:00:00"
+    assert {"source": "MO-T001", "target": "STK-GONE-FG"} in trace["edges"]
+    assert "PO-T901" not in nodes  # bought before the cutoff
+
+    full = sales_service.get_supply_chain_trace(["SHIP-T001"])
+    assert ("PO-T901", "MO-T001") in {(e["source"], e["target"]) for e in full["edges"]}
+
+
+def test_fulfillment_sources_read_archived_picks():
+    with db_conn() as conn:
+        conn.execute("UPDATE shipments SET status = 'delivered', dispatched_at = '2025-06-10T08:00:00' WHERE id = 'SHIP-T001'")
+        conn.executemany(
+            "INSERT INTO stock_movements (id, timestamp, item_id, movement_type, qty, stock_id, reference_type, reference_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("MOV-T911", "2025-06-01T08:00:00", "ITEM-CLASSIC-10", "purchase_in", 6, "STK-GONE-X", "purchase_order", "PO-T911"),
+                ("MOV-T912", "2025-06-10T08:00:00", "ITEM-CLASSIC-10", "shipment_out", -6, "STK-GONE-X", "shipment", "SHIP-T001"),
+            ],
+        )
+        conn.commit()
+    assert archive_service.archive_before("2025-07-01")["stock_movements"] == 2
+
+    shipment = sales_service.get_fulfillment_sources("SO-T001")["shipments"][0]
+    assert [(s["stock_id"], s["qty_taken"], s["source_id"]) for s in shipment["sources"]] == [("STK-GONE-X", 6, "PO-T911")]
@@ -0,0 +1,73 @@
+"""Time-phased available-to-promise projection and its cache invalidation."""
+
+from datetime import date, timedelta
+
+import config
+from services._base import db_conn
+from services.atp import atp_service
+from services.inventory import inventory_service
+from services.pricing import pricing_service
+from services.purchase import purchase_service
+from services.sales import sales_service
+
+TODAY = "2025-08-01"
+
+
+def _days_from_today(days):
+    return (date.fromisoformat(TODAY) + timedelta(days=days)).isoformat()
+
+
+def test_projection_merges_supply_and_demand_by_day():
+    # 48 on hand + 24 from MO-T001 (no ETA yet → today), SO-T001 takes 12 on 08-20
+    p = atp_service.get_projection("ITEM-CLASSIC-10")
+    assert p.days == [TODAY, "2025-08-20"]
+    assert p.balance == [72, 60]
+    assert p.floor == [60, 60]
+
+
+def test_future_demand_and_receipts_shape_the_promise_date():
+    sales_service.create_order(
+        customer_id="CUST-0101", requested_delivery_date="2025-08-10", ship_to=None,
+        lines=[{"sku": "CLASSIC-DUCK-10CM", "qty": 30}], note=None, quote_id="QUO-T001",
+    )
+    with db_conn() as conn:
+        conn.execute(
+            "INSERT INTO purchase_orders (id, item_id, qty, supplier_id, status, expected_delivery) "
+            "VALUES ('PO-ATP1', 'ITEM-CLASSIC-10', 100, 'SUP-001', 'ordered', '2025-08-15')"
+        )
+        conn.commit()
+    atp_service.invalidate("ITEM-CLASSIC-10")
+
+    # 72 today, -30 on 08-10, +100 on 08-15, -12 on 08-20
+    assert atp_service.available_on("ITEM-CLASSIC-10", TODAY) == 42
+    assert atp_service.available_on("ITEM-CLASSIC-10", "2025-08-16") == 130
+    assert atp_service.earliest_date("ITEM-CLASSIC-10", 100) == "2025-08-15"
+    assert atp_service.earliest_date("ITEM-CLASSIC-10", 131) is None
+
+
+def test_writers_invalidate_cached_projection():
+    assert atp_service.earliest_date("ITEM-CLASSIC-10", 60) == TODAY
+    sales_service.create_order(
+        customer_id="CUST-0101", requested_delivery_date="2025-08-10", ship_to=None,
+        lines=[{"sku": "CLASSIC-DUCK-10CM", "qty": 30}], note=None, quote_id="QUO-T001",
+    )
+    assert atp_service.earliest_date("ITEM-CLASSIC-10", 60) is None
+
+    assert atp_service.earliest_date("ITEM-PVC", 2_500_000) is None
+    po = purchase_service.create_order("PVC-PELLETS", 1_000_000, None)
+    assert atp_service.earliest_date("ITEM-PVC", 2_500_000) == po["expected_delivery"]
+
+
+def test_promise_falls_back_to_production_lead():
+    lead = config.PRODUCTION_LEAD_DAYS_BY_TYPE.get("finished_good", config.PRODUCTION_LEAD_DAYS_DEFAULT)
+    promise = atp_service.promise_date("ITEM-CLASSIC-10", 500, lead)
+    assert promise == {"date": _days_from_today(lead), "source": "ctp", "available_today": 60}
+
+
+def test_availability_and_quote_options_use_projection():
+    check = inventory_service.check_availability("CLASSIC-DUCK-10CM", 12)
+    assert check["earliest_available_date"] == TODAY
+
+    options = pricing_service.calculate_quote_options("CLASSIC-DUCK-10CM", 12, None, [])["options"]
+    assert options[0]["lines"] == [{"sku": "CLASSIC-DUCK-10CM", "qty": 12, "source": "stock"}]
+    assert options[0]["can_arrive_by"] == _days_from_today(config.TRANSIT_DAYS_DEFAULT)
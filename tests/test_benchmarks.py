@@ -0,0 +1,60 @@
+"""Smoke tests for the scale benchmark data generator and runner."""
+
+import sqlite3
+
+import pytest
+
+import db
+from benchmarks import datagen, run
+
+
+@pytest.fixture(scope="module")
+def bench_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "scale-1.db"
+    meta = datagen.generate(path, scale=1, seed=7)
+    return path, meta
+
+
+def test_generate_counts_and_cache(bench_db):
+    path, meta = bench_db
+    assert meta["scale"] == 1
+    for table in ("customers", "sales_orders", "shipments", "stock_movements", "activity_log"):
+        assert meta["rows"][table] > 0
+    assert datagen.read_meta(path) == meta
+    # Matching (scale, seed, version) reuses the file instead of regenerating
+    assert datagen.ensure_database(path, scale=1, seed=7) == meta
+
+
+def test_generated_movements_reference_real_rows(bench_db):
+    path, _ = bench_db
+    conn = sqlite3.connect(path)
+    try:
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM stock_movements sm "
+            "WHERE sm.movement_type = 'shipment_out' "
+            "  AND NOT EXISTS (SELECT 1 FROM shipments s WHERE s.id = sm.reference_id)"
+        ).fetchone()[0]
+        dangling_lines = conn.execute(
+            "SELECT COUNT(*) FROM sales_order_lines l "
+            "WHERE NOT EXISTS (SELECT 1 FROM sales_orders so WHERE so.id = l.sales_order_id)"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert orphans == 0
+    assert dangling_lines == 0
+
+
+def test_benchmarks_run_against_generated_db(bench_db, monkeypatch, tmp_path):
+    path, _ = bench_db
+    work = tmp_path / "work.db"
+    run._working_copy(path, work)
+    monkeypatch.setattr(db, "DB_PATH", work)
+    conn = db.get_connection()
+    try:
+        benchmarks = dict(run.build_benchmarks(conn))
+    finally:
+        conn.close()
+    trace = benchmarks["get_supply_chain_trace"]()
+    assert trace["nodes"]
+    stats = run.time_call(benchmarks["search_items"], repeat=2)
+    assert stats["repeat"] == 2 and stats["min_ms"] <= stats["median_ms"]
@@ -0,0 +1,72 @@
+"""Bulk order ingestion: batched validation, pricing and single-transaction writes."""
+
+import pytest
+
+import config
+from services._base import db_conn
+from services.atp import atp_service
+from services.quote import quote_service
+from services.sales import sales_service
+
+
+def _order(customer_id="CUST-0101", *lines, **extra):
+    return {"customer_id": customer_id, "lines": [{"sku": s, "qty": q} for s, q in lines] or [{"sku": "CLASSIC-DUCK-10CM", "qty": 12}], **extra}
+
+
+def test_valid_orders_become_accepted_quotes_and_confirmed_orders():
+    result = sales_service.bulk_create_orders([
+        _order("CUST-0101", ("CLASSIC-DUCK-10CM", 30), requested_delivery_date="2025-08-20"),
+        _order("CUST-0102", ("CLASSIC-DUCK-10CM", 2), ("BOX-SMALL", 5)),
+    ])
+
+    assert (result["created"], result["failed"]) == (2, 0)
+    first, second = result["results"]
+    assert first["quote_id"] != second["quote_id"] and first["sales_order_id"] != second["sales_order_id"]
+
+    quote = quote_service.get_quote(first["quote_id"])
+    detail = sales_service.get_order_details(first["sales_order_id"])
+    assert quote["quote"]["status"] == "accepted"
+    assert detail["sales_order"]["status"] == "confirmed"
+    assert detail["sales_order"]["quote_id"] == first["quote_id"]
+    assert detail["pricing"]["total"] == pytest.approx(quote["quote"]["total"]) == pytest.approx(first["total"])
+    assert [l["qty"] for l in detail["lines"]] == [30]
+
+
+def test_bulk_pricing_matches_single_quote():
+    single = quote_service.create_quote("CUST-0101", None, None, [{"sku": "CLASSIC-DUCK-10CM", "qty": 30}])
+    bulk = sales_service.bulk_create_orders([_order("CUST-0101", ("CLASSIC-DUCK-10CM", 30))])
+    assert bulk["results"][0]["total"] == pytest.approx(single["total"])
+
+
+def test_invalid_orders_are_reported_and_skipped():
+    result = sales_service.bulk_create_orders([
+        _order("CUST-NOPE"),
+        _order("CUST-0101", ("NO-SUCH-SKU", 1)),
+        _order("CUST-0101", ("CLASSIC-DUCK-10CM", 0)),
+        {"customer_id": "CUST-0101", "lines": []},
+        _order("CUST-0101", ("CLASSIC-DUCK-10CM", 3)),
+    ], confirm=False)
+
+    assert (result["created"], result["failed"]) == (1, 4)
+    assert [r["status"] for r in result["results"]] == ["error"] * 4 + ["created"]
+    assert "CUST-NOPE" in result["results"][0]["error"]
+    assert "NO-SUCH-SKU" in result["results"][1]["error"]
+    detail = sales_service.get_order_details(result["results"][4]["sales_order_id"])
+    assert detail["sales_order"]["status"] == "draft"
+
+
+def test_activity_rows_written_with_the_orders():
+    result = sales_service.bulk_create_orders([_order(), _order()], actor="test")
+    with db_conn() as conn:
+        actions = [r[0] for r in conn.execute("SELECT action FROM activity_log WHERE actor = 'test' ORDER BY id")]
+    assert actions == ["quote.created", "quote.accepted", "sales_order.created", "sales_order.confirmed"] * result["created"]
+
+
+def test_batch_limit_and_atp_invalidation(monkeypatch):
+    monkeypatch.setattr(config, "SALES_BULK_MAX_ORDERS", 1)
+    with pytest.raises(ValueError, match="At most 1 orders"):
+        sales_service.bulk_create_orders([_order(), _order()])
+
+    before = atp_service.available_on("ITEM-CLASSIC-10", "2025-08-01")
+    sales_service.bulk_create_orders([_order("CUST-0101", ("CLASSIC-DUCK-10CM", 10))])
+    assert atp_service.available_on("ITEM-CLASSIC-10", "2025-08-01") == before - 10
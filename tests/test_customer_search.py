@@ -0,0 +1,76 @@
+"""Customer lookup through the customers_fts trigram index."""
+
+import db
+from services._base import db_conn
+from services.customer import customer_service
+from services.image_import import _resolve_customer
+
+
+def _ids(result):
+    return [c["id"] for c in result["customers"]]
+
+
+def test_filters_keep_substring_semantics():
+    assert _ids(customer_service.find_customers(name="testwo")) == ["CUST-0101"]
+    assert _ids(customer_service.find_customers(name="ALICE", city="par")) == ["CUST-0101"]
+    assert _ids(customer_service.find_customers(name="bo")) == ["CUST-0102"]  # shorter than a trigram
+    assert _ids(customer_service.find_customers(email="testcorp", country="fr")) == ["CUST-0101"]
+    assert _ids(customer_service.find_customers(name="alice", company="nope")) == []
+    assert _ids(customer_service.find_customers(limit=10)) == ["CUST-0101", "CUST-0102"]
+
+
+def test_short_non_ascii_filters_fall_back_to_substring_match():
+    created = customer_service.create_customer(name="Jürgen Müller", city="Zoë")
+    assert _ids(customer_service.find_customers(name="mü")) == [created["customer_id"]]
+    assert _ids(customer_service.find_customers(city="oë")) == [created["customer_id"]]
+    assert _ids(customer_service.find_customers(name="Mü", city="oë")) == [created["customer_id"]]
+    assert _ids(customer_service.find_customers(name="müller", city="oë")) == [created["customer_id"]]
+    assert _ids(customer_service.search_customers("mü")) == [created["customer_id"]]
+
+
+def test_search_is_ranked_and_typo_tolerant():
+    result = customer_service.search_customers("Alise Testwort")
+    best = result["customers"][0]
+    assert best["id"] == "CUST-0101"
+    assert 0.5 < best["confidence"] < 1.0
+    assert customer_service.search_customers("TestCorp")["customers"][0]["confidence"] == 1.0
+    assert customer_service.search_customers("Zyxwv")["customers"] == []
+
+
+def test_index_follows_inserts_updates_and_deletes():
+    created = customer_service.create_customer(name="Carla Quackenbush", city="Lyon")
+    assert _ids(customer_service.find_customers(name="quacken")) == [created["customer_id"]]
+
+    customer_service.update_customer(created["customer_id"], name="Carla Duckworth")
+    assert _ids(customer_service.find_customers(name="quacken")) == []
+    assert _ids(customer_service.find_customers(name="duckwo")) == [created["customer_id"]]
+
+    with db_conn() as conn:
+        conn.execute("DELETE FROM customers WHERE id = ?", (created["customer_id"],))
+        conn.commit()
+    assert _ids(customer_service.find_customers(name="duckwo")) == []
+
+
+def test_resolver_uses_search_confidence():
+    resolved = _resolve_customer(name="Bob Mockmann")
+    assert resolved["id"] == "CUST-0102"
+    assert resolved["confidence"] >= 0.8
+    assert _resolve_customer(name="Unknown Trading")["id"] is None
+
+
+def test_migration_indexes_existing_customers(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "old.db")
+    db.init_db()
+    conn = db.get_connection()
+    conn.execute("DROP TABLE customers_fts")
+    for trigger in ("customers_fts_ai", "customers_fts_ad", "customers_fts_au"):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    conn.execute("INSERT INTO customers (id, name) VALUES ('CUST-9001', 'Dora Legacy')")
+    conn.execute("PRAGMA user_version = 5")
+    conn.commit()
+
+    assert 6 in db.migrate(conn)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM customers_fts WHERE name LIKE '%legacy%'"
+    ).fetchone()[0] == 1
+    conn.close()
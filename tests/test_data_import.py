@@ -395,6 +395,148 @@ def test_rollback_deletes_created_customers(_mock, tmp_path):
         assert conn.execute("SELECT id FROM customers WHERE id = ?", (entity_id,)).fetchone() is None
 
 
+def _seed_ready_customer_job(job_id, n):
+    """Insert a validated customer job with *n* ready rows, bypassing upload."""
+    with db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO import_jobs (id, entity_type, status, row_count, created_at) "
+            "VALUES (?, 'customer', 'validated', ?, '2025-08-01T08:00:00')",
+            (job_id, n),
+        )
+        conn.executemany(
+            "INSERT INTO import_rows (id, job_id, source_row, raw_data, mapped_data, status) VALUES (?, ?, ?, '{}', ?, 'ready')",
+            [(f"{job_id}-R{i:05d}", job_id, i, json.dumps({"name": f"Bulk {i}", "city": "Lyon", "country": "FR"})) for i in range(n)],
+        )
+        conn.commit()
+
+
+def test_execute_inserts_in_chunks_with_progress(monkeypatch):
+    monkeypatch.setattr("config.IMPORT_EXECUTE_CHUNK_SIZE", 2)
+    _seed_ready_customer_job("IMP-BULK", 5)
+    progress = []
+
+    result = data_import_service.execute(job_id="IMP-BULK", on_progress=lambda done, total: progress.append((done, total)))
+
+    assert result["status"] == "executed"
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+    ids = [c["entity_id"] for c in result["created"]]
+    assert len(set(ids)) == 5
+    with db.get_connection() as conn:
+        names = [r[0] for r in conn.execute(
+            f"SELECT name FROM customers WHERE id IN ({','.join('?' for _ in ids)}) ORDER BY id", ids
+        )]
+        imported = conn.execute(
+            "SELECT COUNT(*) FROM import_rows WHERE job_id = 'IMP-BULK' AND status = 'imported'"
+        ).fetchone()[0]
+    assert names == [f"Bulk {i}" for i in range(5)]
+    assert imported == 5
+
+    with pytest.raises(ValueError, match="Cannot execute job in status 'executed'"):
+        data_import_service.execute(job_id="IMP-BULK")
+
+
+def test_rollback_is_set_based_and_idempotent():
+    _seed_ready_customer_job("IMP-RB", 3)
+    created = data_import_service.execute(job_id="IMP-RB")["created"]
+
+    assert data_import_service.rollback(job_id="IMP-RB")["status"] == "rolled_back"
+    assert data_import_service.rollback(job_id="IMP-RB")["status"] == "rolled_back"
+    with db.get_connection() as conn:
+        ids = [c["entity_id"] for c in created]
+        assert conn.execute(
+            f"SELECT COUNT(*) FROM customers WHERE id IN ({','.join('?' for _ in ids)})", ids
+        ).fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM import_rows WHERE job_id = 'IMP-RB' AND status = 'ready' AND created_entity_id IS NULL"
+        ).fetchone()[0] == 3
+
+
+def test_execute_large_job():
+    # Timing lives in benchmarks.run (data_import.execute_20k)
+    _seed_ready_customer_job("IMP-FAST", 20_000)
+    result = data_import_service.execute(job_id="IMP-FAST")
+    assert result["status"] == "executed"
+    assert len(result["created"]) == 20_000
+    with db.get_connection() as conn:
+        assert [tuple(r) for r in conn.execute(
+            "SELECT status, COUNT(*) FROM import_rows WHERE job_id = 'IMP-FAST' GROUP BY status"
+        )] == [("imported", 20_000)]
+
+
+def _seed_sales_order_job(job_id, metadata, sku):
+    with db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO import_jobs (id, entity_type, status, row_count, global_instructions, created_at) "
+            "VALUES (?, 'sales_order', 'ready_to_execute', 1, ?, '2025-08-01T08:00:00')",
+            (job_id, json.dumps(metadata)),
+        )
+        conn.execute(
+            "INSERT INTO import_rows (id, job_id, source_row, raw_data, mapped_data, status) VALUES (?, ?, 1, '{}', ?, 'ready')",
+            (f"{job_id}-R1", job_id, json.dumps({"sku": sku, "qty": 3})),
+        )
+        conn.commit()
+
+
+def _job_status(job_id):
+    with db.get_connection() as conn:
+        return conn.execute("SELECT status FROM import_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def test_execute_checks_metadata_before_claiming_the_job():
+    _seed_sales_order_job("IMP-NOCUST", {"notes": "no customer"}, sku="NO-SUCH-SKU")
+    with pytest.raises(ValueError, match="no customer_id"):
+        data_import_service.execute(job_id="IMP-NOCUST")
+    assert _job_status("IMP-NOCUST") == "ready_to_execute"
+
+
+def test_failed_execute_releases_the_claim_and_can_be_retried():
+    _seed_sales_order_job("IMP-BADSKU", {"customer_id": "CUST-0101"}, sku="NO-SUCH-SKU")
+    with pytest.raises(ValueError, match="NO-SUCH-SKU"):
+        data_import_service.execute(job_id="IMP-BADSKU")
+    assert _job_status("IMP-BADSKU") == "ready_to_execute"
+
+    with db.get_connection() as conn:
+        sku = conn.execute("SELECT sku FROM items WHERE unit_price IS NOT NULL LIMIT 1").fetchone()[0]
+        conn.execute("UPDATE import_rows SET mapped_data = ? WHERE job_id = 'IMP-BADSKU'", (json.dumps({"sku": sku, "qty": 3}),))
+        conn.commit()
+    result = data_import_service.execute(job_id="IMP-BADSKU")
+    assert result["status"] == "executed"
+    assert result["created"][0]["entity_type"] == "quote"
+
+
+def test_chunk_failure_after_imports_keeps_job_executing(monkeypatch):
+    monkeypatch.setattr("config.IMPORT_EXECUTE_CHUNK_SIZE", 2)
+    _seed_ready_customer_job("IMP-HALF", 4)
+
+    def fail_second_chunk(done, total):
+        if done == 2:
+            raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        data_import_service.execute(job_id="IMP-HALF", on_progress=fail_second_chunk)
+    assert _job_status("IMP-HALF") == "executing"
+    assert data_import_service.rollback(job_id="IMP-HALF")["status"] == "rolled_back"
+
+
+def test_rollback_during_execute_stops_the_remaining_chunks(monkeypatch):
+    monkeypatch.setattr("config.IMPORT_EXECUTE_CHUNK_SIZE", 2)
+    _seed_ready_customer_job("IMP-RACE", 6)
+
+    def roll_back_after_first_chunk(done, total):
+        if done == 2:
+            data_import_service.rollback(job_id="IMP-RACE")
+
+    with pytest.raises(ValueError, match="no longer executing"):
+        data_import_service.execute(job_id="IMP-RACE", on_progress=roll_back_after_first_chunk)
+    assert _job_status("IMP-RACE") == "rolled_back"
+    conn = db.get_connection()
+    try:
+        statuses = {r[0] for r in conn.execute("SELECT status FROM import_rows WHERE job_id = 'IMP-RACE'")}
+    finally:
+        conn.close()
+    assert statuses == {"ready"}
+
+
 # ---------------------------------------------------------------------------
 # Python transforms
 # ---------------------------------------------------------------------------
@@ -0,0 +1,127 @@
+"""Event bus behind /api/events: replay, backpressure, activity rows and dashboard deltas."""
+
+import asyncio
+
+import pytest
+
+import config
+import events
+from services import activity_service, write_transaction
+from services._base import db_conn
+
+
+def _drain(last_event_id=None, action=None, timeout=0.05):
+    """Subscribe, run *action*, return whatever arrives within *timeout* seconds."""
+    async def go():
+        sub = events.subscribe(last_event_id)
+        try:
+            if action:
+                action()
+            return await sub.get(timeout)
+        finally:
+            events.unsubscribe(sub)
+    return asyncio.run(go())
+
+
+def test_resume_replays_events_after_last_id():
+    first = events.publish("activity", {"n": 1})
+    events.publish("activity", {"n": 2})
+    events.publish("activity", {"n": 3})
+
+    assert [e["data"]["n"] for e in _drain(first)] == [2, 3]
+
+
+def test_unknown_or_expired_last_id_gets_reset(monkeypatch):
+    assert _drain("deadbeef-5")[0]["type"] == "reset"
+
+    monkeypatch.setattr(events, "_buffer", events.deque(maxlen=2))
+    first = events.publish("activity", {})
+    for _ in range(3):
+        events.publish("activity", {})
+    batch = _drain(first)
+    assert [e["type"] for e in batch] == ["reset"]
+
+
+def test_slow_subscriber_is_reset_instead_of_growing(monkeypatch):
+    monkeypatch.setattr(config, "EVENTS_SUBSCRIBER_QUEUE", 2)
+    batch = _drain(action=lambda: [events.publish("activity", {"n": i}) for i in range(5)])
+    assert [e["type"] for e in batch] == ["reset"]
+    assert batch[0]["data"]["reason"] == "client fell behind"
+
+
+def test_activity_writes_are_published_like_log_entries():
+    def write():
+        activity_service.log_activity("mcp:sales", "sales", "quote.created", "quote", "Q-9001", {"total": 12.5})
+        activity_service.log_batch([{"actor": "system", "category": "billing", "action": "invoice.issued"}])
+
+    batch = _drain(action=write)
+    assert [e["type"] for e in batch] == ["activity", "activity"]
+    stored = activity_service.get_log(limit=1, entity_ids=["Q-9001"])["entries"][0]
+    assert batch[0]["data"] == stored
+    assert batch[1]["data"]["action"] == "invoice.issued"
+
+
+def test_activity_is_published_only_when_the_outer_transaction_commits(monkeypatch):
+    published = []
+    monkeypatch.setattr(events, "publish", lambda kind, data: published.append(data["action"]))
+
+    with pytest.raises(RuntimeError):
+        with write_transaction():
+            activity_service.log_activity("system", "sales", "quote.created")
+            raise RuntimeError("abort")
+    assert published == []
+
+    with write_transaction() as conn:
+        activity_service.log_activity("system", "sales", "quote.created")
+        activity_service.log_batch([{"actor": "system", "category": "billing", "action": "invoice.issued"}], conn=conn)
+        assert published == []
+    assert published == ["quote.created", "invoice.issued"]
+
+
+def test_dashboard_delta_carries_only_changed_values():
+    def change():
+        with db_conn() as conn:
+            invoice_id = conn.execute("SELECT id FROM invoices WHERE status != 'overdue' LIMIT 1").fetchone()[0]
+            conn.execute("UPDATE invoices SET status = 'overdue' WHERE id = ?", (invoice_id,))
+            conn.commit()
+        events.publish_dashboard_delta()
+
+    before = events._dashboard_snapshot()
+    batch = _drain(action=change)
+    assert [e["type"] for e in batch] == ["dashboard"]
+    delta = batch[0]["data"]
+    assert delta["kpis"] == {"overdue_invoices": before["kpis"]["overdue_invoices"] + 1}
+    assert set(delta["status_distributions"]) == {"invoices"}
+    assert delta["status_distributions"]["invoices"]["overdue"] == before["kpis"]["overdue_invoices"] + 1
+
+
+def test_no_subscribers_means_no_dashboard_queries(monkeypatch):
+    monkeypatch.setattr(events, "_dashboard_snapshot", lambda: pytest.fail("queried without subscribers"))
+    activity_service.log_activity("system", "sales", "sales_order.created")
+    assert events.publish_dashboard_delta() is None
+
+
+@pytest.mark.rest
+def test_event_stream_route(mcp_app):
+    # TestClient buffers whole bodies, so read the endless stream from the endpoint directly
+    from starlette.requests import Request
+
+    endpoint = next(r.endpoint for r in mcp_app._custom_starlette_routes if r.path == "/api/events")
+    first = events.publish("activity", {"id": "ACT-X1"})
+    second = events.publish("activity", {"id": "ACT-X2"})
+    request = Request({
+        "type": "http", "method": "GET", "path": "/api/events", "query_string": b"",
+        "headers": [(b"last-event-id", first.encode()), (b"accept-encoding", b"gzip")],
+    })
+
+    async def go():
+        response = await endpoint(request)
+        chunks = [await response.body_iterator.__anext__() for _ in range(2)]
+        await response.body_iterator.aclose()
+        return response, chunks
+
+    response, chunks = asyncio.run(go())
+    assert response.media_type == "text/event-stream"
+    assert "content-encoding" not in response.headers
+    assert chunks == [b"retry: 3000\n\n", f'id: {second}\nevent: activity\ndata: {{"id":"ACT-X2"}}\n\n'.encode()]
+    assert events.subscriber_count() == 0
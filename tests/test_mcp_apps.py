@@ -0,0 +1,67 @@
+"""MCP App UI bundles: table-driven ui:// resources and the in-memory bundle cache."""
+
+import asyncio
+import gzip
+import os
+
+import pytest
+
+import mcp_apps
+
+
+@pytest.fixture()
+def ui_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(mcp_apps, "UI_DIR", str(tmp_path))
+    mcp_apps.invalidate()
+    yield tmp_path
+    mcp_apps.invalidate()
+
+
+def test_every_app_is_registered(mcp_app):
+    resources = {str(r.uri): r for r in asyncio.run(mcp_app.list_resources())}
+    assert set(resources) == {uri for uri, _, _ in mcp_apps.UI_APPS}
+    confirm = resources["ui://generic-confirm/dialog"]
+    assert confirm.name == "get_generic_confirm_ui"
+    assert confirm.mimeType == mcp_apps.MIME_TYPE
+
+
+def test_bundle_is_read_once(ui_dir, monkeypatch):
+    (ui_dir / "app.html").write_text("<html>v1</html>", encoding="utf-8")
+    first = mcp_apps.get_bundle("app.html")
+    assert gzip.decompress(first.gzip) == b"<html>v1</html>"
+
+    monkeypatch.setattr(mcp_apps, "_read", lambda path: pytest.fail("bundle re-read"))
+    assert mcp_apps.read_ui("app.html") == "<html>v1</html>"
+    assert mcp_apps.get_bundle("app.html") is first
+
+
+def test_missing_bundle_serves_placeholder(ui_dir):
+    assert mcp_apps.get_bundle("nope.html") is None
+    assert mcp_apps.read_ui("nope.html") == mcp_apps.NOT_BUILT_HTML
+
+
+def test_reload_swaps_changed_bundles(ui_dir):
+    path = ui_dir / "app.html"
+    path.write_text("<html>v1</html>", encoding="utf-8")
+    before = mcp_apps.get_bundle("app.html")
+    assert mcp_apps.reload_changed() == 0
+
+    path.write_text("<html>v2</html>", encoding="utf-8")
+    os.utime(path, ns=(before.mtime_ns + 1_000_000, before.mtime_ns + 1_000_000))
+    assert mcp_apps.reload_changed() == 1
+    after = mcp_apps.get_bundle("app.html")
+    assert after.text == "<html>v2</html>" and after.etag != before.etag
+
+
+@pytest.mark.rest
+def test_rest_debug_route_uses_etag_and_gzip(rest_client, ui_dir):
+    (ui_dir / "app.html").write_text("<html>" + "duck " * 200 + "</html>", encoding="utf-8")
+
+    resp = rest_client.get("/api/mcp-app-ui/app", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text.startswith("<html>duck")
+
+    again = rest_client.get("/api/mcp-app-ui/app", headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+    assert rest_client.get("/api/mcp-app-ui/nope").status_code == 404
@@ -44,6 +44,27 @@ def test_sales_search_orders(mcp_app):
     assert len(result["sales_orders"]) >= 1
 
 
+def test_sales_search_orders_pages_through_orders_without_created_at(mcp_app):
+    from services._base import db_conn
+    with db_conn() as conn:
+        conn.executemany(
+            "INSERT INTO sales_orders (id, quote_id, customer_id, status, created_at) VALUES (?, 'QUO-T001', 'CUST-0101', 'draft', ?)",
+            [("SO-T901", None), ("SO-T902", None), ("SO-T903", "2025-08-02 09:00:00")],
+        )
+        conn.commit()
+        expected = [r[0] for r in conn.execute("SELECT id FROM sales_orders ORDER BY created_at DESC, id DESC")]
+
+    seen, cursor = [], None
+    while True:
+        page = _call(mcp_app, "sales_search_orders", limit=1, cursor=cursor)
+        seen += [o["sales_order_id"] for o in page["sales_orders"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == expected
+    assert seen[-2:] == ["SO-T902", "SO-T901"]
+
+
 def test_sales_search_orders_by_customer(mcp_app):
     result = _call(mcp_app, "sales_search_orders", customer_ids=["CUST-0101"])
     assert isinstance(result, dict)
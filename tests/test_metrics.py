@@ -0,0 +1,43 @@
+"""Unit tests for the in-process Prometheus metrics registry."""
+
+import metrics
+from mcp_tools._common import log_tool
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("t_seconds", "test", ["op"], buckets=(0.1, 1.0))
+    h.observe(0.05, "a")
+    h.observe(0.5, "a")
+    h.observe(5.0, "a")
+    lines = h.render()
+    assert 't_seconds_bucket{op="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{op="a",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{op="a"} 3' in lines
+
+
+def test_counter_label_escaping():
+    c = metrics.Counter("t_total", "test", ["name"])
+    c.inc('a"b')
+    c.inc('a"b', amount=2)
+    assert c.render() == ['t_total{name="a\\"b"} 3']
+
+
+def test_log_tool_records_calls_and_errors():
+    @log_tool("metrics_test_tool")
+    def tool(fail=False):
+        if fail:
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    calls = metrics.MCP_TOOL_CALLS.value("metrics_test_tool")
+    errors = metrics.MCP_TOOL_ERRORS.value("metrics_test_tool")
+    tool()
+    try:
+        tool(fail=True)
+    except RuntimeError:
+        pass
+    assert metrics.MCP_TOOL_CALLS.value("metrics_test_tool") == calls + 2
+    assert metrics.MCP_TOOL_ERRORS.value("metrics_test_tool") == errors + 1
+    assert metrics.MCP_TOOL_DURATION.count("metrics_test_tool") >= 1
+    assert "duck_mcp_tool_calls_total{tool=\"metrics_test_tool\"}" in metrics.render()
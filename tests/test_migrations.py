@@ -0,0 +1,69 @@
+"""Tests – schema versioning: fresh databases are stamped, old ones are migrated."""
+
+import sqlite3
+
+import db
+
+
+def _get_indexes(conn: sqlite3.Connection) -> set:
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()}
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_fresh_db_is_stamped_with_latest_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "fresh.db")
+    db.init_db()
+    conn = db.get_connection()
+    assert _user_version(conn) == db.SCHEMA_VERSION
+    conn.close()
+
+
+def test_unversioned_db_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "old.db")
+    db.init_db()
+    conn = db.get_connection()
+    # Simulate a database created before the migration runner existed
+    conn.execute("DROP INDEX idx_mo_so")
+    conn.execute("DROP INDEX idx_inv_status_due")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+
+    applied = db.migrate(conn)
+
+    assert applied == [v for v, _, _ in db.MIGRATIONS]
+    assert {"idx_mo_so", "idx_inv_status_due"} <= _get_indexes(conn)
+    assert _user_version(conn) == db.SCHEMA_VERSION
+    assert db.migrate(conn) == []
+    conn.close()
+
+
+def test_db_older_than_a_table_is_migrated_then_completed(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "older.db")
+    db.init_db()
+    conn = db.get_connection()
+    # Built before QC holds and the activity log existed
+    conn.execute("DROP TABLE qc_hold_batches")
+    conn.execute("DROP TABLE activity_log")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+
+    db.init_db(conn)
+
+    assert {"idx_qc_hold_batch_item", "idx_actlog_ts_id"} <= _get_indexes(conn)
+    assert "trace_id" in {r[1] for r in conn.execute("PRAGMA table_info(activity_log)")}
+    assert _user_version(conn) == db.SCHEMA_VERSION
+    conn.close()
+
+
+def test_add_column_is_idempotent(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "cols.db")
+    db.init_db()
+    conn = db.get_connection()
+    db._add_column(conn, "emails", "extra_note", "TEXT")
+    db._add_column(conn, "emails", "extra_note", "TEXT")
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(emails)")]
+    assert cols.count("extra_note") == 1
+    conn.close()
@@ -0,0 +1,26 @@
+"""Keyset pagination helpers: list totals and their short-lived cache."""
+
+import services._base as services_base
+from services._base import count_total, db_conn
+
+
+def test_approx_total_cache_keeps_only_recent_filters(monkeypatch):
+    monkeypatch.setattr(services_base, "_TOTAL_CACHE_MAX_ENTRIES", 3)
+    monkeypatch.setattr(services_base, "_total_cache", services_base.OrderedDict())
+    with db_conn() as conn:
+        for n in range(5):
+            count_total(conn, "customers", " WHERE id <> ?", [f"CUST-X{n}"], "approx")
+        count_total(conn, "customers", " WHERE id <> ?", ["CUST-X2"], "approx")
+        count_total(conn, "customers", " WHERE id <> ?", ["CUST-X5"], "approx")
+
+    assert [key[2] for key in services_base._total_cache] == [("CUST-X4",), ("CUST-X2",), ("CUST-X5",)]
+
+
+def test_approx_total_of_unfiltered_table_ignores_deleted_rows(monkeypatch):
+    monkeypatch.setattr(services_base, "_total_cache", services_base.OrderedDict())
+    with db_conn() as conn:
+        exact = count_total(conn, "stock", "", [], "exact")
+        conn.execute("DELETE FROM stock WHERE rowid = (SELECT MIN(rowid) FROM stock)")
+        conn.commit()
+
+        assert count_total(conn, "stock", "", [], "approx") == exact - 1
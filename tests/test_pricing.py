@@ -0,0 +1,79 @@
+"""Pricing engine: cached price list, one-pass line pricing, tiers and substitutions."""
+
+import config
+from services._base import db_conn
+from services.inventory import inventory_service
+from services.pricing import pricing_service
+from services.simulation import simulation_service
+
+
+def _set_price(item_id, price):
+    with db_conn() as conn:
+        conn.execute("UPDATE items SET unit_price = ? WHERE id = ?", (price, item_id))
+        conn.commit()
+
+
+def test_price_lines_applies_highest_volume_tier(monkeypatch):
+    monkeypatch.setattr(config, "PRICING_VOLUME_TIERS", ((100, 0.10), (24, 0.05)))
+
+    small = pricing_service.price_lines([("ITEM-CLASSIC-10", 10), ("ITEM-QC-DUCK", 5)])
+    assert [l["line_total"] for l in small["lines"]] == [100.0, 60.0]
+    assert (small["subtotal"], small["discount"], small["shipping"]) == (160.0, 0.0, config.PRICING_FLAT_SHIPPING)
+
+    assert pricing_service.price_lines([("ITEM-CLASSIC-10", 30)])["discount"] == 15.0
+    big = pricing_service.price_lines([("ITEM-CLASSIC-10", 100), ("ITEM-PVC", 1)])
+    assert big["lines"][1]["unit_price"] == config.PRICING_DEFAULT_UNIT_PRICE
+    assert big["discount"] == 0.10 * big["subtotal"]
+    assert big["total"] == big["subtotal"] - big["discount"]
+
+
+def test_compute_pricing_describes_the_tier_reached():
+    pricing = pricing_service.compute_pricing("SO-T001")["pricing"]
+    assert pricing["discounts"] == []
+
+    with db_conn() as conn:
+        conn.execute("UPDATE sales_order_lines SET qty = 30 WHERE id = 'SOL-T001'")
+        conn.commit()
+    discounts = pricing_service.compute_pricing("SO-T001")["pricing"]["discounts"]
+    assert discounts == [{"type": "volume", "description": "24+ units discount", "amount": -15.0}]
+
+
+def test_price_list_is_cached_until_invalidated():
+    assert pricing_service.get_unit_price("ITEM-CLASSIC-10") == 10.0
+    _set_price("ITEM-CLASSIC-10", 11.0)
+    assert pricing_service.get_unit_price("ITEM-CLASSIC-10") == 10.0
+
+    pricing_service.invalidate()
+    assert pricing_service.get_unit_price("ITEM-CLASSIC-10") == 11.0
+
+    _set_price("ITEM-CLASSIC-10", 12.0)
+    simulation_service.advance_time(hours=1, side_effects=False)
+    assert pricing_service.get_unit_price("ITEM-CLASSIC-10") == 12.0
+
+
+def test_substitutions_match_per_item_stock_summaries():
+    with db_conn() as conn:
+        conn.executemany(
+            "INSERT INTO items (id, sku, name, type, unit_price) VALUES (?, ?, ?, 'finished_good', ?)",
+            [("ITEM-SUB-A", "SUB-A", "Sub A", 11.0), ("ITEM-SUB-B", "SUB-B", "Sub B", 14.0),
+             ("ITEM-SUB-C", "SUB-C", "Sub C", 9.5), ("ITEM-SUB-D", "SUB-D", "Sub D", 9.0)],
+        )
+        conn.executemany(
+            "INSERT INTO stock (id, item_id, warehouse, location, on_hand) VALUES (?, ?, 'WH-LYON', 'FG', ?)",
+            [("STK-SA", "ITEM-SUB-A", 20), ("STK-SB", "ITEM-SUB-B", 20), ("STK-SD", "ITEM-SUB-D", 4)],
+        )
+        # SUB-D is fully reserved by an open order line
+        conn.execute(
+            "INSERT INTO sales_order_lines (id, sales_order_id, item_id, qty, unit_price, line_total) "
+            "VALUES ('SOL-SUB', 'SO-T001', 'ITEM-SUB-D', 4, 9.0, 36.0)"
+        )
+        conn.commit()
+    pricing_service.invalidate()
+    requested = {"id": "ITEM-CLASSIC-10", "type": "finished_good"}
+
+    subs = pricing_service.find_substitutions(requested, [])
+    assert [s["item"]["sku"] for s in subs] == ["SUB-A"]
+    assert subs[0]["unit_price"] == 11.0
+    expected = inventory_service.get_stock_summary("ITEM-SUB-A")
+    assert subs[0]["stock"]["available_total"] == expected["available_total"] == 20
+    assert pricing_service.find_substitutions(requested, ["SUB-B", "SUB-C"]) == []
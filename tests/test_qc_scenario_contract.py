@@ -3,33 +3,49 @@
 These tests verify that after running scenario s01, exactly 3 QC hold batches
 with 'pending' status exist, bound to the expected SKUs.
 
-We run the scenario against a fresh in-memory DB rather than the session DB
-to avoid polluting other tests.
+We run the scenario once per session against a fresh DB rather than the
+session DB, then give each test its own copy of the result.
 """
 
+import sqlite3
+
 import pytest
 
 from scenarios.s01_steady_state import run as run_s01
 import db
 
 
+@pytest.fixture(scope="session")
+def _s01_template(tmp_path_factory):
+    """DB seeded by base_setup + s01, built once per session."""
+    db_file = tmp_path_factory.mktemp("s01") / "scenario_template.db"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db, "DB_PATH", db_file)
+        db.init_db()
+
+        from scenarios.base_setup import populate as base_setup
+        conn = db.get_connection()
+        conn.execute("INSERT OR IGNORE INTO simulation_state (id, sim_time) VALUES (1, '2025-07-01 00:00:00')")
+        conn.commit()
+        conn.close()
+        base_result = base_setup()
+        ctx = {"customer_ids": base_result["customer_ids"], "base_result": base_result}
+        run_s01(ctx)
+    return db_file
+
+
 @pytest.fixture()
-def scenario_db(tmp_path, monkeypatch):
-    """Fresh DB seeded by s01 scenario."""
+def scenario_db(tmp_path, monkeypatch, _s01_template):
+    """Fresh copy of the s01-seeded DB."""
     db_file = tmp_path / "scenario_test.db"
+    source = sqlite3.connect(_s01_template)
+    target = sqlite3.connect(db_file)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
     monkeypatch.setattr(db, "DB_PATH", db_file)
-    db.init_db()
-
-    from scenarios.base_setup import populate as base_setup
-    import db as _db
-    conn = _db.get_connection()
-    conn.execute("INSERT OR IGNORE INTO simulation_state (id, sim_time) VALUES (1, '2025-07-01 00:00:00')")
-    conn.commit()
-    conn.close()
-    base_result = base_setup()
-    ctx = {"customer_ids": base_result["customer_ids"], "base_result": base_result}
-    run_s01(ctx)
-
     yield db_file
 
 
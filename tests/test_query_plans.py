@@ -0,0 +1,109 @@
+"""Query-plan regression tests for the service layer's hot paths.
+
+Runs representative service calls against a fresh seeded database with a
+trace callback installed, then ``EXPLAIN QUERY PLAN``s every statement they
+issued.  Any full-table scan not listed in ``ALLOWED_SCANS`` fails the test,
+so a missing index shows up here before it shows up as latency.
+"""
+
+import re
+import sqlite3
+
+import pytest
+
+import db
+import services._base as services_base
+from tests.seed_test_data import TABLE_DATA
+
+# Table (or alias, as EXPLAIN QUERY PLAN reports it) → why a full scan is fine
+ALLOWED_SCANS = {
+    "items": "catalog search scores every item in Python; the catalog is small",
+    "work_centers": "the scheduler needs every work center's capacity; a handful of rows",
+    # Legacy quote chains (no quote_chain_id) walk recursive CTEs of one row per revision
+    "up": "legacy quote chain walk towards the root",
+    "chain": "legacy quote chain walk back down to the latest revision",
+}
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@pytest.fixture()
+def traced_db(tmp_path, monkeypatch):
+    """Fresh seeded DB; yields the list every executed statement is appended to."""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "plans.db")
+    db.init_db()
+    conn = db.get_connection()
+    for table_name, rows in TABLE_DATA:
+        if not rows:
+            continue
+        cols = list(rows[0].keys())
+        conn.executemany(
+            f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+            [[row[c] for c in cols] for row in rows],
+        )
+    conn.commit()
+    conn.close()
+
+    statements: list[str] = []
+    real_get_connection = services_base.get_connection
+
+    def traced_connection() -> sqlite3.Connection:
+        conn = real_get_connection()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(services_base, "get_connection", traced_connection)
+    yield statements
+
+
+def _full_scans(statements: list[str]) -> set[tuple[str, str]]:
+    """Return (table, statement) pairs whose plan contains a full-table scan."""
+    conn = db.get_connection()
+    scans = set()
+    try:
+        for sql in set(statements):
+            if not re.match(r"\s*(SELECT|UPDATE|DELETE|WITH)\b", sql, re.IGNORECASE):
+                continue
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+                m = _SCAN_RE.match(row["detail"])
+                if m:
+                    scans.add((m.group(1), sql))
+    finally:
+        conn.close()
+    return scans
+
+
+def test_hot_paths_have_no_unexpected_full_scans(traced_db):
+    from services import (
+        activity_service, catalog_service, customer_service, inventory_service,
+        invoice_service, logistics_service, production_service, quote_service,
+        sales_service, simulation_service,
+    )
+
+    activity_service.get_log(limit=10)
+    activity_service.get_log(limit=10, category="sales", cursor=activity_service.get_log(limit=1)["next_cursor"] or None)
+    inventory_service.get_stock_summary("ITEM-CLASSIC-10")
+    inventory_service.check_availability("CLASSIC-DUCK-10CM", 6)
+    catalog_service.search_items(["classic", "duck"])
+    customer_service.find_customers(name="Alice")
+    customer_service.search_customers("Alice Testworth")
+    customer_service.get_customer_details("CUST-0101")
+    sales_service.search_orders(None, 10, "most_recent")
+    sales_service.search_orders(["CUST-0101"], 10, "most_recent")
+    sales_service.get_order_details("SO-T001")
+    sales_service.get_order_timeline("SO-T001")
+    sales_service.get_supply_chain_trace_for_order("SO-T001")
+    invoice_service.list_invoices(status="issued")
+    invoice_service.get_invoice("INV-T001")
+    quote_service.list_quotes(status="sent")
+    quote_service.get_quote("QUO-T001")
+    logistics_service.get_shipment_status("SHIP-T001")
+    production_service.get_order_status("MO-T001")
+    production_service.get_order_timeline("MO-T001")
+    simulation_service.advance_time(hours=1)
+
+    unexpected = sorted(
+        f"{table}: {sql}" for table, sql in _full_scans(traced_db)
+        if table not in ALLOWED_SCANS
+    )
+    assert not unexpected, "Full-table scans on hot paths:\n  " + "\n  ".join(unexpected)
@@ -0,0 +1,73 @@
+"""Quote revision chains: quote_chain_id, the legacy fallback and the backfill migration."""
+
+import db
+from services._base import db_conn
+from services.quote import quote_service
+from services.sales import sales_service
+
+
+def _revised_twice():
+    root = quote_service.create_quote("CUST-0101", None, None, [{"sku": "CLASSIC-DUCK-10CM", "qty": 6}])["quote_id"]
+    r2 = quote_service.revise_quote(root, {"lines": [{"sku": "CLASSIC-DUCK-10CM", "qty": 12}]})["quote_id"]
+    r3 = quote_service.revise_quote(r2)["quote_id"]
+    return root, r2, r3
+
+
+def test_revisions_share_the_root_chain_id():
+    root, r2, r3 = _revised_twice()
+
+    chain = quote_service.get_revision_chain(r2)
+    assert [q["id"] for q in chain] == [root, r2, r3]
+    listed = quote_service.list_quotes(quote_chain_id=root, show_superseded=True)["quotes"]
+    assert {q["id"] for q in listed} == {root, r2, r3}
+
+    detail = quote_service.get_quote(root)
+    assert [r["revision_number"] for r in detail["revisions"]] == [1, 2, 3]
+    assert detail["newer_revision"]["id"] == r2
+    assert detail["latest_revision"]["id"] == r3
+    assert quote_service.get_quote(r3)["latest_revision"] is None
+
+
+def test_legacy_chain_is_walked_and_stamped_on_revision():
+    with db_conn() as conn:
+        conn.executemany(
+            "INSERT INTO quotes (id, customer_id, revision_number, supersedes_quote_id, status, created_at) "
+            "VALUES (?, 'CUST-0101', ?, ?, ?, '2025-07-01')",
+            [("QUOTE-0900", 1, None, "superseded"), ("QUOTE-0900-R2", 2, "QUOTE-0900", "sent")],
+        )
+        conn.commit()
+    assert [q["id"] for q in quote_service.get_revision_chain("QUOTE-0900-R2")] == ["QUOTE-0900", "QUOTE-0900-R2"]
+
+    r3 = quote_service.revise_quote("QUOTE-0900-R2")
+    assert r3["quote_chain_id"] == "QUOTE-0900"
+    with db_conn() as conn:
+        chain_ids = {r[0] for r in conn.execute("SELECT quote_chain_id FROM quotes WHERE id LIKE 'QUOTE-0900%'")}
+    assert chain_ids == {"QUOTE-0900"}
+    assert len(quote_service.get_revision_chain("QUOTE-0900")) == 3
+
+
+def test_order_timeline_lists_the_quote_chain():
+    timeline = sales_service.get_order_timeline("SO-T001")
+    assert [q["id"] for q in timeline["quotes"]] == ["QUO-T001"]
+
+
+def test_migration_backfills_chain_ids(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "old.db")
+    db.init_db()
+    conn = db.get_connection()
+    conn.execute("DROP INDEX idx_quotes_chain")
+    conn.execute("ALTER TABLE quotes DROP COLUMN quote_chain_id")
+    conn.executemany(
+        "INSERT INTO quotes (id, customer_id, revision_number, supersedes_quote_id, created_at) "
+        "VALUES (?, 'CUST-0101', ?, ?, '2025-07-01')",
+        [("Q-1", 1, None), ("Q-1-R2", 2, "Q-1"), ("Q-1-R3", 3, "Q-1-R2"), ("Q-2", 1, None), ("Q-9-R2", 2, "Q-9")],
+    )
+    conn.execute("PRAGMA user_version = 6")
+    conn.commit()
+
+    assert 7 in db.migrate(conn)
+    chains = dict(conn.execute("SELECT id, quote_chain_id FROM quotes"))
+    assert chains == {"Q-1": "Q-1", "Q-1-R2": "Q-1", "Q-1-R3": "Q-1", "Q-2": "Q-2", "Q-9-R2": "Q-9-R2"}
+    plan = " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN SELECT id FROM quotes WHERE quote_chain_id = 'Q-1'"))
+    assert "idx_quotes_chain" in plan
+    conn.close()
@@ -0,0 +1,47 @@
+"""Smoke tests for the MCP tool-call replay harness and the fake inference provider."""
+
+import asyncio
+
+import config
+import db
+from benchmarks import replay
+from services import myforterro
+
+
+def test_load_session_keeps_mcp_calls_in_order():
+    calls = replay.load_session(db.ROOT / "chatlogs" / "0001.json")
+    names = [name for name, _ in calls]
+    # system_get_current_date_time_iso is a client-side tool and is skipped
+    assert names == ["stats_get_summary"] * 3 + ["inventory_get_stock"] * 3
+    assert calls[3][1] == {"item_id": "ITEM-PIRATE-15"}
+
+
+def test_inprocess_replay_reports_per_tool_stats():
+    sessions = [[("catalog_search_items", {"words": ["duck"]}), ("inventory_get_stock", {"item_id": "NO-SUCH-ITEM"})]]
+
+    async def go():
+        async with replay.open_callers("inprocess", 2, "", None) as callers:
+            return await replay.replay(sessions, callers, iterations=3)
+
+    report = asyncio.run(go())
+    assert report["calls"] == 6
+    assert set(report["tools"]) == {"catalog_search_items", "inventory_get_stock"}
+    assert report["tools"]["catalog_search_items"]["errors"] == 0
+    assert report["tools"]["inventory_get_stock"]["calls"] == 3
+    assert report["lock_contention"] is False
+
+
+def test_lock_errors_are_flagged():
+    report = replay.build_report(
+        {"quote_create": [5.0, 7.0]},
+        {"quote_create": ["Error executing tool quote_create: database is locked"]},
+        1.0,
+    )
+    assert report["lock_errors"] == 1 and report["lock_contention"]
+    assert any("lock contention" in line for line in replay.format_report(report))
+
+
+def test_fake_inference_provider(monkeypatch):
+    monkeypatch.setattr(config, "INFERENCE_FAKE", True)
+    resp = myforterro.chat_completion(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+    assert resp.choices[0].message.content == "{}"
@@ -40,3 +40,23 @@ def test_dashboard(rest_client):
     assert resp.status_code == 200
     data = resp.json()
     assert isinstance(data, dict)
+
+
+def test_activity_log_cursor_pages_do_not_overlap(rest_client):
+    first = rest_client.get("/api/activity-log", params={"limit": 1}).json()
+    assert "next_cursor" in first
+    if first["next_cursor"] is None:
+        assert first["total"] <= 1
+        return
+    second = rest_client.get("/api/activity-log", params={
+        "limit": 1, "cursor": first["next_cursor"], "total": "none",
+    }).json()
+    assert second["total"] is None
+    assert second["entries"][0]["id"] != first["entries"][0]["id"]
+    assert (second["entries"][0]["timestamp"], second["entries"][0]["id"]) < \
+        (first["entries"][0]["timestamp"], first["entries"][0]["id"])
+
+
+def test_activity_log_bad_cursor(rest_client):
+    resp = rest_client.get("/api/activity-log", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
@@ -0,0 +1,64 @@
+"""REST response encoding: JSON backend, compression and streamed list bodies."""
+
+import asyncio
+import json
+
+import pytest
+
+import config
+from api_routes import _common
+from services import activity_service
+
+pytestmark = pytest.mark.rest
+
+
+@pytest.fixture()
+def busy_log():
+    activity_service.log_batch([
+        {"actor": "mcp:sales", "category": "sales", "action": "quote.created",
+         "entity_type": "quote", "entity_id": f"Q-{i:04d}", "details": {"note": "rubber duck order " * 5}}
+        for i in range(60)
+    ])
+
+
+def test_stdlib_backend_is_compact_and_keeps_unicode(monkeypatch):
+    monkeypatch.setattr(config, "JSON_BACKEND", "stdlib")
+    assert _common.dumps({"name": "Canard jaune ü", "n": [1, 2.5, None]}) == (
+        '{"name":"Canard jaune ü","n":[1,2.5,null]}'.encode("utf-8")
+    )
+
+
+def test_large_responses_are_gzipped(rest_client, busy_log):
+    resp = rest_client.get("/api/activity-log?limit=200", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert "entries" in resp.json()
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(rest_client, busy_log):
+    assert "content-encoding" not in rest_client.get("/api/health", headers={"Accept-Encoding": "gzip"}).headers
+    resp = rest_client.get("/api/activity-log?limit=200", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in resp.headers
+
+
+def test_streamed_list_matches_buffered_body(rest_client, busy_log, monkeypatch):
+    buffered = rest_client.get("/api/activity-log?limit=100").json()
+    monkeypatch.setattr(config, "RESPONSE_STREAM_MIN_ITEMS", 1)
+    resp = rest_client.get("/api/activity-log?limit=100", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-length" not in resp.headers  # chunked
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json() == buffered
+    assert len(buffered["entries"]) == 61
+
+
+def test_stream_body_is_valid_json_for_any_chunking(monkeypatch):
+    monkeypatch.setattr(config, "RESPONSE_STREAM_MIN_ITEMS", 1)
+    data = {"total": 5, "entries": [{"id": i} for i in range(5)]}
+    response = _common._json_stream(data, "entries", chunk_items=2)
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert json.loads(asyncio.run(collect())) == data
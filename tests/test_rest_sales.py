@@ -73,3 +73,16 @@ def test_quote_options(rest_client):
     assert resp.status_code == 200
     data = resp.json()
     assert isinstance(data, dict)
+
+
+def test_bulk_create_sales_orders(rest_client):
+    resp = rest_client.post("/api/sales-orders/bulk", json={"orders": [
+        {"customer_id": "CUST-0101", "lines": [{"sku": "CLASSIC-DUCK-10CM", "qty": 12}]},
+        {"customer_id": "CUST-0101", "lines": [{"sku": "NO-SUCH-SKU", "qty": 1}]},
+    ]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["failed"]) == (1, 1)
+    assert_shape(data["results"][0], {"index": int, "status": str, "quote_id": str, "sales_order_id": str, "total": AnyOf(int, float)})
+
+    assert rest_client.post("/api/sales-orders/bulk", json={}).status_code == 400
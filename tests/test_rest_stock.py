@@ -28,3 +28,17 @@ def test_get_stock_detail(rest_client):
     data = resp.json()
     assert data["id"] == "STK-T004"
     assert "on_hand" in data
+
+
+def test_list_stock_cursor_walks_all_rows(rest_client):
+    everything = rest_client.get("/api/stock", params={"limit": 1000}).json()
+    assert everything["next_cursor"] is None
+    seen = []
+    params = {"limit": 2}
+    while True:
+        page = rest_client.get("/api/stock", params=params).json()
+        seen.extend(r["id"] for r in page["stock"])
+        if page["next_cursor"] is None:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+    assert seen == [r["id"] for r in everything["stock"]]
@@ -2,6 +2,8 @@
 
 import pytest
 
+from tests.contract_helpers import assert_shape, AnyOf
+
 pytestmark = pytest.mark.rest
 
 
@@ -28,3 +30,39 @@ def test_spotlight(rest_client):
     assert isinstance(data, dict)
     for key in ("customers", "quotes", "sales_orders", "shipments", "invoices"):
         assert key in data, f"Missing spotlight key: {key}"
+
+
+def test_admin_query_stats(rest_client):
+    resp = rest_client.get("/api/admin/query-stats", params={"limit": 5})
+    assert resp.status_code == 200
+    assert_shape(resp.json(), {
+        "tracing_enabled": bool,
+        "slow_query_ms": AnyOf(int, float),
+        "statements": list,
+    })
+
+
+def test_admin_query_stats_bad_sort(rest_client):
+    resp = rest_client.get("/api/admin/query-stats", params={"sort": "nope"})
+    assert resp.status_code == 400
+
+
+def test_admin_query_stats_reset_needs_confirmation(rest_client):
+    resp = rest_client.post("/api/admin/query-stats/reset", params={"tracing": "true"})
+    assert resp.status_code == 400
+
+    resp = rest_client.post("/api/admin/query-stats/reset", params={"confirm": "kondor"})
+    assert resp.status_code == 200
+    assert resp.json()["reset"] is True
+
+
+def test_metrics(rest_client):
+    rest_client.get("/api/health")
+    resp = rest_client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    for name in ("duck_mcp_tool_calls_total", "duck_http_request_duration_seconds",
+                 "duck_db_session_seconds", "duck_simulation_tick_seconds"):
+        assert f"# TYPE {name} " in body
+    assert 'duck_http_request_duration_seconds_count{route="api_health",method="GET",status="200"}' in body
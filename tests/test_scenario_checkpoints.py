@@ -0,0 +1,64 @@
+"""Scenario engine checkpoints: save after each stage, restore with ``--from``."""
+
+import sqlite3
+
+import db
+from scenarios import engine
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_base_setup_checkpoint_restores_database_and_ctx(tmp_path, monkeypatch):
+    demo = tmp_path / "demo.db"
+    monkeypatch.setattr(db, "DB_PATH", demo)
+    monkeypatch.setattr(engine, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+
+    engine.run_scenarios(base_only=True)
+    saved = sorted(p.name for p in (tmp_path / "checkpoints").iterdir())
+    assert len(saved) == 2 and saved[0].startswith("00-base_setup-")
+    customers = _count(demo, "customers")
+    assert customers
+
+    conn = sqlite3.connect(demo)
+    conn.execute("DELETE FROM customers")
+    conn.commit()
+    conn.close()
+
+    # No checkpoint after s01 exists yet, so the base_setup one is the latest valid
+    chain, ctx = engine.restore_checkpoint(engine.SCENARIO_MODULES[:1])
+    assert chain == []
+    assert ctx["customer_ids"]
+    assert _count(demo, "customers") == customers
+
+
+def test_checkpoint_is_invalidated_by_source_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "demo.db")
+    monkeypatch.setattr(engine, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+    extra = tmp_path / "extra.py"
+    extra.write_text("A = 1\n")
+    monkeypatch.setattr(engine, "_SHARED_SOURCES", engine._SHARED_SOURCES + [extra])
+
+    engine.reset_database()
+    engine.save_checkpoint([], {"customer_ids": []})
+    assert engine.restore_checkpoint([]) is not None
+
+    extra.write_text("A = 2\n")
+    assert engine.restore_checkpoint([]) is None
+
+
+def test_checkpoint_key_depends_on_chain():
+    base = engine.checkpoint_key([])
+    s01 = engine.checkpoint_key(engine.SCENARIO_MODULES[:1])
+    assert base != s01
+    assert engine.checkpoint_key(engine.SCENARIO_MODULES[:1]) == s01
+
+
+def test_checkpoint_key_covers_modules_the_services_import():
+    shared = {path.name for path in engine._SHARED_SOURCES}
+    assert {"utils.py", "events.py", "metrics.py", "tracing.py"} <= shared
@@ -0,0 +1,77 @@
+"""Scenario engine ``--fast`` mode: in-memory build must match a normal run row for row."""
+
+import sqlite3
+
+import pytest
+
+import db
+from scenarios import engine
+from services import customer_service, logistics_service
+from services._base import pinned_connection
+
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        data = {t: sorted(conn.execute(f"SELECT * FROM {t}").fetchall(), key=repr) for t in tables}
+        data["user_version"] = conn.execute("PRAGMA user_version").fetchone()[0]
+        return data
+    finally:
+        conn.close()
+
+
+def test_fast_base_setup_matches_normal_run(tmp_path, monkeypatch):
+    normal, fast = tmp_path / "normal.db", tmp_path / "fast.db"
+    monkeypatch.setattr(engine, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+
+    monkeypatch.setattr(db, "DB_PATH", normal)
+    engine.run_scenarios(base_only=True)
+    monkeypatch.setattr(db, "DB_PATH", fast)
+    engine.run_scenarios(base_only=True, fast=True)
+
+    normal_rows, fast_rows = _dump(normal), _dump(fast)
+    assert normal_rows["customers"]
+    assert fast_rows == normal_rows
+
+
+def test_daily_commit_connection_commits_once_per_sim_day():
+    conn = engine.open_memory_database()
+    try:
+        engine.reset_database(conn)
+        conn.deferring = True
+        base = conn.commits
+
+        conn.commit()  # first commit of the day goes through
+        conn.execute("INSERT INTO suppliers (id, name, lead_time_days) VALUES ('SUP-X', 'X', 5)")
+        conn.commit()
+        conn.commit()
+        assert conn.commits == base + 1
+        assert conn.in_transaction
+
+        conn.execute("UPDATE simulation_state SET sim_time = '2025-01-02 00:00:00' WHERE id = 1")
+        conn.commit()
+        assert conn.commits == base + 2
+        assert not conn.in_transaction
+    finally:
+        conn.close()
+
+
+def test_failed_service_call_keeps_the_days_earlier_writes():
+    conn = engine.open_memory_database()
+    try:
+        engine.reset_database(conn)
+        conn.deferring = True
+        with pinned_connection(conn):
+            conn.commit()
+            customer_id = customer_service.create_customer(name="Kept Customer")["customer_id"]
+            with pytest.raises(ValueError, match="not found"):
+                logistics_service.dispatch_shipment("SHIP-NOPE")
+            assert conn.execute("SELECT 1 FROM customers WHERE id = ?", (customer_id,)).fetchone()
+
+        with pytest.raises(RuntimeError, match="deferred commits"):
+            conn.rollback()
+    finally:
+        conn.close()
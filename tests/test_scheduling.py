@@ -0,0 +1,103 @@
+"""Finite-capacity scheduler: dispatch rules, capacity limits and stored plans."""
+
+import time
+
+import pytest
+
+from services._base import db_conn
+from services.scheduling import compute_schedule, scheduling_service
+from services.sales import sales_service
+
+
+def _order(mo_id, due, *ops):
+    return (mo_id, due, [(f"{mo_id}-{i}", wc, hours, None) for i, (wc, hours) in enumerate(ops)])
+
+
+def test_capacity_limits_concurrent_operations():
+    orders = [_order(f"MO-{i:04d}", None, ("MOLDING", 2.0)) for i in range(5)]
+    op_plan, _ = compute_schedule(orders, {"MOLDING": 2})
+
+    starts = sorted(start for start, _ in op_plan.values())
+    assert starts == [0.0, 0.0, 2.0, 2.0, 4.0]
+
+
+def test_operations_follow_sequence_within_an_order():
+    op_plan, mo_plan = compute_schedule([_order("MO-0001", None, ("MOLDING", 1.0), ("PAINTING", 0.5))], {"MOLDING": 1, "PAINTING": 1})
+
+    assert op_plan["MO-0001-1"] == (1.0, 1.5)
+    assert mo_plan["MO-0001"] == (0.0, 1.5)
+
+
+def test_edd_prefers_earliest_due_date_and_fifo_prefers_oldest_order():
+    orders = [
+        _order("MO-0001", "2025-09-01", ("MOLDING", 1.0)),
+        _order("MO-0002", "2025-08-05", ("MOLDING", 1.0)),
+    ]
+    edd, _ = compute_schedule(orders, {"MOLDING": 1}, "edd")
+    fifo, _ = compute_schedule(orders, {"MOLDING": 1}, "fifo")
+
+    assert edd["MO-0002-0"][0] == 0.0 and edd["MO-0001-0"][0] == 1.0
+    assert fifo["MO-0001-0"][0] == 0.0 and fifo["MO-0002-0"][0] == 1.0
+
+
+def test_running_operation_keeps_its_slot():
+    running = ("MO-0002", None, [("MO-0002-0", "MOLDING", 3.0, -1.0)])
+    op_plan, _ = compute_schedule([_order("MO-0001", None, ("MOLDING", 1.0)), running], {"MOLDING": 1})
+
+    assert op_plan["MO-0002-0"] == (-1.0, 2.0)
+    assert op_plan["MO-0001-0"] == (2.0, 3.0)
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError, match="dispatch rule"):
+        compute_schedule([], {}, "spt")
+
+
+def test_ten_thousand_operations_plan_in_under_a_second():
+    centers = ["MOLDING", "PAINTING", "QC", "PACKAGING"]
+    orders = [
+        _order(f"MO-{i:05d}", f"2025-{8 + i % 4:02d}-{1 + i % 28:02d}", *[(wc, 0.25 + (i % 7) / 4) for wc in centers])
+        for i in range(2500)
+    ]
+    t0 = time.perf_counter()
+    op_plan, mo_plan = compute_schedule(orders, {wc: 3 for wc in centers})
+    assert time.perf_counter() - t0 < 1.0
+    assert len(op_plan) == 10_000 and len(mo_plan) == 2500
+
+
+def test_replan_stores_plan_and_only_rewrites_changed_rows():
+    first = scheduling_service.replan()
+    assert first["planned_operations"] == 4
+    assert first["updated_operations"] == 4
+
+    with db_conn() as conn:
+        ops = conn.execute(
+            "SELECT planned_start, planned_end FROM production_operations WHERE production_order_id = 'MO-T001' ORDER BY sequence_order"
+        ).fetchall()
+        mo = conn.execute("SELECT planned_start, planned_finish, eta_finish FROM production_orders WHERE id = 'MO-T001'").fetchone()
+    assert ops[0]["planned_start"] == "2025-08-01 08:00:00"
+    assert ops[-1]["planned_end"] == "2025-08-01 10:30:00"
+    assert mo["planned_finish"] == "2025-08-01 10:30:00"
+    assert mo["eta_finish"] is None
+
+    second = scheduling_service.replan()
+    assert second["updated_operations"] == 0 and second["updated_orders"] == 0
+
+
+def test_sales_order_details_expose_production_eta():
+    scheduling_service.replan()
+    detail = sales_service.get_order_details("SO-T001")
+
+    assert detail["production_eta"] == "2025-08-01 10:30:00"
+    assert [mo["production_order_id"] for mo in detail["production_orders"]] == ["MO-T001"]
+
+
+def test_production_eta_ignores_completed_orders():
+    scheduling_service.replan()
+    with db_conn() as conn:
+        conn.execute("UPDATE production_orders SET status = 'completed' WHERE id = 'MO-T001'")
+        conn.commit()
+    detail = sales_service.get_order_details("SO-T001")
+
+    assert detail["production_eta"] is None
+    assert [mo["production_order_id"] for mo in detail["production_orders"]] == ["MO-T001"]
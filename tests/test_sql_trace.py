@@ -0,0 +1,53 @@
+"""Tests – connection-layer SQL tracing: normalisation, timing, attribution."""
+
+import pytest
+
+import db
+from services import db_conn
+
+
+@pytest.fixture()
+def tracing():
+    db.reset_query_stats()
+    db.set_query_tracing(True)
+    yield
+    db.set_query_tracing(False)
+    db.reset_query_stats()
+
+
+def test_normalize_sql_collapses_literals_and_in_lists():
+    assert db.normalize_sql("SELECT * FROM t WHERE a = 'x' AND b IN (?, ?,?)  AND c > 10") == \
+        "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ?"
+    assert db.normalize_sql("SELECT * FROM idx_2 WHERE id = 'O''Brien'") == \
+        "SELECT * FROM idx_2 WHERE id = ?"
+
+
+def test_traced_statements_record_rows_and_origin(tracing):
+    with db.query_origin("mcp:test_tool"):
+        with db_conn() as conn:
+            rows = conn.execute("SELECT id FROM customers WHERE id IN (?, ?)", ("CUST-0101", "CUST-0102")).fetchall()
+            for _ in conn.execute("SELECT id FROM items"):
+                pass
+
+    stats = {s["sql"]: s for s in db.get_query_stats(limit=100, sort="calls")}
+    customers = stats["SELECT id FROM customers WHERE id IN (...)"]
+    assert customers["calls"] == 1
+    assert customers["rows"] == len(rows)
+    assert customers["origins"] == {"mcp:test_tool": 1}
+    assert customers["p50_ms"] <= customers["p99_ms"]
+    assert stats["SELECT id FROM items"]["rows"] >= 1
+
+
+def test_untraced_connections_record_nothing():
+    db.reset_query_stats()
+    with db_conn() as conn:
+        conn.execute("SELECT 1").fetchall()
+    assert db.get_query_stats() == []
+
+
+def test_slow_queries_are_logged(tracing, monkeypatch, caplog):
+    monkeypatch.setattr(db.config, "SQL_SLOW_QUERY_MS", 0.0)
+    with caplog.at_level("WARNING", logger="duck-demo.sql"):
+        with db_conn() as conn:
+            conn.execute("SELECT COUNT(*) FROM items").fetchone()
+    assert any("[SlowQuery]" in r.getMessage() for r in caplog.records)
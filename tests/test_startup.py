@@ -0,0 +1,35 @@
+"""Cold-start budget for server.py and the lazy imports that keep it small."""
+
+import sys
+
+from benchmarks import startup
+from utils import lazy_import
+
+
+def test_parse_importtime_rows():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     config\n"
+        "import time:      2500 |       2620 |   db\n"
+        "import time:     80000 |      82620 | server\n"
+    )
+    rows = startup.parse_importtime(stderr)
+    assert [(r["module"], r["depth"]) for r in rows] == [("config", 2), ("db", 1), ("server", 0)]
+    assert rows[-1]["self_ms"] == 80.0 and rows[-1]["cumulative_ms"] == 82.62
+
+
+def test_lazy_import_defers_until_first_attribute():
+    calls = []
+    json_proxy = lazy_import("json", before=lambda: calls.append("before"))
+    assert calls == [] and "not loaded" in repr(json_proxy)
+
+    assert json_proxy.dumps([1]) == "[1]"
+    assert json_proxy.loads("2") == 2
+    assert calls == ["before"]
+    assert json_proxy._module is sys.modules["json"]
+
+
+def test_server_cold_start_within_budget():
+    report = startup.run(runs=2)
+    assert report["deferred_loaded"] == []
+    assert report["ok"], "\n".join(startup.format_report(report))
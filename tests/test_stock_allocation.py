@@ -0,0 +1,78 @@
+"""Batched stock allocation: pick planning, preference rules and one-batch writes."""
+
+import pytest
+
+import config
+from services._base import db_conn
+from services.inventory import inventory_service, plan_picks
+
+
+def _row(stock_id, on_hand, warehouse=config.WAREHOUSE_DEFAULT, location="FG", item_id="ITEM-X"):
+    return {"id": stock_id, "item_id": item_id, "warehouse": warehouse, "location": location, "on_hand": on_hand}
+
+
+def _taken(plan, item_id="ITEM-X"):
+    return [(row["id"], take) for row, take in plan["picks"][item_id]]
+
+
+def test_oldest_lot_is_picked_first():
+    rows = [_row("STK-10000", 5), _row("STK-9999", 5), _row("STK-0042", 5)]
+    plan = plan_picks(rows, {"ITEM-X": 8})
+
+    assert _taken(plan) == [("STK-0042", 5), ("STK-9999", 3)]
+    assert plan["shortages"] == {}
+
+
+def test_preferred_warehouse_then_location_then_age(monkeypatch):
+    monkeypatch.setattr(config, "STOCK_PICK_LOCATION_PREFERENCE", ("PICK-FACE",))
+    rows = [
+        _row("STK-0001", 5, warehouse="WH-OTHER"),
+        _row("STK-0002", 5, location="BULK"),
+        _row("STK-0003", 5, location="PICK-FACE"),
+    ]
+    plan = plan_picks(rows, {"ITEM-X": 12}, warehouse=config.WAREHOUSE_DEFAULT)
+
+    assert _taken(plan) == [("STK-0003", 5), ("STK-0002", 5), ("STK-0001", 2)]
+
+
+def test_shortage_is_reported_per_item():
+    plan = plan_picks([_row("STK-0001", 5)], {"ITEM-X": 7, "ITEM-Y": 1})
+    assert plan["shortages"] == {"ITEM-X": 2, "ITEM-Y": 1}
+
+
+def test_allocate_stock_applies_whole_pick_list():
+    result = inventory_service.allocate_stock(
+        [("ITEM-BOX-SMALL", 150), ("ITEM-YELLOW-DYE", 100), ("ITEM-BOX-SMALL", 50)],
+        reference_type="shipment", reference_id="SHIP-T001",
+    )
+
+    assert [(a["item_id"], a["qty_deducted"]) for a in result["allocations"]] == [("ITEM-BOX-SMALL", 200), ("ITEM-YELLOW-DYE", 100)]
+    with db_conn() as conn:
+        stock = dict(conn.execute("SELECT id, on_hand FROM stock WHERE id IN ('STK-T002', 'STK-T003')").fetchall())
+        movements = conn.execute(
+            "SELECT id, item_id, movement_type, qty FROM stock_movements WHERE reference_id = 'SHIP-T001' ORDER BY id"
+        ).fetchall()
+    assert stock == {"STK-T002": 500}  # the emptied box row is removed
+    assert [tuple(m)[1:] for m in movements] == [
+        ("ITEM-BOX-SMALL", "shipment_out", -200),
+        ("ITEM-YELLOW-DYE", "shipment_out", -100),
+    ]
+    assert len({m["id"] for m in movements}) == 2
+
+
+def test_allocate_stock_writes_nothing_when_short():
+    with pytest.raises(ValueError, match="Insufficient stock for item ITEM-YELLOW-DYE"):
+        inventory_service.allocate_stock([("ITEM-BOX-SMALL", 10), ("ITEM-YELLOW-DYE", 10_000)])
+
+    with db_conn() as conn:
+        assert conn.execute("SELECT on_hand FROM stock WHERE id = 'STK-T003'").fetchone()[0] == 200
+
+
+def test_allocation_reads_the_positive_stock_index():
+    with db_conn() as conn:
+        plan = " ".join(r[3] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, item_id, warehouse, location, on_hand FROM stock "
+            "WHERE item_id IN (?, ?) AND on_hand > 0 ORDER BY item_id, id",
+            ("ITEM-PVC", "ITEM-BOX-SMALL"),
+        ))
+    assert "idx_stock_positive" in plan
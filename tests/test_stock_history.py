@@ -0,0 +1,87 @@
+"""Point-in-time inventory from daily snapshots plus the movement ledger."""
+
+import time
+
+from services._base import db_conn
+from services.inventory import inventory_service
+from services.simulation import simulation_service
+from services.stats import stats_service
+from services.stock_history import stock_history_service
+
+
+def _ship(qty):
+    inventory_service.allocate_stock([("ITEM-CLASSIC-10", qty)], reference_type="shipment", reference_id="SHIP-T001")
+
+
+def _history():
+    # 48 on hand on 08-01, ship 10 on 08-02, ship 5 on 08-05
+    simulation_service.advance_time(days=1, side_effects=False)
+    _ship(10)
+    simulation_service.advance_time(days=3, side_effects=False)
+    _ship(5)
+
+
+def _on_hand(day):
+    return stock_history_service.get_on_hand_as_of(day, ["ITEM-CLASSIC-10"]).get("ITEM-CLASSIC-10", 0)
+
+
+def test_leaving_a_day_snapshots_its_closing_stock():
+    _history()
+    with db_conn() as conn:
+        rows = conn.execute("SELECT day, on_hand FROM inventory_snapshots WHERE item_id = 'ITEM-CLASSIC-10' ORDER BY day").fetchall()
+    assert [tuple(r) for r in rows] == [("2025-08-01", 48), ("2025-08-02", 38)]
+
+
+def test_as_of_matches_with_and_without_snapshots():
+    _history()
+    expected = {"2025-07-31": 0, "2025-08-01": 48, "2025-08-02": 38, "2025-08-04": 38, "2025-08-05": 33}
+    assert {day: _on_hand(day) for day in expected} == expected
+
+    with db_conn() as conn:
+        conn.execute("DELETE FROM inventory_snapshots")
+        conn.commit()
+    assert {day: _on_hand(day) for day in expected} == expected
+
+
+def test_series_and_stats_entity():
+    _history()
+    series = stock_history_service.get_series("2025-08-01", "2025-08-05", ["ITEM-CLASSIC-10"])
+    assert series["series"]["ITEM-CLASSIC-10"] == [48, 38, 38, 38, 33]
+
+    stats = stats_service.get_statistics(
+        "stock_history", "sum", ["date", "item_id"], None, None, None, None, None,
+        ["ITEM-CLASSIC-10"], 10, date_from="2025-08-04", date_to="2025-08-05",
+    )
+    assert stats["results"] == [
+        {"date": "2025-08-04", "item_id": "ITEM-CLASSIC-10", "value": 38},
+        {"date": "2025-08-05", "item_id": "ITEM-CLASSIC-10", "value": 33},
+    ]
+    assert "error" in stats_service.get_statistics(
+        "stock_history", "sum", "warehouse", None, None, None, None, None, None, 10,
+    )
+
+
+def test_stock_as_of_by_sku():
+    _history()
+    result = stock_history_service.get_stock_as_of("2025-08-02", ["CLASSIC-DUCK-10CM"])
+    assert result["items"][0]["on_hand"] == 38
+
+
+def test_series_for_hundreds_of_items_is_fast():
+    items = [f"ITEM-H{i:03d}" for i in range(300)]
+    with db_conn() as conn:
+        conn.executemany(
+            "INSERT INTO stock (id, item_id, warehouse, location, on_hand) VALUES (?, ?, 'WH-H', 'FG', 30)",
+            [(f"STK-H{i:03d}", item) for i, item in enumerate(items)],
+        )
+        conn.executemany(
+            "INSERT INTO stock_movements (id, timestamp, item_id, movement_type, qty, stock_id) "
+            "VALUES (?, ?, ?, 'adjustment', 1, ?)",
+            [(f"MOV-H{i}-{d}", f"2025-07-{d:02d}T10:00:00", item, f"STK-H{i:03d}") for i, item in enumerate(items) for d in range(1, 31)],
+        )
+        conn.commit()
+    t0 = time.perf_counter()
+    series = stock_history_service.get_series("2025-07-01", "2025-07-30", items)
+    elapsed = time.perf_counter() - t0
+    assert series["series"]["ITEM-H000"] == list(range(1, 31))
+    assert elapsed < 0.5, f"series took {elapsed * 1000:.0f} ms"
@@ -0,0 +1,86 @@
+"""Tool-call tracing: size caps and redaction, sampling, trace IDs and the async log file."""
+
+import base64
+import logging
+import os
+
+import pytest
+
+import config
+import tracing
+from mcp_tools._common import log_tool
+from services.activity import activity_service
+
+
+def test_summarize_caps_and_redacts():
+    image = "data:image/png;base64," + base64.b64encode(bytes(3000)).decode()
+    summary = tracing.summarize({
+        "image": "https://example.com/photo.jpg",
+        "payload": image,
+        "note": "quack " * 100,
+        "rows": list(range(50)),
+        "blob": b"\x00" * 10,
+        "nested": {"a": {"b": {"c": {"d": {"e": 1}}}}},
+    })
+    assert summary["image"] == "<redacted 29 chars>"
+    assert summary["payload"] == f"<base64 {len(image)} chars>"
+    assert summary["note"] == ("quack " * 100)[:200] + "...(+400 chars)"
+    assert summary["rows"][-1] == "...(+30 items)" and len(summary["rows"]) == 21
+    assert summary["blob"] == "<10 bytes>"
+    assert summary["nested"]["a"]["b"]["c"] == "<dict>"
+
+
+def test_sampling_skips_successes_but_not_errors(monkeypatch, caplog):
+    monkeypatch.setattr(config, "TOOL_TRACE_SAMPLE_RATE", 0.0)
+
+    @log_tool("tracing_test_tool")
+    def tool(fail=False):
+        if fail:
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    with caplog.at_level(logging.INFO, logger="duck-demo.trace"):
+        tool()
+        with pytest.raises(RuntimeError):
+            tool(fail=True)
+    messages = [r.getMessage() for r in caplog.records]
+    assert len(messages) == 1 and messages[0].startswith("[CallToolError] tool=tracing_test_tool")
+
+
+def test_trace_id_reaches_activity_rows(caplog):
+    @log_tool("crm_create_customer")
+    def tool(image=None):
+        activity_service.log_activity("mcp:crm", "sales", "customer.checked", "customer", "CUST-0101")
+        return {"customer_id": "CUST-0101"}
+
+    with caplog.at_level(logging.INFO, logger="duck-demo.trace"):
+        tool(image="A" * 10_000)
+    request = next(r.getMessage() for r in caplog.records if r.getMessage().startswith("[CallToolRequest]"))
+    trace_id = request.split("trace=")[1].split()[0]
+    assert "AAAA" not in request
+
+    rows = activity_service.get_log(trace_id=trace_id)["entries"]
+    assert sorted(r["action"] for r in rows) == ["customer.checked", "customer.created"]
+    assert tracing.current_trace_id() is None
+
+
+def test_trace_records_are_written_by_background_listener(tmp_path):
+    log_file = tmp_path / "trace.log"
+    tracing.setup_logging(str(log_file))
+    try:
+        tracing.trace_logger.info("[CallToolRequest] tool=x trace=abc params={}")
+    finally:
+        tracing.shutdown_logging()
+    assert not tracing.trace_logger.handlers
+    assert "trace=abc" in log_file.read_text()
+
+
+def test_each_worker_writes_its_own_log_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_WORKERS", 2)
+    tracing.setup_logging(str(tmp_path / "trace.log"))
+    try:
+        tracing.trace_logger.info("[CallToolRequest] tool=x trace=def params={}")
+    finally:
+        tracing.shutdown_logging()
+    assert not (tmp_path / "trace.log").exists()
+    assert "trace=def" in (tmp_path / f"trace.{os.getpid()}.log").read_text()
@@ -0,0 +1,212 @@
+"""Write transactions under contention: BEGIN IMMEDIATE, busy retries and multi-process invariants."""
+
+import multiprocessing
+import sqlite3
+
+import pytest
+
+import config
+import db
+import metrics
+from services import atp_service, inventory_service, messaging_service, write_transaction
+from services._base import begin_immediate
+
+WORKERS = 4
+ROUNDS = 15
+CONTESTED_ITEM = "ITEM-CLASSIC-10"  # 48 on hand in the seed; workers ask for more than that
+TICKS = 10
+IMPORT_ROWS = 200
+
+
+def _worker(db_path, start, results):
+    """One server process: MCP tool calls and stock picks against the shared DB file."""
+    from mcp.server.fastmcp import FastMCP
+    from mcp_tools import register_all_tools
+
+    db.DB_PATH = db_path
+    mcp = FastMCP("duck-demo-worker")
+    register_all_tools(mcp)
+    tools = mcp._tool_manager._tools
+    start.wait()
+
+    outcome = {"customers": [], "emails": [], "picked": 0, "short": 0, "errors": []}
+    for n in range(ROUNDS):
+        try:
+            created = tools["generic_confirm_action"].fn(
+                original_tool="crm_create_customer", arguments={"name": f"Contention {n}", "email": f"c{n}@example.com"})
+            outcome["customers"].append(created["customer_id"])
+            email = tools["messaging_create_email"].fn(
+                customer_id=created["customer_id"], subject=f"Hello {n}", body="Quack")
+            outcome["emails"].append(email["email_id"])
+            try:
+                inventory_service.allocate_stock([(CONTESTED_ITEM, 1)], reference_type="adjustment")
+                outcome["picked"] += 1
+            except ValueError:
+                outcome["short"] += 1
+        except Exception as exc:  # surfaced in the assertion message
+            outcome["errors"].append(repr(exc))
+    results.put(outcome)
+
+
+def _ticker(db_path, start, results):
+    """The simulation clock: hourly ticks with side effects while the workers write."""
+    from services import simulation_service
+
+    db.DB_PATH = db_path
+    start.wait()
+    outcome = {"ticks": 0, "errors": []}
+    for _ in range(TICKS):
+        try:
+            simulation_service.advance_time(hours=1)
+            outcome["ticks"] += 1
+        except Exception as exc:
+            outcome["errors"].append(repr(exc))
+    results.put(outcome)
+
+
+def _importer(db_path, start, results):
+    """A customer import executed in small chunks while the workers write."""
+    from services.data_import import data_import_service
+
+    db.DB_PATH = db_path
+    config.IMPORT_EXECUTE_CHUNK_SIZE = 10
+    conn = db.get_connection()
+    conn.execute(
+        "INSERT INTO import_jobs (id, entity_type, status, row_count, created_at) "
+        "VALUES ('IMP-CONTEND', 'customer', 'validated', ?, '2025-12-29 08:00:00')",
+        (IMPORT_ROWS,),
+    )
+    conn.executemany(
+        "INSERT INTO import_rows (id, job_id, source_row, raw_data, mapped_data, status) "
+        "VALUES (?, 'IMP-CONTEND', ?, '{}', ?, 'ready')",
+        [(f"IMP-CONTEND-{i:03d}", i, f'{{"name": "Imported {i}"}}') for i in range(IMPORT_ROWS)],
+    )
+    conn.commit()
+    conn.close()
+    start.wait()
+    outcome = {"created": 0, "errors": []}
+    try:
+        outcome["created"] = len(data_import_service.execute(job_id="IMP-CONTEND")["created"])
+    except Exception as exc:
+        outcome["errors"].append(repr(exc))
+    results.put(outcome)
+
+
+def test_concurrent_mcp_writes_across_processes_keep_invariants():
+    ctx = multiprocessing.get_context("spawn")
+    start, results = ctx.Event(), ctx.Queue()
+    targets = [_worker] * WORKERS + [_ticker, _importer]
+    procs = [ctx.Process(target=target, args=(db.DB_PATH, start, results)) for target in targets]
+    for p in procs:
+        p.start()
+    start.set()
+    everything = [results.get(timeout=180) for _ in procs]
+    for p in procs:
+        p.join(timeout=30)
+
+    assert [o["errors"] for o in everything] == [[]] * len(procs)
+    outcomes = [o for o in everything if "customers" in o]
+    assert [o["ticks"] for o in everything if "ticks" in o] == [TICKS]
+    assert [o["created"] for o in everything if "created" in o] == [IMPORT_ROWS]
+    customers = [c for o in outcomes for c in o["customers"]]
+    emails = [e for o in outcomes for e in o["emails"]]
+    assert len(customers) == len(set(customers)) == WORKERS * ROUNDS
+    assert len(emails) == len(set(emails)) == WORKERS * ROUNDS
+
+    picked = sum(o["picked"] for o in outcomes)
+    conn = db.get_connection()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM stock WHERE on_hand < 0").fetchone()[0] == 0
+        on_hand = conn.execute(
+            "SELECT COALESCE(SUM(on_hand), 0) FROM stock WHERE item_id = ?", (CONTESTED_ITEM,)).fetchone()[0]
+        moved = conn.execute(
+            "SELECT COALESCE(SUM(qty), 0) FROM stock_movements WHERE item_id = ? AND qty < 0",
+            (CONTESTED_ITEM,)).fetchone()[0]
+        activity_ids = [r[0] for r in conn.execute("SELECT id FROM activity_log")]
+        imported = conn.execute(
+            "SELECT COUNT(*) FROM import_rows r JOIN customers c ON c.id = r.created_entity_id "
+            "WHERE r.job_id = 'IMP-CONTEND' AND r.status = 'imported'").fetchone()[0]
+        job_status = conn.execute("SELECT status FROM import_jobs WHERE id = 'IMP-CONTEND'").fetchone()[0]
+    finally:
+        conn.close()
+    assert picked == 48 and on_hand == 0 and moved == -picked
+    assert sum(o["short"] for o in outcomes) == WORKERS * ROUNDS - picked
+    assert len(activity_ids) == len(set(activity_ids))
+    assert imported == IMPORT_ROWS and job_status == "executed"
+
+
+def test_begin_immediate_retries_with_backoff_then_succeeds(monkeypatch):
+    monkeypatch.setattr(config, "DB_WRITE_LOCK_TIMEOUT_MS", 0)
+    monkeypatch.setattr(config, "DB_WRITE_BACKOFF_MS", 1)
+    holder = db.get_connection()
+    holder.execute("BEGIN IMMEDIATE")
+    sleeps = []
+
+    def release_after_two(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            holder.rollback()
+
+    monkeypatch.setattr("services._base.time.sleep", release_after_two)
+    retries_before = metrics.DB_BUSY_RETRIES.value()
+    conn = db.get_connection()
+    try:
+        assert begin_immediate(conn) == 2
+        assert conn.in_transaction
+        conn.rollback()
+    finally:
+        conn.close()
+        holder.close()
+    assert metrics.DB_BUSY_RETRIES.value() - retries_before == 2
+    assert all(0 <= s <= 0.002 for s in sleeps)
+
+
+def test_begin_immediate_gives_up_after_configured_retries(monkeypatch):
+    monkeypatch.setattr(config, "DB_WRITE_LOCK_TIMEOUT_MS", 0)
+    monkeypatch.setattr(config, "DB_WRITE_RETRIES", 3)
+    monkeypatch.setattr("services._base.time.sleep", lambda s: None)
+    holder = db.get_connection()
+    holder.execute("BEGIN IMMEDIATE")
+    failures_before = metrics.DB_BUSY_FAILURES.value()
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            messaging_service.create_email("CUST-0101", "Blocked", "Quack")
+    finally:
+        holder.close()
+    assert metrics.DB_BUSY_FAILURES.value() - failures_before == 1
+
+
+def test_nested_write_transactions_commit_once_and_roll_back_together():
+    with pytest.raises(RuntimeError):
+        with write_transaction() as conn:
+            email = messaging_service.create_email("CUST-0101", "Nested", "Quack")
+            assert conn.in_transaction  # the inner block did not commit
+            raise RuntimeError("abort")
+
+    with pytest.raises(ValueError):
+        messaging_service.get_email(email["email_id"])
+
+
+def test_failed_nested_block_undoes_only_its_own_writes():
+    with write_transaction():
+        kept = messaging_service.create_email("CUST-0101", "Kept", "Quack")
+        with pytest.raises(RuntimeError):
+            with write_transaction():
+                dropped = messaging_service.create_email("CUST-0101", "Dropped", "Quack")
+                raise RuntimeError("abort")
+
+    assert messaging_service.get_email(kept["email_id"])
+    with pytest.raises(ValueError):
+        messaging_service.get_email(dropped["email_id"])
+
+
+def test_worker_mode_caches_follow_commits_from_other_processes(monkeypatch):
+    monkeypatch.setattr(config, "SERVER_WORKERS", 2)
+    before = atp_service.get_projection(CONTESTED_ITEM).balance[0]
+
+    other = sqlite3.connect(db.DB_PATH)  # stands in for another worker; no invalidate() reaches us
+    other.execute("UPDATE stock SET on_hand = on_hand - 8 WHERE item_id = ?", (CONTESTED_ITEM,))
+    other.commit()
+    other.close()
+
+    assert atp_service.get_projection(CONTESTED_ITEM).balance[0] == before - 8
@@ -0,0 +1,149 @@
+"""Structured, size-capped tracing of MCP tool calls.
+
+Every tool call gets a short trace ID, held in a context variable for the
+duration of the call so that activity_log rows written underneath it carry
+the same ID.  Call arguments and results are summarised before logging:
+long strings are truncated, base64/binary payloads and known blob fields
+are replaced by a size marker, and long lists and dicts are cut to their
+first entries.  Only a sampled fraction of successful calls is traced;
+errors always are.
+
+Trace records go to the ``duck-demo.trace`` logger.  :func:`setup_logging`
+hands them to a background thread (``QueueHandler``/``QueueListener``)
+that writes a rotating log file, so request threads never wait on disk.
+With several server workers each process writes its own file (PID in the
+name): a RotatingFileHandler only rotates safely when it is the file's sole
+writer.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+import config
+
+trace_logger = logging.getLogger("duck-demo.trace")
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Long runs of base64 alphabet (optionally behind a data: URI prefix)
+_BASE64_RE = re.compile(r"^(data:[\w/+.-]+;base64,)?[A-Za-z0-9+/=\r\n]+$")
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace ID of the tool call being executed, or ``None`` outside one."""
+    return _trace_id.get()
+
+
+@contextmanager
+def trace(trace_id: Optional[str] = None) -> Iterator[str]:
+    """Run the block under *trace_id* (a fresh ID when omitted) and yield it."""
+    trace_id = trace_id or uuid.uuid4().hex[:16]
+    token = _trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+
+def sampled() -> bool:
+    """Whether a successful call should be traced (``TOOL_TRACE_SAMPLE_RATE``)."""
+    rate = config.TOOL_TRACE_SAMPLE_RATE
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def summarize(value: Any, depth: int = 0) -> Any:
+    """JSON-friendly copy of *value* with blobs redacted and sizes capped."""
+    max_chars = config.TOOL_TRACE_MAX_FIELD_CHARS
+    max_items = config.TOOL_TRACE_MAX_ITEMS
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        if len(value) > max_chars and _BASE64_RE.match(value[:4096]):
+            return f"<base64 {len(value)} chars>"
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+        return value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if depth >= config.TOOL_TRACE_MAX_DEPTH:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        out = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i == max_items:
+                out["..."] = f"+{len(value) - max_items} keys"
+                break
+            if str(key) in config.TOOL_TRACE_REDACT_FIELDS and item:
+                size = len(item) if isinstance(item, (str, bytes, bytearray)) else None
+                out[str(key)] = f"<redacted {size} chars>" if size is not None else "<redacted>"
+            else:
+                out[str(key)] = summarize(item, depth + 1)
+        return out
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value)
+        out = [summarize(item, depth + 1) for item in items[:max_items]]
+        if len(items) > max_items:
+            out.append(f"...(+{len(items) - max_items} items)")
+        return out
+    return summarize(str(value), depth)
+
+
+def worker_log_file(log_file: str, pid: Optional[int] = None) -> str:
+    """Return *log_file* with the worker's PID before the extension (``duck-demo.4242.log``)."""
+    root, ext = os.path.splitext(log_file)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def setup_logging(log_file: Optional[str] = None) -> logging.handlers.QueueListener:
+    """Send ``duck-demo.trace`` records to a rotating file via a background thread.
+
+    In multi-worker mode the file name gets this process's PID (see
+    :func:`worker_log_file`), so every worker rotates only its own file.
+    Idempotent; :func:`shutdown_logging` runs at interpreter exit.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    log_file = log_file or config.LOG_FILE
+    if config.SERVER_WORKERS > 1:
+        log_file = worker_log_file(log_file)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=config.LOG_MAX_BYTES,
+        backupCount=config.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s", "%Y-%m-%dT%H:%M:%S"))
+    records: queue.Queue = queue.Queue(-1)
+    trace_logger.addHandler(logging.handlers.QueueHandler(records))
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.propagate = False
+    _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush pending trace records and detach the file from ``duck-demo.trace``."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    for handler in list(trace_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            trace_logger.removeHandler(handler)
+    trace_logger.propagate = True
+    _listener = None
@@ -95,10 +95,12 @@ export const api = {
     production_orders: { label: string; sublabel: string; href: string }[]
     purchase_orders: { label: string; sublabel: string; href: string }[]
   }>(`/stats/spotlight`),
-  activityLog: (params?: { limit?: number; offset?: number; category?: string; action?: string; entity_type?: string; entity_id?: string; since?: string; until?: string }) => {
+  activityLog: (params?: { limit?: number; offset?: number; cursor?: string; total?: 'exact' | 'approx' | 'none'; category?: string; action?: string; entity_type?: string; entity_id?: string; since?: string; until?: string }) => {
     const p = new URLSearchParams()
     if (params?.limit) p.set('limit', String(params.limit))
     if (params?.offset) p.set('offset', String(params.offset))
+    if (params?.cursor) p.set('cursor', params.cursor)
+    if (params?.total) p.set('total', params.total)
     if (params?.category) p.set('category', params.category)
     if (params?.action) p.set('action', params.action)
     if (params?.entity_type) p.set('entity_type', params.entity_type)
@@ -106,7 +108,7 @@ export const api = {
     if (params?.since) p.set('since', params.since)
     if (params?.until) p.set('until', params.until)
     const q = p.toString()
-    return fetchJson<{ entries: ActivityLogEntry[]; total: number; limit: number; offset: number }>(`/activity-log${q ? `?${q}` : ''}`)
+    return fetchJson<{ entries: ActivityLogEntry[]; total: number | null; limit: number; offset: number; next_cursor: string | null }>(`/activity-log${q ? `?${q}` : ''}`)
   },
   activitySummary: (params?: { since?: string; until?: string }) => {
     const p = new URLSearchParams()
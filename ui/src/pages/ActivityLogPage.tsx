@@ -34,28 +34,29 @@ const PAGE_SIZE = 50
 export function ActivityLogPage() {
     const [entries, setEntries] = useState<ActivityLogEntry[]>([])
     const [total, setTotal] = useState(0)
-    const [offset, setOffset] = useState(0)
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
     const [loading, setLoading] = useState(true)
     const [category, setCategory] = useState('')
     const [actionFilter, setActionFilter] = useState('')
     const [error, setError] = useState<string | null>(null)
 
-    const load = useCallback((newOffset: number) => {
+    const load = useCallback((cursor: string | null) => {
         setLoading(true)
         api.activityLog({
             limit: PAGE_SIZE,
-            offset: newOffset,
+            cursor: cursor ?? undefined,
+            total: cursor === null ? 'exact' : 'none',
             category: category || undefined,
             action: actionFilter || undefined,
         })
             .then((data) => {
-                if (newOffset === 0) {
+                if (cursor === null) {
                     setEntries(data.entries)
+                    setTotal(data.total ?? 0)
                 } else {
                     setEntries((prev) => [...prev, ...data.entries])
                 }
-                setTotal(data.total)
-                setOffset(newOffset)
+                setNextCursor(data.next_cursor)
                 setError(null)
             })
             .catch((err) => setError(String(err)))
@@ -64,11 +65,11 @@ export function ActivityLogPage() {
 
     // Reload on filter change
     useEffect(() => {
-        load(0)
+        load(null)
     }, [load])
 
     const handleLoadMore = () => {
-        load(offset + PAGE_SIZE)
+        load(nextCursor)
     }
 
     return (
@@ -149,7 +150,7 @@ export function ActivityLogPage() {
             </div>
 
             {/* Load more */}
-            {entries.length < total && (
+            {nextCursor !== null && (
                 <div className="flex justify-center">
                     <button
                         onClick={handleLoadMore}
@@ -1,7 +1,8 @@
 """Utility functions for the duck-demo application."""
 
+import importlib
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 from urllib.parse import quote
 import config
 
@@ -81,3 +82,41 @@ def format_qty(value: int, uom: str) -> str:
         fmt = f"{litres:g}"
         return f"{fmt} L"
     return f"{value} {uom}"
+
+
+# ---------------------------------------------------------------------------
+# Deferred imports — keep heavy optional libraries off the startup path
+# ---------------------------------------------------------------------------
+
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str, before: Optional[Callable[[], None]] = None):
+        self._name = name
+        self._before = before
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            if self._before is not None:
+                self._before()
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str, before: Optional[Callable[[], None]] = None) -> Any:
+    """Return a proxy for module *name* that imports it on first use.
+
+    *before* runs once, just ahead of the real import (e.g. to pick the
+    matplotlib backend).  Used for libraries such as ReportLab, matplotlib,
+    Pillow and openai that only a few tools need, so ``import server``
+    stays fast.
+    """
+    return _LazyModule(name, before)